@@ -0,0 +1,38 @@
+"""
+app_paths.py - Diretório de dados persistentes do aplicativo (caches e histórico)
+"""
+import os
+
+# Permite apontar os dados para outro diretório (ex: testes)
+DATA_DIR_ENV = 'MENINODETI_DATA_DIR'
+
+
+def get_data_dir() -> str:
+    """
+    Retorna o diretório de dados do aplicativo, criando-o se necessário.
+
+    Usa %LOCALAPPDATA%\\MeninoDeTI no Windows (fora da pasta Temp, que a
+    limpeza apaga) e ~/.meninodeti nos demais sistemas.
+
+    Returns:
+        Caminho absoluto do diretório
+    """
+    data_dir = os.getenv(DATA_DIR_ENV)
+    if not data_dir:
+        base = os.getenv('LOCALAPPDATA')
+        data_dir = os.path.join(base, 'MeninoDeTI') if base else os.path.join(os.path.expanduser('~'), '.meninodeti')
+    os.makedirs(data_dir, exist_ok=True)
+    return data_dir
+
+
+def get_data_path(filename: str) -> str:
+    """
+    Retorna o caminho de um arquivo dentro do diretório de dados.
+
+    Args:
+        filename: Nome do arquivo
+
+    Returns:
+        Caminho absoluto do arquivo
+    """
+    return os.path.join(get_data_dir(), filename)
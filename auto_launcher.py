@@ -2,18 +2,52 @@
 """
 auto_launcher.py - Launcher automático que detecta argumentos de modo
 Permite executar com: python auto_launcher.py console  ou  python auto_launcher.py gui
+Execuções agendadas: python auto_launcher.py headless <apps|windows|cleanup|all> (headless_cli.py)
+
+tkinter, a splash gráfica (Pillow) e o restante da GUI só são importados
+quando o modo gráfico ou o seletor de modo é escolhido; o modo console usa a
+tela de inicialização para pré-carregar o que o menu vai usar.
 """
 import sys
 import os
-import tkinter as tk
-from tkinter import ttk
 
 from console_splash import ConsoleSplash
-from splash_screen import SplashScreen
-from gui_utils import center_window
 from system_check import SystemChecker
 
 
+def _preload_update_modules():
+    """Importa os módulos usados pelas opções de atualização e limpeza"""
+    import powershell_manager  # noqa: F401
+    import cleanup_manager  # noqa: F401
+
+
+def _preload_prerequisites():
+    """Carrega o cache de pré-requisitos gravado em disco"""
+    from prereq_cache import get_shared_cache
+    get_shared_cache()
+
+
+def _preload_upgrade_catalog():
+    """Carrega o catálogo local de atualizações de aplicativos"""
+    from upgrade_catalog import get_shared_catalog
+    get_shared_catalog()
+
+
+def _preload_size_index():
+    """Carrega o índice de tamanhos usado pela limpeza"""
+    from size_index import get_shared_size_index
+    get_shared_size_index()
+
+
+# Trabalho real exibido na tela de inicialização do modo console
+CONSOLE_PRELOAD_TASKS = [
+    ("Carregando modulos de atualizacao...", _preload_update_modules),
+    ("Lendo cache de pre-requisitos...", _preload_prerequisites),
+    ("Lendo catalogo de atualizacoes...", _preload_upgrade_catalog),
+    ("Lendo indice de tamanhos da limpeza...", _preload_size_index),
+]
+
+
 def show_console_menu():
     """Exibe menu interativo no console"""
     while True:
@@ -82,6 +116,9 @@ def verificar_status_sistema():
         from powershell_manager import PowerShellManager
         ps_manager = PowerShellManager()
         
+        # Verificação explícita: ignorar resultados em cache e consultar de novo
+        ps_manager.invalidate_prerequisites()
+        
         # Verificar privilégios de administrador
         if ps_manager.check_admin_privileges():
             print("✓ Executando como Administrador")
@@ -132,7 +169,10 @@ def atualizar_aplicativos():
     
     try:
         from powershell_manager import PowerShellManager
-        ps_manager = PowerShellManager()
+        from upgrade_catalog import format_catalog_age, get_shared_catalog
+        from upgrade_eta import UpgradeEta
+        from upgrade_history import get_shared_history
+        ps_manager = PowerShellManager(catalog=get_shared_catalog(), history=get_shared_history())
         
         print("\nVerificando winget...")
         is_installed, msg = ps_manager.install_winget_if_needed()
@@ -147,10 +187,8 @@ def atualizar_aplicativos():
             print("\n🔄 Iniciando atualização rápida (bulk update)...")
             print("Isso pode levar vários minutos...\n")
             
-            success, output = ps_manager.update_all_apps_with_winget()
-            
-            if output:
-                print(output)
+            # Saída exibida ao vivo enquanto o comando executa
+            success, output = ps_manager.update_all_apps_with_winget(output_callback=print)
             
             if success:
                 print("\n✓ Aplicativos atualizados com sucesso!")
@@ -162,15 +200,29 @@ def atualizar_aplicativos():
             print("\n🔄 Iniciando atualização detalhada...")
             print("Listando aplicativos para atualizar...\n")
             
+            # Catálogo local exibido na hora (a consulta ao winget só ocorre se não estiver recente)
+            snapshot = ps_manager.catalog.snapshot()
+            if snapshot is not None:
+                cached_apps, age = snapshot
+                print(f"Catálogo local ({format_catalog_age(age)}): {len(cached_apps)} aplicativo(s)")
+                for app in cached_apps:
+                    print(f"  • {app['name']} {app['version']} → {app['available']}")
+                print()
+            
+            # Tempo restante estimado pelo histórico de cada app (upgrade_eta.py)
+            eta = UpgradeEta(ps_manager.history)
+            
             def progress_callback(current, total, app_name, success):
+                remaining = eta.describe()
+                suffix = f" ({remaining})" if remaining else ""
                 if success is None:
-                    print(f"[{current}/{total}] Atualizando: {app_name}...")
+                    print(f"[{current}/{total}] Atualizando: {app_name}...{suffix}")
                 elif success:
-                    print(f"[{current}/{total}] ✓ {app_name} - Atualizado com sucesso")
+                    print(f"[{current}/{total}] ✓ {app_name} - Atualizado com sucesso{suffix}")
                 else:
-                    print(f"[{current}/{total}] ✗ {app_name} - Falha na atualização")
+                    print(f"[{current}/{total}] ✗ {app_name} - Falha na atualização{suffix}")
             
-            successful, failed, failed_apps = ps_manager.update_apps_individually(progress_callback)
+            successful, failed, failed_apps = ps_manager.update_apps_individually(progress_callback, eta=eta)
             
             print(f"\n{'='*75}")
             print("RESUMO DA ATUALIZAÇÃO")
@@ -217,10 +269,8 @@ def atualizar_windows():
         print("\n🔄 Iniciando Windows Update...")
         print("Isso pode levar muito tempo...\n")
         
-        success, output = ps_manager.run_windows_update()
-        
-        if output:
-            print(output)
+        # Saída exibida ao vivo enquanto o comando executa
+        success, output = ps_manager.run_windows_update(output_callback=print)
         
         if success or "No updates available" in output or "não há atualizações" in output.lower():
             print("\n✓ Windows Update concluído!")
@@ -247,49 +297,51 @@ def atualizar_tudo():
         return
     
     print("\n" + "="*75)
-    print("ETAPA 1/2: ATUALIZANDO APLICATIVOS")
+    print("APLICATIVOS + BUSCA E DOWNLOAD DO WINDOWS UPDATE (EM PARALELO)")
     print("="*75 + "\n")
     
     try:
         from powershell_manager import PowerShellManager
-        ps_manager = PowerShellManager()
-        
-        # Etapa 1: Aplicativos
-        is_installed, msg = ps_manager.install_winget_if_needed()
-        
-        if is_installed:
-            print("🔄 Atualizando aplicativos...")
-            success, output = ps_manager.update_all_apps_with_winget()
+        from update_pipeline import FullUpdatePipeline
+        from upgrade_catalog import get_shared_catalog
+        from upgrade_history import get_shared_history
+        ps_manager = PowerShellManager(catalog=get_shared_catalog(), history=get_shared_history())
+        
+        def apps_step(report):
+            is_installed, msg = ps_manager.install_winget_if_needed()
+            if not is_installed:
+                print(f"⚠️  {msg}")
+                return False
             
-            if output:
-                print(output)
+            print("🔄 Atualizando aplicativos...")
+            # Saída exibida ao vivo enquanto o comando executa
+            success, output = ps_manager.update_all_apps_with_winget(output_callback=print)
             
             if success:
                 print("\n✓ Aplicativos atualizados!")
             else:
                 print("\n⚠️  Problemas ao atualizar aplicativos.")
+            return success
+        
+        # Do Windows Update só o progresso (a saída do winget já ocupa o console);
+        # a instalação começa quando os aplicativos terminam
+        def on_progress(percent, message):
+            print(f"[{percent:5.1f}%] {message}")
+        
+        result = FullUpdatePipeline(ps_manager, apps_step, on_progress).run()
+        
+        if result['apps_error']:
+            print(f"\n❌ Erro ao atualizar aplicativos: {result['apps_error']}")
+        if result['windows_error']:
+            print(f"\n⚠️  {result['windows_error']}")
+        elif result['windows_skipped']:
+            print("\n✓ Windows Update: nenhuma atualização disponível")
+        elif result['windows_success'] or "No updates available" in result['windows_output']:
+            print("\n✓ Windows Update concluído!")
         else:
-            print(f"⚠️  {msg}")
-        
-        # Etapa 2: Windows
-        print("\n" + "="*75)
-        print("ETAPA 2/2: ATUALIZANDO WINDOWS")
-        print("="*75 + "\n")
-        
-        module_success, module_msg = ps_manager.install_pswindowsupdate_module()
-        print(module_msg)
-        
-        if module_success:
-            print("\n🔄 Executando Windows Update...")
-            success, output = ps_manager.run_windows_update()
-            
-            if output:
-                print(output)
-            
-            if success or "No updates available" in output:
-                print("\n✓ Windows Update concluído!")
-            else:
-                print("\n⚠️  Problemas no Windows Update.")
+            print("\n⚠️  Problemas no Windows Update.")
+        print(f"Download do Windows Update em paralelo com os aplicativos por "
+              f"{result['overlap_seconds']:.0f}s (total {result['seconds']['total']:.0f}s)")
         
         print("\n" + "="*75)
         print("ATUALIZAÇÃO COMPLETA FINALIZADA")
@@ -364,7 +416,7 @@ def launch_console_mode():
     print("="*75 + "\n")
     
     splash = ConsoleSplash()
-    splash.show()
+    splash.show(tasks=CONSOLE_PRELOAD_TASKS)
     
     print("\n✓ Aplicação iniciada em modo console!")
     print("\n")
@@ -376,7 +428,13 @@ def launch_console_mode():
 def launch_gui_mode():
     """Inicia a aplicação em modo gráfico"""
     try:
+        import tkinter as tk
+        from splash_screen import SplashScreen
         from gui_main_window import MeninoDeTIHelperGUI
+        from startup_tasks import start_gui_startup
+        
+        # Aquecimento real (sessão PowerShell, pré-requisitos, catálogo, índice)
+        ps_manager, startup = start_gui_startup()
         
         # Criar janela principal (mas não exibir ainda)
         root = tk.Tk()
@@ -384,12 +442,12 @@ def launch_gui_mode():
         
         # Mostrar splash screen
         image_path = os.path.join(os.path.dirname(__file__), 'img', 'loading.png')
-        splash = SplashScreen(root, image_path=image_path, duration=3.0)
+        splash = SplashScreen(root, image_path=image_path, startup=startup)
         
-        # Quando splash terminar, mostrar aplicação principal
+        # Quando as tarefas críticas terminarem, mostrar aplicação principal
         def show_main_window():
             root.deiconify()
-            app = MeninoDeTIHelperGUI(root)
+            app = MeninoDeTIHelperGUI(root, ps_manager=ps_manager)
         
         splash.set_complete_callback(show_main_window)
         root.mainloop()
@@ -401,6 +459,10 @@ def launch_gui_mode():
 
 def launch_launcher_mode():
     """Abre o seletor de modo"""
+    import tkinter as tk
+    from tkinter import ttk
+    from gui_utils import center_window
+    
     class ModeLauncher:
         """Janela para escolher entre modo console e modo gráfico"""
         
@@ -505,6 +567,11 @@ def launch_launcher_mode():
 
 def main():
     """Função principal"""
+    # Modo sem interface: nada de prompts nem textos extras em stdout
+    if len(sys.argv) > 1 and sys.argv[1].lower() == "headless":
+        from headless_cli import main as headless_main
+        sys.exit(headless_main(sys.argv[2:]))
+    
     # Verificar compatibilidade do sistema
     print("\n" + "="*75)
     print("MENINO DA TI - VERIFICAÇÃO DE SISTEMA")
@@ -533,7 +600,7 @@ def main():
     elif mode == "gui":
         launch_gui_mode()
     else:
-        print("Modo inválido! Use: python auto_launcher.py [console|gui]")
+        print("Modo inválido! Use: python auto_launcher.py [console|gui|headless <comando>]")
         sys.exit(1)
 
 
@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+"""
+bench_cleanup_engine.py - Benchmark do motor de exclusão da limpeza
+
+Gera uma árvore sintética de arquivos pequenos e compara a limpeza antiga
+(pré-varredura com _get_folder_size + os.walk/isfile/getsize + shutil.rmtree)
+com o motor de passada única (cleanup_engine.delete_tree_contents), tanto na
+varredura de tamanho quanto na exclusão.
+
+As chamadas de sistema de arquivos são contadas interceptando as funções do
+módulo os (stat, lstat, scandir, listdir, remove, unlink, rmdir, open).
+DirEntry.stat() não passa pelo módulo os: no Windows ele não custa nada (o
+tamanho vem da listagem), no Linux custa um lstat por arquivo, somado à parte
+como 'direntry_stat_posix'.
+
+Uso:
+    python bench_cleanup_engine.py [arquivos] [arquivos_por_pasta]
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+from collections import Counter
+
+COUNTED_FUNCTIONS = ('stat', 'lstat', 'scandir', 'listdir', 'remove', 'unlink', 'rmdir', 'open')
+
+
+def generate_tree(root: str, files: int, per_dir: int = 100) -> int:
+    """
+    Cria 'files' arquivos pequenos distribuídos em pastas de dois níveis.
+
+    Returns:
+        Total de bytes gerados
+    """
+    total = 0
+    dirs = max(1, files // per_dir)
+    created = 0
+    for d in range(dirs):
+        folder = os.path.join(root, f"grupo{d // 50}", f"pasta{d}")
+        os.makedirs(folder, exist_ok=True)
+        for f in range(per_dir):
+            if created >= files:
+                break
+            data = b"x" * (64 + (created % 512))
+            with open(os.path.join(folder, f"arquivo{f}.tmp"), 'wb') as handle:
+                handle.write(data)
+            total += len(data)
+            created += 1
+    return total
+
+
+def _legacy_clean(path: str):
+    """Reproduz a limpeza antiga: pré-varredura descartada + os.walk + rmtree"""
+    _legacy_folder_size(path)
+    deleted_count = 0
+    freed_bytes = 0
+    for item in os.listdir(path):
+        item_path = os.path.join(path, item)
+        if os.path.isfile(item_path):
+            size = os.path.getsize(item_path)
+            os.remove(item_path)
+            deleted_count += 1
+            freed_bytes += size
+        elif os.path.isdir(item_path):
+            for subdir, _, files in os.walk(item_path, topdown=False):
+                for file in files:
+                    try:
+                        file_path = os.path.join(subdir, file)
+                        size = os.path.getsize(file_path)
+                        os.remove(file_path)
+                        deleted_count += 1
+                        freed_bytes += size
+                    except OSError:
+                        pass
+            shutil.rmtree(item_path, ignore_errors=True)
+    return deleted_count, freed_bytes
+
+
+def _legacy_folder_size(path: str):
+    total_size = 0
+    file_count = 0
+    for dirpath, dirnames, filenames in os.walk(path):
+        for filename in filenames:
+            filepath = os.path.join(dirpath, filename)
+            if os.path.isfile(filepath):
+                total_size += os.path.getsize(filepath)
+                file_count += 1
+    return total_size, file_count
+
+
+class _SyscallCounter:
+    """Conta chamadas às funções de sistema de arquivos do módulo os"""
+
+    def __init__(self):
+        self.counts = Counter()
+        self.originals = {}
+
+    def __enter__(self):
+        for name in COUNTED_FUNCTIONS:
+            original = getattr(os, name)
+            self.originals[name] = original
+
+            def wrapper(*args, _name=name, _original=original, **kwargs):
+                self.counts[_name] += 1
+                return _original(*args, **kwargs)
+
+            setattr(os, name, wrapper)
+        return self
+
+    def __exit__(self, *exc):
+        for name, original in self.originals.items():
+            setattr(os, name, original)
+        return False
+
+
+def _measure(func, path: str) -> dict:
+    """Executa func(path) contando chamadas os.* e medindo o tempo"""
+    if hasattr(os, 'sync'):
+        os.sync()
+    with _SyscallCounter() as counter:
+        start = time.perf_counter()
+        result = func(path)
+        elapsed = time.perf_counter() - start
+    calls = dict(counter.counts)
+    return {
+        'seconds': round(elapsed, 3),
+        'result': result,
+        'os_calls': calls,
+        'os_calls_total': sum(calls.values()),
+    }
+
+
+def run_benchmark(files: int = 200000, per_dir: int = 100) -> dict:
+    """
+    Mede a varredura de tamanho e a exclusão de cada estratégia.
+
+    A varredura é medida duas vezes na mesma árvore; a exclusão usa uma
+    árvore nova para cada estratégia.
+
+    Returns:
+        Dicionário com tempo, resultado e chamadas de cada estratégia
+    """
+    import logging
+    logging.disable(logging.INFO)
+
+    from cleanup_engine import scan_tree_size
+    from cleanup_manager import CleanupManager
+
+    results = {'files': files, 'per_dir': per_dir, 'scan': {}, 'delete': {}}
+    manager = CleanupManager()
+
+    strategies = (
+        ('legacy', _legacy_folder_size, _legacy_clean),
+        ('single_pass', scan_tree_size, manager._safe_delete_folder_contents),
+    )
+
+    for label, scan, clean in strategies:
+        root = tempfile.mkdtemp(prefix=f"bench_cleanup_{label}_")
+        try:
+            generated = generate_tree(root, files, per_dir)
+            results['scan'][label] = _measure(scan, root)
+            results['delete'][label] = _measure(clean, root)
+            results['delete'][label]['bytes_generated'] = generated
+        finally:
+            shutil.rmtree(root, ignore_errors=True)
+
+    # DirEntry.stat() faz um lstat por arquivo em POSIX (gratuito no Windows)
+    results['direntry_stat_posix'] = files if os.name != 'nt' else 0
+    for phase in ('scan', 'delete'):
+        results[phase]['speedup'] = round(
+            results[phase]['legacy']['seconds'] / max(results[phase]['single_pass']['seconds'], 1e-9), 2
+        )
+    return results
+
+
+def main():
+    files = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    per_dir = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+
+    print("\n" + "="*75)
+    print("BENCHMARK - MOTOR DE EXCLUSÃO DA LIMPEZA")
+    print("="*75 + "\n")
+
+    results = run_benchmark(files, per_dir)
+
+    print(f"Arquivos: {results['files']} ({results['per_dir']} por pasta)")
+    for phase, title in (('scan', 'Varredura de tamanho'), ('delete', 'Exclusão')):
+        print(f"\n{title}:")
+        for label in ('legacy', 'single_pass'):
+            data = results[phase][label]
+            print(f"  {label:<12} {data['seconds']:7.2f}s  resultado={data['result']}  "
+                  f"chamadas os.*={data['os_calls_total']} {data['os_calls']}")
+        print(f"  Ganho: {results[phase]['speedup']}x")
+    print(f"\nlstat via DirEntry.stat por passada (POSIX; zero no Windows): {results['direntry_stat_posix']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+"""
+bench_cleanup_parallel.py - Benchmark da limpeza serial vs paralela
+
+Gera várias pastas-alvo sintéticas (como caches de navegador, INetCache, pip,
+npm) e mede CleanupManager.clean_cache com max_workers=1 e com o pool de
+threads. Opcionalmente simula a latência de cada exclusão (ex: antivírus ou
+disco de rede), que é o caso em que a concorrência mais ajuda.
+
+Uso:
+    python bench_cleanup_parallel.py [alvos] [subpastas] [arquivos_por_subpasta] [latência_ms] [workers]
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from bench_cleanup_engine import generate_tree
+
+
+def _latency_remove(original, latency: float):
+    """Envolve os.remove adicionando uma espera de I/O por arquivo"""
+    def remove(path, *args, **kwargs):
+        time.sleep(latency)
+        return original(path, *args, **kwargs)
+    return remove
+
+
+def run_benchmark(targets: int = 6, subdirs: int = 10, files_per_subdir: int = 200,
+                  latency_ms: float = 0.0, workers: int = 4) -> dict:
+    """
+    Executa a limpeza serial e a paralela sobre árvores idênticas.
+
+    Returns:
+        Dicionário com tempo, arquivos, bytes e progresso de cada modo
+    """
+    import logging
+    logging.disable(logging.INFO)
+
+    from cleanup_manager import CleanupManager
+
+    files_per_target = subdirs * files_per_subdir
+    results = {
+        'targets': targets,
+        'files': targets * files_per_target,
+        'latency_ms': latency_ms,
+        'workers': workers,
+    }
+
+    original_remove = os.remove
+    if latency_ms:
+        os.remove = _latency_remove(original_remove, latency_ms / 1000.0)
+
+    try:
+        for label, worker_count in (('serial', 1), ('parallel', workers)):
+            root = tempfile.mkdtemp(prefix=f"bench_cleanup_{label}_")
+            try:
+                folders = []
+                for t in range(targets):
+                    folder = os.path.join(root, f"alvo{t}")
+                    os.makedirs(folder)
+                    generate_tree(folder, files_per_target, files_per_subdir)
+                    folders.append(folder)
+
+                progress = []
+                manager = CleanupManager(lambda msg, pct: progress.append(pct), max_workers=worker_count)
+                manager.get_cache_folders = lambda: folders
+
+                start = time.perf_counter()
+                cleaned = manager.clean_cache()
+                elapsed = time.perf_counter() - start
+
+                results[label] = {
+                    'seconds': round(elapsed, 3),
+                    'files_deleted': cleaned['files_deleted'],
+                    'bytes_freed': cleaned['bytes_freed'],
+                    'details': len(cleaned['details']),
+                    'progress_monotonic': progress == sorted(progress),
+                }
+            finally:
+                shutil.rmtree(root, ignore_errors=True)
+    finally:
+        os.remove = original_remove
+
+    results['speedup'] = round(results['serial']['seconds'] / results['parallel']['seconds'], 2)
+    return results
+
+
+def main():
+    args = [float(a) for a in sys.argv[1:]]
+    targets = int(args[0]) if len(args) > 0 else 6
+    subdirs = int(args[1]) if len(args) > 1 else 10
+    files_per_subdir = int(args[2]) if len(args) > 2 else 200
+    latency_ms = args[3] if len(args) > 3 else None
+    workers = int(args[4]) if len(args) > 4 else 4
+
+    print("\n" + "="*75)
+    print("BENCHMARK - LIMPEZA SERIAL VS PARALELA")
+    print("="*75 + "\n")
+
+    # Sem latência informada: mede o disco local e uma latência de 0,2 ms por arquivo
+    latencies = [latency_ms] if latency_ms is not None else [0.0, 0.2]
+    for latency in latencies:
+        results = run_benchmark(targets, subdirs, files_per_subdir, latency, workers)
+        print(f"Alvos: {results['targets']}, arquivos: {results['files']}, latência simulada: {latency} ms")
+        for label in ('serial', 'parallel'):
+            data = results[label]
+            print(f"  {label:<9} {data['seconds']:6.2f}s  arquivos={data['files_deleted']}  "
+                  f"detalhes={data['details']}  progresso monotônico={data['progress_monotonic']}")
+        print(f"  Ganho ({workers} workers): {results['speedup']}x\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,261 @@
+# -*- coding: utf-8 -*-
+"""
+bench_eta.py - Erro da estimativa de tempo restante em históricos reproduzidos
+
+Reproduz execuções de atualização já terminadas (início e duração de cada
+pacote) com o relógio do UpgradeEta avançando de evento em evento. Antes de
+cada execução, o histórico contém só as execuções anteriores, como aconteceria
+de verdade. A cada pacote concluído, compara o tempo restante estimado com o
+que de fato faltava.
+
+Estimadores comparados:
+    eta    UpgradeEta (histórico por pacote, modelo sem histórico, correção ao vivo)
+    count  O que a barra antiga sugeria: decorrido / concluídos * faltando
+
+O erro é dado em % da duração da execução (|estimado - real| / duração).
+A primeira execução não tem histórico nenhum (só o modelo sem histórico).
+
+Sem --db, as execuções são sintéticas: pacotes com duração log-normal (de
+ferramentas de segundos a IDEs de vários minutos), variação entre execuções,
+downloads concorrentes e instalações serializadas, como no UpgradeScheduler.
+Com --db, reproduz o histórico gravado (upgrade_history.sqlite3), agrupando
+em execuções as tentativas separadas por mais de --gap segundos.
+
+Uso:
+    python bench_eta.py [execuções] [pacotes] [workers]
+    python bench_eta.py --db caminho/upgrade_history.sqlite3 [--gap 1800]
+"""
+import heapq
+import math
+import random
+import sys
+from typing import List, Optional
+
+# Intervalo sem tentativas que separa duas execuções no histórico gravado (segundos)
+DEFAULT_SESSION_GAP = 1800
+
+
+def synthetic_sessions(sessions: int = 8, packages: int = 15, workers: int = 3,
+                       seed: int = 0) -> List[List[dict]]:
+    """
+    Gera execuções sintéticas com o agendamento do UpgradeScheduler.
+
+    Returns:
+        Lista de execuções; cada execução é uma lista de tentativas com
+        package_id, started_at, seconds, success, outcome, download_seconds,
+        install_seconds e installer_type
+    """
+    rng = random.Random(seed)
+    catalog = []
+    for index in range(packages):
+        total = math.exp(rng.gauss(math.log(60), 1.0))
+        catalog.append({'package_id': f"Bench.Package{index}", 'seconds': total,
+                        'install_share': rng.uniform(0.2, 0.7),
+                        'installer_type': rng.choice(('exe', 'msi', 'msix'))})
+
+    result = []
+    clock = 1_000_000.0
+    for _ in range(sessions):
+        clock += 7 * 24 * 3600
+        selected = [package for package in catalog if rng.random() < 0.6] or catalog[:1]
+        queue = []
+        for package in selected:
+            total = package['seconds'] * math.exp(rng.gauss(0, 0.2))
+            success = rng.random() >= 0.05
+            queue.append((package, total * (1 - package['install_share']),
+                          total * package['install_share'] if success else 0.0, success))
+
+        # Downloads em paralelo nos workers; o mutex de instalação vai para quem terminar o download primeiro
+        ready = []
+        attempts = []
+
+        def start(at):
+            package, download, install, success = queue.pop(0)
+            heapq.heappush(ready, (at + download, len(attempts), at, package, download, install, success))
+            attempts.append(None)
+
+        while queue and len(ready) < max(1, workers):
+            start(clock)
+        installer_free = clock
+        while ready:
+            download_done, index, started_at, package, download, install, success = heapq.heappop(ready)
+            finished_at = download_done
+            if success:
+                installer_free = max(download_done, installer_free) + install
+                finished_at = installer_free
+            attempts[index] = {
+                'package_id': package['package_id'], 'started_at': started_at,
+                'seconds': finished_at - started_at, 'success': success,
+                'outcome': 'upgraded' if success else 'installer_failed',
+                'download_seconds': download, 'install_seconds': install if success else None,
+                'installer_type': package['installer_type'],
+            }
+            if queue:
+                start(finished_at)
+        result.append(attempts)
+    return result
+
+
+def sessions_from_history(history, gap_seconds: float = DEFAULT_SESSION_GAP,
+                          limit: int = 100000) -> List[List[dict]]:
+    """Agrupa as tentativas gravadas em execuções (intervalo maior que gap_seconds separa)"""
+    attempts = sorted(history.attempts(limit=limit), key=lambda a: a['started_at'])
+    sessions = []
+    last_end = None
+    for attempt in attempts:
+        if last_end is None or attempt['started_at'] - last_end > gap_seconds:
+            sessions.append([])
+            last_end = attempt['started_at']
+        sessions[-1].append(attempt)
+        last_end = max(last_end, attempt['started_at'] + attempt['seconds'])
+    return sessions
+
+
+def _record(history, attempt: dict):
+    history.record(attempt['package_id'], attempt['success'], attempt['outcome'], attempt['seconds'],
+                   installer_type=attempt.get('installer_type'),
+                   download_seconds=attempt.get('download_seconds'),
+                   install_seconds=attempt.get('install_seconds'), started_at=attempt['started_at'])
+
+
+def replay_session(attempts: List[dict], history, workers: int) -> List[dict]:
+    """
+    Reproduz uma execução e mede as estimativas a cada pacote concluído.
+
+    Returns:
+        Lista de pontos {'done', 'actual', 'eta', 'count', 'duration'} (segundos)
+    """
+    from upgrade_eta import UpgradeEta
+
+    start = min(a['started_at'] for a in attempts)
+    end = max(a['started_at'] + a['seconds'] for a in attempts)
+    duration = end - start
+    now = [start]
+    eta = UpgradeEta(history, workers=workers, clock=lambda: now[0])
+    eta.plan([{'id': a['package_id'], 'name': a['package_id']} for a in attempts])
+
+    events = sorted([(a['started_at'], 1, a['package_id']) for a in attempts]
+                    + [(a['started_at'] + a['seconds'], 0, a['package_id']) for a in attempts])
+    points = [{'done': 0, 'actual': duration, 'eta': eta.snapshot()['remaining_seconds'], 'count': None,
+               'duration': duration}]
+    done = 0
+    for at, is_start, package_id in events:
+        now[0] = at
+        if is_start:
+            eta.started(package_id)
+            continue
+        eta.finished(package_id)
+        done += 1
+        if done == len(attempts):
+            break
+        elapsed = at - start
+        points.append({
+            'done': done,
+            'actual': end - at,
+            'eta': eta.snapshot()['remaining_seconds'],
+            'count': elapsed / done * (len(attempts) - done),
+            'duration': duration,
+        })
+    return points
+
+
+def _error_stats(points: List[dict], key: str) -> Optional[dict]:
+    errors = [abs(p[key] - p['actual']) / p['duration'] * 100 for p in points
+              if p[key] is not None and p['duration'] > 0]
+    if not errors:
+        return None
+    return {'mean_error_pct': round(sum(errors) / len(errors), 2), 'max_error_pct': round(max(errors), 2),
+            'points': len(errors)}
+
+
+def run_benchmark(sessions: int = 8, packages: int = 15, workers: int = 3, seed: int = 0,
+                  replayed: Optional[List[List[dict]]] = None) -> dict:
+    """
+    Reproduz as execuções em ordem, acumulando o histórico.
+
+    Args:
+        replayed: Execuções a reproduzir (padrão: synthetic_sessions)
+
+    Returns:
+        Dicionário com o erro de cada estimador (todas as execuções, só a
+        primeira e só as com histórico) e o erro da estimativa inicial
+    """
+    import logging
+    # Também chamado no mesmo processo (bench_suite, testes): o logging volta ao que era
+    disabled = logging.root.manager.disable
+    logging.disable(logging.INFO)
+    try:
+        return _replay(sessions, packages, workers, seed, replayed)
+    finally:
+        logging.disable(disabled)
+
+
+def _replay(sessions, packages, workers, seed, replayed) -> dict:
+    from upgrade_history import UpgradeHistory
+
+    if replayed is None:
+        replayed = synthetic_sessions(sessions, packages, workers, seed)
+    history = UpgradeHistory()
+
+    all_points, first_points, later_points = [], [], []
+    for index, attempts in enumerate(replayed):
+        points = replay_session(attempts, history, workers)
+        all_points.extend(points)
+        (first_points if index == 0 else later_points).extend(points)
+        for attempt in attempts:
+            _record(history, attempt)
+
+    def initial(points):
+        return _error_stats([p for p in points if p['done'] == 0], 'eta')
+
+    return {
+        'sessions': len(replayed),
+        'packages': packages,
+        'workers': workers,
+        'eta': _error_stats(all_points, 'eta'),
+        'count': _error_stats(all_points, 'count'),
+        'eta_with_history': _error_stats(later_points, 'eta'),
+        'count_with_history': _error_stats(later_points, 'count'),
+        'eta_first_session': _error_stats(first_points, 'eta'),
+        'initial_with_history': initial(later_points),
+    }
+
+
+def main():
+    args = sys.argv[1:]
+    replayed = None
+    if '--db' in args:
+        from upgrade_history import UpgradeHistory
+        path = args[args.index('--db') + 1]
+        gap = float(args[args.index('--gap') + 1]) if '--gap' in args else DEFAULT_SESSION_GAP
+        replayed = sessions_from_history(UpgradeHistory(path=path), gap)
+        if not replayed:
+            print(f"Nenhuma tentativa registrada em {path}")
+            return 1
+        args = []
+    sessions = int(args[0]) if len(args) > 0 else 8
+    packages = int(args[1]) if len(args) > 1 else 15
+    workers = int(args[2]) if len(args) > 2 else 3
+
+    print("\n" + "="*75)
+    print("BENCHMARK - ERRO DA ESTIMATIVA DE TEMPO RESTANTE")
+    print("="*75 + "\n")
+
+    results = run_benchmark(sessions, packages, workers, replayed=replayed)
+
+    print(f"Execuções reproduzidas: {results['sessions']} ({results['workers']} workers)")
+    print("Erro médio (máximo) em % da duração da execução:")
+    for label, key in (("UpgradeEta, todas as execuções", 'eta'),
+                       ("Por contagem, todas as execuções", 'count'),
+                       ("UpgradeEta, com histórico", 'eta_with_history'),
+                       ("Por contagem, com histórico", 'count_with_history'),
+                       ("UpgradeEta, primeira execução", 'eta_first_session'),
+                       ("Estimativa inicial, com histórico", 'initial_with_history')):
+        stats = results[key]
+        if stats:
+            print(f"  {label:<36} {stats['mean_error_pct']:6.1f}% ({stats['max_error_pct']:.1f}%)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
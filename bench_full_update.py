@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+"""
+bench_full_update.py - Benchmark da atualização completa: em sequência vs em fases sobrepostas
+
+Contra o PowerShell e o winget falsos, com latência por fase:
+- aplicativos: download concorrente e instalação serializada por lock
+- Windows Update: busca, download por atualização e instalação por
+  atualização (com o mesmo lock de instalação dos aplicativos)
+
+sequential: aplicativos até o fim e depois o Windows Update completo
+pipelined:  FullUpdatePipeline (busca e download do WU junto com os aplicativos)
+
+Uso:
+    python bench_full_update.py [pacotes] [atualizações_do_windows]
+"""
+import os
+import sys
+import tempfile
+import time
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+STUB_ARGV = [sys.executable, os.path.join(BASE_DIR, 'stub_powershell.py')]
+WINGET_STUB_ARGV = [sys.executable, os.path.join(BASE_DIR, 'stub_winget.py')]
+
+
+def run_benchmark(packages: int = 6, windows_updates: int = 3, workers: int = 3,
+                  app_download_seconds: float = 0.4, app_install_seconds: float = 0.2,
+                  wu_scan_seconds: float = 0.5, wu_download_seconds: float = 0.6,
+                  wu_install_seconds: float = 0.3) -> dict:
+    """
+    Executa a atualização completa das duas formas.
+
+    Returns:
+        Dicionário com o tempo de cada forma, as fases do pipeline e o ganho
+    """
+    import logging
+    logging.disable(logging.INFO)
+
+    from event_bus import EventBus
+    from powershell_manager import PowerShellManager
+    from prereq_cache import PrerequisiteCache
+    from stub_winget import synthetic_packages
+    from update_pipeline import FullUpdatePipeline
+    from upgrade_scheduler import UpgradeScheduler
+
+    apps = [{'name': name, 'id': app_id} for name, app_id, _, _ in synthetic_packages(packages)]
+    results = {'packages': packages, 'windows_updates': windows_updates, 'workers': workers}
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        os.environ.update({
+            'STUB_WINGET_PACKAGES': str(packages),
+            'STUB_WINGET_DOWNLOAD_SECONDS': str(app_download_seconds),
+            'STUB_WINGET_INSTALL_SECONDS': str(app_install_seconds),
+            'STUB_WINGET_LOCK': os.path.join(work_dir, 'install.lock'),
+            'STUB_PS_MODULES': 'PSWindowsUpdate',
+            'STUB_WU_UPDATES': str(windows_updates),
+            'STUB_WU_SCAN_SECONDS': str(wu_scan_seconds),
+            'STUB_WU_DOWNLOAD_SECONDS': str(wu_download_seconds),
+            'STUB_WU_INSTALL_SECONDS': str(wu_install_seconds),
+        })
+
+        for label in ('sequential', 'pipelined'):
+            os.environ['STUB_WU_CACHE'] = os.path.join(work_dir, f'{label}_downloads.txt')
+            ps_manager = PowerShellManager(shell_argv=STUB_ARGV, winget_argv=WINGET_STUB_ARGV,
+                                           prereq_cache=PrerequisiteCache(), event_bus=EventBus())
+
+            def apps_step(report=None):
+                return UpgradeScheduler(ps_manager.update_app_silent, max_workers=workers).run(apps)
+
+            start = time.perf_counter()
+            if label == 'sequential':
+                successful, failed, _ = apps_step()
+                windows_success, _ = ps_manager.run_windows_update_with_progress()
+                results[label] = {'seconds': round(time.perf_counter() - start, 3)}
+            else:
+                percents = []
+                pipeline = FullUpdatePipeline(ps_manager, apps_step,
+                                              progress_callback=lambda percent, message: percents.append(percent))
+                outcome = pipeline.run()
+                successful, failed, _ = outcome['apps']
+                windows_success = outcome['windows_success']
+                results[label] = {
+                    'seconds': round(time.perf_counter() - start, 3),
+                    'phases': outcome['seconds'],
+                    'overlap_seconds': outcome['overlap_seconds'],
+                    'progress_monotonic': percents == sorted(percents),
+                }
+            results[label].update(successful=successful, failed=failed, windows_success=windows_success)
+
+    results['saved_seconds'] = round(results['sequential']['seconds'] - results['pipelined']['seconds'], 3)
+    results['speedup'] = round(results['sequential']['seconds'] / results['pipelined']['seconds'], 2)
+    return results
+
+
+def main():
+    packages = int(sys.argv[1]) if len(sys.argv) > 1 else 6
+    windows_updates = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+
+    print("\n" + "="*75)
+    print("BENCHMARK - ATUALIZAÇÃO COMPLETA EM FASES SOBREPOSTAS")
+    print("="*75 + "\n")
+
+    results = run_benchmark(packages, windows_updates)
+    phases = results['pipelined']['phases']
+
+    print(f"Aplicativos: {results['packages']}, atualizações do Windows: {results['windows_updates']}")
+    print(f"Em sequência:         {results['sequential']['seconds']:.2f}s")
+    print(f"Fases sobrepostas:    {results['pipelined']['seconds']:.2f}s "
+          f"(aplicativos {phases['apps']:.2f}s, busca+download do WU {phases['windows_download']:.2f}s, "
+          f"instalação do WU {phases['windows_install']:.2f}s)")
+    print(f"Sobreposição: {results['pipelined']['overlap_seconds']:.2f}s")
+    print(f"Ganho: {results['saved_seconds']:.2f}s ({results['speedup']}x)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
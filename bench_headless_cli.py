@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+"""
+bench_headless_cli.py - Benchmark da linha de comando sem interface
+
+Executa 'headless_cli.py apps' em processos novos contra o PowerShell e o
+winget falsos (stub_powershell.py / stub_winget.py), como numa execução
+agendada, e mede o tempo total e a vazão (apps/s) para cada número de
+atualizações simultâneas. O tempo de cada app vem dos eventos JSON.
+
+Uso:
+    python bench_headless_cli.py [pacotes] [workers,...] [download_s] [instalação_s]
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+STUB_SHELL = f'"{sys.executable}" "{os.path.join(BASE_DIR, "stub_powershell.py")}"'
+
+
+def _run_cli(workers: int, env: dict) -> dict:
+    """Executa 'apps' uma vez e resume os eventos"""
+    with tempfile.TemporaryDirectory() as data_dir:
+        start = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, os.path.join(BASE_DIR, 'headless_cli.py'), 'apps',
+             '--workers', str(workers), '--shell', STUB_SHELL],
+            cwd=BASE_DIR, env=dict(env, MENINODETI_DATA_DIR=data_dir),
+            capture_output=True, text=True, encoding='utf-8', timeout=600)
+        wall = time.perf_counter() - start
+
+    events = [json.loads(line) for line in result.stdout.splitlines() if line.strip()]
+    done = next((e for e in events if e['event'] == 'apps_done'), {})
+    listed = next((e for e in events if e['event'] == 'apps_listed'), {})
+    per_app = [e['seconds'] for e in events if e['event'] == 'app_finished']
+    successful = done.get('successful', 0)
+    return {
+        'exit_code': result.returncode,
+        'wall_seconds': round(wall, 3),
+        'list_seconds': listed.get('seconds', 0.0),
+        'successful': successful,
+        'apps_per_second': round(successful / wall, 2) if wall else 0.0,
+        'mean_app_seconds': round(sum(per_app) / len(per_app), 3) if per_app else 0.0,
+    }
+
+
+def run_benchmark(packages: int = 6, workers_options=(1, 3), download_seconds: float = 0.4,
+                  install_seconds: float = 0.2) -> dict:
+    """
+    Executa a linha de comando para cada número de workers.
+
+    Returns:
+        Dicionário com tempo total, vazão e código de saída por configuração
+    """
+    env = dict(os.environ, PYTHONIOENCODING='utf-8',
+               STUB_WINGET_PACKAGES=str(packages),
+               STUB_WINGET_DOWNLOAD_SECONDS=str(download_seconds),
+               STUB_WINGET_INSTALL_SECONDS=str(install_seconds))
+    results = {'packages': packages, 'download_seconds': download_seconds,
+               'install_seconds': install_seconds}
+    for workers in workers_options:
+        results[f'workers_{workers}'] = _run_cli(workers, env)
+    return results
+
+
+def main():
+    packages = int(sys.argv[1]) if len(sys.argv) > 1 else 6
+    workers_options = tuple(int(w) for w in sys.argv[2].split(',')) if len(sys.argv) > 2 else (1, 3)
+    download_seconds = float(sys.argv[3]) if len(sys.argv) > 3 else 0.4
+    install_seconds = float(sys.argv[4]) if len(sys.argv) > 4 else 0.2
+
+    print("\n" + "="*75)
+    print("BENCHMARK - LINHA DE COMANDO SEM INTERFACE")
+    print("="*75 + "\n")
+
+    results = run_benchmark(packages, workers_options, download_seconds, install_seconds)
+
+    print(f"Pacotes: {packages} (download {download_seconds}s, instalação {install_seconds}s cada)")
+    for workers in workers_options:
+        item = results[f'workers_{workers}']
+        print(f"{workers} worker(s): {item['wall_seconds']:.2f}s no total "
+              f"(listagem {item['list_seconds']:.2f}s), {item['apps_per_second']:.2f} apps/s, "
+              f"{item['successful']}/{packages} ok, código {item['exit_code']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
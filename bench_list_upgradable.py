@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+"""
+bench_list_upgradable.py - Benchmark da listagem de aplicativos atualizáveis
+
+Mede o tempo por listagem contra a saída gravada em fixtures/ servida pelo
+winget falso (stub_winget.py), com latência simulada de consulta ao catálogo.
+Compara a listagem antiga (duas consultas: 'winget upgrade | ConvertTo-Json'
+seguida de 'winget upgrade') com a consulta única e com o catálogo local
+recente (upgrade_catalog.py), que dispensa a consulta.
+
+Uso:
+    python bench_list_upgradable.py [repetições] [latência_catálogo_s]
+"""
+import os
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+STUB_ARGV = [sys.executable, os.path.join(BASE_DIR, 'stub_powershell.py')]
+FIXTURE = os.path.join(BASE_DIR, 'fixtures', 'winget_upgrade_en.txt')
+
+
+def _legacy_listing(ps_manager) -> list:
+    """Reproduz a listagem antiga: duas consultas completas ao catálogo"""
+    ps_manager.execute_command("winget upgrade --accept-source-agreements | ConvertTo-Json -Depth 10", timeout=120)
+    success, stdout, _ = ps_manager.execute_command("winget upgrade --accept-source-agreements", timeout=120)
+    return ps_manager._parse_upgrade_text(stdout) if success else []
+
+
+def run_benchmark(repetitions: int = 5, catalog_seconds: float = 0.3) -> dict:
+    """
+    Executa as duas estratégias de listagem.
+
+    Returns:
+        Dicionário com o tempo médio por listagem de cada estratégia
+    """
+    import logging
+    logging.disable(logging.INFO)
+
+    from powershell_manager import PowerShellManager
+    from prereq_cache import PrerequisiteCache
+    from upgrade_catalog import UpgradeCatalog
+
+    os.environ['STUB_WINGET_FIXTURE'] = FIXTURE
+    os.environ['STUB_WINGET_LIST_SECONDS'] = str(catalog_seconds)
+
+    ps_manager = PowerShellManager(shell_argv=STUB_ARGV, prereq_cache=PrerequisiteCache())
+    results = {'repetitions': repetitions, 'catalog_seconds': catalog_seconds}
+
+    # Detecção do Microsoft.WinGet.Client fica no cache de pré-requisitos, fora da medição
+    ps_manager.detect_winget_client()
+
+    # Catálogo local preenchido por uma consulta inicial (como a da splash)
+    cataloged = PowerShellManager(shell_argv=STUB_ARGV, prereq_cache=ps_manager.prereq_cache,
+                                  catalog=UpgradeCatalog())
+    cataloged.refresh_upgrade_catalog()
+
+    for label, listing in (('legacy_double_query', _legacy_listing),
+                           ('single_query', lambda ps: ps.list_upgradable_apps()),
+                           ('local_catalog', lambda ps: cataloged.get_upgradable_apps())):
+        start = time.perf_counter()
+        for _ in range(repetitions):
+            apps = listing(ps_manager)
+        elapsed = time.perf_counter() - start
+        results[label] = {
+            'seconds_per_listing': round(elapsed / repetitions, 3),
+            'apps': len(apps)
+        }
+
+    return results
+
+
+def main():
+    repetitions = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    catalog_seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 0.3
+
+    print("\n" + "="*75)
+    print("BENCHMARK - LISTAGEM DE ATUALIZAÇÕES")
+    print("="*75 + "\n")
+
+    results = run_benchmark(repetitions, catalog_seconds)
+
+    print(f"Latência simulada do catálogo: {catalog_seconds}s")
+    print(f"Duas consultas (antigo): {results['legacy_double_query']['seconds_per_listing']:.3f}s por listagem")
+    print(f"Consulta única:          {results['single_query']['seconds_per_listing']:.3f}s por listagem")
+    print(f"Catálogo local recente:  {results['local_catalog']['seconds_per_listing']:.3f}s por listagem")
+    print(f"Apps encontrados: {results['single_query']['apps']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+"""
+bench_progress_pump.py - Benchmark sem display da janela de progresso
+
+Uma thread produz linhas de saída (como o winget ou o PSWindowsUpdate em
+streaming), cada uma com log() e update_progress(), enquanto o laço de
+eventos falso (stub_tk.py) processa a interface. Compara:
+1. Implementação anterior: um parent.after(0, ...) por mensagem, e cada
+   _log_impl faz insert + see + update_idletasks
+2. Bomba periódica: fila drenada em lote, só o progresso mais recente e log
+   limitado a LOG_MAX_LINES
+
+Mede linhas exibidas por segundo e o atraso de um "batimento" agendado a cada
+10 ms no laço (o quanto a janela demora a responder a cliques e redesenhos).
+
+Uso:
+    python bench_progress_pump.py [linhas] [linhas_por_segundo (0 = sem limite)]
+"""
+import sys
+import threading
+import time
+from datetime import datetime
+
+HEARTBEAT_MS = 10
+
+
+class _LegacyProgressWindow:
+    """Cópia do comportamento anterior da ProgressWindow (um after por mensagem)"""
+
+    def __init__(self, loop):
+        from stub_tk import StubText, StubVar, StubWindow
+        self.parent = loop
+        self.window = StubWindow(loop)
+        self.step_var = StubVar(loop)
+        self.desc_var = StubVar(loop)
+        self.progress_var = StubVar(loop, 0)
+        self.percent_var = StubVar(loop, "0%")
+        self.status_var = StubVar(loop)
+        self.log_text = StubText(loop)
+
+    def update_progress(self, percent, step_text="", desc_text="", log_text=""):
+        self.parent.after(0, self._update_progress_impl, percent, step_text, desc_text, log_text)
+
+    def _update_progress_impl(self, percent, step_text, desc_text, log_text):
+        self.progress_var.set(percent)
+        self.percent_var.set(f"{int(percent)}%")
+        if step_text:
+            self.step_var.set(step_text)
+        if desc_text:
+            self.desc_var.set(desc_text)
+        if log_text:
+            self._log_impl(log_text)
+        self.window.update_idletasks()
+
+    def log(self, message):
+        self.parent.after(0, self._log_impl, message)
+
+    def _log_impl(self, message):
+        timestamp = datetime.now().strftime("%H:%M:%S")
+        self.log_text.insert('end', f"[{timestamp}] {message}\n")
+        self.log_text.see('end')
+        self.window.update_idletasks()
+
+
+def _run_scenario(label: str, lines: int, rate: float) -> dict:
+    """Executa um cenário e retorna as medidas"""
+    from stub_tk import StubLoop, make_progress_window
+
+    loop = StubLoop()
+    window = _LegacyProgressWindow(loop) if label == 'legacy' else make_progress_window(loop)
+
+    # Batimento: mede o atraso entre o horário agendado e a execução
+    lateness = []
+
+    def heartbeat(scheduled):
+        now = time.perf_counter()
+        lateness.append(now - scheduled)
+        loop.after(HEARTBEAT_MS, heartbeat, now + HEARTBEAT_MS / 1000.0)
+
+    loop.after(HEARTBEAT_MS, heartbeat, time.perf_counter() + HEARTBEAT_MS / 1000.0)
+
+    def produce():
+        interval = 1.0 / rate if rate else 0.0
+        start = time.perf_counter()
+        for i in range(lines):
+            window.log(f"Downloading https://example.invalid/pacote{i}.msi  {i % 100}%")
+            window.update_progress(i * 100.0 / lines)
+            if interval:
+                delay = start + (i + 1) * interval - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+
+    producer = threading.Thread(target=produce, daemon=True)
+    start = time.perf_counter()
+    producer.start()
+
+    # Concluído quando a última linha produzida aparece no log
+    last_marker = f"pacote{lines - 1}.msi"
+
+    def finished():
+        text_lines = window.log_text.lines
+        return bool(text_lines) and last_marker in text_lines[-1]
+
+    completed = loop.run_until(finished, timeout=120)
+    elapsed = time.perf_counter() - start
+    producer.join()
+
+    lateness_ms = sorted(x * 1000 for x in lateness) or [0.0]
+    return {
+        'completed': completed,
+        'seconds': round(elapsed, 3),
+        'lines_per_second': round(lines / elapsed),
+        'heartbeat_p95_ms': round(lateness_ms[min(len(lateness_ms) - 1, int(len(lateness_ms) * 0.95))], 1),
+        'heartbeat_max_ms': round(lateness_ms[-1], 1),
+        'callbacks': loop.callbacks_run,
+        'redraws': loop.redraws,
+        'text_lines': len(window.log_text.lines),
+        'shown_lines': window.log_text.inserted_lines,
+        'final_percent': window.percent_var.get(),
+    }
+
+
+def run_benchmark(lines: int = 5000, rate: float = 0.0) -> dict:
+    """
+    Executa os dois cenários com a mesma carga.
+
+    Returns:
+        Dicionário com as medidas de 'legacy' e 'pump'
+    """
+    import logging
+    logging.disable(logging.INFO)
+    return {
+        'lines': lines,
+        'rate': rate,
+        'legacy': _run_scenario('legacy', lines, rate),
+        'pump': _run_scenario('pump', lines, rate),
+    }
+
+
+def main():
+    lines = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    rate = float(sys.argv[2]) if len(sys.argv) > 2 else None
+
+    print("\n" + "="*75)
+    print("BENCHMARK - BOMBA DE ATUALIZAÇÕES DA JANELA DE PROGRESSO")
+    print("="*75 + "\n")
+
+    # Sem taxa informada: rajada sem limite e um fluxo contínuo de 1000 linhas/s
+    rates = [rate] if rate is not None else [0.0, 1000.0]
+    for current in rates:
+        results = run_benchmark(lines, current)
+        print(f"Linhas: {results['lines']}, taxa: {'sem limite' if not current else f'{current:.0f}/s'}")
+        for label, name in (('legacy', 'Um after por mensagem'), ('pump', 'Bomba periódica')):
+            data = results[label]
+            print(f"  {name}")
+            print(f"    {data['seconds']:.2f}s  {data['lines_per_second']} linhas/s  "
+                  f"callbacks={data['callbacks']}  redesenhos={data['redraws']}")
+            print(f"    batimento p95={data['heartbeat_p95_ms']} ms  máx={data['heartbeat_max_ms']} ms  "
+                  f"linhas exibidas={data['shown_lines']}  no log={data['text_lines']}  "
+                  f"progresso final={data['final_percent']}")
+        print()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
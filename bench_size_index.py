@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+"""
+bench_size_index.py - Benchmark do índice de tamanhos do diálogo de limpeza
+
+Gera uma árvore sintética (como um cache de navegador) e mede o que o diálogo
+de limpeza paga para mostrar os tamanhos:
+1. Varredura completa (scan_tree_size, comportamento anterior)
+2. Primeira varredura com o índice (índice vazio)
+3. Estimativa instantânea a partir do índice gravado
+4. Revarredura sem alterações e com algumas pastas alteradas
+
+Uso:
+    python bench_size_index.py [arquivos] [arquivos_por_pasta] [pastas_alteradas]
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from bench_cleanup_engine import generate_tree
+
+
+def _timed(func, *args):
+    """Executa func(*args) e retorna (resultado, segundos)"""
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def run_benchmark(files: int = 50000, per_dir: int = 100, changed_dirs: int = 10) -> dict:
+    """
+    Mede a varredura completa contra o índice frio, a estimativa e o índice quente.
+
+    Returns:
+        Dicionário com tempos, pastas revarridas e totais de cada modo
+    """
+    import logging
+    logging.disable(logging.INFO)
+
+    from cleanup_engine import scan_tree_size
+    from size_index import SizeIndex
+
+    root = tempfile.mkdtemp(prefix="bench_size_index_")
+    data_dir = tempfile.mkdtemp(prefix="bench_size_index_data_")
+    try:
+        generate_tree(root, files, per_dir)
+        index_path = os.path.join(data_dir, 'size_index.json')
+
+        full, full_seconds = _timed(scan_tree_size, root)
+
+        cold_index = SizeIndex(path=index_path)
+        cold, cold_seconds = _timed(cold_index.refresh, root)
+        cold_rescanned = cold_index.rescanned
+        cold_index.save()
+
+        # Nova instância: simula reabrir o diálogo em outra execução
+        _, load_seconds = _timed(SizeIndex, index_path)
+        warm_index = SizeIndex(path=index_path)
+        estimate, estimate_seconds = _timed(warm_index.estimate, root)
+        warm, warm_seconds = _timed(warm_index.refresh, root)
+        warm_rescanned = warm_index.rescanned
+
+        # Altera algumas pastas (novo arquivo em cada uma)
+        leaves = [dir_path for dir_path, dirs, _ in os.walk(root) if not dirs][:changed_dirs]
+        for leaf in leaves:
+            with open(os.path.join(leaf, "novo.tmp"), 'wb') as handle:
+                handle.write(b"z" * 1024)
+        changed, changed_seconds = _timed(warm_index.refresh, root)
+        changed_rescanned = warm_index.rescanned
+
+        return {
+            'files': files,
+            'full_scan': {'seconds': round(full_seconds, 3), 'total': full},
+            'index_cold': {'seconds': round(cold_seconds, 3), 'total': cold, 'rescanned': cold_rescanned},
+            'index_load': {'seconds': round(load_seconds, 3), 'entries': len(warm_index)},
+            'estimate': {'seconds': round(estimate_seconds, 4), 'total': estimate},
+            'index_warm': {'seconds': round(warm_seconds, 3), 'total': warm, 'rescanned': warm_rescanned},
+            'index_changed': {'seconds': round(changed_seconds, 3), 'total': changed,
+                              'rescanned': changed_rescanned, 'changed_dirs': len(leaves)},
+        }
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+
+def main():
+    files = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    per_dir = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    changed_dirs = int(sys.argv[3]) if len(sys.argv) > 3 else 10
+
+    print("\n" + "="*75)
+    print("BENCHMARK - ÍNDICE DE TAMANHOS (DIÁLOGO DE LIMPEZA)")
+    print("="*75 + "\n")
+
+    results = run_benchmark(files, per_dir, changed_dirs)
+    print(f"Arquivos: {results['files']}\n")
+    for label, name in (('full_scan', 'Varredura completa'), ('index_cold', 'Índice frio'),
+                        ('index_load', 'Carregar índice'), ('estimate', 'Estimativa'),
+                        ('index_warm', 'Índice sem alterações'), ('index_changed', 'Índice com alterações')):
+        data = results[label]
+        extra = {k: v for k, v in data.items() if k != 'seconds'}
+        print(f"  {name:<24} {data['seconds']:8.4f}s  {extra}")
+
+    speedup = results['full_scan']['seconds'] / max(results['index_warm']['seconds'], 1e-6)
+    print(f"\nGanho da revarredura sem alterações: {speedup:.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+"""
+bench_startup.py - Benchmark de inicialização do modo console (com orçamento)
+
+Mede, em processos novos:
+1. O tempo de import do auto_launcher com 'python -X importtime' e quais
+   módulos pesados foram carregados (tkinter e Pillow não podem aparecer)
+2. O tempo total de 'python auto_launcher.py console' até o menu, com a
+   entrada fechada (o menu sai ao receber EOF)
+
+Sai com código 1 se a mediana passar do orçamento ou se um módulo de GUI for
+importado no modo console, para uso em CI.
+
+Uso:
+    python bench_startup.py [repetições]
+"""
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Orçamentos do modo console (milissegundos, mediana)
+CONSOLE_IMPORT_BUDGET_MS = 100
+CONSOLE_STARTUP_BUDGET_MS = 1000
+
+# Módulos que só o modo gráfico deve carregar
+GUI_ONLY_MODULES = ('tkinter', '_tkinter', 'tkinter.ttk', 'PIL', 'splash_screen',
+                    'gui_main_window', 'gui_utils')
+
+
+def parse_importtime(stderr: str) -> dict:
+    """
+    Interpreta a saída de 'python -X importtime'.
+
+    Returns:
+        Dicionário módulo -> (próprio_us, cumulativo_us)
+    """
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        # "import time:   próprio |   cumulativo |   [recuo]módulo"
+        try:
+            self_us, cumulative_us, name = line.split(":", 1)[1].split("|")
+            modules[name.strip()] = (int(self_us), int(cumulative_us))
+        except ValueError:
+            continue
+    return modules
+
+
+def measure_imports(module: str = 'auto_launcher') -> dict:
+    """
+    Importa 'module' num processo novo com -X importtime.
+
+    Returns:
+        Dicionário com o tempo cumulativo (ms), módulos de GUI carregados e os
+        imports mais caros
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=BASE_DIR, capture_output=True, text=True, encoding='utf-8', errors='replace'
+    )
+    modules = parse_importtime(result.stderr)
+    slowest = sorted(modules.items(), key=lambda item: item[1][0], reverse=True)[:5]
+    return {
+        'ok': result.returncode == 0 and module in modules,
+        'cumulative_ms': modules.get(module, (0, 0))[1] / 1000.0,
+        'gui_modules': [name for name in GUI_ONLY_MODULES if name in modules],
+        'slowest': [(name, round(self_us / 1000.0, 2)) for name, (self_us, _) in slowest],
+        'error': result.stderr.strip().splitlines()[-1] if result.returncode else "",
+    }
+
+
+def measure_console_startup(data_dir: str) -> dict:
+    """
+    Executa 'auto_launcher.py console' até o menu (entrada fechada).
+
+    Returns:
+        Dicionário com o tempo total (ms) e se o menu foi exibido
+    """
+    env = dict(os.environ, MENINODETI_DATA_DIR=data_dir, PYTHONIOENCODING='utf-8', TERM='dumb')
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, os.path.join(BASE_DIR, 'auto_launcher.py'), 'console'],
+        cwd=BASE_DIR, stdin=subprocess.DEVNULL, capture_output=True,
+        text=True, encoding='utf-8', errors='replace', env=env, timeout=60
+    )
+    elapsed = (time.perf_counter() - start) * 1000.0
+    return {'ms': elapsed, 'menu_shown': "MENU PRINCIPAL" in result.stdout}
+
+
+def run_benchmark(repeats: int = 5) -> dict:
+    """
+    Mede import e inicialização 'repeats' vezes e compara a mediana com o orçamento.
+
+    Returns:
+        Dicionário com medianas, orçamentos e 'within_budget'
+    """
+    imports = [measure_imports() for _ in range(repeats)]
+    with tempfile.TemporaryDirectory() as data_dir:
+        startups = [measure_console_startup(data_dir) for _ in range(repeats)]
+    # Referência: o que o modo console deixa de importar
+    deferred = measure_imports('tkinter.ttk')
+
+    import_ms = statistics.median(m['cumulative_ms'] for m in imports)
+    startup_ms = statistics.median(s['ms'] for s in startups)
+    gui_modules = sorted({name for m in imports for name in m['gui_modules']})
+
+    return {
+        'repeats': repeats,
+        'import_ms': round(import_ms, 1),
+        'import_budget_ms': CONSOLE_IMPORT_BUDGET_MS,
+        'startup_ms': round(startup_ms, 1),
+        'startup_budget_ms': CONSOLE_STARTUP_BUDGET_MS,
+        'imports_ok': all(m['ok'] for m in imports),
+        'import_error': next((m['error'] for m in imports if not m['ok']), ""),
+        'menu_shown': all(s['menu_shown'] for s in startups),
+        'gui_modules': gui_modules,
+        'deferred_tkinter_ms': round(deferred['cumulative_ms'], 1),
+        'slowest': imports[-1]['slowest'],
+        'within_budget': (all(m['ok'] for m in imports) and not gui_modules
+                          and all(s['menu_shown'] for s in startups)
+                          and import_ms <= CONSOLE_IMPORT_BUDGET_MS
+                          and startup_ms <= CONSOLE_STARTUP_BUDGET_MS),
+    }
+
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+
+    print("\n" + "="*75)
+    print("BENCHMARK - INICIALIZAÇÃO DO MODO CONSOLE")
+    print("="*75 + "\n")
+
+    results = run_benchmark(repeats)
+    print(f"Repetições: {results['repeats']} (medianas)")
+    print(f"  import auto_launcher: {results['import_ms']} ms (orçamento {results['import_budget_ms']} ms)")
+    print(f"  console até o menu:   {results['startup_ms']} ms (orçamento {results['startup_budget_ms']} ms)")
+    print(f"  Módulos de GUI carregados: {results['gui_modules'] or 'nenhum'}")
+    print(f"  tkinter adiado (import isolado): {results['deferred_tkinter_ms']} ms")
+    print(f"  Imports mais caros (próprio, ms): {results['slowest']}")
+    if results['import_error']:
+        print(f"  Erro de import: {results['import_error']}")
+
+    if results['within_budget']:
+        print("\n✓ Dentro do orçamento")
+        return 0
+    print("\n❌ Fora do orçamento")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,431 @@
+# -*- coding: utf-8 -*-
+"""
+bench_suite.py - Suíte de benchmarks com PowerShell e winget falsos
+
+Executa os cenários dos bench_*.py contra stub_powershell.py e stub_winget.py
+(latência, variação e taxa de falha configuráveis) e grava os resultados em
+JSON para comparação com uma execução anterior:
+
+    listing            Listagem de atualizações (duas consultas, uma, catálogo local)
+    upgrades           Atualizações sequenciais vs concorrentes
+    upgrades_failures  Atualizações concorrentes com falhas e latência variável
+    winget_direct      winget executado direto vs pelo PowerShell (custo por comando)
+    full_update        Atualização completa em sequência vs em fases sobrepostas
+    cleanup            Limpeza de árvores sintéticas, serial vs paralela
+    eta                Erro da estimativa de tempo restante em históricos reproduzidos
+    gui_log            Vazão do log da janela de progresso (laço Tk falso)
+
+Cada cenário declara as métricas comparáveis e o sentido ('lower' = tempo,
+'higher' = vazão). Uma métrica regride quando piora mais que a tolerância
+relativa e mais que o piso absoluto (ruído de medição).
+
+Uso:
+    python bench_suite.py [--profile quick|full] [--scenarios listing,upgrades]
+                          [--output arquivo.json] [--baseline anterior.json]
+                          [--fail-rate 0.1] [--jitter 0.3] [--seed 1] [--ps-startup 0.3]
+
+Sai com 1 se alguma métrica regrediu em relação a --baseline.
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, List, Optional
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+STUB_ARGV = [sys.executable, os.path.join(BASE_DIR, 'stub_powershell.py')]
+RESULTS_DIR = os.path.join(BASE_DIR, 'bench_results')
+
+SUITE_RESULTS_VERSION = 1
+DEFAULT_TOLERANCE = 0.25
+# Diferenças menores que isto (segundos, ou unidades da métrica) são ruído
+DEFAULT_MIN_DELTA = 0.05
+
+LOWER = 'lower'
+HIGHER = 'higher'
+
+
+@contextmanager
+def stub_environment(**overrides):
+    """
+    Aplica variáveis dos stubs (STUB_*) e restaura o ambiente ao sair.
+
+    Os bench_*.py alteram os.environ e silenciam o logging (logging.disable);
+    o ambiente inteiro e o nível de logging são restaurados para que um
+    cenário não vaze configuração para o seguinte nem para quem chamou.
+    """
+    saved = dict(os.environ)
+    logging_disabled = logging.root.manager.disable
+    os.environ.update({name: str(value) for name, value in overrides.items() if value is not None})
+    try:
+        yield
+    finally:
+        os.environ.clear()
+        os.environ.update(saved)
+        logging.disable(logging_disabled)
+
+
+def _run_listing(repetitions, catalog_seconds):
+    from bench_list_upgradable import run_benchmark
+    return run_benchmark(repetitions, catalog_seconds)
+
+
+def _run_upgrades(packages, workers, download_seconds, install_seconds):
+    from bench_upgrade_scheduler import run_benchmark
+    return run_benchmark(packages, workers, download_seconds, install_seconds)
+
+
+def _run_upgrades_failures(packages, workers, download_seconds, install_seconds, fail_rate, jitter):
+    """Atualizações concorrentes com falhas e latências variáveis (determinísticas pela semente)"""
+    # Falhas simuladas são esperadas: sem os erros do PowerShellManager no console
+    # (stub_environment restaura o logging ao fim do cenário)
+    logging.disable(logging.ERROR)
+
+    from powershell_manager import PowerShellManager
+    from prereq_cache import PrerequisiteCache
+    from stub_winget import should_fail, synthetic_packages
+    from upgrade_scheduler import UpgradeScheduler
+
+    os.environ['STUB_WINGET_PACKAGES'] = str(packages)
+    os.environ['STUB_WINGET_DOWNLOAD_SECONDS'] = str(download_seconds)
+    os.environ['STUB_WINGET_INSTALL_SECONDS'] = str(install_seconds)
+    os.environ.setdefault('STUB_WINGET_FAIL_RATE', str(fail_rate))
+    os.environ.setdefault('STUB_WINGET_JITTER', str(jitter))
+
+    apps = [{'name': name, 'id': app_id} for name, app_id, _, _ in synthetic_packages(packages)]
+    expected_failures = sum(1 for app in apps if should_fail(app['id']))
+    ps_manager = PowerShellManager(shell_argv=STUB_ARGV, prereq_cache=PrerequisiteCache())
+    scheduler = UpgradeScheduler(ps_manager.update_app_silent, max_workers=workers)
+
+    start = time.perf_counter()
+    successful, failed, _ = scheduler.run(apps)
+    elapsed = time.perf_counter() - start
+    return {
+        'packages': packages,
+        'workers': workers,
+        'seconds': round(elapsed, 3),
+        'successful': successful,
+        'failed': failed,
+        'expected_failures': expected_failures,
+        'apps_per_second': round(packages / elapsed, 2) if elapsed else 0.0,
+    }
+
+
+def _run_winget_direct(packages, ps_startup_seconds, winget_startup_seconds):
+    from bench_winget_direct import run_benchmark
+    return run_benchmark(packages, ps_startup_seconds, winget_startup_seconds)
+
+
+def _run_full_update(packages, windows_updates, workers):
+    from bench_full_update import run_benchmark
+    return run_benchmark(packages, windows_updates, workers)
+
+
+def _run_cleanup(targets, subdirs, files_per_subdir, latency_ms, workers):
+    from bench_cleanup_parallel import run_benchmark
+    return run_benchmark(targets, subdirs, files_per_subdir, latency_ms, workers)
+
+
+def _run_eta(sessions, packages, workers):
+    from bench_eta import run_benchmark
+    return run_benchmark(sessions, packages, workers)
+
+
+def _run_gui_log(lines, rate):
+    from bench_progress_pump import run_benchmark
+    return run_benchmark(lines, rate)
+
+
+# Cenário: função, parâmetros por perfil e métricas comparáveis (caminho -> sentido)
+SCENARIOS = {
+    'listing': {
+        'run': _run_listing,
+        'params': {
+            'quick': {'repetitions': 2, 'catalog_seconds': 0.1},
+            'full': {'repetitions': 5, 'catalog_seconds': 0.3},
+        },
+        'metrics': {
+            'legacy_double_query.seconds_per_listing': LOWER,
+            'single_query.seconds_per_listing': LOWER,
+            'local_catalog.seconds_per_listing': LOWER,
+        },
+    },
+    'upgrades': {
+        'run': _run_upgrades,
+        'params': {
+            'quick': {'packages': 6, 'workers': 3, 'download_seconds': 0.1, 'install_seconds': 0.03},
+            'full': {'packages': 12, 'workers': 4, 'download_seconds': 0.3, 'install_seconds': 0.1},
+        },
+        'metrics': {
+            'sequential.seconds': LOWER,
+            'concurrent.seconds': LOWER,
+            'speedup': HIGHER,
+        },
+    },
+    'upgrades_failures': {
+        'run': _run_upgrades_failures,
+        'params': {
+            'quick': {'packages': 8, 'workers': 3, 'download_seconds': 0.1, 'install_seconds': 0.03,
+                      'fail_rate': 0.25, 'jitter': 0.3},
+            'full': {'packages': 20, 'workers': 4, 'download_seconds': 0.3, 'install_seconds': 0.1,
+                     'fail_rate': 0.15, 'jitter': 0.5},
+        },
+        'metrics': {
+            'seconds': LOWER,
+            'apps_per_second': HIGHER,
+        },
+    },
+    'winget_direct': {
+        'run': _run_winget_direct,
+        'params': {
+            'quick': {'packages': 3, 'ps_startup_seconds': 0.2, 'winget_startup_seconds': 0.02},
+            'full': {'packages': 8, 'ps_startup_seconds': 0.4, 'winget_startup_seconds': 0.05},
+        },
+        'metrics': {
+            'powershell.seconds_per_command': LOWER,
+            'direct.seconds_per_command': LOWER,
+        },
+    },
+    'full_update': {
+        'run': _run_full_update,
+        'params': {
+            'quick': {'packages': 3, 'windows_updates': 2, 'workers': 3},
+            'full': {'packages': 6, 'windows_updates': 3, 'workers': 3},
+        },
+        'metrics': {
+            'sequential.seconds': LOWER,
+            'pipelined.seconds': LOWER,
+        },
+    },
+    'cleanup': {
+        'run': _run_cleanup,
+        'params': {
+            'quick': {'targets': 3, 'subdirs': 4, 'files_per_subdir': 50, 'latency_ms': 0.2, 'workers': 4},
+            'full': {'targets': 6, 'subdirs': 10, 'files_per_subdir': 200, 'latency_ms': 0.2, 'workers': 4},
+        },
+        'metrics': {
+            'serial.seconds': LOWER,
+            'parallel.seconds': LOWER,
+        },
+    },
+    'eta': {
+        'run': _run_eta,
+        'params': {
+            'quick': {'sessions': 6, 'packages': 12, 'workers': 3},
+            'full': {'sessions': 20, 'packages': 30, 'workers': 3},
+        },
+        'metrics': {
+            'eta.mean_error_pct': LOWER,
+            'eta_with_history.mean_error_pct': LOWER,
+        },
+    },
+    'gui_log': {
+        'run': _run_gui_log,
+        'params': {
+            'quick': {'lines': 1000, 'rate': 0.0},
+            'full': {'lines': 5000, 'rate': 0.0},
+        },
+        'metrics': {
+            'pump.lines_per_second': HIGHER,
+        },
+    },
+}
+
+
+def _lookup(data: dict, path: str):
+    for key in path.split('.'):
+        if not isinstance(data, dict) or key not in data:
+            return None
+        data = data[key]
+    return data
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        result = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=BASE_DIR,
+                                capture_output=True, text=True, timeout=10)
+        return result.stdout.strip() or None if result.returncode == 0 else None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def run_suite(scenarios: Optional[List[str]] = None, profile: str = 'quick',
+              stub_overrides: Optional[Dict[str, str]] = None, progress=None) -> dict:
+    """
+    Executa os cenários escolhidos.
+
+    Args:
+        scenarios: Nomes em SCENARIOS (padrão: todos)
+        profile: 'quick' (cargas pequenas) ou 'full'
+        stub_overrides: Variáveis STUB_* aplicadas a todos os cenários
+        progress: Função callback(nome) chamada antes de cada cenário
+
+    Returns:
+        Resultados serializáveis em JSON (metadados e, por cenário, parâmetros,
+        resultado completo e métricas comparáveis)
+
+    Raises:
+        ValueError: Cenário ou perfil desconhecido
+    """
+    names = list(SCENARIOS) if not scenarios else list(scenarios)
+    unknown = [name for name in names if name not in SCENARIOS]
+    if unknown:
+        raise ValueError(f"Cenário desconhecido: {', '.join(unknown)}")
+    if profile not in ('quick', 'full'):
+        raise ValueError(f"Perfil desconhecido: {profile}")
+
+    results = {
+        'version': SUITE_RESULTS_VERSION,
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'host': platform.node(),
+        'platform': platform.platform(),
+        'python': platform.python_version(),
+        'commit': _git_commit(),
+        'profile': profile,
+        'stub': dict(stub_overrides or {}),
+        'scenarios': {},
+    }
+    for name in names:
+        scenario = SCENARIOS[name]
+        params = scenario['params'][profile]
+        if progress:
+            progress(name)
+        start = time.perf_counter()
+        with stub_environment(**(stub_overrides or {})):
+            result = scenario['run'](**params)
+        results['scenarios'][name] = {
+            'params': params,
+            'seconds': round(time.perf_counter() - start, 3),
+            'metrics': {path: _lookup(result, path) for path in scenario['metrics']},
+            'result': result,
+        }
+    return results
+
+
+def compare_results(baseline: dict, current: dict, tolerance: float = DEFAULT_TOLERANCE,
+                    min_delta: float = DEFAULT_MIN_DELTA) -> List[dict]:
+    """
+    Compara as métricas de duas execuções.
+
+    Só entram cenários e métricas presentes nas duas; execuções com perfis
+    diferentes não são comparáveis.
+
+    Returns:
+        Lista de {'scenario', 'metric', 'baseline', 'current', 'change', 'regression'}
+        (change é a variação relativa; positivo = pior)
+
+    Raises:
+        ValueError: Perfis diferentes
+    """
+    if baseline.get('profile') != current.get('profile'):
+        raise ValueError(f"Perfis diferentes: {baseline.get('profile')} x {current.get('profile')}")
+
+    comparisons = []
+    for name, scenario in current['scenarios'].items():
+        previous = baseline.get('scenarios', {}).get(name)
+        if previous is None or name not in SCENARIOS:
+            continue
+        for metric, direction in SCENARIOS[name]['metrics'].items():
+            old = previous['metrics'].get(metric)
+            new = scenario['metrics'].get(metric)
+            if not isinstance(old, (int, float)) or not isinstance(new, (int, float)):
+                continue
+            worse_by = (new - old) if direction == LOWER else (old - new)
+            change = worse_by / old if old else 0.0
+            comparisons.append({
+                'scenario': name,
+                'metric': metric,
+                'baseline': old,
+                'current': new,
+                'change': round(change, 3),
+                'regression': change > tolerance and worse_by > min_delta,
+            })
+    return comparisons
+
+
+def save_results(results: dict, path: Optional[str] = None) -> str:
+    """Grava os resultados (padrão: bench_results/suite_<data>.json) e retorna o caminho"""
+    if path is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        path = os.path.join(RESULTS_DIR, f"suite_{results['profile']}_{stamp}.json")
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+    return path
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='bench_suite.py', description="Suíte de benchmarks com stubs")
+    parser.add_argument('--profile', choices=('quick', 'full'), default='quick')
+    parser.add_argument('--scenarios', default=None, help=f"Separados por vírgula ({', '.join(SCENARIOS)})")
+    parser.add_argument('--output', default=None, help="Arquivo JSON de resultados")
+    parser.add_argument('--baseline', default=None, help="Resultados anteriores para comparação")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help="Piora relativa tolerada (padrão: 0.25)")
+    parser.add_argument('--fail-rate', type=float, default=None, help="STUB_WINGET_FAIL_RATE")
+    parser.add_argument('--jitter', type=float, default=None, help="STUB_WINGET_JITTER")
+    parser.add_argument('--seed', default=None, help="STUB_WINGET_SEED")
+    parser.add_argument('--ps-startup', type=float, default=None, help="STUB_PS_STARTUP_SECONDS")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    overrides = {name: value for name, value in (
+        ('STUB_WINGET_FAIL_RATE', args.fail_rate),
+        ('STUB_WINGET_JITTER', args.jitter),
+        ('STUB_WINGET_SEED', args.seed),
+        ('STUB_PS_STARTUP_SECONDS', args.ps_startup),
+    ) if value is not None}
+    scenarios = [name.strip() for name in args.scenarios.split(',')] if args.scenarios else None
+
+    print("\n" + "="*75)
+    print(f"SUÍTE DE BENCHMARKS ({args.profile})")
+    print("="*75 + "\n")
+
+    try:
+        results = run_suite(scenarios, args.profile, overrides,
+                            progress=lambda name: print(f"▶ {name}...", flush=True))
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 2
+
+    for name, scenario in results['scenarios'].items():
+        metrics = ", ".join(f"{metric}={value}" for metric, value in scenario['metrics'].items())
+        print(f"  {name:<18} {scenario['seconds']:6.2f}s  {metrics}")
+
+    path = save_results(results, args.output)
+    print(f"\nResultados gravados em {path}")
+
+    if not args.baseline:
+        return 0
+
+    with open(args.baseline, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    try:
+        comparisons = compare_results(baseline, results, args.tolerance)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 2
+
+    print(f"\nComparação com {args.baseline} (tolerância {args.tolerance:.0%}):")
+    for item in comparisons:
+        mark = "❌" if item['regression'] else "✓"
+        trend = f"{item['change']:+.0%} pior" if item['change'] > 0 else f"{-item['change']:.0%} melhor"
+        print(f"  {mark} {item['scenario']}.{item['metric']}: {item['baseline']} -> {item['current']} ({trend})")
+    regressions = [item for item in comparisons if item['regression']]
+    if regressions:
+        print(f"\n⚠️  {len(regressions)} métrica(s) regrediram")
+        return 1
+    print("\n✓ Sem regressões")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
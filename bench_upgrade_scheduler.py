@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+"""
+bench_upgrade_scheduler.py - Benchmark do agendador de atualizações
+
+Compara atualização sequencial vs concorrente contra o winget falso
+(stub_winget.py), que dorme por pacote no download (concorrente) e na
+instalação (serializada por lock entre processos).
+
+Uso:
+    python bench_upgrade_scheduler.py [pacotes] [workers]
+"""
+import os
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+STUB_ARGV = [sys.executable, os.path.join(BASE_DIR, 'stub_powershell.py')]
+
+
+def run_benchmark(packages: int = 12, workers: int = 4,
+                  download_seconds: float = 0.3, install_seconds: float = 0.1) -> dict:
+    """
+    Executa o cenário sequencial e o concorrente.
+
+    Returns:
+        Dicionário com os tempos de cada cenário
+    """
+    import logging
+    logging.disable(logging.INFO)
+
+    from powershell_manager import PowerShellManager
+    from upgrade_scheduler import UpgradeScheduler
+    from stub_winget import synthetic_packages
+
+    os.environ['STUB_WINGET_PACKAGES'] = str(packages)
+    os.environ['STUB_WINGET_DOWNLOAD_SECONDS'] = str(download_seconds)
+    os.environ['STUB_WINGET_INSTALL_SECONDS'] = str(install_seconds)
+
+    apps = [{'name': name, 'id': app_id} for name, app_id, _, _ in synthetic_packages(packages)]
+    ps_manager = PowerShellManager(shell_argv=STUB_ARGV)
+
+    results = {'packages': packages, 'workers': workers}
+    for label, worker_count in (('sequential', 1), ('concurrent', workers)):
+        scheduler = UpgradeScheduler(ps_manager.update_app_silent, max_workers=worker_count)
+        start = time.perf_counter()
+        successful, failed, _ = scheduler.run(apps)
+        elapsed = time.perf_counter() - start
+        results[label] = {'seconds': round(elapsed, 3), 'successful': successful, 'failed': failed}
+
+    results['speedup'] = round(results['sequential']['seconds'] / results['concurrent']['seconds'], 2)
+    return results
+
+
+def main():
+    packages = int(sys.argv[1]) if len(sys.argv) > 1 else 12
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+
+    print("\n" + "="*75)
+    print("BENCHMARK - AGENDADOR DE ATUALIZAÇÕES")
+    print("="*75 + "\n")
+
+    results = run_benchmark(packages, workers)
+
+    print(f"Pacotes: {results['packages']}")
+    print(f"Sequencial:            {results['sequential']['seconds']:.2f}s")
+    print(f"Concorrente ({workers} workers): {results['concurrent']['seconds']:.2f}s")
+    print(f"Ganho: {results['speedup']}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
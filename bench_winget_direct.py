@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+"""
+bench_winget_direct.py - Benchmark do winget direto vs pelo PowerShell
+
+Executa a listagem e uma atualização por pacote (em sequência, para isolar o
+custo por comando) das duas formas:
+- powershell: 'powershell -Command winget ...' (stub_powershell.py, que paga
+  STUB_PS_STARTUP_SECONDS ao iniciar, e depois o winget)
+- direct: o winget (stub_winget.py) executado com argv, sem host PowerShell
+
+Os dois caminhos pagam o início do interpretador Python dos stubs e o custo
+do próprio winget; a diferença é o host PowerShell por comando.
+
+Uso:
+    python bench_winget_direct.py [pacotes] [início_do_powershell_em_segundos]
+"""
+import os
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+STUB_ARGV = [sys.executable, os.path.join(BASE_DIR, 'stub_powershell.py')]
+WINGET_STUB_ARGV = [sys.executable, os.path.join(BASE_DIR, 'stub_winget.py')]
+
+
+def run_benchmark(packages: int = 6, ps_startup_seconds: float = 0.3,
+                  winget_startup_seconds: float = 0.05) -> dict:
+    """
+    Executa os comandos winget pelos dois caminhos.
+
+    Returns:
+        Dicionário com o tempo total, por comando e até a primeira saída de cada caminho
+    """
+    import logging
+    logging.disable(logging.INFO)
+
+    from command_timing import CommandTimingCollector
+    from event_bus import EventBus
+    from powershell_manager import PowerShellManager
+    from prereq_cache import PrerequisiteCache
+    from stub_winget import synthetic_packages
+
+    os.environ['STUB_WINGET_PACKAGES'] = str(packages)
+    os.environ['STUB_WINGET_DOWNLOAD_SECONDS'] = '0'
+    os.environ['STUB_WINGET_INSTALL_SECONDS'] = '0'
+    os.environ['STUB_PS_STARTUP_SECONDS'] = str(ps_startup_seconds)
+    os.environ['STUB_WINGET_STARTUP_SECONDS'] = str(winget_startup_seconds)
+
+    app_ids = [app_id for _, app_id, _, _ in synthetic_packages(packages)]
+    results = {'packages': packages, 'ps_startup_seconds': ps_startup_seconds}
+    for label, options in (('powershell', {'direct_winget': False}),
+                           ('direct', {'winget_argv': WINGET_STUB_ARGV})):
+        cache = PrerequisiteCache()
+        cache.set('winget_client', False, persist=False)
+        bus = EventBus()
+        collector = CommandTimingCollector()
+        bus.subscribe(collector)
+        ps_manager = PowerShellManager(shell_argv=STUB_ARGV, prereq_cache=cache, event_bus=bus,
+                                       instrument_commands=True, **options)
+
+        start = time.perf_counter()
+        listed = ps_manager.list_upgradable_apps()
+        upgraded = sum(1 for app_id in app_ids if ps_manager.update_app_silent(app_id))
+        elapsed = time.perf_counter() - start
+
+        totals = collector.report()['totals']
+        results[label] = {
+            'seconds': round(elapsed, 3),
+            'commands': totals['commands'],
+            'seconds_per_command': round(elapsed / totals['commands'], 3) if totals['commands'] else 0.0,
+            'startup_seconds': totals['startup_seconds'],
+            'listed': len(listed),
+            'upgraded': upgraded,
+        }
+
+    results['saved_per_command'] = round(results['powershell']['seconds_per_command']
+                                         - results['direct']['seconds_per_command'], 3)
+    results['speedup'] = round(results['powershell']['seconds'] / results['direct']['seconds'], 2)
+    return results
+
+
+def main():
+    packages = int(sys.argv[1]) if len(sys.argv) > 1 else 6
+    ps_startup = float(sys.argv[2]) if len(sys.argv) > 2 else 0.3
+
+    print("\n" + "="*75)
+    print("BENCHMARK - WINGET DIRETO VS POWERSHELL")
+    print("="*75 + "\n")
+
+    results = run_benchmark(packages, ps_startup)
+
+    print(f"Pacotes: {results['packages']} (início simulado do PowerShell: {ps_startup}s)")
+    for label in ('powershell', 'direct'):
+        item = results[label]
+        print(f"{label:<11} {item['seconds']:6.2f}s  {item['commands']} comandos, "
+              f"{item['seconds_per_command']:.3f}s/comando, até a primeira saída {item['startup_seconds']:.2f}s")
+    print(f"Economia por comando: {results['saved_per_command']:.3f}s ({results['speedup']}x)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+"""
+bench_winget_parser.py - Benchmark de throughput do parser do winget
+
+Gera uma tabela sintética de 'winget upgrade' e mede linhas por segundo do
+parser por offsets de coluna (winget_parser) contra o parser antigo baseado
+em re.search + split() por linha.
+
+Uso:
+    python bench_winget_parser.py [linhas]
+"""
+import re
+import sys
+import time
+
+
+def build_table(rows: int) -> str:
+    """Gera a saída sintética com nomes com espaços e IDs com/sem ponto"""
+    from stub_winget import render_upgrade_table
+
+    packages = []
+    for i in range(rows):
+        if i % 10 == 0:
+            packages.append((f"Store App {i}", f"9NBLGGH{i:05d}", "1.0", "1.1"))
+        else:
+            packages.append((f"Vendor Product Suite {i}", f"Vendor.Product{i}", f"2.{i}.0", f"2.{i}.1"))
+    return "\n".join(render_upgrade_table(packages))
+
+
+def legacy_parse(stdout: str) -> list:
+    """Parser antigo de list_upgradable_apps (mantido aqui só para comparação)"""
+    apps = []
+    lines = stdout.split('\n')
+    header_idx = -1
+    separator_idx = -1
+    for i, line in enumerate(lines):
+        if 'Name' in line and 'Id' in line and 'Version' in line:
+            header_idx = i
+        elif header_idx >= 0 and '-' * 10 in line:
+            separator_idx = i
+            break
+    if separator_idx > 0:
+        for line in lines[separator_idx + 1:]:
+            line = line.strip()
+            if not line or 'upgrades available' in line.lower():
+                continue
+            match = re.search(r'(\S+\.\S+)', line)
+            if match:
+                app_id = match.group(1)
+                parts = line.split()
+                try:
+                    id_idx = parts.index(app_id)
+                    app_name = ' '.join(parts[:id_idx]) if id_idx > 0 else app_id
+                    version = parts[id_idx + 1] if len(parts) > id_idx + 1 else 'unknown'
+                    available = parts[id_idx + 2] if len(parts) > id_idx + 2 else 'unknown'
+                    if len(app_id) > 3 and '.' in app_id and not app_id.replace('.', '').isdigit():
+                        apps.append({'name': app_name, 'id': app_id, 'version': version, 'available': available})
+                except (ValueError, IndexError):
+                    continue
+    return apps
+
+
+def run_benchmark(rows: int = 10000, repetitions: int = 5) -> dict:
+    """
+    Mede o throughput dos dois parsers.
+
+    Returns:
+        Dicionário com linhas/s e quantidade de apps encontrados por parser
+    """
+    from winget_parser import parse_upgrade_table
+
+    table = build_table(rows)
+    results = {'rows': rows}
+
+    for label, parser in (('legacy', legacy_parse), ('column_offsets', parse_upgrade_table)):
+        best = None
+        for _ in range(repetitions):
+            start = time.perf_counter()
+            apps = parser(table)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        results[label] = {
+            'seconds': round(best, 4),
+            'rows_per_second': int(rows / best),
+            'apps_found': len(apps)
+        }
+
+    return results
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+
+    print("\n" + "="*75)
+    print("BENCHMARK - PARSER DO WINGET")
+    print("="*75 + "\n")
+
+    results = run_benchmark(rows)
+
+    for label in ('legacy', 'column_offsets'):
+        r = results[label]
+        print(f"{label:15s} {r['seconds']:.4f}s  {r['rows_per_second']:>10,} linhas/s  {r['apps_found']} apps")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
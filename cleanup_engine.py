@@ -0,0 +1,252 @@
+"""
+cleanup_engine.py - Motor de exclusão em passada única baseado em os.scandir
+
+Percorre cada árvore uma única vez: os arquivos são apagados assim que são
+encontrados (tamanho obtido do stat em cache do DirEntry, que no Windows vem
+da própria listagem do diretório) e as pastas são removidas de baixo para
+cima na mesma passada. Links simbólicos e junções são removidos sem seguir o
+destino.
+"""
+import logging
+import os
+import stat
+from typing import Callable, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Quantidade máxima de mensagens de erro guardadas por execução
+MAX_ERROR_SAMPLES = 100
+
+# Atributo de reparse point (junções e links) no Windows
+_FILE_ATTRIBUTE_REPARSE_POINT = 0x400
+
+
+def is_link(entry: os.DirEntry) -> bool:
+    """True para links simbólicos e junções (não devem ser seguidos)"""
+    if entry.is_symlink():
+        return True
+    is_junction = getattr(entry, 'is_junction', None)
+    if is_junction is not None:
+        return is_junction()
+    if os.name == 'nt':
+        try:
+            attributes = entry.stat(follow_symlinks=False).st_file_attributes
+            return bool(attributes & _FILE_ATTRIBUTE_REPARSE_POINT)
+        except OSError:
+            return False
+    return False
+
+
+def _remove_file(path: str):
+    """Remove um arquivo, limpando o atributo somente leitura se necessário"""
+    try:
+        os.remove(path)
+    except PermissionError:
+        os.chmod(path, stat.S_IWRITE)
+        os.remove(path)
+
+
+def new_stats() -> dict:
+    """Retorna um dicionário de estatísticas zerado"""
+    return {'files': 0, 'bytes': 0, 'dirs': 0, 'errors': 0, 'error_samples': []}
+
+
+def _record_error(stats: dict, message: str):
+    """Conta um erro e guarda a mensagem até o limite de amostras"""
+    stats['errors'] += 1
+    if len(stats['error_samples']) < MAX_ERROR_SAMPLES:
+        stats['error_samples'].append(message)
+    logger.debug(message)
+
+
+def _delete_entry(entry: os.DirEntry, stats: dict):
+    """Apaga um arquivo ou link (sem seguir o destino) e atualiza as estatísticas"""
+    if is_link(entry):
+        # Remove o link, nunca o destino (no Windows, links de pasta exigem rmdir)
+        if os.name == 'nt' and entry.is_dir():
+            os.rmdir(entry.path)
+        else:
+            os.remove(entry.path)
+        stats['files'] += 1
+        return
+    size = entry.stat(follow_symlinks=False).st_size
+    _remove_file(entry.path)
+    stats['files'] += 1
+    stats['bytes'] += size
+
+
+def delete_tree_contents(path: str, stats: dict = None, remove_root: bool = False) -> dict:
+    """
+    Apaga o conteúdo de uma pasta em uma única passada.
+
+    Args:
+        path: Pasta a limpar
+        stats: Dicionário de estatísticas a acumular (padrão: novo)
+        remove_root: Remover também a própria pasta
+
+    Returns:
+        Dicionário {'files', 'bytes', 'dirs', 'errors', 'error_samples'}
+    """
+    stats = new_stats() if stats is None else stats
+
+    # Pós-ordem iterativa: o marcador (pasta, True) é desempilhado depois dos filhos
+    stack = [(path, False)]
+    while stack:
+        dir_path, children_done = stack.pop()
+
+        if children_done:
+            if dir_path != path or remove_root:
+                try:
+                    os.rmdir(dir_path)
+                    stats['dirs'] += 1
+                except OSError as e:
+                    _record_error(stats, f"Erro ao remover pasta {dir_path}: {e}")
+            continue
+
+        stack.append((dir_path, True))
+        try:
+            with os.scandir(dir_path) as entries:
+                for entry in entries:
+                    try:
+                        if not is_link(entry) and entry.is_dir(follow_symlinks=False):
+                            stack.append((entry.path, False))
+                        else:
+                            _delete_entry(entry, stats)
+                    except OSError as e:
+                        _record_error(stats, f"Erro ao deletar {entry.path}: {e}")
+        except OSError as e:
+            _record_error(stats, f"Erro ao listar {dir_path}: {e}")
+
+    return stats
+
+
+def scan_tree_size(path: str) -> Tuple[int, int]:
+    """
+    Calcula o tamanho de uma pasta em uma passada com os.scandir.
+
+    Args:
+        path: Caminho da pasta
+
+    Returns:
+        Tupla (tamanho_bytes, num_arquivos)
+    """
+    total_size = 0
+    file_count = 0
+    stack = [path]
+
+    while stack:
+        dir_path = stack.pop()
+        try:
+            with os.scandir(dir_path) as entries:
+                for entry in entries:
+                    try:
+                        if is_link(entry):
+                            continue
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        else:
+                            total_size += entry.stat(follow_symlinks=False).st_size
+                            file_count += 1
+                    except OSError as e:
+                        logger.debug(f"Erro ao obter tamanho de {entry.path}: {e}")
+        except OSError as e:
+            logger.debug(f"Erro ao processar pasta {dir_path}: {e}")
+
+    return total_size, file_count
+
+
+def merge_stats(total: dict, part: dict):
+    """Acumula as estatísticas de 'part' em 'total'"""
+    for key in ('files', 'bytes', 'dirs', 'errors'):
+        total[key] += part[key]
+    room = MAX_ERROR_SAMPLES - len(total['error_samples'])
+    if room > 0:
+        total['error_samples'].extend(part['error_samples'][:room])
+
+
+def _delete_top_level_files(entries: list) -> dict:
+    """Apaga os arquivos e links do primeiro nível de uma pasta"""
+    stats = new_stats()
+    for entry in entries:
+        try:
+            _delete_entry(entry, stats)
+        except OSError as e:
+            _record_error(stats, f"Erro ao deletar {entry.path}: {e}")
+    return stats
+
+
+def plan_parallel_tasks(paths: list) -> Tuple[list, dict]:
+    """
+    Divide as pastas-alvo em tarefas independentes.
+
+    Cada subpasta de primeiro nível vira uma tarefa (removida inteira) e os
+    arquivos soltos de cada alvo formam mais uma tarefa. Listar só o primeiro
+    nível é barato, então o total de tarefas é conhecido antes de começar e o
+    progresso pode ser monotônico.
+
+    Args:
+        paths: Pastas cujo conteúdo será apagado
+
+    Returns:
+        Tupla (tarefas, falhas): tarefas são (alvo, função, argumentos) e
+        falhas mapeia alvo -> mensagem de erro da listagem
+    """
+    tasks = []
+    failures = {}
+    for target in paths:
+        files = []
+        try:
+            with os.scandir(target) as entries:
+                for entry in entries:
+                    try:
+                        if not is_link(entry) and entry.is_dir(follow_symlinks=False):
+                            tasks.append((target, delete_tree_contents, (entry.path, None, True)))
+                            continue
+                    except OSError:
+                        pass
+                    files.append(entry)
+        except OSError as e:
+            failures[target] = f"Erro ao listar {target}: {e}"
+            continue
+        if files:
+            tasks.append((target, _delete_top_level_files, (files,)))
+    return tasks, failures
+
+
+def delete_targets_parallel(paths: list, max_workers: int = 4,
+                            progress_callback: Callable[[int, int, str], None] = None) -> dict:
+    """
+    Apaga o conteúdo de várias pastas com um pool de threads.
+
+    A exclusão é limitada por latência de I/O (e não por CPU), então várias
+    threads mantêm o disco ocupado enquanto outras esperam.
+
+    Args:
+        paths: Pastas cujo conteúdo será apagado
+        max_workers: Número máximo de threads
+        progress_callback: Função callback(concluídas, total, alvo) chamada a cada
+            tarefa concluída, sempre na thread que chamou esta função
+
+    Returns:
+        Dicionário {alvo: estatísticas} na mesma ordem de 'paths'
+    """
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+
+    results = {target: new_stats() for target in paths}
+    tasks, failures = plan_parallel_tasks(paths)
+    for target, message in failures.items():
+        _record_error(results[target], message)
+
+    total = len(tasks)
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        futures = {executor.submit(func, *args): target for target, func, args in tasks}
+        for done, future in enumerate(as_completed(futures), start=1):
+            target = futures[future]
+            try:
+                merge_stats(results[target], future.result())
+            except Exception as e:
+                _record_error(results[target], f"Erro ao limpar {target}: {e}")
+            if progress_callback:
+                progress_callback(done, total, target)
+
+    return results
@@ -2,27 +2,37 @@
 cleanup_manager.py - Gerenciador de limpeza segura de cache, lixeira e arquivos temporários
 """
 import os
-import shutil
 import sys
 import logging
 import tempfile
 from pathlib import Path
-from typing import Callable, Tuple, Dict
+from typing import Callable, Tuple, Dict, Iterable
+from cleanup_engine import delete_targets_parallel, delete_tree_contents, scan_tree_size
+from cleanup_planner import PLAN_PRIORITY, plan_cleanup_targets
+from event_bus import EVENT_CLEANUP_TARGET, EventBus, get_shared_bus
+from size_index import SizeIndex, get_shared_size_index
 
 logger = logging.getLogger(__name__)
 
+# Threads de exclusão no modo paralelo (exclusão é limitada por latência de I/O)
+DEFAULT_CLEANUP_WORKERS = 4
+
 
 class CleanupManager:
     """Gerencia limpeza segura de cache, lixeira e arquivos temporários"""
     
-    def __init__(self, callback: Callable = None):
+    def __init__(self, callback: Callable = None, max_workers: int = 1, event_bus: EventBus = None):
         """
         Inicializa o gerenciador de limpeza.
         
         Args:
             callback: Função para reportar progresso (mensagem, percentual)
+            max_workers: Threads de exclusão (1 = uma pasta por vez; ver DEFAULT_CLEANUP_WORKERS)
+            event_bus: Barramento de eventos (padrão: barramento compartilhado do processo)
         """
         self.callback = callback
+        self.max_workers = max_workers
+        self.event_bus = event_bus if event_bus is not None else get_shared_bus()
         self.total_files_deleted = 0
         self.total_size_freed = 0
         self.errors = []
@@ -153,83 +163,41 @@ class CleanupManager:
         Returns:
             Tupla (tamanho_bytes, num_arquivos)
         """
-        total_size = 0
-        file_count = 0
-        
-        try:
-            for dirpath, dirnames, filenames in os.walk(path):
-                for filename in filenames:
-                    filepath = os.path.join(dirpath, filename)
-                    try:
-                        if os.path.isfile(filepath):
-                            total_size += os.path.getsize(filepath)
-                            file_count += 1
-                    except (OSError, PermissionError) as e:
-                        logger.debug(f"Erro ao obter tamanho de {filepath}: {e}")
-        except (OSError, PermissionError) as e:
-            logger.debug(f"Erro ao processar pasta {path}: {e}")
-        
-        return total_size, file_count
+        return scan_tree_size(path)
     
     def _safe_delete_folder_contents(self, path: str) -> Tuple[int, int]:
         """
         Deleta conteúdo de uma pasta com segurança.
         
+        Percorre a pasta uma única vez (os.scandir): cada arquivo é medido pelo
+        stat em cache do DirEntry e apagado na mesma passada, e as subpastas são
+        removidas de baixo para cima. Arquivos em uso são contados como erro e
+        mantidos.
+        
         Args:
             path: Caminho da pasta
             
         Returns:
             Tupla (arquivos_deletados, bytes_liberados)
         """
-        deleted_count = 0
-        freed_bytes = 0
-        
         try:
-            if not os.path.exists(path):
-                return deleted_count, freed_bytes
-            
             if not os.path.isdir(path):
-                return deleted_count, freed_bytes
+                return 0, 0
             
             # Não deletar a pasta em si, apenas o conteúdo
-            for item in os.listdir(path):
-                item_path = os.path.join(path, item)
-                
-                try:
-                    # Obter tamanho antes de deletar
-                    if os.path.isfile(item_path):
-                        size = os.path.getsize(item_path)
-                        os.remove(item_path)
-                        deleted_count += 1
-                        freed_bytes += size
-                    elif os.path.isdir(item_path):
-                        # Deletar recursivamente
-                        for subdir, _, files in os.walk(item_path, topdown=False):
-                            for file in files:
-                                try:
-                                    file_path = os.path.join(subdir, file)
-                                    size = os.path.getsize(file_path)
-                                    os.remove(file_path)
-                                    deleted_count += 1
-                                    freed_bytes += size
-                                except (OSError, PermissionError):
-                                    pass
-                        
-                        try:
-                            shutil.rmtree(item_path, ignore_errors=True)
-                        except (OSError, PermissionError):
-                            pass
-                except (OSError, PermissionError) as e:
-                    error_msg = f"Erro ao deletar {item_path}: {e}"
-                    logger.warning(error_msg)
-                    self.errors.append(error_msg)
+            stats = delete_tree_contents(path)
+            
+            if stats['errors']:
+                logger.warning(f"{stats['errors']} item(ns) não puderam ser deletados em {path}")
+                self.errors.extend(stats['error_samples'])
+            
+            return stats['files'], stats['bytes']
                     
         except Exception as e:
             error_msg = f"Erro geral ao limpar {path}: {e}"
             logger.error(error_msg)
             self.errors.append(error_msg)
-        
-        return deleted_count, freed_bytes
+            return 0, 0
     
     def _format_size(self, bytes_size: int) -> str:
         """
@@ -247,15 +215,24 @@ class CleanupManager:
             bytes_size /= 1024.0
         return f"{bytes_size:.2f} PB"
     
-    def clean_cache(self) -> Dict:
+    def _clean_folders(self, folders: list, start: int, end: int,
+                       step_label: str, done_label: str, category: str = '') -> Dict:
         """
-        Limpa caches do sistema.
+        Limpa o conteúdo de uma lista de pastas, em série ou em paralelo.
+        
+        Publica um evento cleanup_target por pasta com os arquivos e bytes liberados.
         
+        Args:
+            folders: Pastas a limpar
+            start: Percentual inicial do progresso
+            end: Percentual final do progresso
+            step_label: Prefixo da mensagem de progresso (ex: "Limpando cache")
+            done_label: Prefixo do log de conclusão (ex: "Cache limpo")
+            category: Categoria informada nos eventos (ex: 'cache')
+            
         Returns:
             Dicionário com resultados da limpeza
         """
-        self._report_progress("Iniciando limpeza de cache...", 5)
-        
         results = {
             'files_deleted': 0,
             'bytes_freed': 0,
@@ -263,82 +240,108 @@ class CleanupManager:
             'details': []
         }
         
-        cache_folders = self.get_cache_folders()
-        total_folders = len(cache_folders)
+        total_folders = len(folders)
         
-        for i, cache_path in enumerate(cache_folders):
-            progress = 5 + (i / total_folders) * 30  # 5% a 35%
+        if self.max_workers > 1 and total_folders:
+            # Pastas e subpastas distribuídas num pool de threads
+            def on_task_done(done, total, target):
+                folder_name = os.path.basename(target) or target
+                progress = start + (done / total) * (end - start)
+                self._report_progress(f"{step_label}: {folder_name}... ({done}/{total})", int(progress))
             
-            folder_name = os.path.basename(cache_path)
-            self._report_progress(f"Limpando cache: {folder_name}...", int(progress))
+            per_target = delete_targets_parallel(folders, self.max_workers, on_task_done)
+        else:
+            per_target = None
+        
+        for i, folder_path in enumerate(folders):
+            folder_name = os.path.basename(folder_path) or folder_path
             
             try:
-                size_before, files_before = self._get_folder_size(cache_path)
-                deleted, freed = self._safe_delete_folder_contents(cache_path)
+                if per_target is None:
+                    progress = start + (i / total_folders) * (end - start)
+                    self._report_progress(f"{step_label}: {folder_name}...", int(progress))
+                    deleted, freed = self._safe_delete_folder_contents(folder_path)
+                else:
+                    stats = per_target[folder_path]
+                    deleted, freed = stats['files'], stats['bytes']
+                    if stats['errors']:
+                        logger.warning(f"{stats['errors']} item(ns) não puderam ser deletados em {folder_path}")
+                        self.errors.extend(stats['error_samples'])
+                
+                self.event_bus.emit(EVENT_CLEANUP_TARGET, target=folder_path, category=category,
+                                    files=deleted, bytes=freed)
                 
                 if deleted > 0 or freed > 0:
                     results['files_deleted'] += deleted
                     results['bytes_freed'] += freed
                     results['details'].append({
-                        'path': cache_path,
+                        'path': folder_path,
                         'files': deleted,
                         'size': freed
                     })
                     
-                    logger.info(f"Cache limpo: {folder_name} - {deleted} arquivos, {self._format_size(freed)}")
+                    logger.info(f"{done_label}: {folder_name} - {deleted} arquivos, {self._format_size(freed)}")
                     
             except Exception as e:
-                error_msg = f"Erro ao limpar {cache_path}: {e}"
+                error_msg = f"Erro ao limpar {folder_path}: {e}"
                 logger.error(error_msg)
                 results['errors'].append(error_msg)
         
         return results
     
-    def clean_temp_files(self) -> Dict:
+    def get_cleanup_plan(self, categories: Iterable[str] = PLAN_PRIORITY) -> Dict[str, list]:
         """
-        Limpa arquivos temporários.
+        Monta o plano de limpeza sem pastas duplicadas nem aninhadas.
+        
+        Uma pasta listada em mais de uma categoria (ex: Temp, que aparece em
+        cache e temporários) fica só na primeira categoria de PLAN_PRIORITY.
+        
+        Args:
+            categories: Categorias a incluir ('cache' e/ou 'temp')
+            
+        Returns:
+            Dicionário categoria -> lista de pastas
+        """
+        sources = {'cache': self.get_cache_folders, 'temp': self.get_temp_folders}
+        return plan_cleanup_targets({c: sources[c]() for c in categories if c in sources})
+    
+    def clean_cache(self, folders: list = None) -> Dict:
+        """
+        Limpa caches do sistema.
+        
+        Args:
+            folders: Pastas já planejadas (padrão: plano só com o cache)
         
         Returns:
             Dicionário com resultados da limpeza
         """
-        self._report_progress("Iniciando limpeza de arquivos temporários...", 35)
+        self._report_progress("Iniciando limpeza de cache...", 5)
         
-        results = {
-            'files_deleted': 0,
-            'bytes_freed': 0,
-            'errors': [],
-            'details': []
-        }
+        if folders is None:
+            folders = self.get_cleanup_plan(('cache',))['cache']
         
-        temp_folders = self.get_temp_folders()
-        total_folders = len(temp_folders)
+        # 5% a 35%
+        with self.event_bus.phase('cleanup_cache', targets=len(folders)):
+            return self._clean_folders(folders, 5, 35, "Limpando cache", "Cache limpo", 'cache')
+    
+    def clean_temp_files(self, folders: list = None) -> Dict:
+        """
+        Limpa arquivos temporários.
         
-        for i, temp_path in enumerate(temp_folders):
-            progress = 35 + (i / total_folders) * 30  # 35% a 65%
-            
-            folder_name = os.path.basename(temp_path) or temp_path
-            self._report_progress(f"Limpando temporários: {folder_name}...", int(progress))
-            
-            try:
-                deleted, freed = self._safe_delete_folder_contents(temp_path)
-                
-                if deleted > 0 or freed > 0:
-                    results['files_deleted'] += deleted
-                    results['bytes_freed'] += freed
-                    results['details'].append({
-                        'path': temp_path,
-                        'files': deleted,
-                        'size': freed
-                    })
-                    
-                    logger.info(f"Temporários limpos: {folder_name} - {deleted} arquivos, {self._format_size(freed)}")
-                    
-            except Exception as e:
-                error_msg = f"Erro ao limpar {temp_path}: {e}"
-                logger.error(error_msg)
-                results['errors'].append(error_msg)
+        Args:
+            folders: Pastas já planejadas (padrão: plano só com os temporários)
         
-        return results
+        Returns:
+            Dicionário com resultados da limpeza
+        """
+        self._report_progress("Iniciando limpeza de arquivos temporários...", 35)
+        
+        if folders is None:
+            folders = self.get_cleanup_plan(('temp',))['temp']
+        
+        # 35% a 65%
+        with self.event_bus.phase('cleanup_temp', targets=len(folders)):
+            return self._clean_folders(folders, 35, 65, "Limpando temporários", "Temporários limpos", 'temp')
     
     def empty_recycle_bin(self) -> Dict:
         """
@@ -347,6 +350,14 @@ class CleanupManager:
         Returns:
             Dicionário com resultados
         """
+        with self.event_bus.phase('cleanup_recycle'):
+            results = self._empty_recycle_bin()
+        self.event_bus.emit(EVENT_CLEANUP_TARGET, target='recycle_bin', category='recycle',
+                            files=0, bytes=results['size_freed'], success=results['success'])
+        return results
+    
+    def _empty_recycle_bin(self) -> Dict:
+        """Chama SHEmptyRecycleBin (ver empty_recycle_bin)"""
         self._report_progress("Iniciando esvaziamento da lixeira...", 65)
         
         results = {
@@ -398,9 +409,13 @@ class CleanupManager:
         """
         self._report_progress("Iniciando limpeza completa do sistema...", 0)
         
+        # Um único plano: cada pasta é limpa uma vez, na categoria que a reivindicou
+        with self.event_bus.phase('cleanup_plan'):
+            plan = self.get_cleanup_plan()
+        
         complete_results = {
-            'cache': self.clean_cache(),
-            'temp': self.clean_temp_files(),
+            'cache': self.clean_cache(plan['cache']),
+            'temp': self.clean_temp_files(plan['temp']),
             'recycle': self.empty_recycle_bin(),
             'summary': {
                 'total_files': 0,
@@ -430,45 +445,68 @@ class CleanupManager:
         return complete_results
 
 
-def cleanup_all_safe(callback: Callable = None) -> Dict:
+def cleanup_all_safe(callback: Callable = None, max_workers: int = DEFAULT_CLEANUP_WORKERS) -> Dict:
     """
     Função de conveniência para limpeza completa.
     
     Args:
         callback: Função para reportar progresso
+        max_workers: Threads de exclusão
         
     Returns:
         Resultados da limpeza
     """
-    manager = CleanupManager(callback)
+    manager = CleanupManager(callback, max_workers)
     return manager.cleanup_all()
 
 
-def get_cleanup_info() -> Dict:
+def get_cleanup_info(estimate_only: bool = False, size_index: SizeIndex = None) -> Dict:
     """
     Obtém informações sobre limpeza possível.
     
+    Os tamanhos vêm do índice persistente (size_index.py): com estimate_only o
+    resultado sai na hora, a partir da última varredura; sem ele, só as pastas
+    alteradas desde então são listadas de novo e o índice é gravado.
+    
+    Args:
+        estimate_only: Usar apenas o índice, sem acessar o disco
+        size_index: Índice de tamanhos (padrão: o compartilhado do processo)
+    
     Returns:
-        Dicionário com informações
+        Dicionário com informações ('estimated' indica valores do índice e
+        'unindexed' quantas pastas ainda não têm tamanho conhecido)
     """
     manager = CleanupManager()
+    index = size_index if size_index is not None else get_shared_size_index()
+    
+    # Mesmo plano usado por cleanup_all: nenhuma pasta é somada duas vezes
+    plan = manager.get_cleanup_plan()
     
     info = {
-        'cache_folders': manager.get_cache_folders(),
-        'temp_folders': manager.get_temp_folders(),
+        'cache_folders': plan['cache'],
+        'temp_folders': plan['temp'],
         'recycle_size': manager.get_recyclable_size(),
         'cache_size': 0,
-        'temp_size': 0
+        'temp_size': 0,
+        'estimated': estimate_only,
+        'unindexed': 0
     }
     
     # Calcular tamanhos
-    for path in info['cache_folders']:
-        size, _ = manager._get_folder_size(path)
-        info['cache_size'] += size
+    for category in ('cache', 'temp'):
+        for path in plan[category]:
+            if estimate_only:
+                known = index.estimate(path)
+                if known is None:
+                    info['unindexed'] += 1
+                    continue
+                size, _ = known
+            else:
+                size, _ = index.refresh(path)
+            info[f'{category}_size'] += size
     
-    for path in info['temp_folders']:
-        size, _ = manager._get_folder_size(path)
-        info['temp_size'] += size
+    if not estimate_only:
+        index.save()
     
     return info
 
@@ -0,0 +1,75 @@
+"""
+cleanup_planner.py - Plano de limpeza com caminhos canônicos e sem sobreposição
+
+Os alvos de limpeza vêm de listas diferentes (cache e temporários) e
+frequentemente apontam para a mesma pasta com grafias diferentes:
+tempfile.gettempdir() com nome curto 8.3, "C:\\Users\\<usuário>\\AppData\\Local\\Temp"
+com outra capitalização, junções, ou uma pasta dentro de outra já listada.
+O planejador resolve cada caminho para sua forma canônica e monta um único
+plano sem duplicatas nem alvos aninhados, usado tanto pela estimativa de
+tamanho quanto pela exclusão.
+"""
+import os
+from typing import Dict, Iterable, List
+
+# Ordem de prioridade: uma pasta presente em duas categorias fica na primeira
+PLAN_PRIORITY = ('temp', 'cache')
+
+
+def canonicalize_path(path: str) -> str:
+    """
+    Retorna a forma canônica de um caminho para comparação.
+
+    realpath resolve links simbólicos, junções e (no Windows) nomes curtos 8.3;
+    normcase ignora maiúsculas/minúsculas e unifica separadores no Windows.
+
+    Args:
+        path: Caminho como informado
+
+    Returns:
+        Caminho canônico (usado só para comparação)
+    """
+    return os.path.normcase(os.path.realpath(os.path.abspath(path)))
+
+
+def _is_inside(path: str, parent: str) -> bool:
+    """True se 'path' é igual a 'parent' ou está dentro dele (ambos canônicos)"""
+    if path == parent:
+        return True
+    prefix = parent if parent.endswith(os.sep) else parent + os.sep
+    return path.startswith(prefix)
+
+
+def plan_cleanup_targets(groups: Dict[str, Iterable[str]],
+                         priority: Iterable[str] = PLAN_PRIORITY) -> Dict[str, List[str]]:
+    """
+    Monta o plano de limpeza sem duplicatas nem alvos aninhados.
+
+    Args:
+        groups: Categoria -> lista de pastas (ex: {'cache': [...], 'temp': [...]})
+        priority: Ordem em que as categorias reivindicam pastas repetidas
+
+    Returns:
+        Categoria -> lista de pastas (grafia original da primeira ocorrência),
+        na ordem original dentro de cada categoria
+    """
+    order = [c for c in priority if c in groups] + [c for c in groups if c not in priority]
+
+    candidates = []
+    for rank, category in enumerate(order):
+        for index, path in enumerate(groups[category]):
+            candidates.append((canonicalize_path(path), rank, index, category, path))
+
+    # Ancestrais (caminhos mais curtos) primeiro; empates mantêm a prioridade
+    candidates.sort(key=lambda c: (len(c[0]), c[1], c[2]))
+
+    kept = []
+    for canonical, rank, index, category, path in candidates:
+        if any(_is_inside(canonical, parent[0]) for parent in kept):
+            continue
+        kept.append((canonical, rank, index, category, path))
+
+    plan = {category: [] for category in groups}
+    for _, _, _, category, path in sorted(kept, key=lambda c: (c[1], c[2])):
+        plan[category].append(path)
+    return plan
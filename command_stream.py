@@ -0,0 +1,183 @@
+"""
+command_stream.py - Execução de comandos com leitura de stdout em streaming
+
+Em vez de process.communicate(), que só devolve a saída quando o processo
+termina e guarda tudo em memória, CommandStream entrega cada linha decodificada
+assim que ela chega e mantém apenas as últimas linhas (ring buffer) para
+relatórios de erro. Com idle_timeout, um processo sem saída e sem CPU por esse
+tempo (instalador travado) é encerrado junto com seus descendentes.
+"""
+import logging
+import queue
+import subprocess
+import threading
+import time
+from collections import deque
+from typing import Callable, Iterator, List, Optional
+
+from process_activity import HangWatch, kill_process_tree
+
+logger = logging.getLogger(__name__)
+
+# Quantidade de linhas mantidas no final da saída para relatórios de erro
+DEFAULT_TAIL_LINES = 200
+
+# Tamanho máximo de uma linha sem '\n' (barras de progresso redesenhadas com '\r')
+MAX_LINE_BYTES = 64 * 1024
+
+
+def _decode_line(raw: bytes) -> str:
+    """Decodifica uma linha e mantém só o último redesenho de barras de progresso"""
+    text = raw.decode('utf-8', errors='replace').rstrip('\r')
+    if '\r' in text:
+        text = text.rsplit('\r', 1)[-1]
+    return text
+
+
+def _pump(pipe, name: str, lines: queue.Queue, on_chunk: Optional[Callable[[bytes], None]] = None):
+    """Lê um pipe em blocos e publica linhas completas na fila (on_chunk a cada bloco lido)"""
+    buffer = b''
+    try:
+        read = getattr(pipe, 'read1', pipe.read)
+        while True:
+            chunk = read(65536)
+            if not chunk:
+                break
+            if on_chunk is not None:
+                on_chunk(chunk)
+            buffer += chunk
+            *complete, buffer = buffer.split(b'\n')
+            for raw in complete:
+                lines.put((name, _decode_line(raw)))
+            if len(buffer) > MAX_LINE_BYTES:
+                # Linha gigante sem '\n': descartar redesenhos antigos
+                buffer = buffer[buffer.rfind(b'\r') + 1:] if b'\r' in buffer else buffer[-MAX_LINE_BYTES:]
+        if buffer:
+            lines.put((name, _decode_line(buffer)))
+    except (OSError, ValueError):
+        pass
+    finally:
+        lines.put((name, None))
+
+
+class CommandStream:
+    """Processo cujas linhas de stdout podem ser iteradas conforme chegam"""
+
+    def __init__(self, argv: List[str], timeout: int = 300, tail_lines: int = DEFAULT_TAIL_LINES,
+                 idle_timeout: Optional[float] = None):
+        """
+        Inicia o processo.
+
+        Args:
+            argv: Comando e argumentos
+            timeout: Tempo máximo total de execução (segundos)
+            tail_lines: Quantidade de linhas finais mantidas em memória
+            idle_timeout: Tempo máximo sem saída e sem CPU (None = sem limite)
+        """
+        self.argv = argv
+        self.timeout = timeout
+        self.tail = deque(maxlen=tail_lines)
+        self.stderr_tail = deque(maxlen=tail_lines)
+        self.returncode = None
+        self.timed_out = False
+        self.hung = False
+        self.idle_timeout = idle_timeout
+        self.line_count = 0
+        # Medições para PowerShellManager.instrument_commands (perf_counter)
+        self.output_bytes = 0
+        self.first_output_at = None
+
+        self._lines = queue.Queue()
+        self.process = subprocess.Popen(argv, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        self.spawned_at = time.perf_counter()
+        self._start_time = time.monotonic()
+        self._watch = HangWatch(self.process.pid, idle_timeout) if idle_timeout else None
+        on_chunk = self._watch.output if self._watch is not None else None
+
+        self._readers = [
+            threading.Thread(target=_pump, args=(self.process.stdout, 'stdout', self._lines, on_chunk),
+                             daemon=True),
+            threading.Thread(target=_pump, args=(self.process.stderr, 'stderr', self._lines, on_chunk),
+                             daemon=True),
+        ]
+        for reader in self._readers:
+            reader.start()
+
+    def __iter__(self) -> Iterator[str]:
+        """Itera sobre as linhas de stdout; stderr vai apenas para stderr_tail"""
+        open_pipes = 2
+        deadline = self._start_time + self.timeout
+        poll = self._watch.poll_seconds if self._watch is not None else 0.5
+
+        while open_pipes:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                self.kill()
+                self.timed_out = True
+                logger.error(f"Command timed out after {self.timeout} seconds")
+                break
+
+            try:
+                name, line = self._lines.get(timeout=min(remaining, 0.5, poll))
+            except queue.Empty:
+                if self._watch is not None and self._watch.hung():
+                    self.kill()
+                    self.hung = True
+                    logger.error(f"Command hung (no output or CPU for {self.idle_timeout} seconds), killed")
+                    break
+                continue
+
+            if line is None:
+                open_pipes -= 1
+                continue
+
+            if name == 'stderr':
+                self.stderr_tail.append(line)
+                continue
+
+            if self.first_output_at is None:
+                self.first_output_at = time.perf_counter()
+            self.output_bytes += len(line.encode('utf-8')) + 1
+            self.tail.append(line)
+            self.line_count += 1
+            yield line
+
+        if not (self.timed_out or self.hung):
+            self.returncode = self.process.wait()
+
+    def kill(self):
+        """Encerra o processo e seus descendentes"""
+        if self.process.poll() is None:
+            kill_process_tree(self.process)
+
+    @property
+    def success(self) -> bool:
+        """True se o processo terminou com código 0 dentro do tempo limite"""
+        return not (self.timed_out or self.hung) and self.returncode == 0
+
+    def tail_text(self) -> str:
+        """Últimas linhas de stdout como texto"""
+        return "\n".join(self.tail)
+
+    def stderr_text(self) -> str:
+        """Últimas linhas de stderr como texto"""
+        if self.timed_out:
+            return "Command timed out"
+        if self.hung:
+            return f"Command hung (no output or activity for {self.idle_timeout} seconds)"
+        return "\n".join(self.stderr_tail)
+
+    def run(self, on_line: Optional[Callable[[str], None]] = None):
+        """
+        Consome toda a saída, chamando on_line para cada linha de stdout.
+
+        Returns:
+            Tuple of (success: bool, stdout_tail: str, stderr_tail: str)
+        """
+        for line in self:
+            if on_line:
+                try:
+                    on_line(line)
+                except Exception as e:
+                    logger.warning(f"Output callback error: {e}")
+        return self.success, self.tail_text(), self.stderr_text()
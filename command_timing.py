@@ -0,0 +1,188 @@
+"""
+command_timing.py - Relatório de tempo dos comandos PowerShell/winget
+
+Com PowerShellManager(instrument_commands=True), cada evento command_finished
+traz, além da duração total:
+
+    caller                Método que pediu o comando (ex: 'update_app_silent')
+    spawn_seconds         Até o processo/host estar pronto (0 em sessão já aquecida)
+    first_output_seconds  Até o primeiro byte de stdout (None sem saída)
+    output_bytes          Bytes de stdout
+    exit_code             Código de saída
+
+O relatório mostra os comandos mais lentos e quanto do tempo total foi gasto
+antes de o comando produzir saída (início do PowerShell, atualização das
+fontes do winget) em relação ao trabalho em si.
+
+Uso:
+    python command_timing.py eventos.jsonl [--limit N] [--json]
+    (eventos.jsonl gravado por 'headless_cli.py ... --instrument --events-file eventos.jsonl')
+"""
+import argparse
+import json
+import sys
+import threading
+from typing import Dict, Iterable, List, Optional
+
+from event_bus import EVENT_COMMAND_FINISHED, percentile
+
+
+def is_timed_command(event: dict) -> bool:
+    """Se o evento é um command_finished instrumentado"""
+    return event.get('type') == EVENT_COMMAND_FINISHED and 'caller' in event
+
+
+class CommandTimingCollector:
+    """Assinante do barramento que guarda os comandos instrumentados"""
+
+    def __init__(self, max_records: int = 10000):
+        """
+        Args:
+            max_records: Máximo de comandos guardados (os mais antigos são descartados)
+        """
+        self.max_records = max_records
+        self._records: List[dict] = []
+        self._lock = threading.Lock()
+
+    def __call__(self, event: dict):
+        if not is_timed_command(event):
+            return
+        with self._lock:
+            self._records.append(event)
+            if len(self._records) > self.max_records:
+                del self._records[0]
+
+    def records(self) -> List[dict]:
+        with self._lock:
+            return list(self._records)
+
+    def clear(self):
+        with self._lock:
+            self._records = []
+
+    def report(self, limit: int = 10) -> dict:
+        """Ver build_timing_report"""
+        return build_timing_report(self.records(), limit)
+
+
+def _startup_seconds(record: dict) -> float:
+    """Tempo até o primeiro byte de saída (o comando inteiro se não houve saída)"""
+    first_output = record.get('first_output_seconds')
+    return first_output if first_output is not None else record.get('seconds', 0.0)
+
+
+def build_timing_report(records: Iterable[dict], limit: int = 10) -> dict:
+    """
+    Monta o relatório a partir dos command_finished instrumentados.
+
+    Args:
+        records: Eventos (outros tipos são ignorados)
+        limit: Quantidade de comandos mais lentos listados
+
+    Returns:
+        Dicionário com 'totals', 'by_caller' (ordenado pelo tempo total) e 'slowest'
+    """
+    records = [record for record in records if is_timed_command(record)]
+    total = sum(record.get('seconds', 0.0) for record in records)
+    spawn = sum(record.get('spawn_seconds') or 0.0 for record in records)
+    startup = sum(_startup_seconds(record) for record in records)
+
+    by_caller: Dict[str, dict] = {}
+    for record in records:
+        item = by_caller.setdefault(record['caller'], {
+            'count': 0, 'seconds': 0.0, 'spawn_seconds': 0.0, 'startup_seconds': 0.0,
+            'output_bytes': 0, 'failed': 0, 'durations': []})
+        item['count'] += 1
+        item['seconds'] += record.get('seconds', 0.0)
+        item['spawn_seconds'] += record.get('spawn_seconds') or 0.0
+        item['startup_seconds'] += _startup_seconds(record)
+        item['output_bytes'] += record.get('output_bytes') or 0
+        item['failed'] += 0 if record.get('success') else 1
+        item['durations'].append(record.get('seconds', 0.0))
+
+    callers = {}
+    for name, item in sorted(by_caller.items(), key=lambda pair: -pair[1]['seconds']):
+        durations = item.pop('durations')
+        callers[name] = {key: round(value, 3) if isinstance(value, float) else value
+                         for key, value in item.items()}
+        callers[name]['p95_seconds'] = round(percentile(durations, 95), 3)
+
+    slowest = sorted(records, key=lambda record: -record.get('seconds', 0.0))[:limit]
+    return {
+        'totals': {
+            'commands': len(records),
+            'seconds': round(total, 3),
+            'spawn_seconds': round(spawn, 3),
+            'startup_seconds': round(startup, 3),
+            'startup_share': round(startup / total, 3) if total else 0.0,
+            'output_bytes': sum(record.get('output_bytes') or 0 for record in records),
+        },
+        'by_caller': callers,
+        'slowest': [{key: record.get(key) for key in
+                     ('caller', 'kind', 'seconds', 'spawn_seconds', 'first_output_seconds',
+                      'output_bytes', 'exit_code', 'command')}
+                    for record in slowest],
+    }
+
+
+def format_timing_report(report: dict) -> str:
+    """Formata o relatório para o console"""
+    totals = report['totals']
+    lines = [
+        f"Comandos: {totals['commands']} em {totals['seconds']:.1f}s "
+        f"(início de processo {totals['spawn_seconds']:.1f}s, até a primeira saída "
+        f"{totals['startup_seconds']:.1f}s = {totals['startup_share']:.0%} do total)",
+        "",
+        "Por método chamador:",
+    ]
+    for caller, item in report['by_caller'].items():
+        lines.append(f"  {caller:<32} {item['count']:>4}x {item['seconds']:>8.1f}s "
+                     f"(p95 {item['p95_seconds']:.1f}s, início {item['spawn_seconds']:.1f}s, "
+                     f"até saída {item['startup_seconds']:.1f}s, {item['failed']} falha(s))")
+    lines += ["", "Mais lentos:"]
+    for record in report['slowest']:
+        first_output = record['first_output_seconds']
+        first_text = f"{first_output:.2f}s" if first_output is not None else "-"
+        lines.append(f"  {record['seconds']:>8.2f}s  {record['caller']:<28} "
+                     f"início {record['spawn_seconds'] or 0:.2f}s, primeira saída {first_text}, "
+                     f"{record['output_bytes'] or 0} bytes, código {record['exit_code']}  "
+                     f"{record['command'][:60]}")
+    return "\n".join(lines)
+
+
+def load_events(path: str) -> List[dict]:
+    """Lê um arquivo JSON Lines de eventos (linhas inválidas são ignoradas)"""
+    events = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                events.append(json.loads(line))
+            except ValueError:
+                continue
+    return events
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog='command_timing.py',
+                                     description="Relatório de tempo dos comandos instrumentados")
+    parser.add_argument('events_file', help="Arquivo JSON Lines de eventos (--events-file)")
+    parser.add_argument('--limit', type=int, default=10, help="Comandos mais lentos listados")
+    parser.add_argument('--json', action='store_true', help="Imprimir o relatório em JSON")
+    args = parser.parse_args(argv)
+
+    try:
+        events = load_events(args.events_file)
+    except OSError as e:
+        print(f"Não foi possível ler {args.events_file}: {e}", file=sys.stderr)
+        return 1
+
+    report = build_timing_report(events, args.limit)
+    if not report['totals']['commands']:
+        print("Nenhum comando instrumentado (use --instrument)", file=sys.stderr)
+        return 1
+    print(json.dumps(report, ensure_ascii=False, indent=2) if args.json else format_timing_report(report))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,7 +3,7 @@ console_splash.py - Tela de inicialização em modo console com arte ASCII
 """
 import sys
 import time
-from typing import Callable
+from typing import Callable, List, Tuple
 
 class ConsoleSplash:
     """Exibe tela ASCII de inicialização no console"""
@@ -51,12 +51,33 @@ class ConsoleSplash:
         empty = total - filled
         return '[' + ('|' * filled) + ('.' * empty) + ']'
     
-    def show(self, callback: Callable[[int], None] = None):
+    def _report(self, callback: Callable[[int], None], progress_percent: int):
+        """Atualiza o progresso e chama o callback sem deixar um erro interromper a tela"""
+        self.progress = progress_percent
+        if callback:
+            try:
+                callback(progress_percent)
+            except Exception as e:
+                print(f"⚠️  Erro no callback de progresso: {e}")
+    
+    def _print_bar(self, progress_percent: int):
+        """Redesenha a barra de progresso na mesma linha"""
+        filled = int((progress_percent / 100) * 50)
+        bar = self.get_progress_bar(filled)
+        print(f"|  {bar} {progress_percent}%{'':>9}|", end='\r', flush=True)
+    
+    def show(self, callback: Callable[[int], None] = None,
+             tasks: List[Tuple[str, Callable[[], object]]] = None):
         """
-        Exibe a tela de inicialização com progresso animado
+        Exibe a tela de inicialização enquanto executa o pré-carregamento.
+        
+        O progresso acompanha trabalho real (tarefas de pré-carregamento) em vez
+        de uma animação com tempo fixo; sem tarefas, a tela é exibida na hora.
         
         Args:
             callback: Função callback para relatar progresso (0-100)
+            tasks: Lista de (texto de status, função) executadas em ordem; uma
+                falha é exibida e não interrompe a inicialização
         """
         try:
             self.clear_screen()
@@ -64,52 +85,31 @@ class ConsoleSplash:
             # Exibe arte ASCII
             print(self.ASCII_ART)
             
-            # Exibe itens de status com animação
-            for i, status in enumerate(self.STATUS_ITEMS):
-                if i < 2:
+            # Itens de status decorativos
+            for status in self.STATUS_ITEMS:
+                print(f"|  [OK] {status:<60}|")
+            self._report(callback, 10)
+            
+            tasks = list(tasks or [])
+            for i, (status, task) in enumerate(tasks):
+                print(f"|  [..] {status:<60}|", end='\r', flush=True)
+                try:
+                    task()
                     print(f"|  [OK] {status:<60}|")
-                else:
-                    print(f"|  [..] {status:<60}|")
-                time.sleep(0.8)
-                
-                # Simula progresso
-                progress_percent = int((i / len(self.STATUS_ITEMS)) * 65)
-                self.progress = progress_percent
-                
-                if callback:
-                    try:
-                        callback(progress_percent)
-                    except Exception as e:
-                        print(f"⚠️  Erro no callback de progresso: {e}")
+                except Exception as e:
+                    print(f"|  [!!] {status:<60}|")
+                    print(f"   ⚠️  {e}")
+                self._report(callback, 10 + int(((i + 1) / len(tasks)) * 90))
             
-            # Simula carregamento final
+            # Barra final
             print("|                                                                       |")
             print("|  PROGRESSO:                                                           |")
-            
-            # Animação da barra de progresso
-            for step in range(26):  # De 65% a 100%
-                progress_percent = 65 + step
-                filled = int((progress_percent / 100) * 50)
-                bar = self.get_progress_bar(filled)
-                progress_line = f"|  {bar} {progress_percent}%{'':>9}|"
-                print(progress_line, end='\r')
-                
-                self.progress = progress_percent
-                if callback:
-                    try:
-                        callback(progress_percent)
-                    except Exception as e:
-                        print(f"⚠️  Erro no callback de progresso: {e}")
-                
-                time.sleep(0.05)
+            self._print_bar(100)
+            self._report(callback, 100)
             
             print()  # Nova linha após barra
             print(self.FOOTER)
-            
-            # Mensagem final
-            time.sleep(1)
             print("\n  Inicializando aplicação...\n")
-            time.sleep(0.5)
         
         except KeyboardInterrupt:
             print("\n\n⚠️  Inicialização interrompida pelo usuário.")
@@ -142,10 +142,7 @@ def test_console_splash():
     def progress_callback(progress: int):
         pass  # Callback para aplicação integrar
     
-    splash.show(progress_callback)
-    
-    # Simula execução
-    time.sleep(2)
+    splash.show(progress_callback, tasks=[("Aquecendo o cafe...", lambda: time.sleep(0.5))])
 
 
 if __name__ == "__main__":
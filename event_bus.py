@@ -0,0 +1,263 @@
+"""
+event_bus.py - Barramento de eventos tipados das operações (comandos, apps, limpeza)
+
+Os gerenciadores (PowerShellManager, CleanupManager) publicam aqui um evento
+por acontecimento relevante, além dos logs de texto e dos valores de retorno:
+
+    command_started / command_finished   Cada comando PowerShell (com duração)
+    app_upgrade                          Resultado de cada atualização de aplicativo
+    cleanup_target                       Arquivos e bytes liberados por pasta/alvo
+    phase_started / phase_finished       Etapas de uma execução (listagem, limpeza...)
+
+Cada evento é um dicionário com 'type', 'ts' (epoch) e os campos do tipo.
+Assinantes prontos: JsonLinesSink (arquivo/stream JSON Lines) e
+MetricsAggregator (latência p50/p95 dos comandos e duração por etapa).
+
+Uso:
+    bus = get_shared_bus()
+    metrics = MetricsAggregator()
+    bus.subscribe(metrics)
+    ... executa ...
+    metrics.summary()
+"""
+import json
+import logging
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, TextIO
+
+logger = logging.getLogger(__name__)
+
+# Tipos de evento
+EVENT_COMMAND_STARTED = 'command_started'
+EVENT_COMMAND_FINISHED = 'command_finished'
+EVENT_APP_UPGRADE = 'app_upgrade'
+EVENT_CLEANUP_TARGET = 'cleanup_target'
+EVENT_PHASE_STARTED = 'phase_started'
+EVENT_PHASE_FINISHED = 'phase_finished'
+
+_shared_bus = None
+_shared_lock = threading.Lock()
+
+
+class EventBus:
+    """Distribui eventos aos assinantes (seguro entre threads)"""
+
+    def __init__(self):
+        self._subscribers: List[Callable[[dict], None]] = []
+        self._lock = threading.Lock()
+
+    def subscribe(self, callback: Callable[[dict], None]):
+        """Registra callback(event), chamado na thread que publicou o evento"""
+        with self._lock:
+            self._subscribers.append(callback)
+
+    def unsubscribe(self, callback: Callable[[dict], None]):
+        with self._lock:
+            if callback in self._subscribers:
+                self._subscribers.remove(callback)
+
+    @property
+    def has_subscribers(self) -> bool:
+        return bool(self._subscribers)
+
+    def emit(self, event_type: str, **fields) -> Optional[dict]:
+        """
+        Publica um evento.
+
+        Args:
+            event_type: Um dos EVENT_*
+            **fields: Campos do evento
+
+        Returns:
+            O evento publicado (None se não há assinantes)
+        """
+        with self._lock:
+            subscribers = list(self._subscribers)
+        if not subscribers:
+            return None
+        event = {'type': event_type, 'ts': round(time.time(), 3)}
+        event.update(fields)
+        for callback in subscribers:
+            try:
+                callback(event)
+            except Exception as e:
+                logger.warning(f"Assinante de eventos falhou em '{event_type}': {e}")
+        return event
+
+    @contextmanager
+    def phase(self, name: str, **fields):
+        """
+        Publica phase_started/phase_finished em volta de um bloco.
+
+        Args:
+            name: Nome da etapa (ex: 'list_upgradable', 'cleanup_cache')
+            **fields: Campos extras dos dois eventos
+        """
+        self.emit(EVENT_PHASE_STARTED, phase=name, **fields)
+        start = time.perf_counter()
+        success = False
+        try:
+            yield
+            success = True
+        finally:
+            self.emit(EVENT_PHASE_FINISHED, phase=name, success=success,
+                      seconds=round(time.perf_counter() - start, 3), **fields)
+
+
+class JsonLinesSink:
+    """Grava cada evento como uma linha JSON (arquivo ou stream)"""
+
+    def __init__(self, path: Optional[str] = None, stream: Optional[TextIO] = None):
+        """
+        Args:
+            path: Arquivo JSON Lines (aberto em modo append)
+            stream: Stream já aberto (usado se path não for informado)
+        """
+        if path is None and stream is None:
+            raise ValueError("Informe path ou stream")
+        self._owns_stream = path is not None
+        self.stream = open(path, 'a', encoding='utf-8') if path is not None else stream
+        self._lock = threading.Lock()
+
+    def __call__(self, event: dict):
+        line = json.dumps(event, ensure_ascii=False, default=str)
+        with self._lock:
+            if self.stream is None:
+                return
+            self.stream.write(line + "\n")
+            self.stream.flush()
+
+    def close(self):
+        with self._lock:
+            if self._owns_stream and self.stream is not None:
+                self.stream.close()
+            self.stream = None
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """
+    Percentil pelo método do posto mais próximo.
+
+    Args:
+        values: Amostras (qualquer ordem)
+        pct: Percentil entre 0 e 100
+
+    Returns:
+        Valor do percentil (0.0 sem amostras)
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def _latency_stats(values: List[float]) -> Dict[str, float]:
+    return {
+        'count': len(values),
+        'p50': round(percentile(values, 50), 3),
+        'p95': round(percentile(values, 95), 3),
+        'max': round(max(values), 3) if values else 0.0,
+        'total': round(sum(values), 3),
+    }
+
+
+class MetricsAggregator:
+    """Agrega os eventos em memória: latências, etapas, apps e bytes liberados"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Descarta as métricas acumuladas (início de uma nova execução)"""
+        with self._lock:
+            self._command_seconds: List[float] = []
+            self._command_seconds_by_kind: Dict[str, List[float]] = {}
+            self._commands_failed = 0
+            self._phases: Dict[str, float] = {}
+            self._apps = {'successful': 0, 'failed': 0, 'outcomes': {}}
+            self._app_seconds: List[float] = []
+            self._cleanup_files = 0
+            self._cleanup_bytes: Dict[str, int] = {}
+
+    def __call__(self, event: dict):
+        event_type = event.get('type')
+        with self._lock:
+            if event_type == EVENT_COMMAND_FINISHED:
+                seconds = event.get('seconds', 0.0)
+                self._command_seconds.append(seconds)
+                self._command_seconds_by_kind.setdefault(event.get('kind', 'command'), []).append(seconds)
+                if not event.get('success'):
+                    self._commands_failed += 1
+            elif event_type == EVENT_PHASE_FINISHED:
+                name = event.get('phase', '?')
+                self._phases[name] = self._phases.get(name, 0.0) + event.get('seconds', 0.0)
+            elif event_type == EVENT_APP_UPGRADE:
+                key = 'successful' if event.get('success') else 'failed'
+                self._apps[key] += 1
+                outcome = event.get('outcome', key)
+                self._apps['outcomes'][outcome] = self._apps['outcomes'].get(outcome, 0) + 1
+                self._app_seconds.append(event.get('seconds', 0.0))
+            elif event_type == EVENT_CLEANUP_TARGET:
+                target = event.get('target', '?')
+                self._cleanup_files += event.get('files', 0)
+                self._cleanup_bytes[target] = self._cleanup_bytes.get(target, 0) + event.get('bytes', 0)
+
+    def summary(self) -> dict:
+        """
+        Resume a execução.
+
+        Returns:
+            Dicionário com 'commands' (p50/p95/max/total em segundos, por tipo e
+            falhas), 'phases' (segundos por etapa), 'apps' e 'cleanup'
+        """
+        with self._lock:
+            commands = _latency_stats(self._command_seconds)
+            commands['failed'] = self._commands_failed
+            commands['by_kind'] = {kind: _latency_stats(values)
+                                   for kind, values in self._command_seconds_by_kind.items()}
+            apps = dict(self._apps, outcomes=dict(self._apps['outcomes']),
+                        seconds=_latency_stats(self._app_seconds))
+            return {
+                'commands': commands,
+                'phases': {name: round(seconds, 3) for name, seconds in self._phases.items()},
+                'apps': apps,
+                'cleanup': {
+                    'files': self._cleanup_files,
+                    'bytes': sum(self._cleanup_bytes.values()),
+                    'bytes_by_target': dict(self._cleanup_bytes),
+                },
+            }
+
+
+def get_shared_bus() -> EventBus:
+    """
+    Retorna o barramento compartilhado do processo.
+
+    Returns:
+        EventBus único por processo
+    """
+    global _shared_bus
+    with _shared_lock:
+        if _shared_bus is None:
+            _shared_bus = EventBus()
+        return _shared_bus
+
+
+def format_metrics_summary(summary: dict) -> str:
+    """
+    Descreve MetricsAggregator.summary() em uma linha para logs e console.
+
+    Returns:
+        Ex: "12 comandos (p50 0.84s, p95 31.20s, 1 falha) | list_upgradable 12.1s, upgrade_apps 95.3s"
+    """
+    commands = summary['commands']
+    text = (f"{commands['count']} comandos (p50 {commands['p50']:.2f}s, p95 {commands['p95']:.2f}s, "
+            f"{commands['failed']} falha(s))")
+    if summary['phases']:
+        text += " | " + ", ".join(f"{name} {seconds:.1f}s" for name, seconds in summary['phases'].items())
+    return text
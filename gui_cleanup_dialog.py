@@ -1,11 +1,18 @@
 """
 gui_cleanup_dialog.py - Interface gráfica para limpeza de cache e temporários
+
+A thread de limpeza não toca nos widgets: mensagens e progresso vão para uma
+fila (ui_update_queue.py) que o diálogo drena na thread do Tk a cada
+PROGRESS_PUMP_INTERVAL_MS, então a velocidade da limpeza não depende do custo
+de desenhar a interface.
 """
 import tkinter as tk
 from tkinter import ttk, messagebox
 import threading
-from cleanup_manager import CleanupManager, get_cleanup_info
+from cleanup_manager import DEFAULT_CLEANUP_WORKERS, CleanupManager, get_cleanup_info
+from gui_constants import LOG_MAX_LINES, PROGRESS_PUMP_INTERVAL_MS, PROGRESS_PUMP_MAX_LINES
 from gui_utils import center_window
+from ui_update_queue import UIUpdateQueue
 import logging
 
 logger = logging.getLogger(__name__)
@@ -38,8 +45,13 @@ class CleanupDialog:
         self.clean_temp_var = tk.BooleanVar(value=True)
         self.clean_recycle_var = tk.BooleanVar(value=True)
         
+        # Fila de atualizações da interface (drenada por _pump na thread do Tk)
+        self._updates = UIUpdateQueue(max_lines=LOG_MAX_LINES)
+        
         # Setup UI
         self.setup_ui()
+        self.configure_log_tags()
+        self._pump_id = self.dialog.after(PROGRESS_PUMP_INTERVAL_MS, self._pump)
         self.load_cleanup_info()
         
         # Centralizar janela
@@ -236,33 +248,19 @@ class CleanupDialog:
         self.close_btn.pack(side=tk.RIGHT, padx=(5, 0))
     
     def load_cleanup_info(self):
-        """Carrega informações sobre o que pode ser limpo"""
+        """
+        Carrega informações sobre o que pode ser limpo.
+        
+        Mostra primeiro a estimativa do índice de tamanhos (instantânea) e
+        depois o valor atualizado, que só revarre as pastas alteradas.
+        """
         def load_info_thread():
             try:
-                info = get_cleanup_info()
+                estimate = get_cleanup_info(estimate_only=True)
+                self._updates.set_latest('info', estimate)
                 
-                # Formatar tamanhos
-                def format_size(bytes_size):
-                    for unit in ['B', 'KB', 'MB', 'GB', 'TB']:
-                        if bytes_size < 1024.0:
-                            return f"{bytes_size:.1f} {unit}"
-                        bytes_size /= 1024.0
-                    return f"{bytes_size:.1f} PB"
-                
-                # Atualizar labels
-                cache_size = format_size(info['cache_size'])
-                temp_size = format_size(info['temp_size'])
-                recycle_size = format_size(info['recycle_size'])
-                
-                self.cache_info_label.config(
-                    text=f"({len(info['cache_folders'])} pastas, ~{cache_size})"
-                )
-                self.temp_info_label.config(
-                    text=f"({len(info['temp_folders'])} pastas, ~{temp_size})"
-                )
-                self.recycle_info_label.config(
-                    text=f"(~{recycle_size})"
-                )
+                info = get_cleanup_info()
+                self._updates.set_latest('info', info)
                 
             except Exception as e:
                 logger.error(f"Erro ao carregar informações: {e}")
@@ -271,30 +269,111 @@ class CleanupDialog:
         thread = threading.Thread(target=load_info_thread, daemon=True)
         thread.start()
     
+    def _show_cleanup_info(self, info: dict):
+        """
+        Atualiza os labels de tamanho (thread da interface).
+        
+        Args:
+            info: Resultado de get_cleanup_info
+        """
+        # Formatar tamanhos
+        def format_size(bytes_size):
+            for unit in ['B', 'KB', 'MB', 'GB', 'TB']:
+                if bytes_size < 1024.0:
+                    return f"{bytes_size:.1f} {unit}"
+                bytes_size /= 1024.0
+            return f"{bytes_size:.1f} PB"
+        
+        # Estimativa: indicar que o valor ainda será atualizado
+        suffix = ", atualizando..." if info.get('estimated') else ""
+        
+        # Atualizar labels
+        cache_size = format_size(info['cache_size'])
+        temp_size = format_size(info['temp_size'])
+        recycle_size = format_size(info['recycle_size'])
+        
+        try:
+            self.cache_info_label.config(
+                text=f"({len(info['cache_folders'])} pastas, ~{cache_size}{suffix})"
+            )
+            self.temp_info_label.config(
+                text=f"({len(info['temp_folders'])} pastas, ~{temp_size}{suffix})"
+            )
+            self.recycle_info_label.config(
+                text=f"(~{recycle_size})"
+            )
+        except tk.TclError:
+            # Diálogo fechado antes do fim da varredura
+            pass
+    
     def add_log_message(self, message: str, level: str = "INFO"):
         """
-        Adiciona mensagem ao log.
+        Adiciona mensagem ao log (qualquer thread; exibida pela bomba).
         
         Args:
             message: Mensagem para logar
             level: Nível (INFO, WARNING, ERROR, SUCCESS)
         """
-        self.log_text.config(state=tk.NORMAL)
-        
-        # Tag para cores
+        # Prefixo e tag para cores
         if level == "SUCCESS":
-            self.log_text.insert(tk.END, f"✓ {message}\n", "success")
+            self._updates.put_line((f"✓ {message}\n", "success"))
         elif level == "ERROR":
-            self.log_text.insert(tk.END, f"✗ {message}\n", "error")
+            self._updates.put_line((f"✗ {message}\n", "error"))
         elif level == "WARNING":
-            self.log_text.insert(tk.END, f"⚠ {message}\n", "warning")
+            self._updates.put_line((f"⚠ {message}\n", "warning"))
         else:
-            self.log_text.insert(tk.END, f"→ {message}\n", "info")
+            self._updates.put_line((f"→ {message}\n", "info"))
+    
+    def _pump(self):
+        """Aplica mensagens, progresso e tamanhos pendentes (thread do Tk)"""
+        try:
+            if not self.dialog.winfo_exists():
+                return
+        except tk.TclError:
+            # Diálogo fechado
+            return
+        
+        try:
+            lines, latest, dropped = self._updates.drain(PROGRESS_PUMP_MAX_LINES)
+            if 'progress' in latest:
+                progress, message = latest['progress']
+                self.progress_bar['value'] = progress
+                self.progress_var.set(f"[{progress}%] {message}")
+            if 'info' in latest:
+                self._show_cleanup_info(latest['info'])
+            if lines or dropped:
+                self._append_log(lines, dropped)
+        except Exception as e:
+            logger.error(f"Erro ao atualizar interface da limpeza: {e}")
+        
+        self._pump_id = self.dialog.after(PROGRESS_PUMP_INTERVAL_MS, self._pump)
+    
+    def _append_log(self, lines: list, dropped: int = 0):
+        """
+        Insere um lote de mensagens em uma única chamada e mantém no máximo
+        LOG_MAX_LINES linhas (thread do Tk).
+        
+        Args:
+            lines: Tuplas (texto, tag)
+            dropped: Mensagens descartadas pela fila antes de serem exibidas
+        """
+        chunks = []
+        if dropped:
+            chunks += [f"⚠ ... {dropped} mensagens omitidas ...\n", "warning"]
+        for text, tag in lines:
+            chunks += [text, tag]
+        
+        self.log_text.config(state=tk.NORMAL)
+        self.log_text.insert(tk.END, *chunks)
+        
+        # Remover as linhas mais antigas ('end-1c' fica na linha vazia final)
+        excess = int(self.log_text.index('end-1c').split('.')[0]) - 1 - LOG_MAX_LINES
+        if excess > 0:
+            self.log_text.delete("1.0", f"{excess + 1}.0")
         
         # Rolar para o fim
         self.log_text.see(tk.END)
         self.log_text.config(state=tk.DISABLED)
-        self.log_text.update()
     
     def configure_log_tags(self):
         """Configura tags de cores para o log"""
@@ -303,24 +382,32 @@ class CleanupDialog:
         self.log_text.tag_config("warning", foreground="orange")
         self.log_text.tag_config("info", foreground="blue")
     
-    def cleanup_thread_func(self):
-        """Função executada em thread para limpeza"""
+    def get_selected_options(self) -> list:
+        """Retorna as opções marcadas (thread do Tk)"""
+        cleanup_options = []
+        if self.clean_cache_var.get():
+            cleanup_options.append("cache")
+        if self.clean_temp_var.get():
+            cleanup_options.append("temp")
+        if self.clean_recycle_var.get():
+            cleanup_options.append("recycle")
+        return cleanup_options
+    
+    def cleanup_thread_func(self, cleanup_options: list):
+        """
+        Função executada em thread para limpeza.
+        
+        Args:
+            cleanup_options: O que limpar ("cache", "temp", "recycle"), lido
+                dos checkboxes antes de iniciar a thread
+        """
         try:
-            # Determinar o que limpar
-            cleanup_options = []
-            if self.clean_cache_var.get():
-                cleanup_options.append("cache")
-            if self.clean_temp_var.get():
-                cleanup_options.append("temp")
-            if self.clean_recycle_var.get():
-                cleanup_options.append("recycle")
-            
             if not cleanup_options:
                 self.add_log_message("Nenhuma opção selecionada!", "WARNING")
                 return
             
             # Criar gerenciador
-            self.cleanup_manager = CleanupManager(self.progress_callback)
+            self.cleanup_manager = CleanupManager(self.progress_callback, max_workers=DEFAULT_CLEANUP_WORKERS)
             
             self.add_log_message("Iniciando limpeza do sistema...", "INFO")
             
@@ -340,15 +427,20 @@ class CleanupDialog:
                     }
                 }
                 
+                # Plano só com as categorias escolhidas (sem pastas repetidas)
+                plan = self.cleanup_manager.get_cleanup_plan(
+                    [option for option in cleanup_options if option != "recycle"]
+                )
+                
                 if "cache" in cleanup_options:
                     self.add_log_message("Limpando cache...", "INFO")
-                    results['cache'] = self.cleanup_manager.clean_cache()
+                    results['cache'] = self.cleanup_manager.clean_cache(plan['cache'])
                     results['summary']['total_files'] += results['cache']['files_deleted']
                     results['summary']['total_bytes'] += results['cache']['bytes_freed']
                 
                 if "temp" in cleanup_options:
                     self.add_log_message("Limpando temporários...", "INFO")
-                    results['temp'] = self.cleanup_manager.clean_temp_files()
+                    results['temp'] = self.cleanup_manager.clean_temp_files(plan['temp'])
                     results['summary']['total_files'] += results['temp']['files_deleted']
                     results['summary']['total_bytes'] += results['temp']['bytes_freed']
                 
@@ -380,21 +472,17 @@ class CleanupDialog:
     
     def progress_callback(self, message: str, progress: int):
         """
-        Callback para atualizar progresso.
+        Callback de progresso da limpeza (thread de limpeza).
         
         Args:
             message: Mensagem de progresso
             progress: Percentual (0-100)
         """
-        # Atualizar barra de progresso
-        self.progress_bar['value'] = progress
-        self.progress_var.set(f"[{progress}%] {message}")
+        # Barra: só o valor mais recente é desenhado a cada intervalo
+        self._updates.set_latest('progress', (progress, message))
         
         # Adicionar ao log
         self.add_log_message(message, "INFO")
-        
-        # Forçar atualização da UI
-        self.dialog.update_idletasks()
     
     def start_cleanup(self):
         """Inicia a limpeza"""
@@ -421,9 +509,6 @@ class CleanupDialog:
         self.log_text.delete("1.0", tk.END)
         self.log_text.config(state=tk.DISABLED)
         
-        # Configurar tags
-        self.configure_log_tags()
-        
         # Resetar barra de progresso
         self.progress_bar['value'] = 0
         self.progress_var.set("Iniciando limpeza...")
@@ -431,6 +516,7 @@ class CleanupDialog:
         # Iniciar thread de limpeza
         self.cleanup_thread = threading.Thread(
             target=self.cleanup_thread_func,
+            args=(self.get_selected_options(),),
             daemon=True
         )
         self.cleanup_thread.start()
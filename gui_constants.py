@@ -20,7 +20,8 @@ ADMIN_INDICATOR_RED = "red"
 
 # Timeouts
 PROGRESS_WINDOW_CREATE_TIMEOUT = 0.5  # segundos
-SPLASH_SCREEN_DURATION = 3000  # milisegundos
+SPLASH_POLL_INTERVAL_MS = 50  # consulta ao grafo de inicialização
+SPLASH_MAX_WAIT_MS = 15000  # espera máxima pelas tarefas críticas
 
 # Aplicativo
 APP_NAME = "Menino de TI Helper"
@@ -33,3 +34,9 @@ BUTTON_DISABLED = "DISABLED"
 
 # Logs
 LOG_TIMESTAMP_FORMAT = "%H:%M:%S"
+
+# Janela de progresso: bomba de atualizações da interface
+PROGRESS_PUMP_INTERVAL_MS = 50  # intervalo entre aplicações em lote (~20 quadros/s)
+PROGRESS_PUMP_MAX_LINES = 500  # linhas aplicadas por intervalo no máximo
+LOG_MAX_LINES = 2000  # linhas mantidas no log (as mais antigas são removidas)
+PROGRESS_ETA_REFRESH_MS = 1000  # intervalo de atualização do tempo restante
@@ -6,7 +6,13 @@ from tkinter import ttk, messagebox
 import threading
 import logging
 import sys
+from event_bus import MetricsAggregator, format_metrics_summary
 from powershell_manager import PowerShellManager
+from upgrade_catalog import diff_apps, format_catalog_age, get_shared_catalog
+from upgrade_eta import UpgradeEta
+from upgrade_history import get_shared_history
+from upgrade_scheduler import UpgradeScheduler, DEFAULT_UPGRADE_WORKERS
+from update_pipeline import FullUpdatePipeline
 from gui_constants import (
     MAIN_WINDOW_WIDTH, MAIN_WINDOW_HEIGHT,
     APP_NAME, APP_VERSION, APP_DESCRIPTION,
@@ -21,15 +27,35 @@ from gui_cleanup_dialog import CleanupDialog
 logger = logging.getLogger(__name__)
 
 
+class _PipelineTrack:
+    """Janela de progresso vista por uma trilha do FullUpdatePipeline: a barra vai para report()"""
+
+    def __init__(self, progress_win, report):
+        self.progress_win = progress_win
+        self.report = report
+
+    def update_progress(self, percent, step_text="", desc_text="", log_text=""):
+        self.report(percent, desc_text or step_text)
+        if log_text:
+            self.progress_win.log(log_text)
+
+    def log(self, message):
+        self.progress_win.log(message)
+
+    def set_eta_source(self, source):
+        self.progress_win.set_eta_source(source)
+
+
 class MeninoDeTIHelperGUI:
     """Aplicação principal com interface gráfica"""
     
-    def __init__(self, root):
+    def __init__(self, root, ps_manager: PowerShellManager = None):
         """
         Inicializa a aplicação.
         
         Args:
             root: Janela Tkinter raiz
+            ps_manager: Gerenciador já aquecido pela splash (padrão: cria um novo)
         """
         self.root = root
         self.root.title(f"{APP_NAME} - {APP_DESCRIPTION}")
@@ -39,8 +65,15 @@ class MeninoDeTIHelperGUI:
         # Verificar se é admin
         self.is_admin = is_admin()
         
-        # Inicializar PowerShell manager
-        self.ps_manager = PowerShellManager()
+        # Inicializar PowerShell manager (hosts persistentes evitam o cold start por comando)
+        if ps_manager is None:
+            ps_manager = PowerShellManager(use_session_pool=True, pool_size=DEFAULT_UPGRADE_WORKERS,
+                                           catalog=get_shared_catalog(), history=get_shared_history())
+        self.ps_manager = ps_manager
+        
+        # Métricas da execução em andamento (latência dos comandos, duração das etapas)
+        self.run_metrics = MetricsAggregator()
+        self.ps_manager.event_bus.subscribe(self.run_metrics)
         
         # Estado
         self.is_running = False
@@ -49,6 +82,12 @@ class MeninoDeTIHelperGUI:
         # Configurar UI
         self.setup_ui()
         
+        # Catálogo local: exibido na hora e reconciliado a cada consulta em segundo plano
+        if self.ps_manager.catalog is not None:
+            self._show_catalog_snapshot()
+            self.ps_manager.catalog.add_listener(self._on_catalog_refreshed)
+            self.ps_manager.start_catalog_refresh()
+        
         # Verificar privilégios após UI estar pronta
         self.root.after(100, self.check_admin_privileges)
         
@@ -96,6 +135,15 @@ class MeninoDeTIHelperGUI:
         )
         self.admin_status_label.pack()
         
+        self.catalog_var = tk.StringVar(value="")
+        catalog_label = ttk.Label(
+            self.admin_status_frame,
+            textvariable=self.catalog_var,
+            font=("Arial", 9),
+            foreground="gray"
+        )
+        catalog_label.pack()
+        
         # Frame de informações
         info_frame = ttk.LabelFrame(main_frame, text="ℹ️ Informações", padding="15")
         info_frame.pack(fill=tk.X, pady=10)
@@ -107,7 +155,7 @@ class MeninoDeTIHelperGUI:
             "  - Progresso baseado na quantidade de aplicativos\n\n"
             "• Passo 2: Executa o Windows Update\n"
             "  - Instala automaticamente o módulo PSWindowsUpdate\n"
-            "  - Baixa e instala atualizações do Windows\n"
+            "  - Busca e baixa junto com os aplicativos; instala quando eles terminam\n"
             "  - Progresso traduzido do processo do Windows\n\n"
             "⏱️ O processo completo pode levar de 15 minutos a 1 hora, dependendo da quantidade de atualizações."
         )
@@ -204,6 +252,22 @@ class MeninoDeTIHelperGUI:
                 self.root.quit()
                 sys.exit(0)
                 
+    def _show_catalog_snapshot(self, diff: dict = None):
+        """Mostra o catálogo local de atualizações (thread do Tk)"""
+        snapshot = self.ps_manager.catalog.snapshot()
+        if snapshot is None:
+            self.catalog_var.set("📦 Aplicativos: verificando atualizações...")
+            return
+        apps, age = snapshot
+        text = f"📦 {len(apps)} aplicativo(s) com atualização ({format_catalog_age(age)})"
+        if diff and (diff['added'] or diff['removed']):
+            text += f" - {len(diff['added'])} novo(s), {len(diff['removed'])} removido(s)"
+        self.catalog_var.set(text)
+        
+    def _on_catalog_refreshed(self, apps, diff):
+        """Consulta ao winget concluída (thread da consulta)"""
+        self.root.after(0, self._show_catalog_snapshot, diff)
+        
     def show_admin_help(self):
         """Mostra ajuda sobre como executar como administrador"""
         AdminWarningDialog(self.root)
@@ -243,6 +307,7 @@ class MeninoDeTIHelperGUI:
         
         if result:
             self.is_running = True
+            self.run_metrics.reset()
             self.disable_buttons()
             thread = threading.Thread(target=self._run_full_update, daemon=True)
             thread.start()
@@ -262,6 +327,7 @@ class MeninoDeTIHelperGUI:
         
         if result:
             self.is_running = True
+            self.run_metrics.reset()
             self.disable_buttons()
             thread = threading.Thread(target=self._run_apps_only, daemon=True)
             thread.start()
@@ -283,6 +349,7 @@ class MeninoDeTIHelperGUI:
         
         if result:
             self.is_running = True
+            self.run_metrics.reset()
             self.disable_buttons()
             thread = threading.Thread(target=self._run_windows_only, daemon=True)
             thread.start()
@@ -303,25 +370,38 @@ class MeninoDeTIHelperGUI:
             if not progress_win:
                 raise Exception("Falha ao criar janela de progresso")
             
-            # Passo 1: Aplicativos (0-50%)
+            # Aplicativos em paralelo com a busca/download do Windows Update;
+            # a instalação do Windows Update espera os instaladores dos aplicativos
             progress_win.update_progress(
                 0,
-                "Passo 1 de 2: Atualizando Aplicativos",
-                "Preparando para atualizar aplicativos...",
-                "Iniciando atualização de aplicativos"
+                "Aplicativos e Windows Update",
+                "Preparando atualizações...",
+                "Iniciando aplicativos e busca do Windows Update em paralelo"
             )
             
-            self._update_apps_with_progress(progress_win, 0, 50)
+            def apps_step(report):
+                self._update_apps_with_progress(_PipelineTrack(progress_win, report), 0, 100)
             
-            # Passo 2: Windows Update (50-100%)
-            progress_win.update_progress(
-                50,
-                "Passo 2 de 2: Windows Update",
-                "Preparando Windows Update...",
-                "Iniciando Windows Update"
-            )
+            def on_progress(percent, message):
+                progress_win.update_progress(percent, desc_text=message)
             
-            self._update_windows_with_progress(progress_win, 50, 100)
+            def on_windows_line(line):
+                if line.strip():
+                    progress_win.log(f"[Windows Update] {line}")
+            
+            result = FullUpdatePipeline(self.ps_manager, apps_step, on_progress, on_windows_line).run()
+            
+            for error in (result['apps_error'], result['windows_error']):
+                if error:
+                    raise Exception(error)
+            if result['windows_skipped']:
+                progress_win.log("Windows Update: nenhuma atualização disponível")
+            elif result['windows_success']:
+                progress_win.log("✓ Windows Update concluído")
+            else:
+                progress_win.log("⚠ Windows Update completado com avisos")
+            progress_win.log(f"Tempo total {result['seconds']['total']:.0f}s; download do Windows Update "
+                             f"em paralelo com os aplicativos por {result['overlap_seconds']:.0f}s")
             
             # Concluído
             progress_win.update_progress(
@@ -351,6 +431,7 @@ class MeninoDeTIHelperGUI:
         finally:
             if progress_win:
                 self.root.after(0, progress_win.close)
+            logger.info(f"Métricas da execução: {format_metrics_summary(self.run_metrics.summary())}")
             self.is_running = False
             self.root.after(0, self.enable_buttons)
             self.root.after(0, lambda: self.status_var.set("Pronto para iniciar"))
@@ -402,6 +483,7 @@ class MeninoDeTIHelperGUI:
         finally:
             if progress_win:
                 self.root.after(0, progress_win.close)
+            logger.info(f"Métricas da execução: {format_metrics_summary(self.run_metrics.summary())}")
             self.is_running = False
             self.root.after(0, self.enable_buttons)
             
@@ -452,6 +534,7 @@ class MeninoDeTIHelperGUI:
         finally:
             if progress_win:
                 self.root.after(0, progress_win.close)
+            logger.info(f"Métricas da execução: {format_metrics_summary(self.run_metrics.summary())}")
             self.is_running = False
             self.root.after(0, self.enable_buttons)
             
@@ -479,7 +562,26 @@ class MeninoDeTIHelperGUI:
             desc_text="Identificando aplicativos..."
         )
         
-        apps_to_update = self.ps_manager.list_upgradable_apps()
+        # Catálogo local exibido na hora; consulta o winget só se não estiver recente
+        catalog = self.ps_manager.catalog
+        snapshot = catalog.snapshot() if catalog is not None else None
+        reconcile = snapshot is not None and not catalog.is_fresh()
+        if snapshot is not None:
+            cached_apps, age = snapshot
+            progress_win.log(f"Catálogo local ({format_catalog_age(age)}): {len(cached_apps)} aplicativos")
+            for app in cached_apps:
+                progress_win.log(f"  • {app['name']} {app['version']} → {app['available']}")
+            if reconcile:
+                progress_win.log("Confirmando com o winget...")
+        
+        apps_to_update = self.ps_manager.get_upgradable_apps()
+        
+        if reconcile:
+            diff = diff_apps(cached_apps, apps_to_update)
+            changes = ([f"+{app['name']}" for app in diff['added']] +
+                       [f"-{app['name']}" for app in diff['removed']])
+            progress_win.log(f"Catálogo reconciliado: {', '.join(changes)}" if changes
+                             else "Catálogo confirmado pelo winget")
         
         if not apps_to_update or len(apps_to_update) == 0:
             progress_win.log("Nenhum aplicativo precisa ser atualizado!")
@@ -489,24 +591,39 @@ class MeninoDeTIHelperGUI:
         app_count = len(apps_to_update)
         progress_win.log(f"Encontrados {app_count} aplicativos para atualizar")
         
-        # Atualizar cada aplicativo
-        percent_per_app = (end_percent - start_percent) * 0.9 / app_count
-        
-        for i, app in enumerate(apps_to_update):
-            current_percent = start_percent + (end_percent - start_percent) * 0.1 + (i * percent_per_app)
-            
-            progress_win.log(f"Atualizando: {app['name']}")
-            progress_win.update_progress(
-                current_percent,
-                desc_text=f"Atualizando {app['name']} ({i+1}/{app_count})..."
-            )
-            
-            success = self.ps_manager.update_app_silent(app['id'])
+        # Atualizar aplicativos em paralelo (instalações continuam serializadas);
+        # a barra e o tempo restante seguem a duração esperada de cada app (histórico)
+        base_percent = start_percent + (end_percent - start_percent) * 0.1
+        span = (end_percent - start_percent) * 0.9
+        eta = UpgradeEta(self.ps_manager.history, workers=DEFAULT_UPGRADE_WORKERS)
+        eta.plan(apps_to_update)
+        progress_win.set_eta_source(eta.describe)
+        state = {'percent': base_percent}
+        
+        def on_app_progress(current, total, app_name, success):
+            state['percent'] = base_percent + eta.snapshot()['fraction'] * span
+            if success is None:
+                progress_win.log(f"Atualizando: {app_name}")
+                progress_win.update_progress(
+                    state['percent'],
+                    desc_text=f"Atualizando {app_name} ({current}/{total})..."
+                )
+                return
             
             if success:
-                progress_win.log(f"✓ {app['name']} atualizado")
+                progress_win.log(f"✓ {app_name} atualizado")
             else:
-                progress_win.log(f"✗ Falha ao atualizar {app['name']}")
+                progress_win.log(f"✗ Falha ao atualizar {app_name}")
+            progress_win.update_progress(
+                state['percent'],
+                desc_text=f"{current}/{total} aplicativos processados"
+            )
+        
+        scheduler = UpgradeScheduler(self.ps_manager.update_app_silent, max_workers=DEFAULT_UPGRADE_WORKERS)
+        try:
+            scheduler.run(apps_to_update, eta.track(on_app_progress))
+        finally:
+            progress_win.set_eta_source(None)
         
         progress_win.update_progress(end_percent, desc_text="Aplicativos atualizados!")
         progress_win.log("Todos os aplicativos foram processados")
@@ -545,12 +662,15 @@ class MeninoDeTIHelperGUI:
             progress_win.update_progress(actual_percent, desc_text=message)
             progress_win.log(message)
         
-        success, output = self.ps_manager.run_windows_update_with_progress(progress_callback)
+        def output_callback(line):
+            if line.strip():
+                progress_win.log(line)
+        
+        success, output = self.ps_manager.run_windows_update_with_progress(progress_callback, output_callback)
         
         if success:
             progress_win.log("✓ Windows Update concluído")
         else:
             progress_win.log("⚠ Windows Update completado com avisos")
-            progress_win.log(output[:500])  # Mostrar primeiras linhas do output
         
         progress_win.update_progress(end_percent, desc_text="Windows Update concluído!")
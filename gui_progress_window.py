@@ -1,11 +1,24 @@
 """
 gui_progress_window.py - Janela de progresso com barra 0-100%
+
+As threads de trabalho apenas publicam atualizações numa fila
+(ui_update_queue.py); uma bomba periódica na thread principal aplica as linhas
+de log em lote e só o valor mais recente de progresso e status, mantendo a
+janela responsiva mesmo com milhares de linhas de saída do winget.
+
+O tempo restante (set_eta_source) é consultado pela própria bomba a cada
+PROGRESS_ETA_REFRESH_MS, então continua correndo enquanto um pacote demorado
+não produz eventos de progresso.
 """
+import time
 import tkinter as tk
 from tkinter import ttk
 from datetime import datetime
-from gui_constants import PROGRESS_WINDOW_WIDTH, PROGRESS_WINDOW_HEIGHT, LOG_TIMESTAMP_FORMAT
+from gui_constants import (PROGRESS_WINDOW_WIDTH, PROGRESS_WINDOW_HEIGHT, LOG_TIMESTAMP_FORMAT,
+                           PROGRESS_PUMP_INTERVAL_MS, PROGRESS_PUMP_MAX_LINES, LOG_MAX_LINES,
+                           PROGRESS_ETA_REFRESH_MS)
 from gui_utils import center_window
+from ui_update_queue import UIUpdateQueue
 
 
 class ProgressWindow:
@@ -30,6 +43,7 @@ class ProgressWindow:
         center_window(self.window, PROGRESS_WINDOW_WIDTH, PROGRESS_WINDOW_HEIGHT)
         
         self.setup_ui()
+        self._start_pump()
         
     def setup_ui(self):
         """Configura a interface da janela de progresso"""
@@ -72,7 +86,16 @@ class ProgressWindow:
             textvariable=self.percent_var,
             font=("Arial", 20, "bold")
         )
-        percent_label.pack(pady=10)
+        percent_label.pack(pady=(10, 0))
+        
+        # Tempo restante estimado (vazio sem estimativa)
+        self.eta_var = tk.StringVar(value="")
+        eta_label = ttk.Label(
+            main_frame,
+            textvariable=self.eta_var,
+            font=("Arial", 9)
+        )
+        eta_label.pack(pady=(0, 5))
         
         # Frame de detalhes
         details_frame = ttk.LabelFrame(
@@ -109,6 +132,14 @@ class ProgressWindow:
         )
         status_label.pack(pady=(5, 0))
         
+    def _start_pump(self):
+        """Cria a fila de atualizações e agenda a bomba (thread principal)"""
+        self._updates = UIUpdateQueue(max_lines=LOG_MAX_LINES)
+        self._eta_source = None
+        self._eta_refreshed_at = 0.0
+        self._closed = False
+        self._pump_id = self.window.after(PROGRESS_PUMP_INTERVAL_MS, self._pump)
+        
     def update_progress(self, percent, step_text="", desc_text="", log_text=""):
         """
         Atualiza a barra de progresso de forma thread-safe.
@@ -119,25 +150,14 @@ class ProgressWindow:
             desc_text: Descrição
             log_text: Texto do log
         """
-        # Usar root.after para garantir thread-safety
-        self.parent.after(0, self._update_progress_impl, percent, step_text, desc_text, log_text)
-    
-    def _update_progress_impl(self, percent, step_text, desc_text, log_text):
-        """Implementação interna de atualização (chamada da thread principal)"""
-        try:
-            self.progress_var.set(percent)
-            self.percent_var.set(f"{int(percent)}%")
-            
-            if step_text:
-                self.step_var.set(step_text)
-            if desc_text:
-                self.desc_var.set(desc_text)
-            if log_text:
-                self._log_impl(log_text)
-                
-            self.window.update_idletasks()
-        except Exception as e:
-            print(f"Erro ao atualizar progresso: {e}")
+        # Apenas publica; valores não aplicados são substituídos pelos mais novos
+        self._updates.set_latest('progress', percent)
+        if step_text:
+            self._updates.set_latest('step', step_text)
+        if desc_text:
+            self._updates.set_latest('desc', desc_text)
+        if log_text:
+            self.log(log_text)
         
     def log(self, message):
         """
@@ -146,17 +166,9 @@ class ProgressWindow:
         Args:
             message: Mensagem para adicionar
         """
-        self.parent.after(0, self._log_impl, message)
-    
-    def _log_impl(self, message):
-        """Implementação interna de log (chamada da thread principal)"""
-        try:
-            timestamp = datetime.now().strftime(LOG_TIMESTAMP_FORMAT)
-            self.log_text.insert(tk.END, f"[{timestamp}] {message}\n")
-            self.log_text.see(tk.END)
-            self.window.update_idletasks()
-        except Exception as e:
-            print(f"Erro ao adicionar log: {e}")
+        # Horário de quando a mensagem foi gerada, não de quando foi exibida
+        timestamp = datetime.now().strftime(LOG_TIMESTAMP_FORMAT)
+        self._updates.put_line(f"[{timestamp}] {message}\n")
         
     def set_status(self, status):
         """
@@ -165,19 +177,99 @@ class ProgressWindow:
         Args:
             status: Novo status
         """
-        self.parent.after(0, self._set_status_impl, status)
+        self._updates.set_latest('status', status)
     
-    def _set_status_impl(self, status):
-        """Implementação interna de set_status (chamada da thread principal)"""
+    def set_eta_source(self, source):
+        """
+        Define a função que descreve o tempo restante (ex: UpgradeEta.describe).
+        
+        Args:
+            source: Função sem argumentos que retorna o texto, chamada pela bomba na
+                thread principal (deve ser thread-safe); None apaga o tempo restante
+        """
+        self._eta_source = source
+        self._eta_refreshed_at = 0.0
+        if source is None:
+            self._updates.set_latest('eta', "")
+    
+    def _pump(self):
+        """Aplica as atualizações pendentes em lote (chamada da thread principal)"""
+        try:
+            lines, latest, dropped = self._updates.drain(PROGRESS_PUMP_MAX_LINES)
+            if latest:
+                self._apply_state(latest)
+            if lines or dropped:
+                self._append_log(lines, dropped)
+            self._refresh_eta()
+        except Exception as e:
+            print(f"Erro ao atualizar progresso: {e}")
+        
+        if not self._closed:
+            try:
+                self._pump_id = self.window.after(PROGRESS_PUMP_INTERVAL_MS, self._pump)
+            except tk.TclError:
+                # Janela destruída
+                self._closed = True
+    
+    def _refresh_eta(self):
+        """Consulta o tempo restante no máximo a cada PROGRESS_ETA_REFRESH_MS (thread principal)"""
+        source = self._eta_source
+        now = time.monotonic()
+        if source is None or (now - self._eta_refreshed_at) * 1000 < PROGRESS_ETA_REFRESH_MS:
+            return
+        self._eta_refreshed_at = now
+        self.eta_var.set(source())
+    
+    def _apply_state(self, latest):
+        """Aplica os valores de estado mais recentes (chamada da thread principal)"""
         try:
-            self.status_var.set(status)
-            self.window.update_idletasks()
+            if 'progress' in latest:
+                percent = latest['progress']
+                self.progress_var.set(percent)
+                self.percent_var.set(f"{int(percent)}%")
+            if 'step' in latest:
+                self.step_var.set(latest['step'])
+            if 'desc' in latest:
+                self.desc_var.set(latest['desc'])
+            if 'status' in latest:
+                self.status_var.set(latest['status'])
+            if 'eta' in latest:
+                self.eta_var.set(latest['eta'])
         except Exception as e:
-            print(f"Erro ao atualizar status: {e}")
+            print(f"Erro ao atualizar progresso: {e}")
+    
+    def _append_log(self, lines, dropped=0):
+        """
+        Insere um lote de linhas no log e remove as mais antigas além de
+        LOG_MAX_LINES (chamada da thread principal).
+        
+        Args:
+            lines: Linhas já formatadas (terminadas em \\n)
+            dropped: Linhas descartadas pela fila antes de serem exibidas
+        """
+        try:
+            if dropped:
+                timestamp = datetime.now().strftime(LOG_TIMESTAMP_FORMAT)
+                lines = [f"[{timestamp}] ... {dropped} linhas omitidas ...\n"] + list(lines)
+            self.log_text.insert(tk.END, "".join(lines))
+            
+            # Buffer circular: 'end-1c' fica na linha vazia após o último \n
+            line_count = int(self.log_text.index('end-1c').split('.')[0]) - 1
+            excess = line_count - LOG_MAX_LINES
+            if excess > 0:
+                self.log_text.delete("1.0", f"{excess + 1}.0")
+            
+            self.log_text.see(tk.END)
+        except Exception as e:
+            print(f"Erro ao adicionar log: {e}")
         
     def close(self):
         """Fecha a janela de forma thread-safe"""
         try:
+            self._closed = True
+            if self._pump_id is not None:
+                self.window.after_cancel(self._pump_id)
+                self._pump_id = None
             if self.window and self.window.winfo_exists():
                 self.window.destroy()
         except Exception as e:
@@ -0,0 +1,384 @@
+# -*- coding: utf-8 -*-
+"""
+headless_cli.py - Linha de comando não interativa para execuções agendadas
+
+Executa os mesmos fluxos da interface (PowerShellManager, UpgradeScheduler e
+CleanupManager) sem Tk e sem input(), para uso no Agendador de Tarefas ou em
+ferramentas de gerenciamento de várias máquinas. Cada acontecimento vira uma
+linha JSON em stdout (--format jsonl) ou uma linha de texto; os logs vão
+para stderr.
+
+Uso:
+    python headless_cli.py apps [--workers N] [--app-timeout S] [--exclude ID] [--dry-run]
+    python headless_cli.py windows [--windows-timeout S]
+    python headless_cli.py cleanup [--categories cache,temp,recycle] [--workers N]
+    python headless_cli.py all [...]            (apps, windows e cleanup, nesta ordem)
+    python auto_launcher.py headless <comando> [...]
+
+Antes de 'finish' sai um evento 'metrics' com a latência p50/p95 dos comandos
+PowerShell e a duração de cada etapa (event_bus.MetricsAggregator);
+--events-file grava também os eventos brutos do barramento em JSON Lines.
+Com --instrument, cada comando é medido (início do processo, primeiro byte de
+saída, bytes, código de saída) e um evento 'timing' traz o relatório de
+command_timing.py (que também lê o arquivo de --events-file depois).
+Os comandos winget rodam direto no winget.exe, sem PowerShell; --winget
+aponta outro executável e --winget-via-powershell volta ao caminho antigo.
+
+Códigos de saída:
+    0  Tudo concluído
+    1  Concluído com falhas (algum app, o Windows Update ou a limpeza falhou)
+    2  Argumentos inválidos
+    3  Pré-requisito ausente (winget, PSWindowsUpdate)
+    4  Erro inesperado
+    130  Interrompido (Ctrl+C)
+"""
+import argparse
+import json
+import logging
+import os
+import shlex
+import socket
+import sys
+import threading
+import time
+from typing import List, Optional, TextIO
+
+logger = logging.getLogger(__name__)
+
+EXIT_OK = 0
+EXIT_FAILURES = 1
+EXIT_USAGE = 2
+EXIT_PREREQUISITE = 3
+EXIT_ERROR = 4
+EXIT_INTERRUPTED = 130
+
+COMMANDS = ('apps', 'windows', 'cleanup', 'all')
+CLEANUP_CATEGORIES = ('cache', 'temp', 'recycle')
+
+
+class PrerequisiteError(Exception):
+    """Pré-requisito ausente (sai com EXIT_PREREQUISITE)"""
+
+
+class UsageError(Exception):
+    """Argumento inválido (sai com EXIT_USAGE)"""
+
+
+def parse_categories(text: str) -> List[str]:
+    """
+    Lê a lista de --categories.
+
+    Raises:
+        UsageError: Se alguma categoria não está em CLEANUP_CATEGORIES
+    """
+    categories = [c.strip() for c in text.split(',') if c.strip()]
+    unknown = [c for c in categories if c not in CLEANUP_CATEGORIES]
+    if unknown:
+        raise UsageError(f"Categoria de limpeza desconhecida: {', '.join(unknown)}")
+    return categories
+
+
+class EventWriter:
+    """Escreve eventos como linhas JSON ou texto, seguro entre threads"""
+
+    def __init__(self, stream: TextIO, fmt: str = 'jsonl', command: str = ''):
+        """
+        Args:
+            stream: Saída dos eventos (normalmente sys.stdout)
+            fmt: 'jsonl' ou 'text'
+            command: Comando em execução (incluído em cada evento)
+        """
+        self.stream = stream
+        self.fmt = fmt
+        self.command = command
+        self.host = socket.gethostname()
+        self._lock = threading.Lock()
+
+    def emit(self, event: str, **fields):
+        """Publica um evento (uma linha, com flush imediato)"""
+        record = {'ts': round(time.time(), 3), 'host': self.host, 'command': self.command,
+                  'event': event}
+        record.update(fields)
+        if self.fmt == 'jsonl':
+            line = json.dumps(record, ensure_ascii=False, default=str)
+        else:
+            details = " ".join(f"{key}={value}" for key, value in fields.items())
+            line = f"{time.strftime('%H:%M:%S')} {event} {details}".rstrip()
+        with self._lock:
+            self.stream.write(line + "\n")
+            self.stream.flush()
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog='headless_cli.py',
+        description="Atualizações e limpeza sem interface (execuções agendadas)")
+    parser.add_argument('command', choices=COMMANDS, help="Fluxo a executar")
+    parser.add_argument('--format', choices=('jsonl', 'text'), default='jsonl',
+                        help="Formato dos eventos em stdout (padrão: jsonl)")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Atualizações/exclusões simultâneas")
+    parser.add_argument('--list-timeout', type=int, default=None,
+                        help="Timeout da listagem do winget (s)")
+    parser.add_argument('--app-timeout', type=int, default=None,
+                        help="Timeout por atualização de aplicativo sem histórico (s)")
+    parser.add_argument('--windows-timeout', type=int, default=None,
+                        help="Timeout do Windows Update (s)")
+    parser.add_argument('--exclude', action='append', default=[], metavar='ID',
+                        help="Id de pacote a não atualizar (repetível)")
+    parser.add_argument('--dry-run', action='store_true',
+                        help="Apenas listar os aplicativos, sem atualizar (só com 'apps')")
+    parser.add_argument('--use-catalog', action='store_true',
+                        help="Aceitar o catálogo local recente em vez de consultar o winget")
+    parser.add_argument('--categories', default=','.join(CLEANUP_CATEGORIES),
+                        help="Categorias da limpeza (padrão: cache,temp,recycle)")
+    parser.add_argument('--shell', default=None,
+                        help="Comando do PowerShell (ex: para usar um executável falso)")
+    parser.add_argument('--winget', default=None,
+                        help="Comando do winget executado diretamente (padrão: winget.exe do sistema)")
+    parser.add_argument('--winget-via-powershell', action='store_true',
+                        help="Executar o winget pelo PowerShell em vez de diretamente")
+    parser.add_argument('--events-file', default=None, metavar='ARQUIVO',
+                        help="Grava os eventos do barramento (comandos, etapas) em JSON Lines")
+    parser.add_argument('--instrument', action='store_true',
+                        help="Medir cada comando e publicar o relatório de tempo ('timing')")
+    parser.add_argument('--verbose', action='store_true', help="Logs INFO em stderr")
+    return parser
+
+
+def create_ps_manager(args):
+    """Cria o PowerShellManager com concorrência e timeouts da linha de comando"""
+    from powershell_manager import PowerShellManager
+    from upgrade_catalog import get_shared_catalog
+    from upgrade_history import get_shared_history
+    from upgrade_scheduler import DEFAULT_UPGRADE_WORKERS
+
+    workers = args.workers or DEFAULT_UPGRADE_WORKERS
+    shell_argv = shlex.split(args.shell, posix=os.name != 'nt') if args.shell else None
+    winget_argv = shlex.split(args.winget, posix=os.name != 'nt') if args.winget else None
+    ps_manager = PowerShellManager(shell_argv=shell_argv, use_session_pool=True, pool_size=workers,
+                                   catalog=get_shared_catalog(), history=get_shared_history(),
+                                   instrument_commands=args.instrument,
+                                   winget_argv=winget_argv, direct_winget=not args.winget_via_powershell)
+    if args.list_timeout:
+        ps_manager.list_timeout = args.list_timeout
+    if args.app_timeout:
+        ps_manager.app_upgrade_timeout = args.app_timeout
+    if args.windows_timeout:
+        ps_manager.windows_update_timeout = args.windows_timeout
+    return ps_manager
+
+
+def run_apps(ps_manager, args, events: EventWriter) -> bool:
+    """
+    Lista e atualiza os aplicativos.
+
+    Returns:
+        True se nenhum aplicativo falhou
+
+    Raises:
+        PrerequisiteError: winget ausente
+    """
+    from upgrade_scheduler import DEFAULT_UPGRADE_WORKERS, UpgradeScheduler
+
+    is_installed, message = ps_manager.install_winget_if_needed()
+    if not is_installed:
+        raise PrerequisiteError(message)
+
+    start = time.perf_counter()
+    with ps_manager.event_bus.phase('list_upgradable'):
+        apps = ps_manager.get_upgradable_apps() if args.use_catalog else ps_manager.list_upgradable_apps()
+    excluded = {app_id.lower() for app_id in args.exclude}
+    skipped = [app['id'] for app in apps if app['id'].lower() in excluded]
+    apps = [app for app in apps if app['id'].lower() not in excluded]
+    events.emit('apps_listed', count=len(apps), skipped=skipped,
+                apps=[{'id': app['id'], 'version': app['version'], 'available': app['available']}
+                      for app in apps],
+                seconds=round(time.perf_counter() - start, 3))
+
+    if args.dry_run or not apps:
+        events.emit('apps_done', successful=0, failed=0, failed_ids=[], dry_run=args.dry_run,
+                    seconds=round(time.perf_counter() - start, 3))
+        return True
+
+    names = {app['id']: app['name'] for app in apps}
+
+    def upgrade(app_id: str) -> bool:
+        events.emit('app_started', id=app_id, name=names.get(app_id, app_id))
+        app_start = time.perf_counter()
+        success = ps_manager.update_app_silent(app_id)
+        events.emit('app_finished', id=app_id, success=success,
+                    seconds=round(time.perf_counter() - app_start, 3))
+        return success
+
+    scheduler = UpgradeScheduler(upgrade, max_workers=args.workers or DEFAULT_UPGRADE_WORKERS)
+    with ps_manager.event_bus.phase('upgrade_apps', apps=len(apps)):
+        successful, failed, failed_apps = scheduler.run(apps)
+    events.emit('apps_done', successful=successful, failed=failed,
+                failed_ids=[app['id'] for app in failed_apps], dry_run=False,
+                seconds=round(time.perf_counter() - start, 3))
+    return failed == 0
+
+
+def run_windows(ps_manager, args, events: EventWriter) -> bool:
+    """
+    Executa o Windows Update com eventos por KB.
+
+    Returns:
+        True se o Windows Update terminou sem erro
+
+    Raises:
+        PrerequisiteError: módulo PSWindowsUpdate não pôde ser instalado
+    """
+    start = time.perf_counter()
+    module_ok, message = ps_manager.install_pswindowsupdate_module()
+    if not module_ok:
+        raise PrerequisiteError(message)
+
+    success, _ = ps_manager.run_windows_update_with_progress(
+        event_callback=lambda event: events.emit('windows_update', **event))
+    events.emit('windows_done', success=success, seconds=round(time.perf_counter() - start, 3))
+    return success
+
+
+def run_cleanup(args, events: EventWriter) -> bool:
+    """
+    Limpa as categorias escolhidas.
+
+    Arquivos em uso (comuns em Temp) são contados em 'locked' e não contam
+    como falha; só um erro ao limpar uma pasta inteira ou ao esvaziar a
+    lixeira conta.
+
+    Returns:
+        True se a limpeza terminou sem falhas
+    """
+    from cleanup_manager import DEFAULT_CLEANUP_WORKERS, CleanupManager
+
+    categories = parse_categories(args.categories)
+
+    def on_progress(message, progress):
+        events.emit('cleanup_progress', percent=progress, message=message)
+
+    start = time.perf_counter()
+    manager = CleanupManager(on_progress, args.workers or DEFAULT_CLEANUP_WORKERS)
+    plan = manager.get_cleanup_plan(c for c in categories if c != 'recycle')
+    files = freed = 0
+    errors = []
+    for category, clean in (('cache', manager.clean_cache), ('temp', manager.clean_temp_files)):
+        if category in plan:
+            result = clean(plan[category])
+            files += result['files_deleted']
+            freed += result['bytes_freed']
+            errors.extend(result['errors'])
+    recycle_ok = True
+    if 'recycle' in categories:
+        result = manager.empty_recycle_bin()
+        freed += result['size_freed']
+        recycle_ok = result['success']
+        if not recycle_ok:
+            errors.append(result['message'])
+    events.emit('cleanup_done', files=files, bytes=freed, locked=len(manager.errors),
+                errors=errors, seconds=round(time.perf_counter() - start, 3))
+    return recycle_ok and not errors
+
+
+def main(argv: Optional[List[str]] = None, stream: TextIO = None) -> int:
+    """
+    Executa um comando da linha de comando.
+
+    Args:
+        argv: Argumentos (padrão: sys.argv[1:])
+        stream: Saída dos eventos (padrão: sys.stdout)
+
+    Returns:
+        Código de saída (EXIT_*)
+    """
+    parser = build_parser()
+    try:
+        args = parser.parse_args(argv)
+        # Antes de qualquer etapa: um erro de digitação não pode custar as atualizações
+        if args.command in ('cleanup', 'all'):
+            try:
+                parse_categories(args.categories)
+            except UsageError as e:
+                parser.error(str(e))
+        # Windows Update e limpeza não têm simulação: '--dry-run' neles mudaria a máquina
+        if args.dry_run and args.command != 'apps':
+            parser.error(f"--dry-run só vale para 'apps' (não para '{args.command}')")
+    except SystemExit as e:
+        return EXIT_OK if e.code == 0 else EXIT_USAGE
+    if args.workers is not None and args.workers < 1:
+        parser.print_usage(sys.stderr)
+        return EXIT_USAGE
+
+    # Logs só em stderr: stdout fica reservado aos eventos
+    level = logging.INFO if args.verbose else logging.WARNING
+    logging.basicConfig(level=level, stream=sys.stderr,
+                        format='%(asctime)s - %(levelname)s - %(message)s')
+    logging.getLogger().setLevel(level)
+    events = EventWriter(stream or sys.stdout, args.format, args.command)
+    steps = ['apps', 'windows', 'cleanup'] if args.command == 'all' else [args.command]
+    events.emit('start', steps=steps, pid=os.getpid())
+
+    from event_bus import JsonLinesSink, MetricsAggregator, get_shared_bus
+    bus = get_shared_bus()
+    metrics = MetricsAggregator()
+    bus.subscribe(metrics)
+    sink = None
+    timing = None
+    if args.instrument:
+        from command_timing import CommandTimingCollector
+        timing = CommandTimingCollector()
+        bus.subscribe(timing)
+
+    start = time.perf_counter()
+    ps_manager = None
+    exit_code = EXIT_OK
+    try:
+        if args.events_file:
+            sink = JsonLinesSink(args.events_file)
+            bus.subscribe(sink)
+        if 'apps' in steps or 'windows' in steps:
+            ps_manager = create_ps_manager(args)
+        for step in steps:
+            with bus.phase(step):
+                if step == 'apps':
+                    ok = run_apps(ps_manager, args, events)
+                elif step == 'windows':
+                    ok = run_windows(ps_manager, args, events)
+                else:
+                    ok = run_cleanup(args, events)
+            if not ok:
+                exit_code = EXIT_FAILURES
+    except PrerequisiteError as e:
+        events.emit('error', kind='prerequisite', message=str(e))
+        exit_code = EXIT_PREREQUISITE
+    except KeyboardInterrupt:
+        events.emit('error', kind='interrupted', message="Interrompido")
+        exit_code = EXIT_INTERRUPTED
+    except UsageError as e:
+        events.emit('error', kind='usage', message=str(e))
+        exit_code = EXIT_USAGE
+    except Exception as e:
+        logger.error(f"Erro inesperado: {e}", exc_info=True)
+        events.emit('error', kind='unexpected', message=str(e))
+        exit_code = EXIT_ERROR
+    finally:
+        if ps_manager is not None:
+            ps_manager.close()
+        bus.unsubscribe(metrics)
+        if timing is not None:
+            bus.unsubscribe(timing)
+        if sink is not None:
+            bus.unsubscribe(sink)
+            sink.close()
+
+    if timing is not None:
+        events.emit('timing', **timing.report())
+    events.emit('metrics', **metrics.summary())
+    events.emit('finish', exit_code=exit_code, seconds=round(time.perf_counter() - start, 3))
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
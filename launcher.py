@@ -131,6 +131,10 @@ def launch_gui_mode():
     import tkinter as tk
     from gui_main_window import MeninoDeTIHelperGUI
     from splash_screen import SplashScreen
+    from startup_tasks import start_gui_startup
+    
+    # Aquecimento real (sessão PowerShell, pré-requisitos, catálogo, índice)
+    ps_manager, startup = start_gui_startup()
     
     # Criar janela principal (mas não exibir ainda)
     root = tk.Tk()
@@ -138,12 +142,12 @@ def launch_gui_mode():
     
     # Mostrar splash screen
     image_path = os.path.join(os.path.dirname(__file__), 'img', 'loading.png')
-    splash = SplashScreen(root, image_path=image_path, duration=3.0)
+    splash = SplashScreen(root, image_path=image_path, startup=startup)
     
-    # Quando splash terminar, mostrar aplicação principal
+    # Quando as tarefas críticas terminarem, mostrar aplicação principal
     def show_main_window():
         root.deiconify()
-        app = MeninoDeTIHelperGUI(root)
+        app = MeninoDeTIHelperGUI(root, ps_manager=ps_manager)
     
     splash.set_complete_callback(show_main_window)
     root.mainloop()
@@ -4,10 +4,15 @@ main.py - Ponto de entrada principal da aplicação Menino de TI Helper
 Este arquivo inicializa e executa a aplicação com a nova arquitetura modular.
 """
 import tkinter as tk
+from tkinter import ttk, messagebox
 import logging
 import sys
+import time
 from datetime import datetime
 from gui_main_window import MeninoDeTIHelperGUI
+from gui_constants import SPLASH_MAX_WAIT_MS, SPLASH_POLL_INTERVAL_MS
+from startup_tasks import StartupTaskGraph, start_gui_startup
+from update_pipeline import FullUpdatePipeline
 from gui_utils import center_window
 from gui_constants import MAIN_WINDOW_WIDTH, MAIN_WINDOW_HEIGHT
 
@@ -26,14 +31,17 @@ logger = logging.getLogger(__name__)
 class MeninoDeTIHelper:
     """Main application class for Menino de TI Helper"""
     
-    def __init__(self, root):
+    def __init__(self, root, ps_manager=None):
         self.root = root
         self.root.title("Menino de TI Helper")
         self.root.geometry("800x600")
         self.root.resizable(True, True)
         
-        # Initialize PowerShell manager
-        self.ps_manager = PowerShellManager()
+        # Initialize PowerShell manager (already warmed up by the splash when given)
+        if ps_manager is None:
+            from powershell_manager import PowerShellManager
+            ps_manager = PowerShellManager()
+        self.ps_manager = ps_manager
         
         # Track if updates are running
         self.is_running = False
@@ -265,15 +273,23 @@ class MeninoDeTIHelper:
             self.log_output("INICIANDO ATUALIZAÇÃO COMPLETA")
             self.log_output("="*60)
             
-            # Step 1: Update apps
-            self.update_progress("1/2 - Atualizando aplicativos...")
-            self.update_status("Atualizando aplicativos com winget...")
-            self._run_apps_update_impl()
+            # Aplicativos em paralelo com a busca/download do Windows Update;
+            # a instalação do Windows Update espera os instaladores dos aplicativos
+            self.update_progress("Aplicativos + busca do Windows Update...")
+            self.update_status("Atualizando aplicativos e baixando atualizações do Windows...")
             
-            # Step 2: Update Windows
-            self.update_progress("2/2 - Atualizando Windows...")
-            self.update_status("Executando Windows Update...")
-            self._run_windows_update_impl()
+            def on_progress(percent, message):
+                self.update_progress(f"{percent:.0f}% - {message}")
+            
+            pipeline = FullUpdatePipeline(self.ps_manager, lambda report: self._run_apps_update_impl(),
+                                          on_progress, self._log_stream_line)
+            result = pipeline.run()
+            for error in (result['apps_error'], result['windows_error']):
+                if error:
+                    raise Exception(error)
+            self._log_windows_update_result(result['windows_success'], result['windows_output'])
+            self.log_output(f"Download do Windows Update em paralelo com os aplicativos por "
+                            f"{result['overlap_seconds']:.0f}s (total {result['seconds']['total']:.0f}s)")
             
             self.log_output("="*60)
             self.log_output("ATUALIZAÇÃO COMPLETA FINALIZADA")
@@ -353,6 +369,11 @@ class MeninoDeTIHelper:
             self.is_running = False
             self.set_buttons_state(tk.NORMAL)
     
+    def _log_stream_line(self, line: str):
+        """Log a line of streamed command output, skipping blank lines"""
+        if line.strip():
+            self.log_output(line)
+    
     def _run_apps_update_impl(self):
         """Implementation of apps update"""
         self.log_output("Verificando winget...")
@@ -365,13 +386,8 @@ class MeninoDeTIHelper:
         self.log_output("Iniciando atualização de aplicativos com winget...")
         self.log_output("Isso pode levar vários minutos dependendo da quantidade de atualizações...")
         
-        success, output = self.ps_manager.update_all_apps_with_winget()
-        
-        # Display output
-        if output:
-            for line in output.split('\n'):
-                if line.strip():
-                    self.log_output(line)
+        # Saída exibida ao vivo, linha a linha, enquanto o comando executa
+        success, output = self.ps_manager.update_all_apps_with_winget(output_callback=self._log_stream_line)
         
         if success:
             self.log_output("✓ Aplicativos atualizados com sucesso!")
@@ -394,14 +410,12 @@ class MeninoDeTIHelper:
         self.log_output("Isso pode levar muito tempo dependendo das atualizações disponíveis...")
         self.log_output("Por favor, seja paciente...")
         
-        success, output = self.ps_manager.run_windows_update()
-        
-        # Display output
-        if output:
-            for line in output.split('\n'):
-                if line.strip():
-                    self.log_output(line)
-        
+        # Saída exibida ao vivo, linha a linha, enquanto o comando executa
+        success, output = self.ps_manager.run_windows_update(output_callback=self._log_stream_line)
+        self._log_windows_update_result(success, output)
+    
+    def _log_windows_update_result(self, success: bool, output: str):
+        """Log the outcome of a Windows Update run"""
         if success or "No updates available" in output or "não há atualizações" in output.lower():
             self.log_output("✓ Windows Update concluído!")
         else:
@@ -409,8 +423,14 @@ class MeninoDeTIHelper:
             self.log_output("Verifique o log acima para mais detalhes", "WARNING")
 
 
-def show_splash_screen():
-    """Show splash screen on startup"""
+def show_splash_screen(startup: StartupTaskGraph = None):
+    """
+    Show splash screen on startup
+    
+    Args:
+        startup: Started startup graph; the splash closes as soon as its
+            critical tasks finish (None = close immediately)
+    """
     splash = tk.Tk()
     splash.title("Menino de TI Helper")
     splash.geometry("400x300")
@@ -461,10 +481,9 @@ def show_splash_screen():
     )
     loading.pack(pady=20)
     
-    # Progress bar
-    progress = ttk.Progressbar(frame, mode='indeterminate', length=300)
+    # Progress bar (real completion of the critical startup tasks)
+    progress = ttk.Progressbar(frame, mode='determinate', maximum=100, length=300)
     progress.pack(pady=10)
-    progress.start(10)
     
     # Info
     info = ttk.Label(
@@ -475,16 +494,27 @@ def show_splash_screen():
     )
     info.pack(side=tk.BOTTOM, pady=10)
     
-    # Close splash after 3 seconds
-    splash.after(3000, splash.destroy)
+    # Close splash when the critical tasks finish (or after the safety limit)
+    deadline = time.monotonic() + SPLASH_MAX_WAIT_MS / 1000.0
+    
+    def poll():
+        if startup is None or startup.critical_done or time.monotonic() > deadline:
+            splash.destroy()
+            return
+        progress['value'] = startup.progress()
+        loading.config(text=startup.current_label() or "Carregando...")
+        splash.after(SPLASH_POLL_INTERVAL_MS, poll)
+    
+    splash.after(0, poll)
     splash.mainloop()
 
 
 def main():
     """Main entry point"""
     try:
-        # Show splash screen
-        show_splash_screen()
+        # Warm up (PowerShell session, prerequisites, app pre-listing) behind the splash
+        ps_manager, startup = start_gui_startup()
+        show_splash_screen(startup)
         
         # Create main application
         root = tk.Tk()
@@ -495,7 +525,7 @@ def main():
         y = (root.winfo_screenheight() // 2) - (600 // 2)
         root.geometry(f"800x600+{x}+{y}")
         
-        app = MeninoDeTIHelper(root)
+        app = MeninoDeTIHelper(root, ps_manager=ps_manager)
         
         # Run the application
         root.mainloop()
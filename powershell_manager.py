@@ -2,9 +2,32 @@
 PowerShell Integration Module
 Handles execution of PowerShell commands from Python
 """
+import glob
+import itertools
+import json
+import os
+import shutil
 import subprocess
 import logging
-from typing import Tuple, Optional
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, List, Tuple, Optional
+from command_stream import DEFAULT_TAIL_LINES, CommandStream
+from event_bus import (EVENT_APP_UPGRADE, EVENT_COMMAND_FINISHED, EVENT_COMMAND_STARTED,
+                       EventBus, get_shared_bus)
+from powershell_session import DEFAULT_POWERSHELL_ARGV, PowerShellSessionPool
+from prereq_cache import PrerequisiteCache, get_shared_cache
+from process_activity import HangWatch, kill_process_tree
+from upgrade_catalog import UpgradeCatalog
+from upgrade_eta import UpgradeEta
+from upgrade_history import UpgradeHistory
+from upgrade_scheduler import DEFAULT_UPGRADE_WORKERS, UpgradeScheduler
+from upgrade_timeouts import HUNG_OUTCOME, TIMEOUT_OUTCOME, UpgradeTimeouts
+from upgrade_transcript import UpgradeTranscript
+from winget_parser import parse_upgrade_table
+from windows_update_progress import WindowsUpdateProgressParser
 
 # Configure logging
 logging.basicConfig(
@@ -13,17 +36,193 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Timeouts padrão (segundos); ajustáveis por instância (ex: headless_cli.py)
+LIST_TIMEOUT = 120
+# Por pacote sem histórico; com histórico, ver upgrade_timeouts.py
+APP_UPGRADE_TIMEOUT = 600
+WINDOWS_UPDATE_TIMEOUT = 3600
+
+
+# Métodos que só repassam o comando (o chamador medido é quem os chamou)
+_COMMAND_PLUMBING = frozenset({'execute_command', 'execute_command_streaming', 'stream_command',
+                               'execute_winget', 'execute_winget_streaming', '_execute_stream',
+                               '__enter__', '_command_events'})
+
+# Caminho do winget.exe encontrado (só resultados positivos são guardados)
+_winget_path = None
+
+
+def find_winget_executable() -> Optional[str]:
+    """
+    Localiza o winget.exe uma vez por processo
+    
+    Procura no PATH e, como o alias de execução do App Installer nem sempre
+    está no PATH (ex: elevado como outro usuário), também em
+    %LOCALAPPDATA%\\Microsoft\\WindowsApps e na pasta do pacote do App Installer.
+    
+    Returns:
+        Caminho do executável, ou None se o winget não foi encontrado
+    """
+    global _winget_path
+    if _winget_path is not None:
+        return _winget_path
+    
+    candidates = [shutil.which('winget')]
+    if sys.platform == 'win32':
+        local_app_data = os.environ.get('LOCALAPPDATA')
+        if local_app_data:
+            candidates.append(os.path.join(local_app_data, 'Microsoft', 'WindowsApps', 'winget.exe'))
+        program_files = os.environ.get('ProgramFiles', r'C:\Program Files')
+        candidates += sorted(glob.glob(os.path.join(
+            program_files, 'WindowsApps', 'Microsoft.DesktopAppInstaller_*_x64__*', 'winget.exe')), reverse=True)
+    
+    for candidate in candidates:
+        if candidate and os.path.isfile(candidate):
+            _winget_path = candidate
+            logger.info(f"winget found at {candidate}")
+            return candidate
+    return None
+
+
+def _find_caller(manager, max_depth: int = 10) -> str:
+    """
+    Nome do método do PowerShellManager que executou o comando (ex: 'update_app_silent')
+
+    Só contam métodos do próprio manager: o catálogo chama _query_upgradable_apps
+    a partir de UpgradeCatalog.refresh, que não deve virar o chamador. Métodos
+    públicos têm preferência; funções aninhadas (ex: o probe de get_or_probe)
+    são puladas, reconhecidas por não serem o código do método de mesmo nome
+    da classe. Sem método do manager na pilha (chamada direta a
+    execute_command), vale a função externa que chamou.
+    """
+    frame = sys._getframe(2)
+    manager_class = type(manager)
+    private = None
+    external = None
+    for _ in range(max_depth):
+        if frame is None:
+            break
+        code = frame.f_code
+        name = code.co_name
+        if name not in _COMMAND_PLUMBING:
+            if frame.f_locals.get('self') is manager:
+                if getattr(getattr(manager_class, name, None), '__code__', None) is code:
+                    if not name.startswith('_'):
+                        return name
+                    private = private or name
+            else:
+                external = external or name
+        frame = frame.f_back
+    return private or external or '?'
+
+
+def _elapsed(start: float, mark: Optional[float]) -> Optional[float]:
+    return round(mark - start, 3) if mark is not None else None
+
 
 class PowerShellManager:
     """Manages PowerShell command execution"""
     
-    def __init__(self):
+    # Listagem de atualizações: uma única consulta ao catálogo por chamada
+    WINGET_LIST_ARGS = ['upgrade', '--accept-source-agreements']
+    WINGET_LIST_COMMAND = "winget " + " ".join(WINGET_LIST_ARGS)
+    WINGET_UPGRADE_ARGS = ['--silent', '--accept-source-agreements', '--accept-package-agreements']
+    WINDOWS_UPDATE_INSTALL_COMMAND = """
+    Import-Module PSWindowsUpdate
+    Get-WindowsUpdate -AcceptAll -Install -AutoReboot:$false -Verbose
+    """
+    # Só busca e baixa; a instalação depois reaproveita o download
+    WINDOWS_UPDATE_DOWNLOAD_COMMAND = """
+    Import-Module PSWindowsUpdate
+    Get-WindowsUpdate -AcceptAll -Download -Verbose
+    """
+    WINGET_CLIENT_LIST_COMMAND = """
+    Import-Module Microsoft.WinGet.Client
+    $packages = @(Get-WinGetPackage | Where-Object { $_.IsUpdateAvailable } | ForEach-Object {
+        [PSCustomObject]@{
+            Name = $_.Name
+            Id = $_.Id
+            Version = $_.InstalledVersion
+            Available = @($_.AvailableVersions)[0]
+        }
+    })
+    ConvertTo-Json -InputObject $packages -Depth 3
+    """
+    
+    def __init__(self, shell_argv: Optional[List[str]] = None, use_session_pool: bool = False,
+                 pool_size: int = 2, prereq_cache: Optional[PrerequisiteCache] = None,
+                 catalog: Optional[UpgradeCatalog] = None, event_bus: Optional[EventBus] = None,
+                 instrument_commands: bool = False, winget_argv: Optional[List[str]] = None,
+                 direct_winget: bool = True, history: Optional[UpgradeHistory] = None,
+                 upgrade_timeouts: Optional[UpgradeTimeouts] = None):
+        """
+        Args:
+            shell_argv: Comando base do PowerShell (padrão: powershell -NoProfile -ExecutionPolicy Bypass)
+            use_session_pool: Reutilizar hosts PowerShell persistentes em vez de um processo por comando
+            pool_size: Número máximo de hosts persistentes
+            prereq_cache: Cache de pré-requisitos (padrão: cache compartilhado do processo)
+            catalog: Catálogo local de atualizações (None = sempre consultar o winget)
+            event_bus: Barramento de eventos (padrão: barramento compartilhado do processo)
+            instrument_commands: Medir cada comando (início do processo, primeiro byte de
+                saída, bytes, código de saída, método chamador) em command_finished;
+                relatório em command_timing.py
+            winget_argv: Comando do winget executado diretamente (padrão: winget.exe
+                encontrado por find_winget_executable)
+            direct_winget: Executar o winget sem passar pelo PowerShell (argv e pipes
+                em bytes, sem um host PowerShell por comando). Com shell_argv próprio e
+                sem winget_argv, o winget continua indo pelo shell informado.
+            history: Histórico de tentativas de atualização por pacote (None = não registrar)
+            upgrade_timeouts: Tempo limite e de inatividade de cada atualização (padrão:
+                UpgradeTimeouts derivado de history; app_upgrade_timeout vale para
+                pacotes sem histórico)
+        """
         self.encoding = 'utf-8'
+        self.shell_argv = list(shell_argv) if shell_argv else list(DEFAULT_POWERSHELL_ARGV)
+        self.session_pool = None
+        self.winget_client_available = None
+        self.prereq_cache = prereq_cache if prereq_cache is not None else get_shared_cache()
+        self.catalog = catalog
+        self.history = history
+        self.upgrade_timeouts = upgrade_timeouts if upgrade_timeouts is not None else UpgradeTimeouts(history)
+        self._listed_versions = {}
+        self.list_timeout = LIST_TIMEOUT
+        self.app_upgrade_timeout = APP_UPGRADE_TIMEOUT
+        self.windows_update_timeout = WINDOWS_UPDATE_TIMEOUT
+        self.event_bus = event_bus if event_bus is not None else get_shared_bus()
+        self._command_ids = itertools.count(1)
+        self.instrument_commands = instrument_commands
+        self.direct_winget = direct_winget
+        self.winget_argv = list(winget_argv) if winget_argv else None
+        self._resolve_winget_path = shell_argv is None and winget_argv is None
+        
+        if use_session_pool:
+            self.enable_session_pool(pool_size)
+    
+    def enable_session_pool(self, pool_size: int = 2, warm_up: bool = False):
+        """
+        Ativa o modo de sessão persistente para execute_command
+        
+        Args:
+            pool_size: Número máximo de hosts persistentes
+            warm_up: Iniciar um host imediatamente para esconder o cold start
+        """
+        if self.session_pool is None:
+            self.session_pool = PowerShellSessionPool(pool_size, self.shell_argv)
+        if warm_up:
+            self.session_pool.warm_up(1)
+    
+    def close(self):
+        """Encerra os hosts PowerShell persistentes, se houver"""
+        if self.session_pool is not None:
+            self.session_pool.close()
+            self.session_pool = None
         
     def execute_command(self, command: str, timeout: int = 300) -> Tuple[bool, str, str]:
         """
         Execute a PowerShell command
         
+        Publica command_started/command_finished (com a duração) no barramento de eventos.
+        
         Args:
             command: PowerShell command to execute
             timeout: Maximum time to wait for command completion (seconds)
@@ -31,13 +230,69 @@ class PowerShellManager:
         Returns:
             Tuple of (success: bool, stdout: str, stderr: str)
         """
+        kind = 'session' if self.session_pool is not None else 'process'
+        with self._command_events(command, kind) as outcome:
+            success, stdout, stderr = self._run_command(command, timeout, outcome.get('timing'))
+            outcome['success'] = success
+            outcome['output_bytes'] = len(stdout.encode('utf-8')) if 'timing' in outcome else 0
+        return success, stdout, stderr
+    
+    @contextmanager
+    def _command_events(self, command: str, kind: str):
+        """
+        Publica o início e o fim de um comando; o bloco preenche outcome['success']
+        
+        Com instrument_commands, o bloco recebe também outcome['timing'] para as
+        marcações de tempo (perf_counter) e outcome['output_bytes'], publicados
+        em command_finished como durações relativas ao início do comando.
+        """
+        command_id = next(self._command_ids)
+        self.event_bus.emit(EVENT_COMMAND_STARTED, id=command_id, kind=kind, command=command.strip()[:100])
+        outcome = {'success': False}
+        if self.instrument_commands:
+            outcome['timing'] = {}
+            caller = _find_caller(self)
+        start = time.perf_counter()
+        try:
+            yield outcome
+        finally:
+            finished_at = time.perf_counter()
+            fields = {}
+            if self.instrument_commands:
+                timing = outcome['timing']
+                fields = {
+                    'caller': caller,
+                    'command': command.strip()[:100],
+                    'spawn_seconds': _elapsed(start, timing.get('spawned_at')),
+                    'first_output_seconds': _elapsed(start, timing.get('first_output_at')),
+                    'output_bytes': outcome.get('output_bytes', 0),
+                    'exit_code': timing.get('exit_code'),
+                    'cold_start': timing.get('cold_start', kind != 'session'),
+                }
+            self.event_bus.emit(EVENT_COMMAND_FINISHED, id=command_id, kind=kind,
+                                success=outcome['success'], seconds=round(finished_at - start, 3), **fields)
+    
+    def _run_command(self, command: str, timeout: int,
+                     timing: Optional[dict] = None) -> Tuple[bool, str, str]:
+        """Executa o comando na sessão persistente ou num processo novo (ver execute_command)"""
         try:
             logger.info(f"Executing PowerShell command: {command[:100]}...")
             
+            if self.session_pool is not None:
+                success, stdout, stderr = self.session_pool.execute(command, timeout, timing)
+                if success:
+                    logger.info("Command executed successfully")
+                else:
+                    logger.error(f"Command failed in PowerShell session: {stderr[:200]}")
+                return success, stdout, stderr
+            
+            if timing is not None:
+                return self._run_process_timed(self.shell_argv + ['-Command', command], timeout, timing)
+            
             # Tentar com UTF-8 primeiro
             try:
                 process = subprocess.Popen(
-                    ['powershell', '-NoProfile', '-ExecutionPolicy', 'Bypass', '-Command', command],
+                    self.shell_argv + ['-Command', command],
                     stdout=subprocess.PIPE,
                     stderr=subprocess.PIPE,
                     text=True,
@@ -50,7 +305,7 @@ class PowerShellManager:
                 # Fallback para CP1252 (Windows Latin-1)
                 logger.warning("UTF-8 decode failed, trying CP1252")
                 process = subprocess.Popen(
-                    ['powershell', '-NoProfile', '-ExecutionPolicy', 'Bypass', '-Command', command],
+                    self.shell_argv + ['-Command', command],
                     stdout=subprocess.PIPE,
                     stderr=subprocess.PIPE,
                     text=True,
@@ -82,6 +337,242 @@ class PowerShellManager:
             logger.error(f"Error executing command: {str(e)}")
             return False, "", str(e)
     
+    def _run_process_timed(self, argv: List[str], timeout: int, timing: dict,
+                           on_line: Optional[Callable[[str], None]] = None,
+                           idle_timeout: Optional[float] = None) -> Tuple[bool, str, str]:
+        """
+        Executa argv num processo novo marcando o início e o primeiro byte de saída
+        
+        Lê os pipes em bytes por threads (communicate() só devolve a saída no fim);
+        on_line, se informado, recebe cada linha completa de stdout assim que chega.
+        Com idle_timeout, o processo e seus descendentes são encerrados após
+        idle_timeout segundos sem saída e sem CPU (timing['stopped'] = 'hung');
+        ao estourar timeout, timing['stopped'] = 'timeout'.
+        """
+        process = subprocess.Popen(argv, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        timing['spawned_at'] = time.perf_counter()
+        chunks = {'stdout': [], 'stderr': []}
+        watch = HangWatch(process.pid, idle_timeout) if idle_timeout else None
+        
+        def read(pipe, name):
+            read_chunk = getattr(pipe, 'read1', pipe.read)
+            pending = b''
+            for chunk in iter(lambda: read_chunk(65536), b''):
+                if name == 'stdout' and not chunks['stdout']:
+                    timing['first_output_at'] = time.perf_counter()
+                if watch is not None:
+                    watch.output(chunk)
+                chunks[name].append(chunk)
+                if name == 'stdout' and on_line is not None:
+                    *lines, pending = (pending + chunk).split(b'\n')
+                    for line in lines:
+                        on_line(line.decode('utf-8', errors='replace').rstrip('\r'))
+            if pending and on_line is not None:
+                on_line(pending.decode('utf-8', errors='replace').rstrip('\r'))
+        
+        readers = [threading.Thread(target=read, args=(process.stdout, 'stdout'), daemon=True),
+                   threading.Thread(target=read, args=(process.stderr, 'stderr'), daemon=True)]
+        for reader in readers:
+            reader.start()
+        try:
+            stopped = self._wait_process(process, timeout, watch)
+            if stopped is not None:
+                timing['stopped'] = stopped
+                if stopped == 'hung':
+                    logger.error(f"Command hung (no output or CPU for {idle_timeout} seconds), killing it")
+                    return False, "", f"Command hung (no output or activity for {idle_timeout} seconds)"
+                logger.error(f"Command timed out after {timeout} seconds")
+                return False, "", "Command timed out"
+        finally:
+            for reader in readers:
+                reader.join(timeout=5)
+        
+        timing['exit_code'] = process.returncode
+        stdout = b''.join(chunks['stdout']).decode('utf-8', errors='replace')
+        stderr = b''.join(chunks['stderr']).decode('utf-8', errors='replace')
+        if process.returncode == 0:
+            logger.info("Command executed successfully")
+        else:
+            logger.error(f"Command failed with return code {process.returncode}")
+        return process.returncode == 0, stdout, stderr
+    
+    @staticmethod
+    def _wait_process(process: subprocess.Popen, timeout: float,
+                      watch: Optional[HangWatch] = None) -> Optional[str]:
+        """
+        Espera o processo terminar, encerrando a árvore dele se travar ou estourar o tempo
+        
+        Returns:
+            None se terminou; 'timeout' ou 'hung' se foi encerrado
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            try:
+                process.wait(timeout=max(0.0, min(remaining, watch.poll_seconds)) if watch else max(0.0, remaining))
+                return None
+            except subprocess.TimeoutExpired:
+                pass
+            if time.monotonic() >= deadline:
+                stopped = 'timeout'
+            elif watch is not None and watch.hung():
+                stopped = 'hung'
+            else:
+                continue
+            kill_process_tree(process)
+            return stopped
+    
+    def stream_command(self, command: str, timeout: int = 300,
+                       tail_lines: int = DEFAULT_TAIL_LINES) -> CommandStream:
+        """
+        Inicia um comando PowerShell cuja saída pode ser iterada linha a linha
+        
+        Comandos longos sempre usam um processo próprio (nunca o pool de sessões),
+        para não prender um host persistente por dezenas de minutos.
+        
+        Args:
+            command: PowerShell command to execute
+            timeout: Maximum time to wait for command completion (seconds)
+            tail_lines: Quantidade de linhas finais mantidas para relatório de erro
+            
+        Returns:
+            CommandStream iterável; após consumido expõe success, returncode e tail
+        """
+        logger.info(f"Streaming PowerShell command: {command[:100]}...")
+        return CommandStream(self.shell_argv + ['-Command', command], timeout, tail_lines)
+    
+    def execute_command_streaming(self, command: str, on_line: Optional[Callable[[str], None]] = None,
+                                  timeout: int = 300,
+                                  tail_lines: int = DEFAULT_TAIL_LINES) -> Tuple[bool, str, str]:
+        """
+        Execute a PowerShell command entregando cada linha de saída assim que chega
+        
+        Args:
+            command: PowerShell command to execute
+            on_line: Função callback(line) chamada para cada linha de stdout
+            timeout: Maximum time to wait for command completion (seconds)
+            tail_lines: Quantidade de linhas finais mantidas em memória
+            
+        Returns:
+            Tuple of (success: bool, stdout_tail: str, stderr_tail: str)
+        """
+        return self._execute_stream(command, 'stream', lambda: self.stream_command(command, timeout, tail_lines),
+                                    on_line)
+    
+    def _execute_stream(self, label: str, kind: str, start_stream: Callable[[], CommandStream],
+                        on_line: Optional[Callable[[str], None]]) -> Tuple[bool, str, str]:
+        """Consome o CommandStream criado por start_stream publicando os eventos do comando"""
+        try:
+            with self._command_events(label, kind) as outcome:
+                stream = start_stream()
+                success, stdout, stderr = stream.run(on_line)
+                outcome['success'] = success
+                if 'timing' in outcome:
+                    outcome['timing'].update(spawned_at=stream.spawned_at, first_output_at=stream.first_output_at,
+                                             exit_code=stream.returncode)
+                    outcome['output_bytes'] = stream.output_bytes
+            
+            if success:
+                logger.info(f"Command executed successfully ({stream.line_count} lines)")
+            elif not (stream.timed_out or stream.hung):
+                logger.error(f"Command failed with return code {stream.returncode}")
+            
+            return success, stdout, stderr
+            
+        except Exception as e:
+            logger.error(f"Error executing command: {str(e)}")
+            return False, "", str(e)
+    
+    def resolve_winget(self) -> Optional[List[str]]:
+        """
+        Comando do winget para execução direta
+        
+        Returns:
+            argv base do winget, ou None se os comandos winget devem ir pelo PowerShell
+            (direct_winget desligado, shell próprio sem winget_argv ou winget não encontrado)
+        """
+        if not self.direct_winget:
+            return None
+        if self.winget_argv is None and self._resolve_winget_path:
+            path = find_winget_executable()
+            if path is not None:
+                self.winget_argv = [path]
+        return self.winget_argv
+    
+    def execute_winget(self, args: List[str], timeout: int = 300,
+                       on_line: Optional[Callable[[str], None]] = None,
+                       details: Optional[dict] = None,
+                       idle_timeout: Optional[float] = None) -> Tuple[bool, str, str]:
+        """
+        Executa o winget diretamente, sem um host PowerShell
+        
+        O winget recebe os argumentos como lista (sem interpretação de um shell) e a
+        saída é lida em bytes e decodificada como UTF-8. Sem execução direta
+        (ver resolve_winget), o mesmo comando vai por execute_command.
+        
+        Args:
+            args: Argumentos do winget (ex: ['upgrade', '--id', 'Git.Git'])
+            timeout: Maximum time to wait for command completion (seconds)
+            on_line: Função callback(line) para cada linha de stdout assim que chega
+                (só na execução direta; pelo PowerShell a saída chega inteira no fim)
+            details: Dicionário preenchido com 'exit_code' (None se desconhecido),
+                'live_output' (se on_line recebeu as linhas ao vivo) e 'stopped'
+                ('timeout' ou 'hung' se o processo foi encerrado, senão None)
+            idle_timeout: Encerrar o winget e o instalador após esse tempo sem saída
+                e sem CPU (só na execução direta; ver process_activity.HangWatch)
+            
+        Returns:
+            Tuple of (success: bool, stdout: str, stderr: str)
+        """
+        command = "winget " + " ".join(args)
+        details = details if details is not None else {}
+        argv = self.resolve_winget()
+        if argv is None:
+            result = self.execute_command(command, timeout)
+            details.update(exit_code=None, live_output=False,
+                           stopped='timeout' if result[2] == "Command timed out" else None)
+            return result
+        
+        with self._command_events(command, 'winget') as outcome:
+            logger.info(f"Executing winget: {command[:100]}...")
+            timing = outcome.get('timing', {})
+            try:
+                success, stdout, stderr = self._run_process_timed(argv + list(args), timeout, timing, on_line,
+                                                                  idle_timeout)
+            except OSError as e:
+                logger.error(f"Error executing winget: {str(e)}")
+                success, stdout, stderr = False, "", str(e)
+            outcome['success'] = success
+            outcome['output_bytes'] = len(stdout.encode('utf-8')) if 'timing' in outcome else 0
+        details.update(exit_code=timing.get('exit_code'), live_output=on_line is not None,
+                       stopped=timing.get('stopped'))
+        return success, stdout, stderr
+    
+    def execute_winget_streaming(self, args: List[str], on_line: Optional[Callable[[str], None]] = None,
+                                 timeout: int = 300,
+                                 tail_lines: int = DEFAULT_TAIL_LINES,
+                                 idle_timeout: Optional[float] = None) -> Tuple[bool, str, str]:
+        """
+        Executa o winget diretamente entregando cada linha de saída assim que chega
+        
+        Sem execução direta (ver resolve_winget), vai por execute_command_streaming.
+        Com idle_timeout, o winget e o instalador são encerrados após esse tempo
+        sem saída e sem CPU (só na execução direta).
+        
+        Returns:
+            Tuple of (success: bool, stdout_tail: str, stderr_tail: str)
+        """
+        command = "winget " + " ".join(args)
+        argv = self.resolve_winget()
+        if argv is None:
+            return self.execute_command_streaming(command, on_line, timeout, tail_lines)
+        
+        def start_stream():
+            logger.info(f"Streaming winget: {command[:100]}...")
+            return CommandStream(argv + list(args), timeout, tail_lines, idle_timeout)
+        
+        return self._execute_stream(command, 'winget_stream', start_stream, on_line)
+    
     def check_admin_privileges(self) -> bool:
         """
         Check if the script is running with administrator privileges
@@ -89,12 +580,27 @@ class PowerShellManager:
         Returns:
             True if running as admin, False otherwise
         """
-        command = """
-        $currentPrincipal = New-Object Security.Principal.WindowsPrincipal([Security.Principal.WindowsIdentity]::GetCurrent())
-        $currentPrincipal.IsInRole([Security.Principal.WindowsBuiltInRole]::Administrator)
+        def probe():
+            command = """
+            $currentPrincipal = New-Object Security.Principal.WindowsPrincipal([Security.Principal.WindowsIdentity]::GetCurrent())
+            $currentPrincipal.IsInRole([Security.Principal.WindowsBuiltInRole]::Administrator)
+            """
+            success, stdout, _ = self.execute_command(command)
+            return bool(success and stdout and stdout.strip().lower() == "true")
+        
+        # Elevação é do processo: guardada só em memória, nunca em disco
+        return self.prereq_cache.get_or_probe('admin', probe, persist=False)
+    
+    def invalidate_prerequisites(self, key: Optional[str] = None):
+        """
+        Descarta verificações de pré-requisitos em cache
+        
+        Args:
+            key: 'admin', 'winget', 'pswindowsupdate' ou 'winget_client' (None = todas)
         """
-        success, stdout, _ = self.execute_command(command)
-        return success and stdout and stdout.strip().lower() == "true"
+        self.prereq_cache.invalidate(key)
+        if key in (None, 'winget_client'):
+            self.winget_client_available = None
     
     def install_winget_if_needed(self) -> Tuple[bool, str]:
         """
@@ -103,29 +609,53 @@ class PowerShellManager:
         Returns:
             Tuple of (is_installed: bool, message: str)
         """
-        command = "Get-Command winget -ErrorAction SilentlyContinue"
-        success, stdout, _ = self.execute_command(command)
+        def probe():
+            if self.resolve_winget() is not None:
+                return True
+            command = "Get-Command winget -ErrorAction SilentlyContinue"
+            success, stdout, _ = self.execute_command(command)
+            return bool(success and stdout and stdout.strip())
         
-        if success and stdout and stdout.strip():
+        # Só resultados positivos são guardados: após instalar, a próxima verificação já vê
+        if self.prereq_cache.get_or_probe('winget', probe, cache_if=bool):
             logger.info("Winget is installed")
             return True, "Winget is available"
         else:
             logger.warning("Winget is not installed")
             return False, "Winget não está instalado. Por favor, instale o App Installer da Microsoft Store."
     
-    def update_all_apps_with_winget(self) -> Tuple[bool, str]:
+    def update_all_apps_with_winget(self, output_callback=None) -> Tuple[bool, str]:
         """
         Update all applications using winget (método mais rápido - atualiza tudo de uma vez)
         
+        Args:
+            output_callback: Função callback(line) chamada ao vivo para cada linha do winget.
+                Quando informada, output contém apenas as últimas linhas da saída.
+        
         Returns:
             Tuple of (success: bool, output: str)
         """
         logger.info("Starting application updates with winget (bulk update)")
-        command = "winget upgrade --all --silent --accept-source-agreements --accept-package-agreements"
-        success, stdout, stderr = self.execute_command(command, timeout=1800)  # 30 minutes timeout
+        args = ['upgrade', '--all'] + self.WINGET_UPGRADE_ARGS
+        # Soma dos limites dos pacotes da última listagem, com teto (sem listagem, BULK_UPGRADE_TIMEOUT)
+        policy = self.upgrade_timeouts.for_bulk(self._listed_versions, self.app_upgrade_timeout)
+        logger.info(f"Bulk update timeout: {policy['timeout']}s, idle {policy['idle_timeout'] or 'off'} "
+                    f"({policy['packages']} known packages)")
+        with self.event_bus.phase('upgrade_all'):
+            if output_callback:
+                success, stdout, stderr = self.execute_winget_streaming(args, output_callback,
+                                                                        timeout=policy['timeout'],
+                                                                        idle_timeout=policy['idle_timeout'])
+            else:
+                success, stdout, stderr = self.execute_winget(args, timeout=policy['timeout'],
+                                                              idle_timeout=policy['idle_timeout'])
         
         output = stdout if stdout else stderr
         
+        # Mesmo parcial, a atualização em massa deixa o catálogo desatualizado
+        if self.catalog is not None:
+            self.catalog.invalidate()
+        
         if success:
             logger.info("Bulk update completed successfully")
         else:
@@ -133,158 +663,217 @@ class PowerShellManager:
         
         return success, output
     
-    def update_apps_individually(self, progress_callback=None) -> Tuple[int, int, list]:
+    def update_apps_individually(self, progress_callback=None,
+                                 max_workers: int = DEFAULT_UPGRADE_WORKERS,
+                                 eta: Optional[UpgradeEta] = None) -> Tuple[int, int, list]:
         """
         Atualiza aplicativos individualmente com progresso detalhado
         
         Args:
             progress_callback: Função callback(current, total, app_name, success) para reportar progresso
+            max_workers: Número de atualizações simultâneas (1 = sequencial)
+            eta: Estimador do tempo restante; recebe a lista de apps e acompanha o
+                progresso antes de progress_callback (que pode consultar eta.snapshot())
             
         Returns:
             Tuple of (successful_count, failed_count, failed_apps_list)
         """
         logger.info("Starting individual application updates")
         
-        # Listar apps que precisam atualização
-        apps_to_update = self.list_upgradable_apps()
+        # Listar apps que precisam atualização (catálogo recente dispensa a consulta)
+        with self.event_bus.phase('list_upgradable'):
+            apps_to_update = self.get_upgradable_apps()
         
         if not apps_to_update:
             logger.info("No applications to update")
             return 0, 0, []
         
-        total = len(apps_to_update)
-        successful = 0
-        failed = 0
-        failed_apps = []
+        logger.info(f"Found {len(apps_to_update)} applications to update")
         
-        logger.info(f"Found {total} applications to update")
+        if eta is not None:
+            eta.plan(apps_to_update)
+            progress_callback = eta.track(progress_callback)
         
-        for i, app in enumerate(apps_to_update, 1):
-            app_id = app['id']
-            app_name = app['name']
-            
-            if progress_callback:
-                try:
-                    progress_callback(i, total, app_name, None)
-                except Exception as e:
-                    logger.warning(f"Progress callback error: {e}")
-            
-            # Atualizar app
-            success = self.update_app_silent(app_id)
-            
-            if success:
-                successful += 1
-            else:
-                failed += 1
-                failed_apps.append({'name': app_name, 'id': app_id})
-            
-            if progress_callback:
-                try:
-                    progress_callback(i, total, app_name, success)
-                except Exception as e:
-                    logger.warning(f"Progress callback error: {e}")
+        scheduler = UpgradeScheduler(self.update_app_silent, max_workers=max_workers)
+        with self.event_bus.phase('upgrade_apps', apps=len(apps_to_update)):
+            successful, failed, failed_apps = scheduler.run(apps_to_update, progress_callback)
         
         logger.info(f"Update complete: {successful} successful, {failed} failed")
         return successful, failed, failed_apps
     
+    def detect_winget_client(self) -> bool:
+        """
+        Verifica se o módulo Microsoft.WinGet.Client está disponível
+        
+        Quando disponível, list_upgradable_apps usa Get-WinGetPackage (objetos
+        estruturados) em vez de interpretar a tabela de texto do winget.
+        
+        Returns:
+            True se o módulo está instalado
+        """
+        def probe():
+            command = "Get-Module -ListAvailable -Name Microsoft.WinGet.Client"
+            success, stdout, _ = self.execute_command(command, timeout=120)
+            available = bool(success and stdout and stdout.strip())
+            logger.info(f"Microsoft.WinGet.Client available: {available}")
+            return available
+        
+        self.winget_client_available = self.prereq_cache.get_or_probe('winget_client', probe)
+        return self.winget_client_available
+    
     def list_upgradable_apps(self) -> list:
         """
-        Lista aplicativos que precisam ser atualizados usando formato JSON do winget
+        Lista aplicativos que precisam ser atualizados com uma única consulta ao winget
+        
+        Usa Get-WinGetPackage quando o módulo Microsoft.WinGet.Client já foi detectado
+        (detect_winget_client, chamado na inicialização ou por quem lista); caso
+        contrário, ou se essa consulta falhar, interpreta a saída de 'winget upgrade'.
+        A listagem em si nunca verifica o módulo, para não abrir um PowerShell só para isso.
+        Uma consulta bem-sucedida também atualiza o catálogo, se houver.
         
         Returns:
             Lista de dicionários com informações dos apps: [{'id': ..., 'name': ..., 'version': ..., 'available': ...}]
         """
+        apps = self._query_upgradable_apps()
+        if apps is None:
+            return []
+        if self.catalog is not None:
+            self.catalog.update(apps)
+        self._remember_versions(apps)
+        return apps
+    
+    def _query_upgradable_apps(self) -> Optional[list]:
+        """
+        Consulta o winget (sem catálogo)
+        
+        Returns:
+            Lista de apps, ou None se a consulta falhou
+        """
         logger.info("Listing upgradable applications")
         
-        # Tentar primeiro com formato JSON (mais confiável)
-        import json
-        command = "winget upgrade --accept-source-agreements | ConvertTo-Json -Depth 10"
-        success, stdout, stderr = self.execute_command(command, timeout=120)
+        structured = self.winget_client_available
+        if structured is None:
+            # Só o resultado já verificado (inclusive em disco); sem verificação aqui
+            structured = bool(self.prereq_cache.get('winget_client'))
+        apps = None
+        if structured:
+            success, stdout, stderr = self.execute_command(self.WINGET_CLIENT_LIST_COMMAND, timeout=self.list_timeout)
+            if success and stdout and stdout.strip():
+                apps = self._parse_upgrade_json(stdout)
+            if apps is None:
+                # Módulo quebrado, falha no Import-Module ou JSON inválido: a tabela de texto ainda serve
+                logger.warning(f"Get-WinGetPackage failed, falling back to winget upgrade: {stderr}")
         
-        apps = []
+        if apps is None:
+            success, stdout, stderr = self.execute_winget(self.WINGET_LIST_ARGS, timeout=self.list_timeout)
+            if not success or not stdout or not stdout.strip():
+                logger.warning(f"Could not list upgradable applications: {stderr}")
+                return None
+            apps = self._parse_upgrade_text(stdout)
         
-        # Se JSON falhar, usar parsing de texto tradicional melhorado
-        if not success or not stdout or not stdout.strip():
-            logger.info("JSON parsing failed, using text parsing")
-            command = "winget upgrade --accept-source-agreements"
-            success, stdout, stderr = self.execute_command(command, timeout=120)
+        logger.info(f"Found {len(apps)} upgradable applications")
+        return apps
+    
+    def get_upgradable_apps(self) -> list:
+        """
+        Lista os aplicativos atualizáveis usando o catálogo quando ainda recente
         
-        if success and stdout:
-            # Tentar parsear como JSON primeiro
-            try:
-                data = json.loads(stdout)
-                if isinstance(data, list):
-                    for item in data:
-                        if isinstance(item, dict) and 'Id' in item:
-                            apps.append({
-                                'name': item.get('Name', item.get('Id', 'Unknown')),
-                                'id': item['Id'],
-                                'version': item.get('Version', 'unknown'),
-                                'available': item.get('Available', item.get('AvailableVersion', 'unknown'))
-                            })
-                    logger.info(f"Found {len(apps)} upgradable applications via JSON")
-                    return apps
-            except (json.JSONDecodeError, ValueError):
-                logger.debug("Not JSON format, using text parsing")
-            
-            # Fallback: Parsing de texto melhorado
-            lines = stdout.split('\n')
-            
-            # Encontrar a linha de cabeçalho e separadores
-            header_idx = -1
-            separator_idx = -1
-            
-            for i, line in enumerate(lines):
-                if 'Name' in line and 'Id' in line and 'Version' in line:
-                    header_idx = i
-                elif header_idx >= 0 and '-' * 10 in line:
-                    separator_idx = i
-                    break
+        Consulta o winget apenas se o catálogo passou de fresh_age; uma consulta
+        já em andamento (ex: atualização em segundo plano) é aproveitada.
+        
+        Returns:
+            Lista de apps, como em list_upgradable_apps
+        """
+        if self.catalog is None:
+            return self.list_upgradable_apps()
+        if self.refresh_upgrade_catalog():
+            snapshot = self.catalog.snapshot()
+            if snapshot is not None:
+                self._remember_versions(snapshot[0])
+                return snapshot[0]
+        return []
+    
+    def _remember_versions(self, apps: list):
+        """
+        Guarda as versões listadas (origem e destino) para o histórico de atualizações
+        
+        Substitui a listagem anterior: os pacotes já atualizados saem, e o timeout de
+        'winget upgrade --all' (soma por pacote) conta só o que ainda está pendente.
+        """
+        self._listed_versions = {app['id']: (app.get('version'), app.get('available'))
+                                 for app in apps if app.get('id')}
+    
+    def refresh_upgrade_catalog(self, force: bool = False) -> bool:
+        """
+        Atualiza o catálogo se ele não estiver mais recente
+        
+        Args:
+            force: Consultar mesmo com o catálogo recente
+        
+        Returns:
+            True se o catálogo está atualizado ao final
+        """
+        if self.catalog is None:
+            return False
+        if not force and self.catalog.is_fresh():
+            return True
+        return self.catalog.refresh(self._query_upgradable_apps)
+    
+    def start_catalog_refresh(self, interval: Optional[float] = None):
+        """
+        Atualiza o catálogo periodicamente em segundo plano
+        
+        Args:
+            interval: Período em segundos (padrão: refresh_interval do catálogo)
+        """
+        if self.catalog is not None:
+            self.catalog.start_background_refresh(self._query_upgradable_apps, interval)
+    
+    def _parse_upgrade_json(self, stdout: str) -> list:
+        """
+        Converte a saída JSON de Get-WinGetPackage em dicionários de apps
+        
+        Args:
+            stdout: Saída de WINGET_CLIENT_LIST_COMMAND
             
-            # Se encontrou o separador, processar linhas de dados
-            if separator_idx > 0:
-                for line in lines[separator_idx + 1:]:
-                    line = line.strip()
-                    
-                    # Ignorar linhas vazias e rodapés
-                    if not line or 'upgrades available' in line.lower():
-                        continue
-                    
-                    # Usar regex para parsing mais robusto
-                    import re
-                    # Padrão: Nome (pode ter espaços) | ID (formato Package.ID) | Versão | Versão Disponível | Source
-                    # Procurar por padrão de ID com pontos (ex: Microsoft.PowerShell)
-                    match = re.search(r'(\S+\.\S+)', line)
-                    
-                    if match:
-                        app_id = match.group(1)
-                        parts = line.split()
-                        
-                        # Encontrar posição do ID na lista de parts
-                        try:
-                            id_idx = parts.index(app_id)
-                            
-                            # Nome está antes do ID
-                            app_name = ' '.join(parts[:id_idx]) if id_idx > 0 else app_id
-                            
-                            # Versão atual e disponível estão depois do ID
-                            version = parts[id_idx + 1] if len(parts) > id_idx + 1 else 'unknown'
-                            available = parts[id_idx + 2] if len(parts) > id_idx + 2 else 'unknown'
-                            
-                            # Filtrar IDs que não são válidos (muito curtos, só números, etc)
-                            if len(app_id) > 3 and '.' in app_id and not app_id.replace('.', '').isdigit():
-                                apps.append({
-                                    'name': app_name,
-                                    'id': app_id,
-                                    'version': version,
-                                    'available': available
-                                })
-                        except (ValueError, IndexError):
-                            continue
+        Returns:
+            Lista de dicionários de apps, ou None se a saída não é o JSON esperado
+        """
+        apps = []
+        try:
+            data = json.loads(stdout)
+        except (json.JSONDecodeError, ValueError):
+            logger.warning("Invalid JSON from Get-WinGetPackage")
+            return None
         
-        logger.info(f"Found {len(apps)} upgradable applications")
+        if isinstance(data, dict):
+            data = [data]
+        if not isinstance(data, list):
+            logger.warning("Unexpected JSON from Get-WinGetPackage")
+            return None
+        
+        for item in data:
+            if isinstance(item, dict) and item.get('Id'):
+                apps.append({
+                    'name': item.get('Name') or item['Id'],
+                    'id': item['Id'],
+                    'version': item.get('Version') or 'unknown',
+                    'available': item.get('Available') or 'unknown'
+                })
         return apps
     
+    def _parse_upgrade_text(self, stdout: str) -> list:
+        """
+        Interpreta a tabela de texto de 'winget upgrade'
+        
+        Args:
+            stdout: Saída de WINGET_LIST_COMMAND
+            
+        Returns:
+            Lista de dicionários de apps
+        """
+        return parse_upgrade_table(stdout)
+    
     def update_app_silent(self, app_id: str) -> bool:
         """
         Atualiza um aplicativo específico silenciosamente com retry e melhor tratamento de erros
@@ -296,25 +885,41 @@ class PowerShellManager:
             True se sucesso, False caso contrário
         """
         logger.info(f"Updating application: {app_id}")
+        start = time.perf_counter()
         
         # Validar que o ID parece válido
         if not app_id or len(app_id) < 3:
             logger.error(f"Invalid app ID: {app_id}")
-            return False
+            return self._report_upgrade(app_id, False, 'invalid_id', start)
+        
+        # Limites pelo histórico do pacote (app_upgrade_timeout se não há histórico)
+        policy = self.upgrade_timeouts.for_package(app_id, self.app_upgrade_timeout)
+        logger.info(f"Timeout for {app_id}: {policy['timeout']}s, idle {policy['idle_timeout'] or 'off'} "
+                    f"({policy['basis']})")
         
         # Tentar com --id exato primeiro (mais preciso)
-        command = f"winget upgrade --id {app_id} --exact --silent --accept-source-agreements --accept-package-agreements"
-        success, stdout, stderr = self.execute_command(command, timeout=600)
+        args = ['upgrade', '--id', app_id, '--exact'] + self.WINGET_UPGRADE_ARGS
+        attempt = self._run_upgrade_attempt(args, policy)
+        success, stdout, stderr = attempt['result']
         
-        # Se falhar com --exact, tentar sem (pode encontrar por match parcial)
-        if not success:
+        # Se falhar com --exact, tentar sem (pode encontrar por match parcial); encerrado por
+        # tempo ou travado, o pacote foi encontrado e repetir só gastaria outro timeout
+        if not success and not attempt['details'].get('stopped'):
             logger.info(f"Exact match failed for {app_id}, trying without --exact")
-            command = f"winget upgrade --id {app_id} --silent --accept-source-agreements --accept-package-agreements"
-            success, stdout, stderr = self.execute_command(command, timeout=600)
+            args = ['upgrade', '--id', app_id] + self.WINGET_UPGRADE_ARGS
+            attempt = self._run_upgrade_attempt(args, policy)
+            success, stdout, stderr = attempt['result']
+        
+        stopped = attempt['details'].get('stopped')
+        if stopped:
+            logger.error(f"Upgrade of {app_id} stopped ({stopped}) after {time.perf_counter() - start:.0f}s")
+            return self._report_upgrade(app_id, False, HUNG_OUTCOME if stopped == 'hung' else TIMEOUT_OUTCOME,
+                                        start, attempt)
         
         if success:
             logger.info(f"Successfully updated: {app_id}")
-            return True
+            self._mark_upgraded(app_id)
+            return self._report_upgrade(app_id, True, 'upgraded', start, attempt)
         else:
             # Log mais detalhado do erro
             error_msg = stderr if stderr else stdout
@@ -323,15 +928,64 @@ class PowerShellManager:
             # Verificar se é erro conhecido
             if "No applicable update found" in error_msg:
                 logger.info(f"No update needed for {app_id} (already up to date)")
-                return True  # Não é erro se já está atualizado
+                self._mark_upgraded(app_id)
+                return self._report_upgrade(app_id, True, 'up_to_date', start, attempt)  # Não é erro se já está atualizado
             elif "No package found matching input criteria" in error_msg:
                 logger.error(f"Package {app_id} not found in repositories")
-                return False
+                return self._report_upgrade(app_id, False, 'not_found', start, attempt)
             elif "installer failed" in error_msg.lower():
                 logger.error(f"Installer failed for {app_id}")
-                return False
+                return self._report_upgrade(app_id, False, 'installer_failed', start, attempt)
             
-            return False
+            return self._report_upgrade(app_id, False, 'failed', start, attempt)
+    
+    def _run_upgrade_attempt(self, args: List[str], policy: dict) -> dict:
+        """
+        Executa um 'winget upgrade --id' acompanhando a saída (UpgradeTranscript)
+        
+        Args:
+            args: Argumentos do winget
+            policy: Limites da tentativa (UpgradeTimeouts.for_package)
+        
+        Returns:
+            Dicionário com 'result' (success, stdout, stderr), 'transcript' e 'details'
+            (código de saída e se foi encerrado), usados por _report_upgrade para o histórico
+        """
+        transcript = UpgradeTranscript()
+        details = {}
+        result = self.execute_winget(args, timeout=policy['timeout'], on_line=transcript.feed,
+                                     details=details, idle_timeout=policy['idle_timeout'])
+        transcript.finish()
+        if not details.get('live_output'):
+            transcript.feed_text(result[1] or result[2])
+        return {'result': result, 'transcript': transcript, 'details': details}
+    
+    def _report_upgrade(self, app_id: str, success: bool, outcome: str, start: float,
+                        attempt: Optional[dict] = None) -> bool:
+        """Publica o resultado de update_app_silent (app_upgrade), registra no histórico e o repassa"""
+        seconds = round(time.perf_counter() - start, 3)
+        self.event_bus.emit(EVENT_APP_UPGRADE, id=app_id, success=success, outcome=outcome, seconds=seconds)
+        if self.history is not None:
+            from_version, to_version = self._listed_versions.get(app_id, (None, None))
+            fields = {}
+            if attempt is not None:
+                transcript = attempt['transcript']
+                fields = {
+                    'to_version': transcript.version or to_version,
+                    'installer_type': transcript.installer_type,
+                    'download_seconds': transcript.download_seconds,
+                    'install_seconds': transcript.install_seconds,
+                    'exit_code': attempt['details'].get('exit_code'),
+                    'output_tail': transcript.tail() or attempt['result'][2][-2000:],
+                }
+            fields.setdefault('to_version', to_version)
+            self.history.record(app_id, success, outcome, seconds, from_version=from_version, **fields)
+        return success
+    
+    def _mark_upgraded(self, app_id: str):
+        """Retira do catálogo um aplicativo que não precisa mais de atualização"""
+        if self.catalog is not None:
+            self.catalog.mark_upgraded(app_id)
     
     def install_pswindowsupdate_module(self) -> Tuple[bool, str]:
         """
@@ -342,11 +996,13 @@ class PowerShellManager:
         """
         logger.info("Checking for PSWindowsUpdate module")
         
-        # Check if module is already installed
-        check_command = "Get-Module -ListAvailable -Name PSWindowsUpdate"
-        success, stdout, _ = self.execute_command(check_command)
+        def probe():
+            check_command = "Get-Module -ListAvailable -Name PSWindowsUpdate"
+            _, stdout, _ = self.execute_command(check_command)
+            return bool(stdout and stdout.strip())
         
-        if stdout and stdout.strip():
+        # Check if module is already installed (só resultados positivos são guardados)
+        if self.prereq_cache.get_or_probe('pswindowsupdate', probe, cache_if=bool):
             logger.info("PSWindowsUpdate module is already installed")
             return True, "Módulo PSWindowsUpdate já está instalado"
         
@@ -361,15 +1017,19 @@ class PowerShellManager:
         
         if success:
             logger.info("PSWindowsUpdate module installed successfully")
+            self.prereq_cache.set('pswindowsupdate', True)
             return True, "Módulo PSWindowsUpdate instalado com sucesso"
         else:
             logger.error(f"Failed to install PSWindowsUpdate module: {stderr}")
             return False, f"Falha ao instalar módulo: {stderr}"
     
-    def run_windows_update(self) -> Tuple[bool, str]:
+    def run_windows_update(self, output_callback=None) -> Tuple[bool, str]:
         """
         Run Windows Update
         
+        Args:
+            output_callback: Função callback(line) chamada ao vivo para cada linha de saída
+        
         Returns:
             Tuple of (success: bool, output: str)
         """
@@ -381,11 +1041,13 @@ class PowerShellManager:
             return False, module_msg
         
         # Run Windows Update
-        command = """
-        Import-Module PSWindowsUpdate
-        Get-WindowsUpdate -AcceptAll -Install -AutoReboot:$false -Verbose
-        """
-        success, stdout, stderr = self.execute_command(command, timeout=3600)  # 1 hour timeout
+        command = self.WINDOWS_UPDATE_INSTALL_COMMAND
+        with self.event_bus.phase('windows_update'):
+            if output_callback:
+                success, stdout, stderr = self.execute_command_streaming(command, output_callback,
+                                                                         timeout=self.windows_update_timeout)
+            else:
+                success, stdout, stderr = self.execute_command(command, timeout=self.windows_update_timeout)
         
         output = stdout if stdout else stderr
         
@@ -396,12 +1058,19 @@ class PowerShellManager:
             
         return success, output
     
-    def run_windows_update_with_progress(self, progress_callback=None) -> Tuple[bool, str]:
+    def run_windows_update_with_progress(self, progress_callback=None, output_callback=None,
+                                         event_callback=None) -> Tuple[bool, str]:
         """
         Run Windows Update with progress callback
         
+        O progresso vem da saída do PSWindowsUpdate lida em streaming: cada
+        transição Accepted/Downloaded/Installed de um KB avança a barra,
+        ponderada pelo tamanho da atualização.
+        
         Args:
             progress_callback: Função callback(percent, message) chamada durante o progresso
+            output_callback: Função callback(line) chamada ao vivo para cada linha de saída
+            event_callback: Função callback(event) com o evento completo (KB, tamanho, duração)
             
         Returns:
             Tuple of (success: bool, output: str)
@@ -416,21 +1085,10 @@ class PowerShellManager:
         if progress_callback:
             progress_callback(0, "Verificando atualizações disponíveis...")
         
-        # Run Windows Update
-        command = """
-        Import-Module PSWindowsUpdate
-        Get-WindowsUpdate -AcceptAll -Install -AutoReboot:$false -Verbose
-        """
-        
-        if progress_callback:
-            progress_callback(20, "Baixando atualizações...")
-        
-        success, stdout, stderr = self.execute_command(command, timeout=3600)  # 1 hour timeout
-        
-        if progress_callback:
-            progress_callback(80, "Instalando atualizações...")
-        
-        output = stdout if stdout else stderr
+        success, output, summary = self._stream_windows_update(
+            self.WINDOWS_UPDATE_INSTALL_COMMAND, 'windows_update', progress_callback, output_callback, event_callback)
+        logger.info(f"Windows Update summary: {summary['installed']}/{summary['total']} installed, "
+                    f"failed: {summary['failed']}")
         
         if progress_callback:
             progress_callback(100, "Windows Update concluído")
@@ -439,5 +1097,59 @@ class PowerShellManager:
             logger.info("Windows Update completed")
             return True, output
         else:
-            logger.error(f"Windows Update completed with issues: {stderr}")
+            logger.error(f"Windows Update completed with issues: {output[-200:]}")
             return False, output
+    
+    def download_windows_updates(self, progress_callback=None, output_callback=None,
+                                 event_callback=None) -> Tuple[bool, str, dict]:
+        """
+        Busca e baixa as atualizações do Windows sem instalá-las
+        
+        A busca e o download só usam a rede e podem rodar junto com as instalações
+        do winget (ver update_pipeline.py); a instalação depois
+        (run_windows_update_with_progress) aproveita o que já foi baixado.
+        
+        Args:
+            progress_callback: Função callback(percent, message); o download vai até 50%
+            output_callback: Função callback(line) chamada ao vivo para cada linha de saída
+            event_callback: Função callback(event) com o evento completo (KB, tamanho, duração)
+            
+        Returns:
+            Tuple of (success: bool, output: str, summary: dict) com o resumo de
+            WindowsUpdateProgressParser ('found' é None se a busca não terminou)
+        """
+        logger.info("Scanning and downloading Windows updates")
+        
+        module_success, module_msg = self.install_pswindowsupdate_module()
+        if not module_success:
+            return False, module_msg, {'found': None}
+        
+        if progress_callback:
+            progress_callback(0, "Verificando atualizações disponíveis...")
+        
+        success, output, summary = self._stream_windows_update(
+            self.WINDOWS_UPDATE_DOWNLOAD_COMMAND, 'windows_download', progress_callback, output_callback,
+            event_callback)
+        logger.info(f"Windows Update download: {summary['downloaded']}/{summary['total']} downloaded")
+        return success, output, summary
+    
+    def _stream_windows_update(self, command: str, phase: str, progress_callback, output_callback,
+                               event_callback) -> Tuple[bool, str, dict]:
+        """Executa um comando do PSWindowsUpdate em streaming, interpretando o progresso"""
+        parser = WindowsUpdateProgressParser()
+        
+        def on_line(line):
+            if output_callback:
+                output_callback(line)
+            for event in parser.feed(line):
+                if progress_callback:
+                    progress_callback(event['percent'], event['message'])
+                if event_callback:
+                    event_callback(event)
+        
+        # Saída lida em streaming: memória limitada às últimas linhas
+        with self.event_bus.phase(phase):
+            success, stdout, stderr = self.execute_command_streaming(command, on_line,
+                                                                     timeout=self.windows_update_timeout)
+        
+        return success, stdout if stdout else stderr, parser.summary()
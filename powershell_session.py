@@ -0,0 +1,319 @@
+"""
+powershell_session.py - Sessões PowerShell persistentes (pool de hosts "quentes")
+
+Cada chamada de PowerShellManager.execute_command abre um novo processo
+powershell.exe, pagando o cold start do host a cada comando. Este módulo mantém
+hosts PowerShell vivos que recebem comandos pelo stdin com um protocolo de
+enquadramento simples e devolvem stdout/stderr/código de saída por comando.
+
+Protocolo (uma linha ASCII por requisição):
+    <token> <comando em base64 UTF-8>
+
+Resposta do host:
+    @@MTI-BEGIN@@ <token>
+    ...linhas de stdout...
+    @@MTI-END@@ <token> <exit_code> <stderr em base64 UTF-8>
+"""
+import base64
+import logging
+import queue
+import subprocess
+import threading
+import time
+import uuid
+from typing import List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Argumentos padrão do host PowerShell (compartilhados com PowerShellManager)
+DEFAULT_POWERSHELL_ARGV = ['powershell', '-NoProfile', '-ExecutionPolicy', 'Bypass']
+
+BEGIN_MARKER = "@@MTI-BEGIN@@"
+END_MARKER = "@@MTI-END@@"
+
+# Loop executado dentro do host PowerShell: lê uma requisição por linha,
+# executa o comando e devolve a resposta enquadrada pelos marcadores.
+SESSION_BOOTSTRAP = r"""
+$ProgressPreference = 'SilentlyContinue'
+[Console]::OutputEncoding = New-Object System.Text.UTF8Encoding $false
+while ($true) {
+    $__line = [Console]::In.ReadLine()
+    if ($__line -eq $null) { break }
+    if (-not $__line.Trim()) { continue }
+    $__parts = $__line.Split(' ', 2)
+    $__token = $__parts[0]
+    $__cmd = [System.Text.Encoding]::UTF8.GetString([Convert]::FromBase64String($__parts[1]))
+    $__errors = New-Object System.Collections.Generic.List[string]
+    $__output = New-Object System.Collections.Generic.List[object]
+    $global:LASTEXITCODE = 0
+    [Console]::Out.WriteLine("@@MTI-BEGIN@@ $__token")
+    try {
+        Invoke-Expression $__cmd 2>&1 | ForEach-Object {
+            if ($_ -is [System.Management.Automation.ErrorRecord]) { $__errors.Add($_.ToString()) }
+            else { $__output.Add($_) }
+        }
+    } catch {
+        $__errors.Add($_.ToString())
+    }
+    if ($__output.Count -gt 0) {
+        [Console]::Out.WriteLine(($__output | Out-String -Width 4096).TrimEnd())
+    }
+    if ($LASTEXITCODE) { $__code = $LASTEXITCODE } elseif ($__errors.Count -gt 0) { $__code = 1 } else { $__code = 0 }
+    $__err = [Convert]::ToBase64String([System.Text.Encoding]::UTF8.GetBytes(($__errors -join "`n")))
+    [Console]::Out.WriteLine("@@MTI-END@@ $__token $__code $__err")
+    [Console]::Out.Flush()
+}
+"""
+
+
+def _encode_bootstrap(script: str) -> str:
+    """Codifica o script para -EncodedCommand (base64 de UTF-16LE)"""
+    return base64.b64encode(script.encode('utf-16-le')).decode('ascii')
+
+
+class PowerShellSession:
+    """Um host PowerShell de longa duração que executa comandos enquadrados"""
+
+    def __init__(self, shell_argv: Optional[List[str]] = None):
+        """
+        Inicializa a sessão (o processo só é criado em start()).
+
+        Args:
+            shell_argv: Comando base do host (padrão: DEFAULT_POWERSHELL_ARGV)
+        """
+        self.shell_argv = list(shell_argv) if shell_argv else list(DEFAULT_POWERSHELL_ARGV)
+        self.process = None
+        self._lines = queue.Queue()
+        self._write_lock = threading.Lock()
+
+    def start(self):
+        """Inicia o processo host e as threads de leitura"""
+        argv = self.shell_argv + ['-NonInteractive', '-EncodedCommand', _encode_bootstrap(SESSION_BOOTSTRAP)]
+        self.process = subprocess.Popen(
+            argv,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE
+        )
+        self._lines = queue.Queue()
+
+        threading.Thread(target=self._read_stdout, args=(self.process, self._lines), daemon=True).start()
+        threading.Thread(target=self._drain_stderr, args=(self.process,), daemon=True).start()
+        logger.info(f"PowerShell session started (pid {self.process.pid})")
+
+    @staticmethod
+    def _read_stdout(process, lines: queue.Queue):
+        """Lê o stdout do host linha a linha (None sinaliza fim do processo)"""
+        try:
+            for raw in iter(process.stdout.readline, b''):
+                lines.put(raw.decode('utf-8', errors='replace').rstrip('\r\n'))
+        except (OSError, ValueError):
+            pass
+        finally:
+            lines.put(None)
+
+    @staticmethod
+    def _drain_stderr(process):
+        """Descarta o stderr do host para não bloquear o pipe"""
+        try:
+            for raw in iter(process.stderr.readline, b''):
+                logger.debug(f"PowerShell session stderr: {raw.decode('utf-8', errors='replace').rstrip()}")
+        except (OSError, ValueError):
+            pass
+
+    def is_alive(self) -> bool:
+        """Retorna True se o processo host ainda está em execução"""
+        return self.process is not None and self.process.poll() is None
+
+    def execute(self, command: str, timeout: int = 300,
+                timing: Optional[dict] = None) -> Tuple[bool, str, str]:
+        """
+        Executa um comando no host persistente.
+
+        Args:
+            command: Comando PowerShell
+            timeout: Tempo máximo de espera (segundos)
+            timing: Se informado, recebe 'spawned_at', 'first_output_at' (perf_counter)
+                e 'exit_code' (ver PowerShellManager.instrument_commands)
+
+        Returns:
+            Tuple of (success: bool, stdout: str, stderr: str)
+        """
+        if not self.is_alive():
+            self.start()
+        if timing is not None:
+            timing['spawned_at'] = time.perf_counter()
+
+        token = uuid.uuid4().hex
+        payload = base64.b64encode(command.encode('utf-8')).decode('ascii')
+
+        try:
+            with self._write_lock:
+                self.process.stdin.write(f"{token} {payload}\n".encode('ascii'))
+                self.process.stdin.flush()
+        except (OSError, ValueError) as e:
+            self.close()
+            return False, "", f"PowerShell session unavailable: {e}"
+
+        deadline = time.monotonic() + timeout
+        started = False
+        stdout_lines = []
+
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                logger.error(f"Command timed out after {timeout} seconds")
+                self.close()
+                return False, "", "Command timed out"
+
+            try:
+                line = self._lines.get(timeout=remaining)
+            except queue.Empty:
+                continue
+
+            if line is None:
+                self.close()
+                return False, "\n".join(stdout_lines), "PowerShell session terminated unexpectedly"
+
+            if not started:
+                # Ignorar qualquer saída residual antes do marcador de início
+                started = line == f"{BEGIN_MARKER} {token}"
+                continue
+
+            if line.startswith(f"{END_MARKER} {token}"):
+                parts = line.split(' ')
+                try:
+                    exit_code = int(parts[2])
+                except (IndexError, ValueError):
+                    exit_code = 1
+                stderr = ""
+                if len(parts) > 3 and parts[3]:
+                    stderr = base64.b64decode(parts[3]).decode('utf-8', errors='replace')
+                stdout = "\n".join(stdout_lines)
+                if stdout:
+                    stdout += "\n"
+                if timing is not None:
+                    timing['exit_code'] = exit_code
+                return exit_code == 0, stdout, stderr
+
+            if timing is not None and not stdout_lines:
+                timing['first_output_at'] = time.perf_counter()
+            stdout_lines.append(line)
+
+    def close(self):
+        """Encerra o processo host"""
+        process, self.process = self.process, None
+        if process is None:
+            return
+        try:
+            if process.poll() is None:
+                process.stdin.close()
+                try:
+                    process.wait(timeout=2)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+        except (OSError, ValueError):
+            try:
+                process.kill()
+            except OSError:
+                pass
+
+
+class PowerShellSessionPool:
+    """Pool de sessões PowerShell persistentes, seguro para uso entre threads"""
+
+    def __init__(self, size: int = 2, shell_argv: Optional[List[str]] = None):
+        """
+        Inicializa o pool (as sessões são criadas sob demanda).
+
+        Args:
+            size: Número máximo de hosts simultâneos
+            shell_argv: Comando base do host (padrão: DEFAULT_POWERSHELL_ARGV)
+        """
+        self.size = max(1, size)
+        self.shell_argv = list(shell_argv) if shell_argv else list(DEFAULT_POWERSHELL_ARGV)
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def warm_up(self, count: Optional[int] = None):
+        """Cria antecipadamente até 'count' sessões para esconder o cold start"""
+        count = self.size if count is None else min(count, self.size)
+        for _ in range(count):
+            with self._lock:
+                if self._created >= self.size:
+                    return
+                self._created += 1
+            session = PowerShellSession(self.shell_argv)
+            try:
+                session.start()
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                raise
+            self._idle.put(session)
+
+    def _acquire(self) -> PowerShellSession:
+        """Obtém uma sessão livre, criando uma nova se houver vaga"""
+        while True:
+            try:
+                return self._idle.get_nowait()
+            except queue.Empty:
+                pass
+
+            with self._lock:
+                if self._created < self.size:
+                    self._created += 1
+                    return PowerShellSession(self.shell_argv)
+
+            # Todas ocupadas: aguardar uma devolução (ou uma vaga por sessão descartada)
+            try:
+                return self._idle.get(timeout=0.1)
+            except queue.Empty:
+                continue
+
+    def _release(self, session: PowerShellSession):
+        """Devolve a sessão ao pool ou descarta se o host morreu"""
+        if session.is_alive() and not self._closed:
+            self._idle.put(session)
+        else:
+            session.close()
+            with self._lock:
+                self._created -= 1
+
+    def execute(self, command: str, timeout: int = 300,
+                timing: Optional[dict] = None) -> Tuple[bool, str, str]:
+        """
+        Executa um comando em uma sessão livre do pool.
+
+        Args:
+            timing: Ver PowerShellSession.execute; recebe também 'cold_start'
+                (True se o host precisou ser iniciado para este comando)
+
+        Returns:
+            Tuple of (success: bool, stdout: str, stderr: str)
+        """
+        session = self._acquire()
+        if timing is not None:
+            timing['cold_start'] = not session.is_alive()
+        try:
+            return session.execute(command, timeout, timing)
+        except Exception as e:
+            logger.error(f"Error executing command in session: {str(e)}")
+            session.close()
+            return False, "", str(e)
+        finally:
+            self._release(session)
+
+    def close(self):
+        """Encerra todas as sessões ociosas do pool"""
+        self._closed = True
+        while True:
+            try:
+                session = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            session.close()
+            with self._lock:
+                self._created -= 1
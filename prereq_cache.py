@@ -0,0 +1,172 @@
+"""
+prereq_cache.py - Cache de verificações de pré-requisitos (admin, winget, PSWindowsUpdate)
+
+Cada verificação abre um PowerShell (e 'Get-Module -ListAvailable' é lento),
+então os resultados são guardados por um tempo (TTL) e compartilhados por
+todas as interfaces (main.py, gui_main_window.py, auto_launcher.py). Entradas
+marcadas como persistentes também são gravadas em disco, para que uma nova
+execução poucos minutos depois não precise repetir as verificações.
+"""
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+# Validade padrão de uma verificação (segundos)
+DEFAULT_PREREQ_TTL = 600
+
+# Arquivo de persistência dentro do diretório de dados (app_paths)
+PREREQ_CACHE_FILE = 'prereq_cache.json'
+
+_shared_cache = None
+_shared_lock = threading.Lock()
+
+
+class PrerequisiteCache:
+    """Cache com TTL, invalidação explícita e persistência opcional em disco"""
+
+    def __init__(self, ttl: float = DEFAULT_PREREQ_TTL, path: Optional[str] = None,
+                 clock: Callable[[], float] = time.time):
+        """
+        Args:
+            ttl: Validade de cada entrada (segundos)
+            path: Arquivo JSON de persistência (None = apenas em memória)
+            clock: Fonte de tempo (substituível em testes)
+        """
+        self.ttl = ttl
+        self.path = path
+        self.clock = clock
+        self._entries = {}
+        self._lock = threading.RLock()
+        self._probe_locks = {}
+
+        if path:
+            self.load()
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """
+        Retorna o valor de uma verificação se ainda estiver válido.
+
+        Args:
+            key: Nome da verificação
+            default: Valor retornado quando ausente ou expirado
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            if self.clock() - entry['checked_at'] > self.ttl:
+                del self._entries[key]
+                return default
+            return entry['value']
+
+    def set(self, key: str, value: Any, persist: bool = True):
+        """
+        Guarda o resultado de uma verificação.
+
+        Args:
+            key: Nome da verificação
+            value: Resultado (precisa ser serializável em JSON se persistente)
+            persist: Gravar também em disco
+        """
+        with self._lock:
+            self._entries[key] = {'value': value, 'checked_at': self.clock(), 'persist': persist}
+            if persist:
+                self.save()
+
+    def invalidate(self, key: Optional[str] = None):
+        """
+        Descarta uma verificação (ou todas), forçando uma nova na próxima consulta.
+
+        Args:
+            key: Nome da verificação (None = todas)
+        """
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+            self.save()
+
+    def get_or_probe(self, key: str, probe: Callable[[], Any], persist: bool = True,
+                     cache_if: Callable[[Any], bool] = None) -> Any:
+        """
+        Retorna o valor em cache ou executa a verificação e guarda o resultado.
+
+        Verificações simultâneas da mesma chave executam o probe uma única vez.
+
+        Args:
+            key: Nome da verificação
+            probe: Função que executa a verificação
+            persist: Gravar o resultado em disco
+            cache_if: Predicado que decide se o resultado deve ser guardado
+                (ex: guardar apenas resultados positivos)
+        """
+        with self._lock:
+            probe_lock = self._probe_locks.setdefault(key, threading.Lock())
+
+        with probe_lock:
+            value = self.get(key)
+            if value is not None:
+                return value
+
+            value = probe()
+            if cache_if is None or cache_if(value):
+                self.set(key, value, persist)
+            return value
+
+    def load(self):
+        """Carrega as entradas persistidas ainda válidas"""
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            now = self.clock()
+            with self._lock:
+                for key, entry in data.items():
+                    if now - entry['checked_at'] <= self.ttl:
+                        self._entries[key] = {'value': entry['value'], 'checked_at': entry['checked_at'], 'persist': True}
+        except (OSError, ValueError, KeyError, TypeError, AttributeError) as e:
+            logger.warning(f"Cache de pré-requisitos ignorado: {e}")
+
+    def save(self):
+        """Grava as entradas persistentes (escrita atômica)"""
+        if not self.path:
+            return
+        with self._lock:
+            data = {
+                key: {'value': entry['value'], 'checked_at': entry['checked_at']}
+                for key, entry in self._entries.items() if entry['persist']
+            }
+        try:
+            temp_path = self.path + '.tmp'
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f)
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            logger.warning(f"Não foi possível salvar o cache de pré-requisitos: {e}")
+
+
+def get_shared_cache() -> PrerequisiteCache:
+    """
+    Retorna o cache compartilhado do processo, persistido no diretório de dados.
+
+    Returns:
+        PrerequisiteCache único por processo
+    """
+    global _shared_cache
+    with _shared_lock:
+        if _shared_cache is None:
+            from app_paths import get_data_path
+            try:
+                path = get_data_path(PREREQ_CACHE_FILE)
+            except OSError as e:
+                logger.warning(f"Cache de pré-requisitos apenas em memória: {e}")
+                path = None
+            _shared_cache = PrerequisiteCache(path=path)
+        return _shared_cache
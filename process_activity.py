@@ -0,0 +1,237 @@
+"""
+process_activity.py - Atividade de um processo e seus descendentes
+
+Um instalador travado não escreve nada e não consome CPU; um instalador lento,
+mas trabalhando, consome. HangWatch junta as duas coisas: a saída do processo
+(marcada por quem lê os pipes) e o tempo de CPU somado do processo e de todos
+os descendentes (o winget roda o instalador como processo filho). Sem saída e
+sem CPU por idle_timeout segundos, o processo é considerado travado. O spinner
+que o winget continua redesenhando enquanto espera um instalador travado não
+conta como saída (winget_parser.has_content).
+
+Instalações MSI rodam no serviço msiexec, fora da árvore do winget: durante
+elas só a saída conta, por isso o idle_timeout de cada pacote vem da duração
+de instalação registrada no histórico, e um pacote sem esse histórico não é
+encerrado por inatividade, só pelo timeout (ver upgrade_timeouts.py).
+
+Tempo de CPU:
+    Linux    /proc/<pid>/stat (inclui filhos já encerrados)
+    Windows  CreateToolhelp32Snapshot + GetProcessTimes (ctypes)
+    outros   indisponível (None): só a saída conta
+"""
+import logging
+import os
+import signal
+import subprocess
+import sys
+import time
+from typing import Callable, Dict, List, Optional
+
+from winget_parser import has_content
+
+logger = logging.getLogger(__name__)
+
+# CPU (fração de um núcleo) entre duas verificações que conta como atividade
+ACTIVITY_CPU_SHARE = 0.02
+
+# Intervalo máximo entre verificações de travamento (segundos)
+HANG_POLL_SECONDS = 1.0
+
+
+def _linux_children() -> Dict[int, List[int]]:
+    """Mapa pid -> filhos a partir de /proc"""
+    children = {}
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat', 'rb') as f:
+                fields = f.read().rsplit(b')', 1)[1].split()
+        except (OSError, IndexError):
+            continue
+        children.setdefault(int(fields[1]), []).append(int(entry))
+    return children
+
+
+def _linux_cpu_seconds(pid: int) -> Optional[float]:
+    """utime + stime + cutime + cstime de um processo (segundos)"""
+    try:
+        with open(f'/proc/{pid}/stat', 'rb') as f:
+            fields = f.read().rsplit(b')', 1)[1].split()
+    except (OSError, IndexError):
+        return None
+    # Campos 14-17 do stat; após o ')' o campo 3 (estado) é o índice 0
+    ticks = sum(int(value) for value in fields[11:15])
+    return ticks / os.sysconf('SC_CLK_TCK')
+
+
+def _descendants(pid: int, children: Dict[int, List[int]]) -> List[int]:
+    result = []
+    stack = [pid]
+    while stack:
+        for child in children.get(stack.pop(), ()):
+            if child not in result:
+                result.append(child)
+                stack.append(child)
+    return result
+
+
+def _kernel32():
+    """kernel32 com os tipos de HANDLE declarados (64 bits)"""
+    import ctypes
+    from ctypes import wintypes
+
+    kernel32 = ctypes.WinDLL('kernel32', use_last_error=True)
+    kernel32.CreateToolhelp32Snapshot.restype = wintypes.HANDLE
+    kernel32.CreateToolhelp32Snapshot.argtypes = [wintypes.DWORD, wintypes.DWORD]
+    kernel32.Process32FirstW.argtypes = [wintypes.HANDLE, ctypes.c_void_p]
+    kernel32.Process32NextW.argtypes = [wintypes.HANDLE, ctypes.c_void_p]
+    kernel32.OpenProcess.restype = wintypes.HANDLE
+    kernel32.OpenProcess.argtypes = [wintypes.DWORD, wintypes.BOOL, wintypes.DWORD]
+    kernel32.GetProcessTimes.argtypes = [wintypes.HANDLE] + [ctypes.c_void_p] * 4
+    kernel32.CloseHandle.argtypes = [wintypes.HANDLE]
+    return kernel32
+
+
+def _windows_children() -> Dict[int, List[int]]:
+    """Mapa pid -> filhos por CreateToolhelp32Snapshot"""
+    import ctypes
+    from ctypes import wintypes
+
+    class PROCESSENTRY32W(ctypes.Structure):
+        _fields_ = [('dwSize', wintypes.DWORD), ('cntUsage', wintypes.DWORD),
+                    ('th32ProcessID', wintypes.DWORD), ('th32DefaultHeapID', ctypes.c_void_p),
+                    ('th32ModuleID', wintypes.DWORD), ('cntThreads', wintypes.DWORD),
+                    ('th32ParentProcessID', wintypes.DWORD), ('pcPriClassBase', ctypes.c_long),
+                    ('dwFlags', wintypes.DWORD), ('szExeFile', ctypes.c_wchar * 260)]
+
+    kernel32 = _kernel32()
+    snapshot = kernel32.CreateToolhelp32Snapshot(0x00000002, 0)  # TH32CS_SNAPPROCESS
+    if not snapshot or snapshot == wintypes.HANDLE(-1).value:
+        return {}
+    children = {}
+    try:
+        entry = PROCESSENTRY32W()
+        entry.dwSize = ctypes.sizeof(PROCESSENTRY32W)
+        more = kernel32.Process32FirstW(snapshot, ctypes.byref(entry))
+        while more:
+            children.setdefault(entry.th32ParentProcessID, []).append(entry.th32ProcessID)
+            more = kernel32.Process32NextW(snapshot, ctypes.byref(entry))
+    finally:
+        kernel32.CloseHandle(snapshot)
+    return children
+
+
+def _windows_cpu_seconds(pid: int) -> Optional[float]:
+    """Tempo de kernel + usuário de um processo por GetProcessTimes (segundos)"""
+    import ctypes
+    from ctypes import wintypes
+
+    kernel32 = _kernel32()
+    handle = kernel32.OpenProcess(0x1000, False, pid)  # PROCESS_QUERY_LIMITED_INFORMATION
+    if not handle:
+        return None
+    try:
+        times = [wintypes.FILETIME() for _ in range(4)]
+        if not kernel32.GetProcessTimes(handle, *[ctypes.byref(t) for t in times]):
+            return None
+        # creation, exit, kernel, user; unidades de 100 ns
+        return sum((t.dwHighDateTime << 32 | t.dwLowDateTime) for t in times[2:]) / 1e7
+    finally:
+        kernel32.CloseHandle(handle)
+
+
+def process_tree_cpu_seconds(pid: int) -> Optional[float]:
+    """
+    Tempo de CPU somado de um processo e de todos os seus descendentes.
+
+    Returns:
+        Segundos de CPU, ou None se indisponível nesta plataforma ou se o
+        processo já terminou
+    """
+    try:
+        if sys.platform.startswith('linux'):
+            children, cpu_seconds = _linux_children, _linux_cpu_seconds
+        elif sys.platform == 'win32':
+            children, cpu_seconds = _windows_children, _windows_cpu_seconds
+        else:
+            return None
+        own = cpu_seconds(pid)
+        if own is None:
+            return None
+        return own + sum(cpu_seconds(child) or 0.0 for child in _descendants(pid, children()))
+    except (OSError, ValueError, AttributeError) as e:
+        logger.debug(f"CPU time unavailable for {pid}: {e}")
+        return None
+
+
+def kill_process_tree(process: subprocess.Popen):
+    """Encerra o processo e seus descendentes (o instalador iniciado pelo winget)"""
+    try:
+        if sys.platform == 'win32':
+            subprocess.run(['taskkill', '/F', '/T', '/PID', str(process.pid)],
+                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=30)
+        elif sys.platform.startswith('linux'):
+            for child in reversed(_descendants(process.pid, _linux_children())):
+                try:
+                    os.kill(child, signal.SIGKILL)
+                except OSError:
+                    pass
+    except (OSError, subprocess.SubprocessError) as e:
+        logger.warning(f"Could not kill process tree of {process.pid}: {e}")
+    try:
+        if process.poll() is None:
+            process.kill()
+        process.wait(timeout=5)
+    except (OSError, subprocess.TimeoutExpired):
+        pass
+
+
+class HangWatch:
+    """Detecta um processo sem saída e sem consumo de CPU por idle_timeout segundos"""
+
+    def __init__(self, pid: int, idle_timeout: float, clock: Callable[[], float] = time.monotonic,
+                 cpu_seconds: Callable[[int], Optional[float]] = process_tree_cpu_seconds):
+        """
+        Args:
+            pid: Processo observado (com os descendentes)
+            idle_timeout: Segundos sem saída e sem CPU para considerar travado
+            clock: Fonte de tempo (substituível em testes)
+            cpu_seconds: Leitura do tempo de CPU da árvore (substituível em testes)
+        """
+        self.pid = pid
+        self.idle_timeout = idle_timeout
+        self.clock = clock
+        self.cpu_seconds = cpu_seconds
+        self.last_activity = clock()
+        self._checked_at = self.last_activity
+        self._cpu = cpu_seconds(pid)
+
+    @property
+    def poll_seconds(self) -> float:
+        """Intervalo entre verificações"""
+        return max(0.05, min(HANG_POLL_SECONDS, self.idle_timeout / 4))
+
+    def activity(self):
+        """Marca atividade"""
+        self.last_activity = self.clock()
+
+    def output(self, data: bytes):
+        """Marca atividade se um bloco lido dos pipes traz algo além do spinner do winget"""
+        if has_content(data.decode('utf-8', errors='replace')):
+            self.activity()
+
+    def idle_seconds(self) -> float:
+        """Segundos desde a última saída ou consumo de CPU"""
+        return self.clock() - self.last_activity
+
+    def hung(self) -> bool:
+        """Lê o tempo de CPU e diz se o processo está travado"""
+        now = self.clock()
+        cpu = self.cpu_seconds(self.pid)
+        if cpu is not None and self._cpu is not None:
+            if cpu - self._cpu >= ACTIVITY_CPU_SHARE * max(now - self._checked_at, self.poll_seconds):
+                self.last_activity = now
+        self._cpu = cpu if cpu is not None else self._cpu
+        self._checked_at = now
+        return now - self.last_activity >= self.idle_timeout
@@ -0,0 +1,36 @@
+"""
+script_checks.py - Verificações compartilhadas pelos scripts de teste (test_*.py)
+
+Os scripts rodam sozinhos (python test_x.py, com o resumo de main()) e pelo
+pytest. Para o pytest acusar uma regressão o teste precisa levantar exceção:
+um 'return False' passaria despercebido. report_checks e fail imprimem o
+resultado como antes (✓/❌) e levantam AssertionError nas falhas; main()
+de cada script já conta uma exceção como teste que falhou.
+"""
+
+
+def report_checks(checks: dict) -> bool:
+    """
+    Imprime cada verificação e falha se alguma não passou.
+
+    Args:
+        checks: Dicionário nome -> resultado
+
+    Returns:
+        True (todas passaram)
+
+    Raises:
+        AssertionError: com os nomes das verificações que falharam
+    """
+    for name, passed in checks.items():
+        print(f"{'✓' if passed else '❌'} {name}")
+    failed = [name for name, passed in checks.items() if not passed]
+    if failed:
+        raise AssertionError(f"Verificações falharam: {', '.join(failed)}")
+    return True
+
+
+def fail(message: str):
+    """Imprime a falha e levanta AssertionError"""
+    print(f"❌ {message}")
+    raise AssertionError(message)
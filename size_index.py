@@ -0,0 +1,207 @@
+"""
+size_index.py - Índice persistente de tamanho por pasta (caminho + mtime)
+
+Calcular o tamanho dos caches percorrendo todos os arquivos leva dezenas de
+segundos em máquinas com caches grandes. O índice guarda, para cada pasta, o
+mtime do diretório, os bytes e arquivos diretos e as subpastas. A mtime de um
+diretório muda quando entradas são criadas, apagadas ou renomeadas nele, então
+numa nova varredura só as pastas alteradas são listadas de novo; as demais
+custam um único stat. O índice também permite uma estimativa instantânea, sem
+acessar o disco, a partir da última varredura.
+
+Limitação: arquivos reescritos no lugar (sem criar/apagar entradas) não mudam a
+mtime da pasta, então o tamanho é uma estimativa, não uma medida exata.
+"""
+import json
+import logging
+import os
+import threading
+from typing import Optional, Tuple
+
+from cleanup_engine import is_link
+
+logger = logging.getLogger(__name__)
+
+# Arquivo de persistência dentro do diretório de dados (app_paths)
+SIZE_INDEX_FILE = 'size_index.json'
+
+# Versão do formato gravado em disco
+SIZE_INDEX_VERSION = 1
+
+_shared_index = None
+_shared_lock = threading.Lock()
+
+
+def _key(path: str) -> str:
+    """Chave de uma pasta no índice"""
+    return os.path.normcase(os.path.abspath(path))
+
+
+def _scan_directory(path: str, mtime_ns: int) -> dict:
+    """Lista uma única pasta e retorna sua entrada de índice"""
+    entry = {'mtime_ns': mtime_ns, 'bytes': 0, 'files': 0, 'dirs': []}
+    with os.scandir(path) as entries:
+        for item in entries:
+            try:
+                if is_link(item):
+                    continue
+                if item.is_dir(follow_symlinks=False):
+                    entry['dirs'].append(item.name)
+                else:
+                    entry['bytes'] += item.stat(follow_symlinks=False).st_size
+                    entry['files'] += 1
+            except OSError as e:
+                logger.debug(f"Erro ao obter tamanho de {item.path}: {e}")
+    return entry
+
+
+class SizeIndex:
+    """Índice de tamanho por pasta com revarredura incremental"""
+
+    def __init__(self, path: Optional[str] = None):
+        """
+        Args:
+            path: Arquivo JSON de persistência (None = apenas em memória)
+        """
+        self.path = path
+        self._entries = {}
+        self._lock = threading.RLock()
+        # Pastas listadas de novo na última chamada de refresh (diagnóstico)
+        self.rescanned = 0
+
+        if path:
+            self.load()
+
+    def estimate(self, root: str) -> Optional[Tuple[int, int]]:
+        """
+        Soma o tamanho de uma pasta usando apenas o índice (sem acessar o disco).
+
+        Args:
+            root: Pasta a estimar
+
+        Returns:
+            Tupla (tamanho_bytes, num_arquivos), ou None se a pasta nunca foi indexada
+        """
+        with self._lock:
+            if _key(root) not in self._entries:
+                return None
+            total_size = 0
+            file_count = 0
+            stack = [root]
+            while stack:
+                dir_path = stack.pop()
+                entry = self._entries.get(_key(dir_path))
+                if entry is None:
+                    continue
+                total_size += entry['bytes']
+                file_count += entry['files']
+                stack.extend(os.path.join(dir_path, name) for name in entry['dirs'])
+            return total_size, file_count
+
+    def refresh(self, root: str) -> Tuple[int, int]:
+        """
+        Atualiza o índice de uma pasta, listando só os diretórios alterados.
+
+        Args:
+            root: Pasta a medir
+
+        Returns:
+            Tupla (tamanho_bytes, num_arquivos)
+        """
+        total_size = 0
+        file_count = 0
+        rescanned = 0
+        seen = set()
+        stack = [root]
+
+        while stack:
+            dir_path = stack.pop()
+            key = _key(dir_path)
+            try:
+                # stat antes da listagem: mudanças durante a listagem geram nova mtime
+                mtime_ns = os.stat(dir_path).st_mtime_ns
+                with self._lock:
+                    entry = self._entries.get(key)
+                if entry is None or entry['mtime_ns'] != mtime_ns:
+                    entry = _scan_directory(dir_path, mtime_ns)
+                    rescanned += 1
+                    with self._lock:
+                        self._entries[key] = entry
+            except OSError as e:
+                logger.debug(f"Erro ao processar pasta {dir_path}: {e}")
+                continue
+
+            seen.add(key)
+            total_size += entry['bytes']
+            file_count += entry['files']
+            stack.extend(os.path.join(dir_path, name) for name in entry['dirs'])
+
+        self._prune(root, seen)
+        self.rescanned = rescanned
+        return total_size, file_count
+
+    def _prune(self, root: str, seen: set):
+        """Remove do índice as pastas que não existem mais sob 'root'"""
+        root_key = _key(root)
+        prefix = root_key if root_key.endswith(os.sep) else root_key + os.sep
+        with self._lock:
+            stale = [key for key in self._entries
+                     if (key == root_key or key.startswith(prefix)) and key not in seen]
+            for key in stale:
+                del self._entries[key]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def load(self):
+        """Carrega o índice gravado em disco"""
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') != SIZE_INDEX_VERSION:
+                return
+            with self._lock:
+                self._entries = {
+                    key: {'mtime_ns': int(entry['mtime_ns']), 'bytes': int(entry['bytes']),
+                          'files': int(entry['files']), 'dirs': list(entry['dirs'])}
+                    for key, entry in data['entries'].items()
+                }
+        except (OSError, ValueError, KeyError, TypeError, AttributeError) as e:
+            logger.warning(f"Índice de tamanhos ignorado: {e}")
+
+    def save(self):
+        """Grava o índice (escrita atômica)"""
+        if not self.path:
+            return
+        with self._lock:
+            data = {'version': SIZE_INDEX_VERSION, 'entries': dict(self._entries)}
+            try:
+                temp_path = self.path + '.tmp'
+                with open(temp_path, 'w', encoding='utf-8') as f:
+                    json.dump(data, f, separators=(',', ':'))
+                os.replace(temp_path, self.path)
+            except OSError as e:
+                logger.warning(f"Não foi possível salvar o índice de tamanhos: {e}")
+
+
+def get_shared_size_index() -> SizeIndex:
+    """
+    Retorna o índice compartilhado do processo, persistido no diretório de dados.
+
+    Returns:
+        SizeIndex único por processo
+    """
+    global _shared_index
+    with _shared_lock:
+        if _shared_index is None:
+            from app_paths import get_data_path
+            try:
+                path = get_data_path(SIZE_INDEX_FILE)
+            except OSError as e:
+                logger.warning(f"Índice de tamanhos apenas em memória: {e}")
+                path = None
+            _shared_index = SizeIndex(path=path)
+        return _shared_index
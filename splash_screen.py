@@ -1,25 +1,32 @@
 """
 splash_screen.py - Tela de inicialização com loading em modo gráfico
+
+A barra acompanha um StartupTaskGraph (startup_tasks.py): a splash fecha assim
+que as tarefas críticas terminam, em vez de esperar um tempo fixo. Pillow é
+opcional (sem ele, a splash aparece sem a imagem).
 """
 import tkinter as tk
 from tkinter import ttk
-from PIL import Image, ImageTk
 import os
-import threading
 import time
 from typing import Callable
 
+from gui_constants import SPLASH_MAX_WAIT_MS, SPLASH_POLL_INTERVAL_MS
+from startup_tasks import StartupTaskGraph
+
 class SplashScreen:
     """Tela de splash com imagem de carregamento"""
     
-    def __init__(self, parent=None, image_path: str = None, duration: float = 3.0):
+    def __init__(self, parent=None, image_path: str = None, startup: StartupTaskGraph = None,
+                 max_wait_ms: int = SPLASH_MAX_WAIT_MS):
         """
         Inicializa a tela de splash
         
         Args:
             parent: Janela pai (opcional)
             image_path: Caminho para a imagem loading.png
-            duration: Duração da animação em segundos
+            startup: Grafo de inicialização já iniciado (None = nada a aguardar)
+            max_wait_ms: Espera máxima pelas tarefas críticas antes de liberar a janela
         """
         self.root = tk.Toplevel(parent) if parent else tk.Tk()
         self.root.title("Carregando...")
@@ -27,7 +34,8 @@ class SplashScreen:
         self.root.attributes('-topmost', True)
         self.root.attributes('-alpha', 0.95)
         
-        self.duration = duration
+        self.startup = startup
+        self.max_wait = max_wait_ms / 1000.0
         self.image_path = image_path
         self.start_time = time.time()
         self.is_running = True
@@ -38,8 +46,8 @@ class SplashScreen:
         self._setup_ui()
         self._center_window()
         
-        # Iniciar animação
-        self._animate()
+        # Iniciar acompanhamento no laço (depois de os callbacks serem definidos)
+        self.root.after(0, self._animate)
     
     def _setup_ui(self):
         """Configura a interface da tela de splash"""
@@ -59,6 +67,7 @@ class SplashScreen:
         self.image_label = None
         if self.image_path and os.path.exists(self.image_path):
             try:
+                from PIL import Image, ImageTk
                 image = Image.open(self.image_path)
                 # Redimensionar se necessário
                 image.thumbnail((300, 200), Image.Resampling.LANCZOS)
@@ -131,38 +140,36 @@ class SplashScreen:
         self.root.geometry(f"{width}x{height}+{x}+{y}")
     
     def _animate(self):
-        """Anima o progresso da barra"""
+        """Atualiza a barra com o progresso real das tarefas críticas"""
         if not self.is_running:
             return
         
-        elapsed = time.time() - self.start_time
-        progress = min((elapsed / self.duration) * 100, 100)
+        if self.startup is None:
+            progress, status, done = 100, "Pronto", True
+        else:
+            progress = self.startup.progress()
+            status = self.startup.current_label() or "Carregando componentes..."
+            done = self.startup.critical_done
+        
+        # Tarefa travada: liberar a janela principal e deixar o grafo seguir em segundo plano
+        if not done and time.time() - self.start_time > self.max_wait:
+            done = True
         
         self.progress_var.set(progress)
         self.percent_label.config(text=f"{int(progress)}%")
-        
-        # Status alternado
-        statuses = [
-            "Carregando componentes...",
-            "Inicializando sistema...",
-            "Preparando interface...",
-            "Quase pronto...",
-        ]
-        status_index = int((progress / 100) * len(statuses))
-        if status_index < len(statuses):
-            self.status_label.config(text=statuses[status_index])
+        self.status_label.config(text=status)
         
         if self._callback:
             self._callback(int(progress))
         
         # Verificar se terminou
-        if progress >= 100:
+        if done:
             self.is_running = False
             if self._complete_callback:
                 self._complete_callback()
-            self.root.after(500, self._close)
+            self._close()
         else:
-            self.root.after(50, self._animate)
+            self.root.after(SPLASH_POLL_INTERVAL_MS, self._animate)
     
     def _close(self):
         """Fecha a janela de splash"""
@@ -190,16 +197,20 @@ class SplashScreen:
 
 
 def test_splash():
-    """Testa a tela de splash"""
+    """Testa a tela de splash com tarefas de exemplo"""
     root = tk.Tk()
     root.withdraw()
     
     # Caminho da imagem
     image_path = os.path.join(os.path.dirname(__file__), 'img', 'loading.png')
     
-    splash = SplashScreen(root, image_path=image_path, duration=3.0)
+    startup = StartupTaskGraph()
+    startup.add('primeira', "Primeira tarefa...", lambda: time.sleep(1.0))
+    startup.add('segunda', "Segunda tarefa...", lambda: time.sleep(1.0), depends=('primeira',))
+    startup.start()
     
-    root.after(3500, root.quit)
+    splash = SplashScreen(root, image_path=image_path, startup=startup)
+    splash.set_complete_callback(root.quit)
     root.mainloop()
 
 
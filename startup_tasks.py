@@ -0,0 +1,260 @@
+"""
+startup_tasks.py - Grafo de tarefas de inicialização (aquecimento real na splash)
+
+A splash deixa de contar tempo fixo e passa a acompanhar trabalho que a
+aplicação faria de qualquer forma logo depois de abrir:
+
+1. Aquecer uma sessão PowerShell persistente (cold start do host)
+2. Verificar pré-requisitos (admin, módulo Microsoft.WinGet.Client)
+3. Atualizar o catálogo de aplicativos atualizáveis, se não estiver recente
+   (consulta lenta ao winget, ver upgrade_catalog.py)
+4. Carregar o índice de tamanhos usado pelo diálogo de limpeza
+
+Cada tarefa roda numa thread própria assim que suas dependências terminam.
+As tarefas críticas definem quando a janela principal pode aparecer e o
+percentual da barra; as demais continuam em segundo plano depois disso.
+Uma dependência que falhou não bloqueia as seguintes: o aquecimento é só
+uma antecipação, e a tarefa seguinte faz o mesmo trabalho se for preciso.
+
+O grafo não toca em widgets: a splash consulta progress() e current_label()
+a partir da thread do Tk.
+"""
+import logging
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Estados de uma tarefa
+TASK_PENDING = 'pendente'
+TASK_RUNNING = 'executando'
+TASK_DONE = 'concluída'
+TASK_FAILED = 'falhou'
+
+
+class StartupTask:
+    """Uma etapa do aquecimento com dependências e peso na barra de progresso"""
+
+    def __init__(self, name: str, label: str, func: Callable[[], object],
+                 depends: Iterable[str] = (), critical: bool = True, weight: float = 1.0):
+        """
+        Args:
+            name: Identificador da tarefa (usado em 'depends')
+            label: Texto exibido na splash enquanto a tarefa roda
+            func: Trabalho a executar (o retorno fica em 'result')
+            depends: Nomes das tarefas que precisam terminar antes
+            critical: Se a janela principal deve esperar por esta tarefa
+            weight: Fração relativa da barra de progresso
+        """
+        self.name = name
+        self.label = label
+        self.func = func
+        self.depends = tuple(depends)
+        self.critical = critical
+        self.weight = max(0.0, weight)
+        self.state = TASK_PENDING
+        self.result = None
+        self.error = None
+        self.seconds = None
+
+    @property
+    def finished(self) -> bool:
+        return self.state in (TASK_DONE, TASK_FAILED)
+
+
+class StartupTaskGraph:
+    """Executa tarefas de inicialização em paralelo respeitando dependências"""
+
+    def __init__(self):
+        self._tasks: Dict[str, StartupTask] = {}
+        self._order: List[str] = []
+        self._started = False
+        self._last_label = ""
+        self._cond = threading.Condition()
+
+    def add(self, name: str, label: str, func: Callable[[], object],
+            depends: Iterable[str] = (), critical: bool = True,
+            weight: float = 1.0) -> StartupTask:
+        """
+        Registra uma tarefa (antes de start).
+
+        Returns:
+            A tarefa criada
+
+        Raises:
+            ValueError: Nome repetido, dependência desconhecida ou grafo já iniciado
+        """
+        if self._started:
+            raise ValueError("Grafo de inicialização já iniciado")
+        if name in self._tasks:
+            raise ValueError(f"Tarefa repetida: {name}")
+        missing = [dep for dep in depends if dep not in self._tasks]
+        if missing:
+            raise ValueError(f"Dependência desconhecida para '{name}': {', '.join(missing)}")
+        task = StartupTask(name, label, func, depends, critical, weight)
+        self._tasks[name] = task
+        self._order.append(name)
+        return task
+
+    def start(self):
+        """Dispara as tarefas sem dependências (retorna imediatamente)"""
+        with self._cond:
+            if self._started:
+                return
+            self._started = True
+            ready = self._collect_ready()
+        self._launch(ready)
+
+    def _collect_ready(self) -> List[StartupTask]:
+        """Marca como em execução as tarefas pendentes com dependências resolvidas (com o lock)"""
+        ready = []
+        for name in self._order:
+            task = self._tasks[name]
+            if task.state == TASK_PENDING and all(self._tasks[dep].finished for dep in task.depends):
+                task.state = TASK_RUNNING
+                ready.append(task)
+        return ready
+
+    def _launch(self, tasks: List[StartupTask]):
+        # Threads daemon: uma consulta lenta ao winget não segura o fechamento da aplicação
+        for task in tasks:
+            threading.Thread(target=self._run_task, args=(task,), daemon=True,
+                             name=f"startup-{task.name}").start()
+
+    def _run_task(self, task: StartupTask):
+        start = time.perf_counter()
+        try:
+            result, error = task.func(), None
+        except Exception as e:
+            result, error = None, e
+            logger.warning(f"Tarefa de inicialização '{task.name}' falhou: {e}")
+        seconds = time.perf_counter() - start
+
+        with self._cond:
+            task.result = result
+            task.error = error
+            task.seconds = seconds
+            task.state = TASK_DONE if error is None else TASK_FAILED
+            self._last_label = task.label
+            ready = self._collect_ready()
+            self._cond.notify_all()
+        logger.info(f"Tarefa de inicialização '{task.name}': {task.state} em {seconds:.2f}s")
+        self._launch(ready)
+
+    def _tasks_where(self, critical_only: bool) -> List[StartupTask]:
+        return [self._tasks[name] for name in self._order
+                if self._tasks[name].critical or not critical_only]
+
+    def progress(self) -> int:
+        """Percentual concluído das tarefas críticas, pelo peso (0-100)"""
+        with self._cond:
+            tasks = self._tasks_where(critical_only=True)
+            total = sum(task.weight for task in tasks)
+            if total <= 0:
+                return 100 if all(task.finished for task in tasks) else 0
+            done = sum(task.weight for task in tasks if task.finished)
+        return int(done * 100 / total)
+
+    def current_label(self) -> str:
+        """Texto da tarefa crítica em execução (ou da última que terminou)"""
+        with self._cond:
+            for task in self._tasks_where(critical_only=True):
+                if task.state == TASK_RUNNING:
+                    return task.label
+            return self._last_label
+
+    @property
+    def critical_done(self) -> bool:
+        """Se todas as tarefas críticas terminaram (com sucesso ou não)"""
+        with self._cond:
+            return self._started and all(task.finished for task in self._tasks_where(critical_only=True))
+
+    @property
+    def all_done(self) -> bool:
+        with self._cond:
+            return self._started and all(task.finished for task in self._tasks.values())
+
+    def wait(self, timeout: Optional[float] = None, critical_only: bool = True) -> bool:
+        """
+        Aguarda as tarefas críticas (ou todas) terminarem.
+
+        Returns:
+            True se terminaram antes do timeout
+        """
+        with self._cond:
+            return self._cond.wait_for(
+                lambda: self._started and all(task.finished for task in self._tasks_where(critical_only)),
+                timeout)
+
+    def get(self, name: str) -> StartupTask:
+        return self._tasks[name]
+
+    def summary(self) -> List[dict]:
+        """Estado e duração de cada tarefa, na ordem de registro"""
+        with self._cond:
+            return [{'name': task.name, 'state': task.state, 'critical': task.critical,
+                     'seconds': task.seconds, 'error': str(task.error) if task.error else None}
+                    for task in (self._tasks[name] for name in self._order)]
+
+
+def build_gui_startup_graph(ps_manager, size_index_loader: Optional[Callable[[], object]] = None) -> StartupTaskGraph:
+    """
+    Monta o aquecimento do modo gráfico para um PowerShellManager.
+
+    A sessão PowerShell e os pré-requisitos são críticos (a janela principal
+    os usa logo de início); o catálogo de atualizações e o índice de tamanhos
+    continuam em segundo plano.
+
+    Args:
+        ps_manager: Gerenciador usado depois pela janela principal
+        size_index_loader: Carrega o índice de tamanhos (padrão: índice compartilhado)
+
+    Returns:
+        Grafo ainda não iniciado
+    """
+    if size_index_loader is None:
+        from size_index import get_shared_size_index
+        size_index_loader = get_shared_size_index
+
+    def warm_up_session():
+        if ps_manager.session_pool is not None:
+            ps_manager.session_pool.warm_up(1)
+
+    def probe_prerequisites():
+        return {
+            'admin': ps_manager.check_admin_privileges(),
+            'winget_client': ps_manager.detect_winget_client(),
+        }
+
+    graph = StartupTaskGraph()
+    graph.add('session', "Iniciando sessão PowerShell...", warm_up_session, weight=3)
+    graph.add('prereqs', "Verificando pré-requisitos...", probe_prerequisites,
+              depends=('session',), weight=2)
+    graph.add('upgradable', "Atualizando catálogo de aplicativos...",
+              ps_manager.refresh_upgrade_catalog, depends=('prereqs',), critical=False)
+    graph.add('size_index', "Carregando índice de tamanhos...", size_index_loader, critical=False)
+    return graph
+
+
+def start_gui_startup():
+    """
+    Cria o PowerShellManager do modo gráfico e dispara o aquecimento.
+
+    Chamado antes de criar a splash, para que o trabalho comece enquanto o
+    Tk monta as janelas.
+
+    Returns:
+        Tupla (ps_manager, grafo_iniciado); o gerenciador deve ser entregue à
+        janela principal (MeninoDeTIHelperGUI(root, ps_manager=...))
+    """
+    from powershell_manager import PowerShellManager
+    from upgrade_catalog import get_shared_catalog
+    from upgrade_history import get_shared_history
+    from upgrade_scheduler import DEFAULT_UPGRADE_WORKERS
+
+    ps_manager = PowerShellManager(use_session_pool=True, pool_size=DEFAULT_UPGRADE_WORKERS,
+                                   catalog=get_shared_catalog(), history=get_shared_history())
+    graph = build_gui_startup_graph(ps_manager)
+    graph.start()
+    return ps_manager, graph
@@ -0,0 +1,304 @@
+# -*- coding: utf-8 -*-
+"""
+stub_powershell.py - PowerShell falso para testes em Linux
+
+Interpreta um vocabulário mínimo de comandos e fala o mesmo protocolo de
+enquadramento das sessões persistentes (powershell_session.py).
+
+Uso:
+    python stub_powershell.py [...] -Command "<comando>"        (execução única)
+    python stub_powershell.py [...] -EncodedCommand <ignorado>  (modo sessão)
+
+Comandos suportados:
+    Write-Output <texto> / echo <texto>
+    Write-Error <texto>
+    Start-Sleep -Seconds <n> / -Milliseconds <n>
+    $PID
+    $null
+    exit <código>
+    winget <args>   (delegado ao stub_winget.py)
+    Get-Module -ListAvailable -Name <módulo>  (módulos em STUB_PS_MODULES)
+    Get-Command <nome> [...]  (só 'winget' existe)
+    Import-Module <módulo>
+    Get-WindowsUpdate ...  (reproduz a transcrição em STUB_WU_TRANSCRIPT,
+                            com STUB_WU_LINE_SECONDS entre as linhas)
+
+Sem transcrição, STUB_WU_UPDATES=N simula N atualizações com latência por fase:
+    STUB_WU_SCAN_SECONDS      Busca (padrão: 0)
+    STUB_WU_DOWNLOAD_SECONDS  Download por atualização (padrão: 0)
+    STUB_WU_INSTALL_SECONDS   Instalação por atualização, com o mesmo lock de
+                              instalação do stub_winget (padrão: 0)
+    STUB_WU_CACHE             Arquivo que guarda o que já foi baixado: com
+                              -Download só busca e baixa; um -Install depois
+                              não baixa de novo
+
+STUB_PS_STARTUP_SECONDS simula o cold start do host (padrão: 0), pago uma vez
+por processo (-Command) ou por sessão (-EncodedCommand).
+"""
+import base64
+import os
+import shlex
+import sys
+import time
+
+BEGIN_MARKER = "@@MTI-BEGIN@@"
+END_MARKER = "@@MTI-END@@"
+
+
+class StubExit(Exception):
+    """Sinaliza um 'exit <código>' dentro do script"""
+
+    def __init__(self, code):
+        super().__init__(code)
+        self.code = code
+
+
+def _unquote(text: str) -> str:
+    """Remove aspas simples/duplas externas"""
+    text = text.strip()
+    if len(text) >= 2 and text[0] == text[-1] and text[0] in "'\"":
+        return text[1:-1]
+    return text
+
+
+def _cmd_write_output(args, out, err):
+    out.append(_unquote(args))
+    return 0
+
+
+def _cmd_write_error(args, out, err):
+    err.append(_unquote(args))
+    return 1
+
+
+def _cmd_start_sleep(args, out, err):
+    parts = args.split()
+    seconds = 0.0
+    for i, part in enumerate(parts):
+        if part.lower() in ('-seconds', '-s') and i + 1 < len(parts):
+            seconds = float(parts[i + 1])
+        elif part.lower() in ('-milliseconds', '-m') and i + 1 < len(parts):
+            seconds = float(parts[i + 1]) / 1000.0
+        elif i == 0 and not part.startswith('-'):
+            seconds = float(part)
+    time.sleep(seconds)
+    return 0
+
+
+def _cmd_exit(args, out, err):
+    raise StubExit(int(args.strip() or 0))
+
+
+def _cmd_winget(args, out, err):
+    import stub_winget
+    code, _ = stub_winget.run(shlex.split(args), out)
+    return code
+
+
+def _cmd_get_module(args, out, err):
+    # Módulos "instalados" vêm de STUB_PS_MODULES (separados por vírgula)
+    parts = args.split()
+    name = parts[parts.index('-Name') + 1] if '-Name' in parts and parts.index('-Name') + 1 < len(parts) else ''
+    modules = [m.strip() for m in os.environ.get('STUB_PS_MODULES', 'PSWindowsUpdate').split(',')]
+    if name in modules:
+        out.append(f"Script     2.2.1.5    {name}")
+    return 0
+
+
+def _cmd_get_command(args, out, err):
+    # Só o winget (delegado ao stub_winget.py) é um comando conhecido
+    parts = args.split()
+    if parts and parts[0].lower() == 'winget':
+        out.append("Application     winget.exe     1.7.10861.0    stub_winget.py")
+    return 0
+
+
+def _cmd_import_module(args, out, err):
+    return 0
+
+
+def _simulate_windows_update(count, args, out):
+    """Busca, download e instalação de atualizações sintéticas (formato do PSWindowsUpdate)"""
+    import stub_winget
+
+    scan = float(os.environ.get('STUB_WU_SCAN_SECONDS', 0))
+    download = float(os.environ.get('STUB_WU_DOWNLOAD_SECONDS', 0))
+    install = float(os.environ.get('STUB_WU_INSTALL_SECONDS', 0))
+    cache = os.environ.get('STUB_WU_CACHE')
+    downloaded = set()
+    if cache and os.path.exists(cache):
+        with open(cache, 'r', encoding='utf-8') as f:
+            downloaded = {line.strip() for line in f if line.strip()}
+
+    updates = [(f"KB50{i:05d}", f"Stub Update {i} (KB50{i:05d})") for i in range(count)]
+    row = "{step} DESKTOP-STUB {result:<10} {kb} 100MB {title}"
+
+    out.append("VERBOSE: DESKTOP-STUB: Connecting to Microsoft Update server. Please wait...")
+    time.sleep(scan)
+    out.append(f"VERBOSE: Found [{count}] Updates in post search criteria")
+    out.append("")
+    out.append("X ComputerName Result     KB          Size Title")
+    out.append("- ------------ ------     --          ---- -----")
+    for kb, title in updates:
+        out.append(row.format(step=1, result='Accepted', kb=kb, title=title))
+    out.append(f"VERBOSE: Accepted [{count}] Updates ready to Download")
+    for kb, title in updates:
+        if kb not in downloaded:
+            time.sleep(download)
+            downloaded.add(kb)
+        out.append(row.format(step=2, result='Downloaded', kb=kb, title=title))
+    if cache:
+        with open(cache, 'w', encoding='utf-8') as f:
+            f.write("\n".join(sorted(downloaded)))
+    if '-install' not in args.lower():
+        return 0
+
+    out.append(f"VERBOSE: Downloaded [{count}] Updates ready to Install")
+    for kb, title in updates:
+        with stub_winget._InstallLock(stub_winget.install_lock_path()):
+            time.sleep(install)
+        out.append(row.format(step=3, result='Installed', kb=kb, title=title))
+    out.append(f"VERBOSE: Installed [{count}] Updates")
+    return 0
+
+
+def _cmd_get_windowsupdate(args, out, err):
+    # Reproduz uma transcrição gravada, com atraso opcional entre as linhas
+    transcript = os.environ.get('STUB_WU_TRANSCRIPT')
+    if not transcript:
+        count = os.environ.get('STUB_WU_UPDATES')
+        return _simulate_windows_update(int(count), args, out) if count else 0
+    delay = float(os.environ.get('STUB_WU_LINE_SECONDS', 0))
+    with open(transcript, 'r', encoding='utf-8') as f:
+        for line in f:
+            out.append(line.rstrip('\n'))
+            if delay:
+                time.sleep(delay)
+    return 0
+
+
+HANDLERS = {
+    'get-module': _cmd_get_module,
+    'get-command': _cmd_get_command,
+    'import-module': _cmd_import_module,
+    'get-windowsupdate': _cmd_get_windowsupdate,
+    'write-output': _cmd_write_output,
+    'echo': _cmd_write_output,
+    'write-error': _cmd_write_error,
+    'start-sleep': _cmd_start_sleep,
+    'exit': _cmd_exit,
+    'winget': _cmd_winget,
+}
+
+
+class LiveOutput(list):
+    """Lista que também escreve cada linha no stream assim que é adicionada"""
+
+    def __init__(self, stream):
+        super().__init__()
+        self.stream = stream
+
+    def append(self, text):
+        super().append(text)
+        self.stream.write((text + "\n").encode('utf-8'))
+        self.stream.flush()
+
+    def extend(self, lines):
+        for text in lines:
+            self.append(text)
+
+
+def run_script(script: str, out: list = None, err: list = None):
+    """
+    Executa um script no vocabulário do stub.
+
+    Args:
+        script: Comandos separados por nova linha ou ';'
+        out: Destino das linhas de stdout (padrão: nova lista)
+        err: Destino das linhas de stderr (padrão: nova lista)
+
+    Returns:
+        Tupla (exit_code, linhas_stdout, linhas_stderr)
+    """
+    out = [] if out is None else out
+    err = [] if err is None else err
+    code = 0
+    failed = False
+
+    statements = []
+    for line in script.replace('\r', '').split('\n'):
+        statements.extend(s.strip() for s in line.split(';'))
+
+    try:
+        for statement in statements:
+            if not statement or statement.startswith('#'):
+                continue
+            if statement == '$PID':
+                out.append(str(os.getpid()))
+                continue
+            if statement == '$null':
+                continue
+
+            name, _, args = statement.partition(' ')
+            handler = HANDLERS.get(name.lower())
+            if handler is None:
+                err.append(f"The term '{name}' is not recognized as the name of a cmdlet.")
+                failed = True
+                continue
+
+            result = handler(args, out, err)
+            if result:
+                code = result
+                failed = True
+    except StubExit as e:
+        return e.code, out, err
+
+    if failed and not code:
+        code = 1
+    return code, out, err
+
+
+def run_session():
+    """Loop do modo sessão: uma requisição por linha no stdin"""
+    stdin = sys.stdin.buffer
+    stdout = sys.stdout.buffer
+
+    for raw in iter(stdin.readline, b''):
+        line = raw.decode('ascii', errors='replace').strip()
+        if not line:
+            continue
+        token, _, payload = line.partition(' ')
+        command = base64.b64decode(payload).decode('utf-8')
+
+        stdout.write(f"{BEGIN_MARKER} {token}\n".encode('utf-8'))
+        code, out, err = run_script(command)
+
+        for text in out:
+            stdout.write((text + "\n").encode('utf-8'))
+        err_b64 = base64.b64encode("\n".join(err).encode('utf-8')).decode('ascii')
+        stdout.write(f"{END_MARKER} {token} {code} {err_b64}\n".encode('utf-8'))
+        stdout.flush()
+
+
+def main(argv):
+    startup = float(os.environ.get('STUB_PS_STARTUP_SECONDS', 0))
+    if startup:
+        time.sleep(startup)
+
+    if '-EncodedCommand' in argv:
+        run_session()
+        return 0
+
+    if '-Command' in argv:
+        index = argv.index('-Command')
+        command = argv[index + 1] if index + 1 < len(argv) else ''
+        # Saída escrita ao vivo, como um processo real
+        code, _, _ = run_script(command, LiveOutput(sys.stdout.buffer), LiveOutput(sys.stderr.buffer))
+        return code
+
+    sys.stderr.write("stub_powershell: use -Command ou -EncodedCommand\n")
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
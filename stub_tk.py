@@ -0,0 +1,311 @@
+# -*- coding: utf-8 -*-
+"""
+stub_tk.py - Laço de eventos e widgets falsos do Tk para testes e benchmarks sem display
+
+Reproduz o que importa para medir a janela de progresso sem um servidor
+gráfico: callbacks 'after' ordenados por horário (como os timers do Tcl),
+chamadas a partir de outras threads, processamento de tarefas ociosas
+(redesenho) depois de cada rodada de eventos e um widget Text com o
+subconjunto de índices usado pela aplicação.
+
+Os widgets registram chamadas feitas fora da thread que roda o laço
+(foreign_calls), que no Tk real seriam inseguras.
+
+Cada operação de widget pode consumir um tempo fixo (custo simulado), imitando
+o layout e o redesenho do Tk real:
+    insert_cost   Text.insert
+    see_cost      Text.see (rolagem e layout)
+    redraw_cost   update_idletasks / rodada ociosa com widgets alterados
+"""
+import heapq
+import itertools
+import threading
+import time
+
+# Custos padrão por chamada (segundos), na ordem de grandeza do Tk no Windows
+DEFAULT_INSERT_COST = 0.00003
+DEFAULT_SEE_COST = 0.0001
+DEFAULT_REDRAW_COST = 0.001
+
+
+def _spend(seconds: float):
+    """Consome 'seconds' de CPU na thread atual (como o Tk, que segura o GIL)"""
+    if seconds <= 0:
+        return
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+class StubLoop:
+    """Laço de eventos com 'after' thread-safe e redesenho ocioso"""
+
+    def __init__(self, redraw_cost: float = DEFAULT_REDRAW_COST):
+        self.redraw_cost = redraw_cost
+        self.dirty = False
+        self.owner = None
+        self.foreign_calls = 0
+        self.redraws = 0
+        self.callbacks_run = 0
+        self._timers = []
+        self._cancelled = set()
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+
+    def after(self, ms, func, *args):
+        """Agenda func(*args) daqui a 'ms' milissegundos (qualquer thread)"""
+        timer_id = next(self._seq)
+        due = time.perf_counter() + ms / 1000.0
+        with self._lock:
+            heapq.heappush(self._timers, (due, timer_id, func, args))
+        return timer_id
+
+    def after_cancel(self, timer_id):
+        with self._lock:
+            self._cancelled.add(timer_id)
+
+    def check_thread(self):
+        """Conta acessos a widgets fora da thread que roda o laço"""
+        if self.owner is not None and threading.current_thread() is not self.owner:
+            self.foreign_calls += 1
+
+    def touch(self):
+        """Marca widgets alterados (redesenho na próxima rodada ociosa)"""
+        self.check_thread()
+        self.dirty = True
+
+    def update_idletasks(self):
+        """Redesenha se algum widget mudou"""
+        self.check_thread()
+        if self.dirty:
+            _spend(self.redraw_cost)
+            self.dirty = False
+            self.redraws += 1
+
+    def run_until(self, predicate, timeout: float = 30.0) -> bool:
+        """
+        Processa eventos até predicate() ser verdadeiro.
+
+        Returns:
+            True se a condição foi atingida antes do timeout
+        """
+        self.owner = threading.current_thread()
+        deadline = time.perf_counter() + timeout
+        while not predicate():
+            now = time.perf_counter()
+            if now > deadline:
+                return False
+            ran = False
+            while True:
+                with self._lock:
+                    if not self._timers or self._timers[0][0] > now:
+                        break
+                    _, timer_id, func, args = heapq.heappop(self._timers)
+                    if timer_id in self._cancelled:
+                        self._cancelled.discard(timer_id)
+                        continue
+                func(*args)
+                self.callbacks_run += 1
+                ran = True
+            if ran:
+                self.update_idletasks()
+            else:
+                time.sleep(0.0005)
+        return True
+
+
+class StubVar:
+    """StringVar/DoubleVar falsa"""
+
+    def __init__(self, loop: StubLoop, value=None):
+        self._loop = loop
+        self._value = value
+        self.sets = 0
+
+    def set(self, value):
+        self._value = value
+        self.sets += 1
+        self._loop.touch()
+
+    def get(self):
+        self._loop.check_thread()
+        return self._value
+
+
+class StubText:
+    """
+    Text falso: insert no fim (com pares texto/tag), delete de linhas iniciais,
+    index('end-1c') e see
+    """
+
+    def __init__(self, loop: StubLoop, insert_cost: float = DEFAULT_INSERT_COST,
+                 see_cost: float = DEFAULT_SEE_COST):
+        self._loop = loop
+        self.insert_cost = insert_cost
+        self.see_cost = see_cost
+        self.lines = []
+        self._tail = ""
+        self.inserted_lines = 0
+        self.inserts = 0
+
+    def insert(self, index, *chunks):
+        if index != 'end':
+            raise ValueError(f"Índice não suportado: {index}")
+        _spend(self.insert_cost)
+        text = "".join(chunks[0::2])
+        parts = (self._tail + text).split("\n")
+        self.lines.extend(parts[:-1])
+        self.inserted_lines += len(parts) - 1
+        self._tail = parts[-1]
+        self.inserts += 1
+        self._loop.touch()
+
+    def index(self, index):
+        if index != 'end-1c':
+            raise ValueError(f"Índice não suportado: {index}")
+        return f"{len(self.lines) + 1}.{len(self._tail)}"
+
+    def delete(self, first, last):
+        if first == "1.0" and last == 'end':
+            self.lines = []
+            self._tail = ""
+            self._loop.touch()
+            return
+        line, column = (int(p) for p in last.split('.'))
+        if first != "1.0" or column != 0:
+            raise ValueError(f"Intervalo não suportado: {first}-{last}")
+        del self.lines[:line - 1]
+        self._loop.touch()
+
+    def see(self, index):
+        _spend(self.see_cost)
+        self._loop.touch()
+
+    def config(self, **options):
+        self._loop.touch()
+
+    def tag_config(self, tag, **options):
+        self._loop.touch()
+
+
+class StubWidget:
+    """Label, Button ou Progressbar falso (config e item['opção'])"""
+
+    def __init__(self, loop: StubLoop):
+        self._loop = loop
+        self.options = {}
+
+    def config(self, **options):
+        self.options.update(options)
+        self._loop.touch()
+
+    def __setitem__(self, key, value):
+        self.options[key] = value
+        self._loop.touch()
+
+    def __getitem__(self, key):
+        return self.options.get(key)
+
+
+class StubWindow:
+    """Toplevel falso ligado ao laço"""
+
+    def __init__(self, loop: StubLoop):
+        self._loop = loop
+        self.exists = True
+
+    def after(self, ms, func, *args):
+        return self._loop.after(ms, func, *args)
+
+    def after_cancel(self, timer_id):
+        self._loop.after_cancel(timer_id)
+
+    def update_idletasks(self):
+        self._loop.update_idletasks()
+
+    def winfo_exists(self):
+        return self.exists
+
+    def destroy(self):
+        self.exists = False
+
+
+def make_progress_window(loop: StubLoop, insert_cost: float = DEFAULT_INSERT_COST,
+                         see_cost: float = DEFAULT_SEE_COST):
+    """
+    Cria uma ProgressWindow real com widgets falsos (sem display).
+
+    Returns:
+        ProgressWindow com a bomba de atualizações já agendada em 'loop'
+    """
+    from gui_progress_window import ProgressWindow
+
+    window = ProgressWindow.__new__(ProgressWindow)
+    window.parent = loop
+    window.window = StubWindow(loop)
+    window.step_var = StubVar(loop, "Iniciando...")
+    window.desc_var = StubVar(loop, "Preparando ambiente...")
+    window.progress_var = StubVar(loop, 0)
+    window.percent_var = StubVar(loop, "0%")
+    window.status_var = StubVar(loop, "Aguardando...")
+    window.eta_var = StubVar(loop, "")
+    window.log_text = StubText(loop, insert_cost, see_cost)
+    window._start_pump()
+    return window
+
+
+def make_cleanup_dialog(loop: StubLoop, insert_cost: float = DEFAULT_INSERT_COST,
+                        see_cost: float = DEFAULT_SEE_COST):
+    """
+    Cria um CleanupDialog real com widgets falsos (sem display).
+
+    Returns:
+        CleanupDialog com a bomba de atualizações já agendada em 'loop'
+    """
+    from gui_cleanup_dialog import CleanupDialog
+    from gui_constants import LOG_MAX_LINES, PROGRESS_PUMP_INTERVAL_MS
+    from ui_update_queue import UIUpdateQueue
+
+    dialog = CleanupDialog.__new__(CleanupDialog)
+    dialog.parent = loop
+    dialog.dialog = StubWindow(loop)
+    dialog.is_cleaning = False
+    dialog.cleanup_manager = None
+    dialog.cleanup_thread = None
+    dialog.clean_cache_var = StubVar(loop, True)
+    dialog.clean_temp_var = StubVar(loop, True)
+    dialog.clean_recycle_var = StubVar(loop, False)
+    dialog._updates = UIUpdateQueue(max_lines=LOG_MAX_LINES)
+    for name in ('cache_info_label', 'temp_info_label', 'recycle_info_label',
+                 'progress_bar', 'start_btn', 'close_btn', 'cancel_btn'):
+        setattr(dialog, name, StubWidget(loop))
+    dialog.progress_var = StubVar(loop, "")
+    dialog.log_text = StubText(loop, insert_cost, see_cost)
+    dialog._pump_id = dialog.dialog.after(PROGRESS_PUMP_INTERVAL_MS, dialog._pump)
+    return dialog
+
+
+def make_splash_screen(loop: StubLoop, startup=None, max_wait_ms: int = None):
+    """
+    Cria uma SplashScreen real com widgets falsos (sem display).
+
+    Returns:
+        SplashScreen acompanhando 'startup', com a primeira consulta já agendada
+    """
+    from gui_constants import SPLASH_MAX_WAIT_MS
+    from splash_screen import SplashScreen
+
+    splash = SplashScreen.__new__(SplashScreen)
+    splash.root = StubWindow(loop)
+    splash.startup = startup
+    splash.max_wait = (SPLASH_MAX_WAIT_MS if max_wait_ms is None else max_wait_ms) / 1000.0
+    splash.image_path = None
+    splash.start_time = time.time()
+    splash.is_running = True
+    splash._callback = None
+    splash._complete_callback = None
+    splash.progress_var = StubVar(loop, 0)
+    splash.percent_label = StubWidget(loop)
+    splash.status_label = StubWidget(loop)
+    splash.root.after(0, splash._animate)
+    return splash
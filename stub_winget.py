@@ -0,0 +1,295 @@
+# -*- coding: utf-8 -*-
+"""
+stub_winget.py - winget falso para testes e benchmarks em Linux
+
+Simula o custo de cada pacote em duas fases:
+- download: concorrente entre processos (STUB_WINGET_DOWNLOAD_SECONDS)
+- instalação: serializada entre processos por um lock de arquivo, como o
+  winget faz ("Waiting for another install/uninstall to complete...")
+  (STUB_WINGET_INSTALL_SECONDS)
+
+Variáveis de ambiente:
+    STUB_WINGET_PACKAGES          Número de pacotes na listagem (padrão: 10)
+    STUB_WINGET_DOWNLOAD_SECONDS  Duração do download por pacote (padrão: 0.2)
+    STUB_WINGET_INSTALL_SECONDS   Duração da instalação por pacote (padrão: 0.1)
+    STUB_WINGET_LOCK              Arquivo de lock de instalação (padrão: no tempdir)
+    STUB_WINGET_FIXTURE           Arquivo com saída gravada de 'winget upgrade'
+    STUB_WINGET_LIST_SECONDS      Latência da consulta ao catálogo (padrão: 0)
+    STUB_WINGET_FAIL_IDS          Ids (separados por vírgula) cuja instalação falha
+    STUB_WINGET_FAIL_RATE         Fração (0 a 1) dos pacotes cuja instalação falha
+    STUB_WINGET_JITTER            Variação relativa das latências (ex: 0.3 = ±30%)
+    STUB_WINGET_SEED              Semente da falha e da variação (padrão: 0); o
+                                  mesmo pacote falha/demora igual a cada execução
+    STUB_WINGET_STARTUP_SECONDS   Custo de iniciar o processo winget (padrão: 0)
+    STUB_WINGET_HANG_IDS          Ids (separados por vírgula) cujo instalador trava
+                                  em silêncio, sem CPU (por STUB_WINGET_HANG_SECONDS,
+                                  padrão: 3600)
+    STUB_WINGET_HANG_SPINNER      1 = o instalador travado continua redesenhando o
+                                  spinner do winget ("\r   - \r   \\ ..."), sem CPU
+    STUB_WINGET_BUSY_INSTALL      1 = a instalação consome CPU em vez de dormir
+                                  (silenciosa, mas ativa)
+
+Uso:
+    python stub_winget.py upgrade [--accept-source-agreements]
+    python stub_winget.py upgrade --id <Id> [--exact] [--silent] ...
+    python stub_winget.py upgrade --all [--silent] ...
+"""
+import itertools
+import os
+import random
+import sys
+import tempfile
+import time
+
+# Extensões sorteadas (por pacote) para a URL do instalador
+INSTALLER_EXTENSIONS = ('.exe', '.msi', '.msix')
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+def _rng(*key: str) -> random.Random:
+    """Gerador determinístico por semente e chave (pacote, fase)"""
+    return random.Random(":".join((os.environ.get('STUB_WINGET_SEED', '0'),) + key))
+
+
+def _latency(name: str, default: float, *key: str) -> float:
+    """Latência configurada com a variação de STUB_WINGET_JITTER"""
+    seconds = _env_float(name, default)
+    jitter = _env_float('STUB_WINGET_JITTER', 0)
+    if seconds and jitter:
+        seconds *= max(0.0, 1 + _rng(name, *key).uniform(-jitter, jitter))
+    return seconds
+
+
+def should_fail(app_id: str) -> bool:
+    """Se a instalação do pacote falha (STUB_WINGET_FAIL_IDS / STUB_WINGET_FAIL_RATE)"""
+    failing = {i.strip() for i in os.environ.get('STUB_WINGET_FAIL_IDS', '').split(',') if i.strip()}
+    if app_id in failing:
+        return True
+    rate = _env_float('STUB_WINGET_FAIL_RATE', 0)
+    return rate > 0 and _rng('fail', app_id).random() < rate
+
+
+def _spin(seconds: float):
+    """Consome CPU por 'seconds' segundos sem escrever nada"""
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+def _hang(out):
+    """Instalador travado: silencioso ou só com o spinner (STUB_WINGET_HANG_SPINNER)"""
+    seconds = _env_float('STUB_WINGET_HANG_SECONDS', 3600)
+    draw = getattr(out, 'draw', None)
+    if os.environ.get('STUB_WINGET_HANG_SPINNER') != '1' or draw is None:
+        time.sleep(seconds)
+        return
+    deadline = time.perf_counter() + seconds
+    for frame in itertools.cycle('-\\|/'):
+        if time.perf_counter() >= deadline:
+            break
+        draw(f"\r   {frame} ")
+        time.sleep(0.1)
+
+
+def synthetic_packages(count: int) -> list:
+    """Gera pacotes sintéticos (nome, id, versão, disponível)"""
+    return [
+        (f"Stub Package {i}", f"Stub.Package{i}", f"1.{i}.0", f"1.{i}.1")
+        for i in range(count)
+    ]
+
+
+def render_upgrade_table(packages: list) -> list:
+    """Renderiza a tabela de 'winget upgrade' como linhas de texto"""
+    name_w = max([len("Name")] + [len(p[0]) for p in packages]) + 1
+    id_w = max([len("Id")] + [len(p[1]) for p in packages]) + 1
+    ver_w = max([len("Version")] + [len(p[2]) for p in packages]) + 1
+    avail_w = max([len("Available")] + [len(p[3]) for p in packages]) + 1
+
+    header = f"{'Name':<{name_w}}{'Id':<{id_w}}{'Version':<{ver_w}}{'Available':<{avail_w}}Source"
+    lines = [header, "-" * len(header)]
+    for name, app_id, version, available in packages:
+        lines.append(f"{name:<{name_w}}{app_id:<{id_w}}{version:<{ver_w}}{available:<{avail_w}}winget")
+    lines.append(f"{len(packages)} upgrades available.")
+    return lines
+
+
+def install_lock_path() -> str:
+    """Lock de instalação entre processos (também usado pelo Windows Update do stub_powershell)"""
+    return os.environ.get('STUB_WINGET_LOCK') or os.path.join(tempfile.gettempdir(), 'stub_winget_install.lock')
+
+
+class _InstallLock:
+    """Lock de instalação entre processos baseado em arquivo"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.handle = None
+
+    def __enter__(self):
+        self.handle = open(self.path, 'a+')
+        if sys.platform == 'win32':
+            import msvcrt
+            while True:
+                try:
+                    msvcrt.locking(self.handle.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    time.sleep(0.01)
+        else:
+            import fcntl
+            fcntl.flock(self.handle.fileno(), fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        if sys.platform == 'win32':
+            import msvcrt
+            self.handle.seek(0)
+            msvcrt.locking(self.handle.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(self.handle.fileno(), fcntl.LOCK_UN)
+        self.handle.close()
+        return False
+
+
+def _option(args: list, name: str):
+    """Retorna o valor de uma opção (--id X) ou None"""
+    if name in args:
+        index = args.index(name)
+        if index + 1 < len(args):
+            return args[index + 1]
+    return None
+
+
+def installer_url(app_id: str) -> str:
+    """URL do instalador simulado; a extensão (tipo do instalador) é fixa por pacote"""
+    extension = _rng('installer', app_id).choice(INSTALLER_EXTENSIONS)
+    return f"https://stub.invalid/{app_id}/installer{extension}"
+
+
+def _install(package: tuple, out: list):
+    """Simula download (concorrente) e instalação (serializada) de um pacote"""
+    out.append(f"Found {package[0]} [{package[1]}] Version {package[3]}")
+    out.append(f"Downloading {installer_url(package[1])}")
+    time.sleep(_latency('STUB_WINGET_DOWNLOAD_SECONDS', 0.2, package[1]))
+    out.append("Successfully verified installer hash")
+
+    hanging = {i.strip() for i in os.environ.get('STUB_WINGET_HANG_IDS', '').split(',') if i.strip()}
+    with _InstallLock(install_lock_path()):
+        out.append("Starting package install...")
+        if package[1] in hanging:
+            _hang(out)
+        elif os.environ.get('STUB_WINGET_BUSY_INSTALL') == '1':
+            _spin(_latency('STUB_WINGET_INSTALL_SECONDS', 0.1, package[1]))
+        else:
+            time.sleep(_latency('STUB_WINGET_INSTALL_SECONDS', 0.1, package[1]))
+    out.append("Successfully installed")
+
+
+def _fail(package: tuple, out: list):
+    """Simula um instalador que falha após o download"""
+    out.append(f"Found {package[0]} [{package[1]}] Version {package[3]}")
+    out.append(f"Downloading {installer_url(package[1])}")
+    time.sleep(_latency('STUB_WINGET_DOWNLOAD_SECONDS', 0.2, package[1]))
+    out.append("Installer failed with exit code: 1603")
+
+
+def run(args: list, out: list = None):
+    """
+    Executa um comando winget simulado.
+
+    Args:
+        args: Argumentos do winget
+        out: Lista (ou objeto com append) que recebe as linhas conforme são produzidas
+
+    Returns:
+        Tupla (exit_code, linhas_stdout)
+    """
+    out = [] if out is None else out
+    time.sleep(_env_float('STUB_WINGET_STARTUP_SECONDS', 0))
+
+    if not args:
+        out.append("Windows Package Manager (stub)")
+        return 0, out
+
+    if args[0] == '--version':
+        out.append("v1.9.0-stub")
+        return 0, out
+
+    if args[0] != 'upgrade':
+        out.append(f"Unsupported stub command: {args[0]}")
+        return 1, out
+
+    count = int(_env_float('STUB_WINGET_PACKAGES', 10))
+    packages = synthetic_packages(count)
+    fixture = os.environ.get('STUB_WINGET_FIXTURE')
+
+    if '--all' in args:
+        code = 0
+        for package in packages:
+            if should_fail(package[1]):
+                _fail(package, out)
+                code = 1
+            else:
+                _install(package, out)
+        return code, out
+
+    app_id = _option(args, '--id')
+    if app_id is None:
+        # Listagem (consulta ao catálogo)
+        time.sleep(_latency('STUB_WINGET_LIST_SECONDS', 0, 'list'))
+        if fixture:
+            with open(fixture, 'r', encoding='utf-8', newline='') as f:
+                out.extend(f.read().split('\n'))
+        else:
+            out.extend(render_upgrade_table(packages))
+        return 0, out
+
+    package = next((p for p in packages if p[1] == app_id), None)
+    if package is None and fixture:
+        with open(fixture, 'r', encoding='utf-8', newline='') as f:
+            if f" {app_id} " in f.read():
+                package = (app_id, app_id, "0", "1")
+    if package is None:
+        out.append("No package found matching input criteria.")
+        return 1, out
+
+    if should_fail(package[1]):
+        _fail(package, out)
+        return 1, out
+
+    _install(package, out)
+    return 0, out
+
+
+class _StdoutLines:
+    """Escreve cada linha assim que produzida (como o winget real, sem esperar o fim)"""
+
+    def append(self, line: str):
+        sys.stdout.write(line + "\n")
+        sys.stdout.flush()
+
+    def draw(self, text: str):
+        """Redesenha sem quebra de linha (spinner e barras de progresso)"""
+        sys.stdout.write(text)
+        sys.stdout.flush()
+
+    def extend(self, lines):
+        for line in lines:
+            self.append(line)
+
+
+def main(argv):
+    code, _ = run(argv, _StdoutLines())
+    return code
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
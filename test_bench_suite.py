@@ -0,0 +1,207 @@
+"""
+test_bench_suite.py - Testa a suíte de benchmarks e os novos controles dos stubs
+
+Este script testa:
+1. stub_winget: taxa de falha e variação de latência determinísticas pela semente
+2. compare_results: regressões por sentido da métrica, tolerância e piso de ruído
+3. run_suite/main: cenários reais em perfil rápido, JSON gravado e ambiente restaurado
+"""
+import io
+import json
+import logging
+import os
+import sys
+import tempfile
+from contextlib import redirect_stdout
+
+from script_checks import report_checks
+
+
+def test_stub_controls():
+    """Testa STUB_WINGET_FAIL_RATE, STUB_WINGET_JITTER e STUB_WINGET_SEED"""
+    print("\n" + "="*75)
+    print("TESTE: Controles do winget Falso")
+    print("="*75 + "\n")
+
+    try:
+        import stub_winget
+        from bench_suite import stub_environment
+
+        ids = [f"Stub.Package{i}" for i in range(200)]
+        with stub_environment(STUB_WINGET_FAIL_RATE='0.2', STUB_WINGET_SEED='7'):
+            first = [app_id for app_id in ids if stub_winget.should_fail(app_id)]
+            again = [app_id for app_id in ids if stub_winget.should_fail(app_id)]
+        with stub_environment(STUB_WINGET_FAIL_RATE='0.2', STUB_WINGET_SEED='8'):
+            other_seed = [app_id for app_id in ids if stub_winget.should_fail(app_id)]
+        with stub_environment(STUB_WINGET_FAIL_RATE='0', STUB_WINGET_FAIL_IDS='Stub.Package3'):
+            explicit = [app_id for app_id in ids if stub_winget.should_fail(app_id)]
+        with stub_environment(STUB_WINGET_JITTER='0.5', STUB_WINGET_SEED='7'):
+            latencies = [stub_winget._latency('STUB_WINGET_INSTALL_SECONDS', 1.0, app_id) for app_id in ids]
+            repeated = [stub_winget._latency('STUB_WINGET_INSTALL_SECONDS', 1.0, app_id) for app_id in ids]
+        fixed = stub_winget._latency('STUB_WINGET_INSTALL_SECONDS', 1.0, 'Stub.Package0')
+
+        print(f"Falhas com 20%: {len(first)}/200, latências {min(latencies):.2f}s a {max(latencies):.2f}s")
+
+        checks = {
+            "Taxa de falha aproximada": 20 <= len(first) <= 60,
+            "Mesma semente, mesmas falhas": first == again,
+            "Outra semente, outras falhas": first != other_seed,
+            "STUB_WINGET_FAIL_IDS continua valendo": explicit == ['Stub.Package3'],
+            "Variação dentro de ±50%": all(0.5 <= value <= 1.5 for value in latencies) and len(set(latencies)) > 1,
+            "Variação determinística": latencies == repeated,
+            "Sem variação, latência fixa": fixed == 1.0,
+        }
+        return report_checks(checks)
+
+    except Exception as e:
+        print(f"❌ Erro no teste: {e}")
+        import traceback
+        traceback.print_exc()
+        raise
+
+
+def test_compare_results():
+    """Testa a detecção de regressões"""
+    print("\n" + "="*75)
+    print("TESTE: Comparação com Execução Anterior")
+    print("="*75 + "\n")
+
+    try:
+        from bench_suite import compare_results
+
+        def run(profile, concurrent, speedup, cleanup):
+            return {'profile': profile, 'scenarios': {
+                'upgrades': {'metrics': {'sequential.seconds': 2.0, 'concurrent.seconds': concurrent,
+                                         'speedup': speedup}},
+                'cleanup': {'metrics': {'serial.seconds': 0.02, 'parallel.seconds': cleanup}},
+            }}
+
+        baseline = run('quick', 1.0, 2.0, 0.01)
+        comparisons = compare_results(baseline, run('quick', 1.5, 1.3, 0.03), tolerance=0.25)
+        by_metric = {f"{c['scenario']}.{c['metric']}": c for c in comparisons}
+        for item in comparisons:
+            print(f"  {item['scenario']}.{item['metric']}: {item['baseline']} -> {item['current']} "
+                  f"(variação {item['change']:+.0%}, regressão: {item['regression']})")
+
+        unchanged = compare_results(baseline, run('quick', 1.1, 1.9, 0.01), tolerance=0.25)
+        try:
+            compare_results(baseline, run('full', 1.0, 2.0, 0.01))
+            profile_checked = False
+        except ValueError:
+            profile_checked = True
+
+        checks = {
+            "Tempo maior é regressão": by_metric['upgrades.concurrent.seconds']['regression'],
+            "Vazão menor é regressão": by_metric['upgrades.speedup']['regression'],
+            "Métrica igual não regride": not by_metric['upgrades.sequential.seconds']['regression'],
+            "Diferença abaixo do piso é ruído": not by_metric['cleanup.parallel.seconds']['regression'],
+            "Dentro da tolerância": not any(c['regression'] for c in unchanged),
+            "Perfis diferentes recusados": profile_checked,
+        }
+        return report_checks(checks)
+
+    except Exception as e:
+        print(f"❌ Erro no teste: {e}")
+        import traceback
+        traceback.print_exc()
+        raise
+
+
+def test_run_suite():
+    """Testa cenários reais em perfil rápido e a linha de comando"""
+    print("\n" + "="*75)
+    print("TESTE: Execução da Suíte")
+    print("="*75 + "\n")
+
+    try:
+        import bench_suite
+
+        env_before = dict(os.environ)
+        logging_before = logging.root.manager.disable
+        with tempfile.TemporaryDirectory() as data_dir:
+            baseline_path = os.path.join(data_dir, 'anterior.json')
+            output_path = os.path.join(data_dir, 'atual.json')
+            results = bench_suite.run_suite(['upgrades_failures', 'cleanup'], 'quick',
+                                            {'STUB_WINGET_SEED': '3'})
+            bench_suite.save_results(results, baseline_path)
+
+            output = io.StringIO()
+            with redirect_stdout(output):
+                code = bench_suite.main(['--scenarios', 'cleanup', '--output', output_path,
+                                         '--baseline', baseline_path, '--tolerance', '100'])
+            with open(output_path, encoding='utf-8') as f:
+                saved = json.load(f)
+
+            with redirect_stdout(io.StringIO()):
+                unknown_code = bench_suite.main(['--scenarios', 'inexistente', '--output', output_path])
+
+        failures = results['scenarios']['upgrades_failures']['result']
+        print(f"Falhas: {failures['failed']} (esperadas {failures['expected_failures']}), "
+              f"{failures['apps_per_second']} apps/s")
+        print(f"Métricas da limpeza: {saved['scenarios']['cleanup']['metrics']}")
+
+        checks = {
+            "Metadados da execução": all(results.get(key) for key in ('created', 'python', 'platform', 'profile')),
+            "Falhas simuladas conferem": (failures['failed'] == failures['expected_failures'] > 0
+                                          and failures['successful'] + failures['failed'] == failures['packages']),
+            "Métricas numéricas": all(isinstance(value, (int, float))
+                                      for scenario in results['scenarios'].values()
+                                      for value in scenario['metrics'].values()),
+            "Linha de comando grava JSON e compara": code == 0 and list(saved['scenarios']) == ['cleanup'],
+            "Cenário desconhecido recusado": unknown_code == 2,
+            "Ambiente restaurado": dict(os.environ) == env_before,
+            "Logging restaurado": logging.root.manager.disable == logging_before,
+        }
+        return report_checks(checks)
+
+    except Exception as e:
+        print(f"❌ Erro no teste: {e}")
+        import traceback
+        traceback.print_exc()
+        raise
+
+
+def main():
+    """Executa todos os testes"""
+    print("\n" + "="*75)
+    print("SUITE DE TESTES - SUÍTE DE BENCHMARKS")
+    print("="*75)
+
+    tests = [
+        ("Controles do winget Falso", test_stub_controls),
+        ("Comparação com Execução Anterior", test_compare_results),
+        ("Execução da Suíte", test_run_suite),
+    ]
+
+    results = {}
+    for test_name, test_func in tests:
+        try:
+            results[test_name] = test_func()
+        except Exception as e:
+            print(f"\n❌ Teste '{test_name}' falhou com erro: {e}")
+            results[test_name] = False
+
+    # Resumo
+    print("\n" + "="*75)
+    print("RESUMO DOS TESTES")
+    print("="*75 + "\n")
+
+    passed = sum(1 for r in results.values() if r)
+    total = len(results)
+
+    for test_name, result in results.items():
+        status = "✓ PASSOU" if result else "❌ FALHOU"
+        print(f"{status}: {test_name}")
+
+    print(f"\n{passed}/{total} testes passaram")
+
+    if passed == total:
+        print("\n✓ SUÍTE DE BENCHMARKS FUNCIONANDO!")
+        return 0
+    else:
+        print(f"\n⚠️  {total - passed} teste(s) falharam")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
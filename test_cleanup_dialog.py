@@ -0,0 +1,180 @@
+"""
+test_cleanup_dialog.py - Testa o caminho de progresso do diálogo de limpeza
+
+Usa o CleanupDialog real com widgets e laço de eventos falsos (stub_tk.py):
+1. A thread de limpeza nunca toca nos widgets; o log e a barra chegam pela bomba
+2. A duração da limpeza não depende do custo de desenhar a interface
+"""
+import os
+import sys
+import tempfile
+import threading
+import time
+
+from script_checks import report_checks
+
+
+def _make_targets(root, targets=20, subdirs=8, files=2):
+    """Cria pastas-alvo com subpastas (cada subpasta gera uma mensagem de progresso)"""
+    folders = []
+    for t in range(targets):
+        folder = os.path.join(root, f"alvo{t}")
+        for d in range(subdirs):
+            sub = os.path.join(folder, f"sub{d}")
+            os.makedirs(sub)
+            for f in range(files):
+                with open(os.path.join(sub, f"arquivo{f}.tmp"), 'wb') as handle:
+                    handle.write(b"x" * 64)
+        folders.append(folder)
+    return folders
+
+
+def _run_cleanup(insert_cost, see_cost, redraw_cost, remove_latency=0.001):
+    """
+    Executa cleanup_thread_func numa thread e retorna (diálogo, laço, segundos, concluído).
+
+    remove_latency simula o custo de I/O de cada exclusão, para que a limpeza
+    dure vários quadros da bomba.
+    """
+    from cleanup_manager import CleanupManager
+    from stub_tk import StubLoop, make_cleanup_dialog
+
+    with tempfile.TemporaryDirectory() as root:
+        folders = _make_targets(root)
+        cache, temp = folders[:10], folders[10:]
+
+        original = (CleanupManager.get_cache_folders, CleanupManager.get_temp_folders, os.remove)
+        CleanupManager.get_cache_folders = lambda self: cache
+        CleanupManager.get_temp_folders = lambda self: temp
+
+        def slow_remove(path, *args, _remove=os.remove, **kwargs):
+            time.sleep(remove_latency)
+            return _remove(path, *args, **kwargs)
+
+        os.remove = slow_remove
+        try:
+            loop = StubLoop(redraw_cost=redraw_cost)
+            dialog = make_cleanup_dialog(loop, insert_cost, see_cost)
+            timing = {}
+
+            def worker():
+                start = time.perf_counter()
+                dialog.cleanup_thread_func(["cache", "temp"])
+                timing['seconds'] = time.perf_counter() - start
+
+            thread = threading.Thread(target=worker)
+            thread.start()
+            done = loop.run_until(
+                lambda: not thread.is_alive() and dialog._updates.pending == 0
+                and bool(dialog.log_text.lines) and "Limpeza concluída" in dialog.log_text.lines[-1],
+                timeout=60)
+            thread.join()
+            emptied = all(not os.listdir(f) for f in folders)
+        finally:
+            CleanupManager.get_cache_folders, CleanupManager.get_temp_folders, os.remove = original
+
+    return dialog, loop, timing['seconds'], done and emptied
+
+
+def test_worker_never_touches_widgets():
+    """Testa que só a bomba (thread do laço) acessa os widgets"""
+    print("\n" + "="*75)
+    print("TESTE: Thread de Limpeza Não Toca nos Widgets")
+    print("="*75 + "\n")
+
+    try:
+        dialog, loop, seconds, done = _run_cleanup(0, 0, 0)
+        log = "\n".join(dialog.log_text.lines)
+
+        print(f"Limpeza: {seconds:.2f}s, callbacks no laço: {loop.callbacks_run}, "
+              f"acessos fora da thread: {loop.foreign_calls}")
+
+        checks = {
+            "Limpeza concluída e exibida": done,
+            "Nenhum acesso a widget pela thread de limpeza": loop.foreign_calls == 0,
+            "Resumo no log": "RESUMO DA LIMPEZA" in log and "Arquivos deletados: 320" in log,
+            "Barra de progresso atualizada": dialog.progress_bar['value'] == 65,
+        }
+        return report_checks(checks)
+
+    except Exception as e:
+        print(f"❌ Erro no teste: {e}")
+        import traceback
+        traceback.print_exc()
+        raise
+
+
+def test_throughput_independent_of_rendering():
+    """Testa que um desenho caro não atrasa a limpeza"""
+    print("\n" + "="*75)
+    print("TESTE: Limpeza Independente do Custo de Desenho")
+    print("="*75 + "\n")
+
+    try:
+        _, cheap_loop, cheap, cheap_done = _run_cleanup(0, 0, 0)
+        # Desenho caro: 20 ms por mensagem se cada uma fosse desenhada na hora
+        slow_dialog, slow_loop, slow, slow_done = _run_cleanup(0.005, 0.005, 0.01)
+        messages = slow_dialog.log_text.inserted_lines
+
+        print(f"Desenho gratuito: {cheap:.2f}s ({cheap_loop.redraws} redesenhos)")
+        print(f"Desenho caro:     {slow:.2f}s ({slow_loop.redraws} redesenhos)")
+        print(f"Desenhando cada uma das {messages} mensagens na thread de limpeza: "
+              f"+{messages * 0.02:.1f}s")
+
+        checks = {
+            "Ambas concluídas": cheap_done and slow_done,
+            "Limpeza não paga o desenho por mensagem (< 2x + 0,5s)": slow < cheap * 2 + 0.5,
+            "Redesenhos limitados pela taxa de quadros": slow_loop.redraws < 100,
+        }
+        return report_checks(checks)
+
+    except Exception as e:
+        print(f"❌ Erro no teste: {e}")
+        import traceback
+        traceback.print_exc()
+        raise
+
+
+def main():
+    """Executa todos os testes"""
+    print("\n" + "="*75)
+    print("SUITE DE TESTES - DIÁLOGO DE LIMPEZA")
+    print("="*75)
+
+    tests = [
+        ("Thread de Limpeza Não Toca nos Widgets", test_worker_never_touches_widgets),
+        ("Limpeza Independente do Custo de Desenho", test_throughput_independent_of_rendering),
+    ]
+
+    results = {}
+    for test_name, test_func in tests:
+        try:
+            results[test_name] = test_func()
+        except Exception as e:
+            print(f"\n❌ Teste '{test_name}' falhou com erro: {e}")
+            results[test_name] = False
+
+    # Resumo
+    print("\n" + "="*75)
+    print("RESUMO DOS TESTES")
+    print("="*75 + "\n")
+
+    passed = sum(1 for r in results.values() if r)
+    total = len(results)
+
+    for test_name, result in results.items():
+        status = "✓ PASSOU" if result else "❌ FALHOU"
+        print(f"{status}: {test_name}")
+
+    print(f"\n{passed}/{total} testes passaram")
+
+    if passed == total:
+        print("\n✓ DIÁLOGO DE LIMPEZA FUNCIONANDO!")
+        return 0
+    else:
+        print(f"\n⚠️  {total - passed} teste(s) falharam")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,331 @@
+"""
+test_cleanup_engine.py - Testa o motor de exclusão em passada única
+
+Este script testa:
+1. Exclusão completa do conteúdo com contagem de arquivos, bytes e pastas
+2. Links simbólicos removidos sem apagar o destino
+3. CleanupManager usando o motor (mesma interface de antes)
+4. Modo paralelo com resultados por alvo e progresso monotônico
+5. Plano de limpeza sem alvos duplicados, aninhados ou com outra grafia
+6. Estimativa e limpeza completa usando o mesmo plano (sem contar duas vezes)
+"""
+import os
+import sys
+import tempfile
+
+from script_checks import report_checks
+
+
+def _make_tree(root):
+    """Cria uma árvore pequena e retorna (arquivos, bytes, pastas)"""
+    files = 0
+    total = 0
+    dirs = 0
+    for d in range(3):
+        folder = os.path.join(root, f"pasta{d}", "sub")
+        os.makedirs(folder)
+        dirs += 2
+        for f in range(5):
+            data = b"x" * (10 * (f + 1))
+            with open(os.path.join(folder, f"arquivo{f}.tmp"), 'wb') as handle:
+                handle.write(data)
+            files += 1
+            total += len(data)
+    with open(os.path.join(root, "raiz.log"), 'wb') as handle:
+        handle.write(b"abc")
+    return files + 1, total + 3, dirs
+
+
+def test_delete_tree_contents():
+    """Testa contagens e remoção de baixo para cima"""
+    print("\n" + "="*75)
+    print("TESTE: Exclusão em Passada Única")
+    print("="*75 + "\n")
+
+    try:
+        from cleanup_engine import delete_tree_contents
+
+        with tempfile.TemporaryDirectory() as root:
+            files, total, dirs = _make_tree(root)
+            stats = delete_tree_contents(root)
+
+            print(f"Estatísticas: {stats}")
+
+            checks = {
+                "Arquivos contados": stats['files'] == files,
+                "Bytes contados": stats['bytes'] == total,
+                "Pastas removidas": stats['dirs'] == dirs,
+                "Sem erros": stats['errors'] == 0,
+                "Pasta raiz mantida e vazia": os.path.isdir(root) and not os.listdir(root),
+            }
+            return report_checks(checks)
+
+    except Exception as e:
+        print(f"❌ Erro no teste: {e}")
+        import traceback
+        traceback.print_exc()
+        raise
+
+
+def test_symlinks_not_followed():
+    """Testa que links para pastas externas não são seguidos"""
+    print("\n" + "="*75)
+    print("TESTE: Links Não São Seguidos")
+    print("="*75 + "\n")
+
+    try:
+        from cleanup_engine import delete_tree_contents
+
+        with tempfile.TemporaryDirectory() as outside, tempfile.TemporaryDirectory() as root:
+            protected = os.path.join(outside, "importante.txt")
+            with open(protected, 'w') as handle:
+                handle.write("não apagar")
+
+            try:
+                os.symlink(outside, os.path.join(root, "link"), target_is_directory=True)
+            except (OSError, NotImplementedError) as e:
+                print(f"⚠️  Links simbólicos indisponíveis neste sistema: {e}")
+                return True
+
+            stats = delete_tree_contents(root)
+
+            checks = {
+                "Link removido": not os.path.lexists(os.path.join(root, "link")),
+                "Destino preservado": os.path.exists(protected),
+                "Sem erros": stats['errors'] == 0,
+            }
+            return report_checks(checks)
+
+    except Exception as e:
+        print(f"❌ Erro no teste: {e}")
+        import traceback
+        traceback.print_exc()
+        raise
+
+
+def test_cleanup_manager_integration():
+    """Testa _safe_delete_folder_contents e _get_folder_size do CleanupManager"""
+    print("\n" + "="*75)
+    print("TESTE: Integração com CleanupManager")
+    print("="*75 + "\n")
+
+    try:
+        from cleanup_manager import CleanupManager
+
+        manager = CleanupManager()
+        with tempfile.TemporaryDirectory() as root:
+            files, total, _ = _make_tree(root)
+            size = manager._get_folder_size(root)
+            deleted, freed = manager._safe_delete_folder_contents(root)
+            missing = manager._safe_delete_folder_contents(os.path.join(root, "inexistente"))
+
+            print(f"Tamanho: {size}, deletados: {deleted}, liberados: {freed}")
+
+            checks = {
+                "Tamanho calculado": size == (total, files),
+                "Retorno (arquivos, bytes)": (deleted, freed) == (files, total),
+                "Pasta inexistente ignorada": missing == (0, 0),
+                "Nenhum erro registrado": manager.errors == [],
+            }
+            return report_checks(checks)
+
+    except Exception as e:
+        print(f"❌ Erro no teste: {e}")
+        import traceback
+        traceback.print_exc()
+        raise
+
+
+def test_parallel_cleanup():
+    """Testa o modo paralelo do CleanupManager"""
+    print("\n" + "="*75)
+    print("TESTE: Limpeza Paralela")
+    print("="*75 + "\n")
+
+    try:
+        from cleanup_manager import CleanupManager
+
+        with tempfile.TemporaryDirectory() as root:
+            folders = []
+            expected = []
+            for t in range(4):
+                folder = os.path.join(root, f"alvo{t}")
+                os.makedirs(folder)
+                files, total, _ = _make_tree(folder)
+                folders.append(folder)
+                expected.append({'path': folder, 'files': files, 'size': total})
+            empty = os.path.join(root, "vazio")
+            os.makedirs(empty)
+            folders.append(empty)
+
+            progress = []
+            manager = CleanupManager(lambda msg, pct: progress.append(pct), max_workers=3)
+            manager.get_cache_folders = lambda: folders
+            results = manager.clean_cache()
+
+            print(f"Detalhes: {results['details']}")
+            print(f"Progresso: {progress}")
+
+            checks = {
+                "Detalhes por alvo, na ordem dos alvos": results['details'] == expected,
+                "Totais somados": results['files_deleted'] == sum(e['files'] for e in expected),
+                "Progresso monotônico até 35%": progress == sorted(progress) and progress[-1] == 35,
+                "Alvos vazios": all(not os.listdir(f) for f in folders),
+            }
+            return report_checks(checks)
+
+    except Exception as e:
+        print(f"❌ Erro no teste: {e}")
+        import traceback
+        traceback.print_exc()
+        raise
+
+
+def test_cleanup_plan():
+    """Testa canonicalização, duplicatas, aninhamento e prioridade entre categorias"""
+    print("\n" + "="*75)
+    print("TESTE: Plano de Limpeza")
+    print("="*75 + "\n")
+
+    try:
+        from cleanup_planner import canonicalize_path, plan_cleanup_targets
+
+        with tempfile.TemporaryDirectory() as root:
+            temp = os.path.join(root, "Temp")
+            inet = os.path.join(root, "INetCache")
+            nested = os.path.join(temp, "sub")
+            sibling = os.path.join(root, "Temp2")
+            for folder in (nested, inet, sibling):
+                os.makedirs(folder)
+
+            alias = os.path.join(root, "atalho")
+            try:
+                os.symlink(temp, alias, target_is_directory=True)
+            except (OSError, NotImplementedError) as e:
+                print(f"⚠️  Links simbólicos indisponíveis neste sistema: {e}")
+                alias = temp
+
+            plan = plan_cleanup_targets({
+                'cache': [inet, nested, temp + os.sep, sibling],
+                'temp': [alias, os.path.join(temp, ".", "sub", ".."), temp],
+            })
+
+            print(f"Plano: {plan}")
+
+            checks = {
+                "Temp fica só em 'temp' (primeira grafia)": plan['temp'] == [alias],
+                "Subpasta e duplicatas removidas do cache": plan['cache'] == [inet, sibling],
+                "Pasta irmã com prefixo igual mantida": sibling in plan['cache'],
+                "Link resolvido para o destino": canonicalize_path(alias) == canonicalize_path(temp),
+            }
+            if os.name == 'nt':
+                checks["Maiúsculas/minúsculas ignoradas"] = (
+                    canonicalize_path(temp.upper()) == canonicalize_path(temp.lower())
+                )
+            return report_checks(checks)
+
+    except Exception as e:
+        print(f"❌ Erro no teste: {e}")
+        import traceback
+        traceback.print_exc()
+        raise
+
+
+def test_plan_shared_by_info_and_cleanup():
+    """Testa que get_cleanup_info e cleanup_all usam o mesmo plano deduplicado"""
+    print("\n" + "="*75)
+    print("TESTE: Estimativa e Limpeza com o Mesmo Plano")
+    print("="*75 + "\n")
+
+    try:
+        import cleanup_manager
+        from cleanup_manager import CleanupManager
+        from size_index import SizeIndex
+
+        with tempfile.TemporaryDirectory() as root:
+            temp = os.path.join(root, "Temp")
+            cache = os.path.join(root, "Cache")
+            for folder in (temp, cache):
+                os.makedirs(folder)
+            temp_files, temp_bytes, _ = _make_tree(temp)
+            cache_files, cache_bytes, _ = _make_tree(cache)
+
+            original = (CleanupManager.get_cache_folders, CleanupManager.get_temp_folders,
+                        CleanupManager.get_recyclable_size, CleanupManager.empty_recycle_bin)
+            CleanupManager.get_cache_folders = lambda self: [cache, temp, os.path.join(temp, "pasta0")]
+            CleanupManager.get_temp_folders = lambda self: [temp, temp + os.sep]
+            CleanupManager.get_recyclable_size = lambda self: 0
+            CleanupManager.empty_recycle_bin = lambda self: {'size_freed': 0, 'success': True, 'message': ''}
+            try:
+                info = cleanup_manager.get_cleanup_info(size_index=SizeIndex())
+                results = CleanupManager().cleanup_all()
+            finally:
+                (CleanupManager.get_cache_folders, CleanupManager.get_temp_folders,
+                 CleanupManager.get_recyclable_size, CleanupManager.empty_recycle_bin) = original
+
+            print(f"Estimativa: cache={info['cache_size']} temp={info['temp_size']}")
+            print(f"Resumo: {results['summary']}")
+
+            checks = {
+                "Estimativa sem contagem dupla": (info['cache_size'], info['temp_size']) == (cache_bytes, temp_bytes),
+                "Cada pasta limpa uma vez": [d['path'] for d in results['cache']['details']] == [cache]
+                                            and [d['path'] for d in results['temp']['details']] == [temp],
+                "Estimativa igual ao liberado": results['summary']['total_bytes'] == info['cache_size'] + info['temp_size'],
+                "Arquivos contados uma vez": results['summary']['total_files'] == cache_files + temp_files,
+            }
+            return report_checks(checks)
+
+    except Exception as e:
+        print(f"❌ Erro no teste: {e}")
+        import traceback
+        traceback.print_exc()
+        raise
+
+
+def main():
+    """Executa todos os testes"""
+    print("\n" + "="*75)
+    print("SUITE DE TESTES - MOTOR DE LIMPEZA")
+    print("="*75)
+
+    tests = [
+        ("Exclusão em Passada Única", test_delete_tree_contents),
+        ("Links Não São Seguidos", test_symlinks_not_followed),
+        ("Integração com CleanupManager", test_cleanup_manager_integration),
+        ("Limpeza Paralela", test_parallel_cleanup),
+        ("Plano de Limpeza", test_cleanup_plan),
+        ("Estimativa e Limpeza com o Mesmo Plano", test_plan_shared_by_info_and_cleanup),
+    ]
+
+    results = {}
+    for test_name, test_func in tests:
+        try:
+            results[test_name] = test_func()
+        except Exception as e:
+            print(f"\n❌ Teste '{test_name}' falhou com erro: {e}")
+            results[test_name] = False
+
+    # Resumo
+    print("\n" + "="*75)
+    print("RESUMO DOS TESTES")
+    print("="*75 + "\n")
+
+    passed = sum(1 for r in results.values() if r)
+    total = len(results)
+
+    for test_name, result in results.items():
+        status = "✓ PASSOU" if result else "❌ FALHOU"
+        print(f"{status}: {test_name}")
+
+    print(f"\n{passed}/{total} testes passaram")
+
+    if passed == total:
+        print("\n✓ MOTOR DE LIMPEZA FUNCIONANDO!")
+        return 0
+    else:
+        print(f"\n⚠️  {total - passed} teste(s) falharam")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,222 @@
+"""
+test_command_stream.py - Testa a execução de comandos com saída em streaming
+
+Este script testa:
+1. Linhas entregues conforme chegam (antes do processo terminar)
+2. Memória limitada: apenas as últimas linhas são mantidas
+3. Timeout encerra o processo
+4. update_all_apps_with_winget consumindo a saída ao vivo
+5. Barras de progresso redesenhadas com '\\r'
+"""
+import os
+import sys
+import time
+
+from script_checks import fail, report_checks
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+STUB_ARGV = [sys.executable, os.path.join(BASE_DIR, 'stub_powershell.py')]
+
+
+def test_lines_arrive_live():
+    """Testa que a primeira linha chega antes do fim do comando"""
+    print("\n" + "="*75)
+    print("TESTE: Linhas Entregues ao Vivo")
+    print("="*75 + "\n")
+
+    try:
+        from powershell_manager import PowerShellManager
+
+        ps_manager = PowerShellManager(shell_argv=STUB_ARGV)
+        start = time.perf_counter()
+        arrivals = []
+
+        stream = ps_manager.stream_command("Write-Output primeira; Start-Sleep -Milliseconds 800; Write-Output segunda")
+        for line in stream:
+            arrivals.append((line, time.perf_counter() - start))
+
+        print(f"Chegadas: {arrivals}")
+
+        checks = {
+            "Duas linhas recebidas": [line for line, _ in arrivals] == ['primeira', 'segunda'],
+            "Primeira linha antes do sleep terminar": arrivals[0][1] < arrivals[1][1] - 0.5,
+            "Processo terminou com sucesso": stream.success,
+        }
+        return report_checks(checks)
+
+    except Exception as e:
+        print(f"❌ Erro no teste: {e}")
+        import traceback
+        traceback.print_exc()
+        raise
+
+
+def test_bounded_tail():
+    """Testa que apenas as últimas linhas ficam em memória"""
+    print("\n" + "="*75)
+    print("TESTE: Ring Buffer das Últimas Linhas")
+    print("="*75 + "\n")
+
+    try:
+        from powershell_manager import PowerShellManager
+
+        ps_manager = PowerShellManager(shell_argv=STUB_ARGV)
+        script = "; ".join(f"Write-Output linha{i}" for i in range(500)) + "; Write-Error falhou"
+
+        received = []
+        success, stdout, stderr = ps_manager.execute_command_streaming(script, received.append, tail_lines=50)
+        tail = stdout.splitlines()
+
+        print(f"Recebidas: {len(received)}, mantidas: {len(tail)}, stderr: {stderr!r}")
+
+        checks = {
+            "Callback recebeu todas as linhas": len(received) == 500,
+            "Tail limitado a 50 linhas": len(tail) == 50,
+            "Tail contém as últimas linhas": tail[0] == 'linha450' and tail[-1] == 'linha499',
+            "Falha e stderr reportados": not success and stderr == 'falhou',
+        }
+        return report_checks(checks)
+
+    except Exception as e:
+        print(f"❌ Erro no teste: {e}")
+        import traceback
+        traceback.print_exc()
+        raise
+
+
+def test_timeout():
+    """Testa que o timeout encerra o processo"""
+    print("\n" + "="*75)
+    print("TESTE: Timeout")
+    print("="*75 + "\n")
+
+    try:
+        from powershell_manager import PowerShellManager
+
+        ps_manager = PowerShellManager(shell_argv=STUB_ARGV)
+        start = time.perf_counter()
+        success, stdout, stderr = ps_manager.execute_command_streaming(
+            "Write-Output inicio; Start-Sleep -Seconds 10", timeout=1
+        )
+        elapsed = time.perf_counter() - start
+
+        print(f"Tempo: {elapsed:.2f}s, stdout: {stdout!r}, stderr: {stderr!r}")
+
+        checks = {
+            "Comando interrompido": not success and stderr == "Command timed out",
+            "Saída parcial preservada": stdout == "inicio",
+            "Retornou logo após o timeout": elapsed < 3,
+        }
+        return report_checks(checks)
+
+    except Exception as e:
+        print(f"❌ Erro no teste: {e}")
+        import traceback
+        traceback.print_exc()
+        raise
+
+
+def test_bulk_update_live():
+    """Testa update_all_apps_with_winget com callback de saída"""
+    print("\n" + "="*75)
+    print("TESTE: Atualização em Massa ao Vivo")
+    print("="*75 + "\n")
+
+    try:
+        from powershell_manager import PowerShellManager
+
+        os.environ['STUB_WINGET_PACKAGES'] = '3'
+        os.environ['STUB_WINGET_DOWNLOAD_SECONDS'] = '0.05'
+        os.environ['STUB_WINGET_INSTALL_SECONDS'] = '0.01'
+
+        ps_manager = PowerShellManager(shell_argv=STUB_ARGV)
+        lines = []
+        success, output = ps_manager.update_all_apps_with_winget(output_callback=lines.append)
+
+        print(f"Linhas recebidas: {len(lines)}")
+
+        checks = {
+            "Sucesso": success,
+            "Uma linha de instalação por pacote": lines.count("Successfully installed") == 3,
+            "Output contém o final da saída": output.endswith("Successfully installed"),
+        }
+        return report_checks(checks)
+
+    except Exception as e:
+        print(f"❌ Erro no teste: {e}")
+        import traceback
+        traceback.print_exc()
+        raise
+
+
+def test_progress_redraws():
+    """Testa que redesenhos com '\\r' viram apenas o estado final da linha"""
+    print("\n" + "="*75)
+    print("TESTE: Barras de Progresso")
+    print("="*75 + "\n")
+
+    try:
+        from command_stream import _decode_line
+
+        raw = "  ██░░░░  10%\r  ████░░  60%\r  ██████  100%\r\n".encode('utf-8')
+        line = _decode_line(raw.rstrip(b'\n'))
+        print(f"Linha decodificada: {line!r}")
+
+        if line == "  ██████  100%":
+            print("✓ Apenas o último redesenho foi mantido")
+            return True
+        fail("Redesenhos antigos não foram descartados")
+
+    except Exception as e:
+        print(f"❌ Erro no teste: {e}")
+        import traceback
+        traceback.print_exc()
+        raise
+
+
+def main():
+    """Executa todos os testes"""
+    print("\n" + "="*75)
+    print("SUITE DE TESTES - SAÍDA EM STREAMING")
+    print("="*75)
+
+    tests = [
+        ("Linhas Entregues ao Vivo", test_lines_arrive_live),
+        ("Ring Buffer das Últimas Linhas", test_bounded_tail),
+        ("Timeout", test_timeout),
+        ("Atualização em Massa ao Vivo", test_bulk_update_live),
+        ("Barras de Progresso", test_progress_redraws),
+    ]
+
+    results = {}
+    for test_name, test_func in tests:
+        try:
+            results[test_name] = test_func()
+        except Exception as e:
+            print(f"\n❌ Teste '{test_name}' falhou com erro: {e}")
+            results[test_name] = False
+
+    # Resumo
+    print("\n" + "="*75)
+    print("RESUMO DOS TESTES")
+    print("="*75 + "\n")
+
+    passed = sum(1 for r in results.values() if r)
+    total = len(results)
+
+    for test_name, result in results.items():
+        status = "✓ PASSOU" if result else "❌ FALHOU"
+        print(f"{status}: {test_name}")
+
+    print(f"\n{passed}/{total} testes passaram")
+
+    if passed == total:
+        print("\n✓ STREAMING FUNCIONANDO!")
+        return 0
+    else:
+        print(f"\n⚠️  {total - passed} teste(s) falharam")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
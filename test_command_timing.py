@@ -0,0 +1,272 @@
+"""
+test_command_timing.py - Testa a instrumentação de execute_command e o relatório
+
+Este script testa (com o PowerShell e o winget falsos):
+1. Processo por comando e streaming: início, primeiro byte, bytes, código de
+   saída e método chamador; sem instrumentação os eventos não mudam
+2. Chamador pelo catálogo e pelo cache de pré-requisitos (só métodos do manager)
+3. Sessões persistentes: host frio versus aquecido
+4. Relatório: totais, agrupamento por chamador, mais lentos e a linha de comando
+"""
+import io
+import json
+import os
+import sys
+import tempfile
+from contextlib import redirect_stdout
+
+from script_checks import report_checks
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+STUB_ARGV = [sys.executable, os.path.join(BASE_DIR, 'stub_powershell.py')]
+
+
+def test_process_instrumentation():
+    """Testa as medições no modo processo por comando"""
+    print("\n" + "="*75)
+    print("TESTE: Instrumentação por Processo")
+    print("="*75 + "\n")
+
+    try:
+        from bench_suite import stub_environment
+        from event_bus import EventBus
+        from powershell_manager import PowerShellManager
+        from prereq_cache import PrerequisiteCache
+
+        with stub_environment(STUB_WINGET_PACKAGES='2', STUB_WINGET_DOWNLOAD_SECONDS='0.2',
+                              STUB_WINGET_INSTALL_SECONDS='0.1'):
+            bus = EventBus()
+            events = []
+            bus.subscribe(events.append)
+            manager = PowerShellManager(shell_argv=STUB_ARGV, prereq_cache=PrerequisiteCache(),
+                                        event_bus=bus, instrument_commands=True)
+            upgraded = manager.update_app_silent('Stub.Package0')
+            streamed, _ = manager.update_all_apps_with_winget(output_callback=lambda line: None)
+            _, stdout, _ = manager.execute_command("winget upgrade --accept-source-agreements")
+
+            plain_events = []
+            plain_bus = EventBus()
+            plain_bus.subscribe(plain_events.append)
+            PowerShellManager(shell_argv=STUB_ARGV, prereq_cache=PrerequisiteCache(),
+                              event_bus=plain_bus).execute_command("winget --version")
+
+        finished = [e for e in events if e['type'] == 'command_finished']
+        by_caller = {e['caller']: e for e in finished}
+        upgrade = by_caller.get('update_app_silent', {})
+        stream = by_caller.get('update_all_apps_with_winget', {})
+        listing = by_caller.get('test_process_instrumentation', {})
+        for event in finished:
+            print(f"  {event['caller']}: {event['seconds']:.3f}s, início {event['spawn_seconds']}s, "
+                  f"primeira saída {event['first_output_seconds']}s, {event['output_bytes']} bytes, "
+                  f"código {event['exit_code']}")
+
+        checks = {
+            "Comandos executados normalmente": upgraded and streamed,
+            "Chamadores identificados": set(by_caller) == {'update_app_silent', 'update_all_apps_with_winget',
+                                                          'test_process_instrumentation'},
+            "Início <= primeira saída <= total": all(
+                0 <= e['spawn_seconds'] <= e['first_output_seconds'] <= e['seconds'] for e in (upgrade, stream)),
+            "Primeira saída antes do fim (download simulado)": upgrade['first_output_seconds'] < upgrade['seconds'] - 0.1,
+            "Bytes de saída e código de saída": (listing['output_bytes'] == len(stdout.encode('utf-8'))
+                                                  and upgrade['exit_code'] == 0 and stream['exit_code'] == 0),
+            "Streaming marcado como tal": stream['kind'] == 'stream' and stream['output_bytes'] > 0,
+            "Sem instrumentação os campos não aparecem": ('caller' not in plain_events[-1]
+                                                          and 'spawn_seconds' not in plain_events[-1]),
+        }
+        return report_checks(checks)
+
+    except Exception as e:
+        print(f"❌ Erro no teste: {e}")
+        import traceback
+        traceback.print_exc()
+        raise
+
+
+def test_caller_outside_manager():
+    """Testa o chamador quando o comando passa pelo catálogo ou pelo cache de pré-requisitos"""
+    print("\n" + "="*75)
+    print("TESTE: Chamador Fora do Manager")
+    print("="*75 + "\n")
+
+    try:
+        from bench_suite import stub_environment
+        from event_bus import EventBus
+        from powershell_manager import PowerShellManager
+        from prereq_cache import PrerequisiteCache
+        from upgrade_catalog import UpgradeCatalog
+
+        with stub_environment(STUB_WINGET_PACKAGES='2'):
+            bus = EventBus()
+            events = []
+            bus.subscribe(events.append)
+            catalog = UpgradeCatalog(fresh_age=60)
+            manager = PowerShellManager(shell_argv=STUB_ARGV, prereq_cache=PrerequisiteCache(),
+                                        catalog=catalog, event_bus=bus, instrument_commands=True)
+            manager.detect_winget_client()
+            manager.get_upgradable_apps()
+            # Como a thread de atualização em segundo plano chama
+            catalog.refresh(manager._query_upgradable_apps)
+            manager.list_upgradable_apps()
+
+        callers = [e['caller'] for e in events if e['type'] == 'command_finished']
+        print(f"Chamadores: {callers}")
+
+        checks = {
+            "Probe do cache atribuído a detect_winget_client": callers[0] == 'detect_winget_client',
+            "Listagem pelo catálogo atribuída ao manager": callers[1:3] == ['refresh_upgrade_catalog',
+                                                                          '_query_upgradable_apps'],
+            "Listagem direta": callers[3:] == ['list_upgradable_apps'],
+            "Nenhum método de outro objeto": not {'refresh', 'get_or_probe', 'probe'} & set(callers),
+        }
+        return report_checks(checks)
+
+    except Exception as e:
+        print(f"❌ Erro no teste: {e}")
+        import traceback
+        traceback.print_exc()
+        raise
+
+
+def test_session_cold_and_warm():
+    """Testa as medições com o pool de sessões"""
+    print("\n" + "="*75)
+    print("TESTE: Instrumentação com Sessões Persistentes")
+    print("="*75 + "\n")
+
+    try:
+        from command_timing import CommandTimingCollector
+        from event_bus import EventBus
+        from powershell_manager import PowerShellManager
+        from prereq_cache import PrerequisiteCache
+
+        bus = EventBus()
+        collector = CommandTimingCollector()
+        bus.subscribe(collector)
+        manager = PowerShellManager(shell_argv=STUB_ARGV, use_session_pool=True, pool_size=1,
+                                    prereq_cache=PrerequisiteCache(), event_bus=bus,
+                                    instrument_commands=True)
+        try:
+            manager.execute_command("winget --version")
+            manager.execute_command("winget --version")
+        finally:
+            manager.close()
+
+        cold, warm = collector.records()
+        print(f"Host frio: início {cold['spawn_seconds']}s, total {cold['seconds']}s")
+        print(f"Host aquecido: início {warm['spawn_seconds']}s, total {warm['seconds']}s")
+
+        checks = {
+            "Primeiro comando inicia o host": cold['cold_start'] and not warm['cold_start'],
+            "Início do host só no primeiro": warm['spawn_seconds'] <= cold['spawn_seconds'],
+            "Código de saída da sessão": cold['exit_code'] == 0 and warm['exit_code'] == 0,
+            "Saída medida": warm['output_bytes'] > 0 and warm['first_output_seconds'] is not None,
+        }
+        return report_checks(checks)
+
+    except Exception as e:
+        print(f"❌ Erro no teste: {e}")
+        import traceback
+        traceback.print_exc()
+        raise
+
+
+def test_report():
+    """Testa o relatório e a linha de comando"""
+    print("\n" + "="*75)
+    print("TESTE: Relatório de Tempo")
+    print("="*75 + "\n")
+
+    try:
+        import command_timing
+
+        def record(caller, seconds, spawn, first_output, success=True):
+            return {'type': 'command_finished', 'caller': caller, 'kind': 'process', 'seconds': seconds,
+                    'spawn_seconds': spawn, 'first_output_seconds': first_output, 'output_bytes': 100,
+                    'exit_code': 0 if success else 1, 'success': success, 'command': f"cmd {caller}"}
+
+        records = [
+            record('list_upgradable_apps', 20.0, 1.0, 15.0),
+            record('update_app_silent', 60.0, 1.0, 5.0),
+            record('update_app_silent', 30.0, 1.0, 4.0, success=False),
+            record('detect_winget_client', 2.0, 1.0, None),
+            {'type': 'command_finished', 'seconds': 99.0},   # sem instrumentação: ignorado
+            {'type': 'phase_finished', 'phase': 'x', 'seconds': 5.0},
+        ]
+        report = command_timing.build_timing_report(records, limit=2)
+        totals = report['totals']
+        print(command_timing.format_timing_report(report))
+
+        with tempfile.TemporaryDirectory() as data_dir:
+            path = os.path.join(data_dir, 'eventos.jsonl')
+            with open(path, 'w', encoding='utf-8') as f:
+                for item in records:
+                    f.write(json.dumps(item) + "\n")
+                f.write("linha corrompida\n")
+            output = io.StringIO()
+            with redirect_stdout(output):
+                code = command_timing.main([path, '--json', '--limit', '1'])
+            cli_report = json.loads(output.getvalue())
+
+        checks = {
+            "Só comandos instrumentados": totals['commands'] == 4 and totals['seconds'] == 112.0,
+            "Tempo até a primeira saída (sem saída = total)": totals['startup_seconds'] == 26.0,
+            "Participação no total": totals['startup_share'] == round(26.0 / 112.0, 3),
+            "Chamadores pelo tempo total": list(report['by_caller'])[:2] == ['update_app_silent', 'list_upgradable_apps'],
+            "Falhas por chamador": report['by_caller']['update_app_silent']['failed'] == 1,
+            "Mais lentos primeiro": [r['seconds'] for r in report['slowest']] == [60.0, 30.0],
+            "Linha de comando em JSON": code == 0 and len(cli_report['slowest']) == 1,
+        }
+        return report_checks(checks)
+
+    except Exception as e:
+        print(f"❌ Erro no teste: {e}")
+        import traceback
+        traceback.print_exc()
+        raise
+
+
+def main():
+    """Executa todos os testes"""
+    print("\n" + "="*75)
+    print("SUITE DE TESTES - TEMPO DOS COMANDOS")
+    print("="*75)
+
+    tests = [
+        ("Instrumentação por Processo", test_process_instrumentation),
+        ("Chamador Fora do Manager", test_caller_outside_manager),
+        ("Instrumentação com Sessões Persistentes", test_session_cold_and_warm),
+        ("Relatório de Tempo", test_report),
+    ]
+
+    results = {}
+    for test_name, test_func in tests:
+        try:
+            results[test_name] = test_func()
+        except Exception as e:
+            print(f"\n❌ Teste '{test_name}' falhou com erro: {e}")
+            results[test_name] = False
+
+    # Resumo
+    print("\n" + "="*75)
+    print("RESUMO DOS TESTES")
+    print("="*75 + "\n")
+
+    passed = sum(1 for r in results.values() if r)
+    total = len(results)
+
+    for test_name, result in results.items():
+        status = "✓ PASSOU" if result else "❌ FALHOU"
+        print(f"{status}: {test_name}")
+
+    print(f"\n{passed}/{total} testes passaram")
+
+    if passed == total:
+        print("\n✓ INSTRUMENTAÇÃO DOS COMANDOS FUNCIONANDO!")
+        return 0
+    else:
+        print(f"\n⚠️  {total - passed} teste(s) falharam")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -70,11 +70,13 @@ def test_gui_threading_safety():
             content = f.read()
             
         checks = {
-            "parent.after() em update_progress": "self.parent.after(0, self._update_progress_impl" in content,
-            "parent.after() em log": "self.parent.after(0, self._log_impl" in content,
-            "parent.after() em set_status": "self.parent.after(0, self._set_status_impl" in content,
-            "Tratamento de exceções em _update_progress_impl": "except Exception as e:" in content.split("_update_progress_impl")[1].split("def ")[0],
-            "Tratamento de exceções em _log_impl": "except Exception as e:" in content.split("_log_impl")[1].split("def ")[0] if "_log_impl" in content.split("_update_progress_impl")[1] else False,
+            "update_progress apenas publica na fila": "self._updates.set_latest('progress', percent)" in content,
+            "log apenas publica na fila": "self._updates.put_line(" in content,
+            "set_status apenas publica na fila": "self._updates.set_latest('status', status)" in content,
+            "Bomba agendada na thread principal": "self.window.after(PROGRESS_PUMP_INTERVAL_MS, self._pump)" in content,
+            "Tratamento de exceções em _pump": "except Exception as e:" in content.split("def _pump")[1].split("def ")[0],
+            "Tratamento de exceções em _apply_state": "except Exception as e:" in content.split("def _apply_state")[1].split("def ")[0],
+            "Tratamento de exceções em _append_log": "except Exception as e:" in content.split("def _append_log")[1].split("def ")[0],
         }
         
         all_passed = True
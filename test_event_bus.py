@@ -0,0 +1,291 @@
+"""
+test_event_bus.py - Testa o barramento de eventos e as métricas das operações
+
+Este script testa:
+1. Barramento, percentis, etapas e gravação em JSON Lines
+2. PowerShellManager com o PowerShell falso: eventos por comando e por app,
+   etapas de listagem/atualização e p50/p95 no agregador
+3. CleanupManager: bytes liberados por pasta (em série e em paralelo)
+4. headless_cli.py: evento 'metrics' e --events-file
+"""
+import io
+import json
+import os
+import sys
+import tempfile
+
+from script_checks import report_checks
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+STUB_ARGV = [sys.executable, os.path.join(BASE_DIR, 'stub_powershell.py')]
+
+
+def test_bus_and_aggregator():
+    """Testa o barramento, os percentis e o sink JSON Lines"""
+    print("\n" + "="*75)
+    print("TESTE: Barramento e Agregador")
+    print("="*75 + "\n")
+
+    try:
+        from event_bus import (EVENT_COMMAND_FINISHED, EventBus, JsonLinesSink,
+                               MetricsAggregator, format_metrics_summary, percentile)
+
+        bus = EventBus()
+        silent = bus.emit(EVENT_COMMAND_FINISHED, seconds=1.0)
+
+        metrics = MetricsAggregator()
+        output = io.StringIO()
+        sink = JsonLinesSink(stream=output)
+
+        def broken(event):
+            raise RuntimeError("assinante quebrado")
+
+        bus.subscribe(broken)
+        bus.subscribe(metrics)
+        bus.subscribe(sink)
+
+        for seconds in range(1, 21):
+            bus.emit(EVENT_COMMAND_FINISHED, kind='process', success=seconds != 20, seconds=float(seconds))
+        with bus.phase('listagem'):
+            pass
+        phase_failed = False
+        try:
+            with bus.phase('instalacao'):
+                raise ValueError("falha")
+        except ValueError:
+            phase_failed = True
+
+        summary = metrics.summary()
+        lines = [json.loads(line) for line in output.getvalue().splitlines()]
+        finished_phases = [e for e in lines if e['type'] == 'phase_finished']
+        print(f"Comandos: {summary['commands']}")
+        print(f"Resumo: {format_metrics_summary(summary)}")
+
+        checks = {
+            "Sem assinantes não monta evento": silent is None,
+            "Percentil pelo posto mais próximo": percentile([3, 1, 2, 4], 50) == 2 and percentile([], 95) == 0.0,
+            "p50/p95/max dos comandos": (summary['commands']['p50'] == 10.0 and summary['commands']['p95'] == 19.0
+                                         and summary['commands']['max'] == 20.0),
+            "Falhas e tipo contabilizados": summary['commands']['failed'] == 1 and summary['commands']['by_kind']['process']['count'] == 20,
+            "Assinante quebrado não interrompe os demais": len(lines) == 24,
+            "Etapa com exceção sai com success=False": phase_failed and [e['success'] for e in finished_phases] == [True, False],
+            "Etapas no resumo": set(summary['phases']) == {'listagem', 'instalacao'},
+        }
+        return report_checks(checks)
+
+    except Exception as e:
+        print(f"❌ Erro no teste: {e}")
+        import traceback
+        traceback.print_exc()
+        raise
+
+
+def test_powershell_manager_events():
+    """Testa os eventos do PowerShellManager com o PowerShell falso"""
+    print("\n" + "="*75)
+    print("TESTE: Eventos do PowerShellManager")
+    print("="*75 + "\n")
+
+    try:
+        from event_bus import EventBus, MetricsAggregator
+        from powershell_manager import PowerShellManager
+        from prereq_cache import PrerequisiteCache
+        from upgrade_catalog import UpgradeCatalog
+
+        os.environ['STUB_WINGET_PACKAGES'] = '4'
+        os.environ['STUB_WINGET_DOWNLOAD_SECONDS'] = '0.05'
+        os.environ['STUB_WINGET_INSTALL_SECONDS'] = '0.05'
+        os.environ['STUB_WINGET_FAIL_IDS'] = 'Stub.Package2'
+        try:
+            bus = EventBus()
+            events = []
+            metrics = MetricsAggregator()
+            bus.subscribe(events.append)
+            bus.subscribe(metrics)
+            manager = PowerShellManager(shell_argv=STUB_ARGV, use_session_pool=True, pool_size=2,
+                                        prereq_cache=PrerequisiteCache(), catalog=UpgradeCatalog(),
+                                        event_bus=bus)
+            try:
+                successful, failed, _ = manager.update_apps_individually(max_workers=2)
+            finally:
+                manager.close()
+        finally:
+            for name in ('STUB_WINGET_PACKAGES', 'STUB_WINGET_DOWNLOAD_SECONDS',
+                         'STUB_WINGET_INSTALL_SECONDS', 'STUB_WINGET_FAIL_IDS'):
+                os.environ.pop(name, None)
+
+        started = [e for e in events if e['type'] == 'command_started']
+        finished = [e for e in events if e['type'] == 'command_finished']
+        upgrades = {e['id']: e for e in events if e['type'] == 'app_upgrade'}
+        phases = [e['phase'] for e in events if e['type'] == 'phase_finished']
+        summary = metrics.summary()
+
+        print(f"Comandos: {len(finished)} (p50 {summary['commands']['p50']}s, p95 {summary['commands']['p95']}s)")
+        print(f"Resultados: { {app_id: e['outcome'] for app_id, e in upgrades.items()} }")
+        print(f"Etapas: {summary['phases']}")
+
+        checks = {
+            "Resultado da atualização inalterado": successful == 3 and failed == 1,
+            "Início e fim para cada comando": (len(started) == len(finished) > 0
+                                              and {e['id'] for e in started} == {e['id'] for e in finished}),
+            "Comandos marcados como sessão": all(e['kind'] == 'session' for e in finished),
+            "Um app_upgrade por app com resultado": (len(upgrades) == 4
+                                                     and upgrades['Stub.Package2']['outcome'] == 'installer_failed'
+                                                     and upgrades['Stub.Package1']['outcome'] == 'upgraded'),
+            "Etapas de listagem e atualização": phases == ['list_upgradable', 'upgrade_apps'],
+            "Agregador com p50 <= p95": 0 < summary['commands']['p50'] <= summary['commands']['p95'],
+            "Apps agregados": summary['apps']['successful'] == 3 and summary['apps']['failed'] == 1,
+        }
+        return report_checks(checks)
+
+    except Exception as e:
+        print(f"❌ Erro no teste: {e}")
+        import traceback
+        traceback.print_exc()
+        raise
+
+
+def test_cleanup_events():
+    """Testa os bytes liberados por pasta"""
+    print("\n" + "="*75)
+    print("TESTE: Eventos da Limpeza")
+    print("="*75 + "\n")
+
+    try:
+        from cleanup_manager import CleanupManager
+        from event_bus import EventBus, MetricsAggregator
+
+        outcomes = {}
+        for workers in (1, 3):
+            with tempfile.TemporaryDirectory() as root:
+                folders = []
+                for i, name in enumerate(('a', 'b', 'c')):
+                    folder = os.path.join(root, name)
+                    os.makedirs(folder)
+                    for j in range(i + 1):
+                        with open(os.path.join(folder, f"f{j}.tmp"), 'wb') as handle:
+                            handle.write(b"x" * 1000)
+                    folders.append(folder)
+
+                bus = EventBus()
+                metrics = MetricsAggregator()
+                bus.subscribe(metrics)
+                manager = CleanupManager(lambda message, progress: None, workers, event_bus=bus)
+                result = manager.clean_temp_files(folders)
+                summary = metrics.summary()
+                outcomes[workers] = (result, {os.path.basename(path): size for path, size
+                                              in summary['cleanup']['bytes_by_target'].items()}, summary)
+
+        for workers, (result, by_target, summary) in outcomes.items():
+            print(f"{workers} worker(s): {by_target}, etapas {summary['phases']}")
+
+        checks = {
+            f"Bytes por pasta ({workers} worker(s))": by_target == {'a': 1000, 'b': 2000, 'c': 3000}
+            for workers, (_, by_target, _) in outcomes.items()
+        }
+        checks.update({
+            "Total igual ao resultado da limpeza": all(summary['cleanup']['bytes'] == result['bytes_freed'] == 6000
+                                                       for result, _, summary in outcomes.values()),
+            "Etapa cleanup_temp medida": all('cleanup_temp' in summary['phases']
+                                             for _, _, summary in outcomes.values()),
+        })
+        return report_checks(checks)
+
+    except Exception as e:
+        print(f"❌ Erro no teste: {e}")
+        import traceback
+        traceback.print_exc()
+        raise
+
+
+def test_headless_metrics():
+    """Testa o evento 'metrics' e o arquivo de eventos da linha de comando"""
+    print("\n" + "="*75)
+    print("TESTE: Métricas na Linha de Comando")
+    print("="*75 + "\n")
+
+    try:
+        import subprocess
+
+        with tempfile.TemporaryDirectory() as data_dir:
+            events_file = os.path.join(data_dir, 'eventos.jsonl')
+            env = dict(os.environ, MENINODETI_DATA_DIR=data_dir, PYTHONIOENCODING='utf-8',
+                       STUB_WINGET_PACKAGES='3', STUB_WINGET_DOWNLOAD_SECONDS='0.02',
+                       STUB_WINGET_INSTALL_SECONDS='0.01')
+            shell = f'"{sys.executable}" "{STUB_ARGV[1]}"'
+            result = subprocess.run(
+                [sys.executable, os.path.join(BASE_DIR, 'headless_cli.py'), 'apps', '--shell', shell,
+                 '--events-file', events_file],
+                cwd=BASE_DIR, env=env, capture_output=True, text=True, encoding='utf-8', timeout=120)
+            with open(events_file, encoding='utf-8') as handle:
+                raw = [json.loads(line) for line in handle]
+
+        events = [json.loads(line) for line in result.stdout.splitlines() if line.strip()]
+        kinds = [e['event'] for e in events]
+        metrics = next((e for e in events if e['event'] == 'metrics'), {})
+        raw_types = {e['type'] for e in raw}
+        print(f"Código: {result.returncode}, eventos brutos: {len(raw)} ({sorted(raw_types)})")
+        print(f"Comandos: {metrics.get('commands', {}).get('count')}, etapas: {metrics.get('phases')}")
+
+        checks = {
+            "Código de saída 0": result.returncode == 0,
+            "'metrics' logo antes de 'finish'": kinds[-2:] == ['metrics', 'finish'],
+            "Latências e resultados dos apps": (metrics['commands']['count'] > 0
+                                                and metrics['apps']['successful'] == 3),
+            "Etapas da execução": set(metrics['phases']) == {'apps', 'list_upgradable', 'upgrade_apps'},
+            "Arquivo com os eventos brutos": {'command_started', 'command_finished', 'app_upgrade'} <= raw_types,
+        }
+        return report_checks(checks)
+
+    except Exception as e:
+        print(f"❌ Erro no teste: {e}")
+        import traceback
+        traceback.print_exc()
+        raise
+
+
+def main():
+    """Executa todos os testes"""
+    print("\n" + "="*75)
+    print("SUITE DE TESTES - BARRAMENTO DE EVENTOS E MÉTRICAS")
+    print("="*75)
+
+    tests = [
+        ("Barramento e Agregador", test_bus_and_aggregator),
+        ("Eventos do PowerShellManager", test_powershell_manager_events),
+        ("Eventos da Limpeza", test_cleanup_events),
+        ("Métricas na Linha de Comando", test_headless_metrics),
+    ]
+
+    results = {}
+    for test_name, test_func in tests:
+        try:
+            results[test_name] = test_func()
+        except Exception as e:
+            print(f"\n❌ Teste '{test_name}' falhou com erro: {e}")
+            results[test_name] = False
+
+    # Resumo
+    print("\n" + "="*75)
+    print("RESUMO DOS TESTES")
+    print("="*75 + "\n")
+
+    passed = sum(1 for r in results.values() if r)
+    total = len(results)
+
+    for test_name, result in results.items():
+        status = "✓ PASSOU" if result else "❌ FALHOU"
+        print(f"{status}: {test_name}")
+
+    print(f"\n{passed}/{total} testes passaram")
+
+    if passed == total:
+        print("\n✓ BARRAMENTO DE EVENTOS FUNCIONANDO!")
+        return 0
+    else:
+        print(f"\n⚠️  {total - passed} teste(s) falharam")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
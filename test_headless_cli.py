@@ -0,0 +1,251 @@
+"""
+test_headless_cli.py - Testa a linha de comando não interativa
+
+Este script testa (com o PowerShell e o winget falsos):
+1. 'auto_launcher.py headless apps': eventos JSON em ordem, --exclude e código 0
+2. Códigos de saída: app com falha (1), argumentos inválidos (2) e
+   pré-requisito ausente (3)
+3. 'windows' com a transcrição gravada: um evento por transição de KB
+4. 'cleanup' em processo, com pastas de teste no lugar das do sistema
+"""
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from script_checks import report_checks
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+STUB_SHELL = f'"{sys.executable}" "{os.path.join(BASE_DIR, "stub_powershell.py")}"'
+
+
+def run_cli(args, env_overrides=None, entry='headless_cli.py'):
+    """
+    Executa a linha de comando num processo novo.
+
+    Returns:
+        Tupla (código_de_saída, eventos_json, stderr)
+    """
+    with tempfile.TemporaryDirectory() as data_dir:
+        env = dict(os.environ, MENINODETI_DATA_DIR=data_dir, PYTHONIOENCODING='utf-8',
+                   STUB_WINGET_DOWNLOAD_SECONDS='0.02', STUB_WINGET_INSTALL_SECONDS='0.01')
+        env.update(env_overrides or {})
+        prefix = [sys.executable, os.path.join(BASE_DIR, entry)]
+        if entry == 'auto_launcher.py':
+            prefix.append('headless')
+        result = subprocess.run(prefix + args + ['--shell', STUB_SHELL], cwd=BASE_DIR, env=env,
+                                capture_output=True, text=True, encoding='utf-8', timeout=120)
+    events = [json.loads(line) for line in result.stdout.splitlines() if line.strip()]
+    return result.returncode, events, result.stderr
+
+
+def test_apps_json_lines():
+    """Testa o fluxo de aplicativos pelo auto_launcher"""
+    print("\n" + "="*75)
+    print("TESTE: Aplicativos em JSON Lines")
+    print("="*75 + "\n")
+
+    try:
+        code, events, _ = run_cli(['apps', '--workers', '3', '--exclude', 'Stub.Package5'],
+                                  {'STUB_WINGET_PACKAGES': '6'}, entry='auto_launcher.py')
+        kinds = [event['event'] for event in events]
+        listed = next(event for event in events if event['event'] == 'apps_listed')
+        finished = [event for event in events if event['event'] == 'app_finished']
+        done = next(event for event in events if event['event'] == 'apps_done')
+
+        print(f"Código de saída: {code}, eventos: {len(events)}")
+        print(f"Listados: {listed['count']}, ignorados: {listed['skipped']}, concluídos: {done['successful']}")
+
+        checks = {
+            "Código de saída 0": code == 0,
+            "Começa com 'start' e termina com 'finish'": kinds[0] == 'start' and kinds[-1] == 'finish',
+            "Todas as linhas são JSON com host e comando": all(e['host'] and e['command'] == 'apps' for e in events),
+            "--exclude respeitado": listed['count'] == 5 and listed['skipped'] == ['Stub.Package5'],
+            "Um evento de fim por aplicativo": len(finished) == 5 and all(e['success'] for e in finished),
+            "Resumo com 5 sucessos": done['successful'] == 5 and done['failed'] == 0,
+        }
+        return report_checks(checks)
+
+    except Exception as e:
+        print(f"❌ Erro no teste: {e}")
+        import traceback
+        traceback.print_exc()
+        raise
+
+
+def test_exit_codes():
+    """Testa os códigos de saída"""
+    print("\n" + "="*75)
+    print("TESTE: Códigos de Saída")
+    print("="*75 + "\n")
+
+    try:
+        from headless_cli import EXIT_FAILURES, EXIT_PREREQUISITE, EXIT_USAGE
+
+        failed_code, failed_events, _ = run_cli(['apps'], {'STUB_WINGET_PACKAGES': '3',
+                                                           'STUB_WINGET_FAIL_IDS': 'Stub.Package1'})
+        done = next(e for e in failed_events if e['event'] == 'apps_done')
+        usage_code, _, usage_err = run_cli(['reboot'])
+        workers_code, _, _ = run_cli(['apps', '--workers', '0'])
+        prereq_code, prereq_events, _ = run_cli(['windows'], {'STUB_PS_MODULES': ''})
+        categories_code, categories_events, categories_err = run_cli(['all', '--categories', 'bogus'],
+                                                                     {'STUB_WINGET_PACKAGES': '3'})
+        dry_run_code, dry_run_events, dry_run_err = run_cli(['all', '--dry-run'], {'STUB_WINGET_PACKAGES': '3',
+                                                                                   'STUB_WU_UPDATES': '2'})
+        error = next((e for e in prereq_events if e['event'] == 'error'), {})
+
+        print(f"App com falha: {failed_code} ({done['failed_ids']})")
+        print(f"Comando inválido: {usage_code}, --workers 0: {workers_code}")
+        print(f"Sem PSWindowsUpdate: {prereq_code} ({error.get('kind')})")
+        print(f"'all --categories bogus': {categories_code}, eventos: {[e['event'] for e in categories_events]}")
+        print(f"'all --dry-run': {dry_run_code}, eventos: {[e['event'] for e in dry_run_events]}")
+
+        checks = {
+            "App com falha sai com 1": failed_code == EXIT_FAILURES and done['failed_ids'] == ['Stub.Package1'],
+            "Comando inválido sai com 2": usage_code == EXIT_USAGE and 'invalid choice' in usage_err,
+            "--workers 0 sai com 2": workers_code == EXIT_USAGE,
+            "Pré-requisito ausente sai com 3": prereq_code == EXIT_PREREQUISITE and error.get('kind') == 'prerequisite',
+            "Categoria inválida sai com 2 antes de qualquer etapa": categories_code == EXIT_USAGE
+                                                                    and categories_events == []
+                                                                    and 'bogus' in categories_err,
+            "--dry-run fora de 'apps' sai com 2 sem executar nada": dry_run_code == EXIT_USAGE
+                                                                 and dry_run_events == []
+                                                                 and '--dry-run' in dry_run_err,
+        }
+        return report_checks(checks)
+
+    except Exception as e:
+        print(f"❌ Erro no teste: {e}")
+        import traceback
+        traceback.print_exc()
+        raise
+
+
+def test_windows_update_events():
+    """Testa os eventos do Windows Update"""
+    print("\n" + "="*75)
+    print("TESTE: Windows Update em JSON Lines")
+    print("="*75 + "\n")
+
+    try:
+        transcript = os.path.join(BASE_DIR, 'fixtures', 'pswindowsupdate_install.txt')
+        code, events, _ = run_cli(['windows', '--windows-timeout', '60'], {'STUB_WU_TRANSCRIPT': transcript})
+        updates = [e for e in events if e['event'] == 'windows_update']
+        done = next(e for e in events if e['event'] == 'windows_done')
+        kbs = sorted({e['kb'] for e in updates if e.get('kb')})
+
+        print(f"Código: {code}, eventos de KB: {len(updates)}, KBs: {kbs}")
+
+        checks = {
+            "Código de saída 0": code == 0 and done['success'],
+            "Eventos por transição de KB": len(updates) > 0 and len(kbs) > 0,
+            "Percentual termina em 100": updates and updates[-1]['percent'] == 100,
+        }
+        return report_checks(checks)
+
+    except Exception as e:
+        print(f"❌ Erro no teste: {e}")
+        import traceback
+        traceback.print_exc()
+        raise
+
+
+def test_cleanup_in_process():
+    """Testa a limpeza com pastas de teste"""
+    print("\n" + "="*75)
+    print("TESTE: Limpeza sem Interface")
+    print("="*75 + "\n")
+
+    try:
+        import headless_cli
+        from cleanup_manager import CleanupManager
+
+        with tempfile.TemporaryDirectory() as root:
+            folders = []
+            for name in ('cache', 'temp'):
+                folder = os.path.join(root, name)
+                os.makedirs(os.path.join(folder, 'sub'))
+                for i in range(5):
+                    with open(os.path.join(folder, 'sub', f"f{i}.tmp"), 'wb') as handle:
+                        handle.write(b"x" * 100)
+                folders.append(folder)
+
+            original = (CleanupManager.get_cache_folders, CleanupManager.get_temp_folders)
+            CleanupManager.get_cache_folders = lambda self: [folders[0]]
+            CleanupManager.get_temp_folders = lambda self: [folders[1], folders[0]]
+            try:
+                output = io.StringIO()
+                code = headless_cli.main(['cleanup', '--categories', 'cache,temp', '--workers', '2'],
+                                         stream=output)
+                bad_output = io.StringIO()
+                bad_code = headless_cli.main(['cleanup', '--categories', 'cache,disco'], stream=bad_output)
+            finally:
+                CleanupManager.get_cache_folders, CleanupManager.get_temp_folders = original
+            emptied = all(not os.listdir(f) for f in folders)
+
+        events = [json.loads(line) for line in output.getvalue().splitlines()]
+        done = next(e for e in events if e['event'] == 'cleanup_done')
+        print(f"Código: {code}, arquivos: {done['files']}, bytes: {done['bytes']}")
+
+        checks = {
+            "Código de saída 0": code == 0,
+            "Pastas esvaziadas (pasta repetida limpa uma vez)": emptied and done['files'] == 10 and done['bytes'] == 1000,
+            "Progresso publicado como eventos": any(e['event'] == 'cleanup_progress' for e in events),
+            "Categoria desconhecida sai com 2": bad_code == headless_cli.EXIT_USAGE,
+        }
+        return report_checks(checks)
+
+    except Exception as e:
+        print(f"❌ Erro no teste: {e}")
+        import traceback
+        traceback.print_exc()
+        raise
+
+
+def main():
+    """Executa todos os testes"""
+    print("\n" + "="*75)
+    print("SUITE DE TESTES - LINHA DE COMANDO SEM INTERFACE")
+    print("="*75)
+
+    tests = [
+        ("Aplicativos em JSON Lines", test_apps_json_lines),
+        ("Códigos de Saída", test_exit_codes),
+        ("Windows Update em JSON Lines", test_windows_update_events),
+        ("Limpeza sem Interface", test_cleanup_in_process),
+    ]
+
+    results = {}
+    for test_name, test_func in tests:
+        try:
+            results[test_name] = test_func()
+        except Exception as e:
+            print(f"\n❌ Teste '{test_name}' falhou com erro: {e}")
+            results[test_name] = False
+
+    # Resumo
+    print("\n" + "="*75)
+    print("RESUMO DOS TESTES")
+    print("="*75 + "\n")
+
+    passed = sum(1 for r in results.values() if r)
+    total = len(results)
+
+    for test_name, result in results.items():
+        status = "✓ PASSOU" if result else "❌ FALHOU"
+        print(f"{status}: {test_name}")
+
+    print(f"\n{passed}/{total} testes passaram")
+
+    if passed == total:
+        print("\n✓ LINHA DE COMANDO SEM INTERFACE FUNCIONANDO!")
+        return 0
+    else:
+        print(f"\n⚠️  {total - passed} teste(s) falharam")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
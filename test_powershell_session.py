@@ -0,0 +1,192 @@
+"""
+test_powershell_session.py - Testa as sessões PowerShell persistentes
+
+Este script testa (contra o stub_powershell.py, funciona em Linux):
+1. Reaproveitamento do mesmo host entre comandos
+2. Contrato (success, stdout, stderr) preservado, inclusive em erros
+3. Timeout com descarte e recriação da sessão
+4. Integração com PowerShellManager.execute_command
+"""
+import os
+import sys
+
+from script_checks import fail
+
+STUB_ARGV = [sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'stub_powershell.py')]
+
+
+def test_session_reuse():
+    """Testa que vários comandos usam o mesmo processo host"""
+    print("\n" + "="*75)
+    print("TESTE: Reaproveitamento de Sessão")
+    print("="*75 + "\n")
+
+    try:
+        from powershell_session import PowerShellSessionPool
+
+        pool = PowerShellSessionPool(size=1, shell_argv=STUB_ARGV)
+        pids = set()
+        for _ in range(5):
+            success, stdout, stderr = pool.execute("$PID", timeout=10)
+            if not success:
+                fail(f"Comando falhou: {stderr}")
+            pids.add(stdout.strip())
+        pool.close()
+
+        print(f"PIDs observados: {pids}")
+        if len(pids) == 1:
+            print("✓ Todos os comandos rodaram no mesmo host")
+            return True
+        fail("Mais de um host foi criado")
+
+    except Exception as e:
+        print(f"❌ Erro no teste: {e}")
+        import traceback
+        traceback.print_exc()
+        raise
+
+
+def test_session_contract():
+    """Testa stdout, stderr e código de saída enquadrados"""
+    print("\n" + "="*75)
+    print("TESTE: Contrato (success, stdout, stderr)")
+    print("="*75 + "\n")
+
+    try:
+        from powershell_session import PowerShellSessionPool
+
+        pool = PowerShellSessionPool(size=1, shell_argv=STUB_ARGV)
+
+        success, stdout, stderr = pool.execute("Write-Output 'ação concluída'", timeout=10)
+        print(f"Sucesso: success={success}, stdout={stdout!r}")
+        if not success or stdout.strip() != "ação concluída" or stderr != "":
+            fail("Saída UTF-8 incorreta")
+
+        success, stdout, stderr = pool.execute("Write-Error 'falhou'", timeout=10)
+        print(f"Erro: success={success}, stderr={stderr!r}")
+        if success or "falhou" not in stderr:
+            fail("Erro não reportado corretamente")
+
+        success, stdout, stderr = pool.execute("$null", timeout=10)
+        if not success or stdout is None or stderr is None:
+            fail("Comando vazio retornou None ou falha")
+
+        pool.close()
+        print("✓ Contrato preservado")
+        return True
+
+    except Exception as e:
+        print(f"❌ Erro no teste: {e}")
+        import traceback
+        traceback.print_exc()
+        raise
+
+
+def test_session_timeout_recovery():
+    """Testa que um timeout descarta o host e o próximo comando funciona"""
+    print("\n" + "="*75)
+    print("TESTE: Timeout e Recuperação")
+    print("="*75 + "\n")
+
+    try:
+        from powershell_session import PowerShellSessionPool
+
+        pool = PowerShellSessionPool(size=1, shell_argv=STUB_ARGV)
+        success, first_pid, _ = pool.execute("$PID", timeout=10)
+
+        success, stdout, stderr = pool.execute("Start-Sleep -Seconds 5", timeout=1)
+        print(f"Timeout: success={success}, stderr={stderr!r}")
+        if success or stderr != "Command timed out":
+            fail("Timeout não foi reportado")
+
+        success, second_pid, _ = pool.execute("$PID", timeout=10)
+        pool.close()
+
+        if success and second_pid.strip() != first_pid.strip():
+            print("✓ Host travado descartado e recriado")
+            return True
+        fail("Sessão não foi recriada após timeout")
+
+    except Exception as e:
+        print(f"❌ Erro no teste: {e}")
+        import traceback
+        traceback.print_exc()
+        raise
+
+
+def test_manager_session_mode():
+    """Testa PowerShellManager com modo de sessão ativado"""
+    print("\n" + "="*75)
+    print("TESTE: PowerShellManager em Modo Sessão")
+    print("="*75 + "\n")
+
+    try:
+        from powershell_manager import PowerShellManager
+
+        one_shot = PowerShellManager(shell_argv=STUB_ARGV)
+        pooled = PowerShellManager(shell_argv=STUB_ARGV, use_session_pool=True, pool_size=1)
+
+        expected = one_shot.execute_command("Write-Output 'teste'")
+        result = pooled.execute_command("Write-Output 'teste'")
+        pooled.close()
+
+        print(f"Processo único: {expected}")
+        print(f"Sessão:         {result}")
+
+        if expected[0] == result[0] and expected[1].strip() == result[1].strip():
+            print("✓ Mesmo resultado nos dois modos")
+            return True
+        fail("Resultados divergentes")
+
+    except Exception as e:
+        print(f"❌ Erro no teste: {e}")
+        import traceback
+        traceback.print_exc()
+        raise
+
+
+def main():
+    """Executa todos os testes"""
+    print("\n" + "="*75)
+    print("SUITE DE TESTES - SESSÕES POWERSHELL PERSISTENTES")
+    print("="*75)
+
+    tests = [
+        ("Reaproveitamento de Sessão", test_session_reuse),
+        ("Contrato de Retorno", test_session_contract),
+        ("Timeout e Recuperação", test_session_timeout_recovery),
+        ("PowerShellManager Modo Sessão", test_manager_session_mode),
+    ]
+
+    results = {}
+    for test_name, test_func in tests:
+        try:
+            results[test_name] = test_func()
+        except Exception as e:
+            print(f"\n❌ Teste '{test_name}' falhou com erro: {e}")
+            results[test_name] = False
+
+    # Resumo
+    print("\n" + "="*75)
+    print("RESUMO DOS TESTES")
+    print("="*75 + "\n")
+
+    passed = sum(1 for r in results.values() if r)
+    total = len(results)
+
+    for test_name, result in results.items():
+        status = "✓ PASSOU" if result else "❌ FALHOU"
+        print(f"{status}: {test_name}")
+
+    print(f"\n{passed}/{total} testes passaram")
+
+    if passed == total:
+        print("\n✓ SESSÕES PERSISTENTES FUNCIONANDO!")
+        return 0
+    else:
+        print(f"\n⚠️  {total - passed} teste(s) falharam")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,197 @@
+"""
+test_prereq_cache.py - Testa o cache de verificações de pré-requisitos
+
+Este script testa:
+1. Expiração por TTL e invalidação explícita
+2. Persistência em disco entre instâncias (nova execução do aplicativo)
+3. PowerShellManager executando cada verificação uma única vez
+"""
+import os
+import sys
+import tempfile
+
+from script_checks import report_checks
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+STUB_ARGV = [sys.executable, os.path.join(BASE_DIR, 'stub_powershell.py')]
+
+
+def test_ttl_and_invalidation():
+    """Testa expiração e invalidação"""
+    print("\n" + "="*75)
+    print("TESTE: TTL e Invalidação")
+    print("="*75 + "\n")
+
+    try:
+        from prereq_cache import PrerequisiteCache
+
+        now = {'t': 1000.0}
+        cache = PrerequisiteCache(ttl=60, clock=lambda: now['t'])
+        probes = []
+
+        def probe():
+            probes.append(now['t'])
+            return True
+
+        cache.get_or_probe('winget', probe)
+        now['t'] += 30
+        cache.get_or_probe('winget', probe)
+        after_hit = len(probes)
+
+        now['t'] += 31
+        cache.get_or_probe('winget', probe)
+        after_expiry = len(probes)
+
+        cache.invalidate('winget')
+        cache.get_or_probe('winget', probe)
+        after_invalidate = len(probes)
+
+        cache.get_or_probe('missing', lambda: False, cache_if=bool)
+        negative_cached = cache.get('missing') is not None
+
+        checks = {
+            "Segunda consulta usou o cache": after_hit == 1,
+            "Entrada expirada consultada de novo": after_expiry == 2,
+            "Invalidação força nova consulta": after_invalidate == 3,
+            "cache_if evita guardar resultado negativo": not negative_cached,
+        }
+        return report_checks(checks)
+
+    except Exception as e:
+        print(f"❌ Erro no teste: {e}")
+        import traceback
+        traceback.print_exc()
+        raise
+
+
+def test_disk_persistence():
+    """Testa que uma nova instância reaproveita as verificações gravadas"""
+    print("\n" + "="*75)
+    print("TESTE: Persistência em Disco")
+    print("="*75 + "\n")
+
+    try:
+        from prereq_cache import PrerequisiteCache
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, 'prereq_cache.json')
+            now = {'t': 1000.0}
+
+            first = PrerequisiteCache(ttl=300, path=path, clock=lambda: now['t'])
+            first.set('pswindowsupdate', True)
+            first.set('admin', True, persist=False)
+
+            now['t'] += 120
+            relaunch = PrerequisiteCache(ttl=300, path=path, clock=lambda: now['t'])
+            reused = relaunch.get('pswindowsupdate')
+            admin = relaunch.get('admin')
+
+            now['t'] += 600
+            stale = PrerequisiteCache(ttl=300, path=path, clock=lambda: now['t'])
+
+            checks = {
+                "Nova execução reaproveita a verificação": reused is True,
+                "Admin não é persistido": admin is None,
+                "Entradas vencidas não são carregadas": stale.get('pswindowsupdate') is None,
+            }
+            return report_checks(checks)
+
+    except Exception as e:
+        print(f"❌ Erro no teste: {e}")
+        import traceback
+        traceback.print_exc()
+        raise
+
+
+def test_manager_probes_once():
+    """Testa que o PowerShellManager consulta cada pré-requisito uma única vez"""
+    print("\n" + "="*75)
+    print("TESTE: PowerShellManager com Cache")
+    print("="*75 + "\n")
+
+    try:
+        from powershell_manager import PowerShellManager
+        from prereq_cache import PrerequisiteCache
+
+        cache = PrerequisiteCache()
+        commands = []
+
+        # Duas "interfaces" compartilhando o mesmo cache
+        managers = [PowerShellManager(shell_argv=STUB_ARGV, prereq_cache=cache) for _ in range(2)]
+        for manager in managers:
+            original = manager.execute_command
+
+            def counting(command, timeout=300, original=original):
+                commands.append(command)
+                return original(command, timeout)
+
+            manager.execute_command = counting
+
+        for manager in managers:
+            manager.install_pswindowsupdate_module()
+            manager.detect_winget_client()
+        probes_before = len(commands)
+
+        managers[1].invalidate_prerequisites('pswindowsupdate')
+        managers[0].install_pswindowsupdate_module()
+
+        print(f"Comandos executados: {probes_before}, após invalidação: {len(commands)}")
+
+        checks = {
+            "Uma consulta por verificação": probes_before == 2,
+            "Cache compartilhado entre instâncias": managers[1].winget_client_available is False,
+            "Invalidação vale para todas as instâncias": len(commands) == 3,
+        }
+        return report_checks(checks)
+
+    except Exception as e:
+        print(f"❌ Erro no teste: {e}")
+        import traceback
+        traceback.print_exc()
+        raise
+
+
+def main():
+    """Executa todos os testes"""
+    print("\n" + "="*75)
+    print("SUITE DE TESTES - CACHE DE PRÉ-REQUISITOS")
+    print("="*75)
+
+    tests = [
+        ("TTL e Invalidação", test_ttl_and_invalidation),
+        ("Persistência em Disco", test_disk_persistence),
+        ("PowerShellManager com Cache", test_manager_probes_once),
+    ]
+
+    results = {}
+    for test_name, test_func in tests:
+        try:
+            results[test_name] = test_func()
+        except Exception as e:
+            print(f"\n❌ Teste '{test_name}' falhou com erro: {e}")
+            results[test_name] = False
+
+    # Resumo
+    print("\n" + "="*75)
+    print("RESUMO DOS TESTES")
+    print("="*75 + "\n")
+
+    passed = sum(1 for r in results.values() if r)
+    total = len(results)
+
+    for test_name, result in results.items():
+        status = "✓ PASSOU" if result else "❌ FALHOU"
+        print(f"{status}: {test_name}")
+
+    print(f"\n{passed}/{total} testes passaram")
+
+    if passed == total:
+        print("\n✓ CACHE DE PRÉ-REQUISITOS FUNCIONANDO!")
+        return 0
+    else:
+        print(f"\n⚠️  {total - passed} teste(s) falharam")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
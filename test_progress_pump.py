@@ -0,0 +1,178 @@
+"""
+test_progress_pump.py - Testa a bomba de atualizações da janela de progresso
+
+Este script testa (sem display, com o laço falso do stub_tk.py):
+1. Fila de atualizações: ordem das linhas, valor mais recente e descarte limitado
+2. ProgressWindow aplicando lotes, limitando o log e mantendo o progresso mais recente
+3. close() cancelando a bomba
+"""
+import sys
+import threading
+
+from script_checks import report_checks
+
+
+def test_update_queue():
+    """Testa ordem, coalescência e limite da fila"""
+    print("\n" + "="*75)
+    print("TESTE: Fila de Atualizações")
+    print("="*75 + "\n")
+
+    try:
+        from ui_update_queue import UIUpdateQueue
+
+        queue = UIUpdateQueue(max_lines=5)
+        for i in range(8):
+            queue.put_line(f"linha{i}")
+            queue.set_latest('progress', i)
+        queue.set_latest('status', "baixando")
+
+        first, latest, dropped = queue.drain(max_lines=3)
+        rest, latest_after, dropped_after = queue.drain()
+
+        print(f"Lote 1: {first} {latest} descartadas={dropped}")
+        print(f"Lote 2: {rest} {latest_after} descartadas={dropped_after}")
+
+        checks = {
+            "Linhas em ordem, as mais antigas descartadas": first + rest == [f"linha{i}" for i in range(3, 8)],
+            "Descartes contados uma vez": dropped == 3 and dropped_after == 0,
+            "Só o progresso mais recente": latest == {'progress': 7, 'status': "baixando"},
+            "Restante fica para o próximo intervalo": len(rest) == 2 and latest_after == {},
+            "Fila vazia após drenar": queue.pending == 0,
+        }
+        return report_checks(checks)
+
+    except Exception as e:
+        print(f"❌ Erro no teste: {e}")
+        import traceback
+        traceback.print_exc()
+        raise
+
+
+def test_pump_batches():
+    """Testa a ProgressWindow com uma thread produzindo milhares de linhas"""
+    print("\n" + "="*75)
+    print("TESTE: Bomba em Lote")
+    print("="*75 + "\n")
+
+    try:
+        from gui_constants import LOG_MAX_LINES
+        from stub_tk import StubLoop, make_progress_window
+
+        loop = StubLoop(redraw_cost=0)
+        window = make_progress_window(loop, insert_cost=0, see_cost=0)
+        total = LOG_MAX_LINES + 1000
+
+        def produce():
+            for i in range(total):
+                window.update_progress(i * 100.0 / total, log_text=f"saída {i}")
+            window.update_progress(100, "Concluído", "Tudo pronto")
+            window.set_status("Finalizado")
+
+        producer = threading.Thread(target=produce)
+        producer.start()
+        done = loop.run_until(
+            lambda: not producer.is_alive() and window._updates.pending == 0
+            and window.percent_var.get() == "100%", timeout=30)
+        producer.join()
+
+        lines = window.log_text.lines
+        print(f"Callbacks: {loop.callbacks_run}, linhas no log: {len(lines)}, "
+              f"última: {lines[-1] if lines else None}")
+
+        checks = {
+            "Todas as atualizações aplicadas": done,
+            "Log limitado a LOG_MAX_LINES": len(lines) == LOG_MAX_LINES,
+            "Última linha exibida": bool(lines) and lines[-1].endswith(f"saída {total - 1}"),
+            "Poucos callbacks na thread do Tk": loop.callbacks_run < total / 10,
+            "Estado final aplicado": (window.step_var.get(), window.desc_var.get(), window.status_var.get())
+                                     == ("Concluído", "Tudo pronto", "Finalizado"),
+        }
+        return report_checks(checks)
+
+    except Exception as e:
+        print(f"❌ Erro no teste: {e}")
+        import traceback
+        traceback.print_exc()
+        raise
+
+
+def test_close_cancels_pump():
+    """Testa que close() para a bomba e destrói a janela"""
+    print("\n" + "="*75)
+    print("TESTE: close() Cancela a Bomba")
+    print("="*75 + "\n")
+
+    try:
+        import time
+        from gui_constants import PROGRESS_PUMP_INTERVAL_MS
+        from stub_tk import StubLoop, make_progress_window
+
+        loop = StubLoop(redraw_cost=0)
+        window = make_progress_window(loop, insert_cost=0, see_cost=0)
+        loop.run_until(lambda: loop.callbacks_run >= 2, timeout=5)
+
+        window.close()
+        callbacks = loop.callbacks_run
+        window.log("depois de fechar")
+        deadline = time.perf_counter() + 3 * PROGRESS_PUMP_INTERVAL_MS / 1000.0
+        loop.run_until(lambda: time.perf_counter() > deadline, timeout=5)
+
+        checks = {
+            "Janela destruída": not window.window.winfo_exists(),
+            "Nenhuma bomba após close()": loop.callbacks_run == callbacks,
+            "Log após close() ignorado": "depois de fechar" not in "".join(window.log_text.lines),
+        }
+        return report_checks(checks)
+
+    except Exception as e:
+        print(f"❌ Erro no teste: {e}")
+        import traceback
+        traceback.print_exc()
+        raise
+
+
+def main():
+    """Executa todos os testes"""
+    print("\n" + "="*75)
+    print("SUITE DE TESTES - BOMBA DE ATUALIZAÇÕES")
+    print("="*75)
+
+    tests = [
+        ("Fila de Atualizações", test_update_queue),
+        ("Bomba em Lote", test_pump_batches),
+        ("close() Cancela a Bomba", test_close_cancels_pump),
+    ]
+
+    results = {}
+    for test_name, test_func in tests:
+        try:
+            results[test_name] = test_func()
+        except Exception as e:
+            print(f"\n❌ Teste '{test_name}' falhou com erro: {e}")
+            results[test_name] = False
+
+    # Resumo
+    print("\n" + "="*75)
+    print("RESUMO DOS TESTES")
+    print("="*75 + "\n")
+
+    passed = sum(1 for r in results.values() if r)
+    total = len(results)
+
+    for test_name, result in results.items():
+        status = "✓ PASSOU" if result else "❌ FALHOU"
+        print(f"{status}: {test_name}")
+
+    print(f"\n{passed}/{total} testes passaram")
+
+    if passed == total:
+        print("\n✓ BOMBA DE ATUALIZAÇÕES FUNCIONANDO!")
+        return 0
+    else:
+        print(f"\n⚠️  {total - passed} teste(s) falharam")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
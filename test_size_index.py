@@ -0,0 +1,222 @@
+"""
+test_size_index.py - Testa o índice persistente de tamanho por pasta
+
+Este script testa:
+1. Revarredura incremental (só pastas alteradas são listadas de novo)
+2. Estimativa instantânea e persistência em disco entre instâncias
+3. get_cleanup_info com estimativa rápida seguida do valor atualizado
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from script_checks import report_checks
+
+
+def _make_tree(root, subdirs=4, files=5):
+    """Cria uma árvore com mtimes antigos e retorna (bytes, arquivos)"""
+    total = 0
+    for d in range(subdirs):
+        folder = os.path.join(root, f"pasta{d}", "sub")
+        os.makedirs(folder)
+        for f in range(files):
+            data = b"x" * (100 * (f + 1))
+            with open(os.path.join(folder, f"arquivo{f}.tmp"), 'wb') as handle:
+                handle.write(data)
+            total += len(data)
+    _age_dirs(root)
+    return total, subdirs * files
+
+
+def _age_dirs(root):
+    """Atrasa a mtime das pastas para que a próxima alteração mude o valor"""
+    old = time.time() - 60
+    for dir_path, _, _ in os.walk(root):
+        os.utime(dir_path, (old, old))
+
+
+def test_incremental_refresh():
+    """Testa que só as pastas alteradas são revarridas"""
+    print("\n" + "="*75)
+    print("TESTE: Revarredura Incremental")
+    print("="*75 + "\n")
+
+    try:
+        from cleanup_engine import scan_tree_size
+        from size_index import SizeIndex
+
+        with tempfile.TemporaryDirectory() as root:
+            total, files = _make_tree(root)
+            baseline = scan_tree_size(root)
+            index = SizeIndex()
+
+            first = index.refresh(root)
+            first_rescanned = index.rescanned
+            second = index.refresh(root)
+            second_rescanned = index.rescanned
+
+            with open(os.path.join(root, "pasta1", "sub", "novo.tmp"), 'wb') as handle:
+                handle.write(b"y" * 50)
+            added = index.refresh(root)
+            added_rescanned = index.rescanned
+
+            shutil.rmtree(os.path.join(root, "pasta2"))
+            entries_before = len(index)
+            removed = index.refresh(root)
+
+            print(f"Primeira: {first} ({first_rescanned} pastas), segunda: {second} ({second_rescanned})")
+            print(f"Após novo arquivo: {added} ({added_rescanned}), após remover pasta: {removed}")
+
+            checks = {
+                "Primeira varredura igual a scan_tree_size": first == (total, files) == baseline,
+                "Sem alterações, nenhuma pasta listada": second == first and second_rescanned == 0,
+                "Arquivo novo: só a pasta alterada listada": added == (first[0] + 50, first[1] + 1) and added_rescanned == 1,
+                "Pasta removida sai do total": removed == scan_tree_size(root),
+                "Pasta removida sai do índice": len(index) == entries_before - 2,
+            }
+            return report_checks(checks)
+
+    except Exception as e:
+        print(f"❌ Erro no teste: {e}")
+        import traceback
+        traceback.print_exc()
+        raise
+
+
+def test_estimate_and_persistence():
+    """Testa a estimativa sem disco e a leitura por uma nova instância"""
+    print("\n" + "="*75)
+    print("TESTE: Estimativa e Persistência")
+    print("="*75 + "\n")
+
+    try:
+        from size_index import SizeIndex
+
+        with tempfile.TemporaryDirectory() as data_dir, tempfile.TemporaryDirectory() as root:
+            total, files = _make_tree(root)
+            index_path = os.path.join(data_dir, 'size_index.json')
+
+            index = SizeIndex(path=index_path)
+            unknown = index.estimate(root)
+            index.refresh(root)
+            index.save()
+
+            reloaded = SizeIndex(path=index_path)
+            estimate = reloaded.estimate(root)
+            warm = reloaded.refresh(root)
+            warm_rescanned = reloaded.rescanned
+
+            print(f"Estimativa recarregada: {estimate}, atualizado: {warm} ({warm_rescanned} pastas)")
+
+            checks = {
+                "Pasta nunca indexada retorna None": unknown is None,
+                "Estimativa igual ao total": estimate == (total, files),
+                "Nova instância não revarre pastas inalteradas": warm == (total, files) and warm_rescanned == 0,
+            }
+            return report_checks(checks)
+
+    except Exception as e:
+        print(f"❌ Erro no teste: {e}")
+        import traceback
+        traceback.print_exc()
+        raise
+
+
+def test_cleanup_info_estimate():
+    """Testa get_cleanup_info com estimate_only antes e depois da varredura"""
+    print("\n" + "="*75)
+    print("TESTE: get_cleanup_info com Índice")
+    print("="*75 + "\n")
+
+    try:
+        import cleanup_manager
+        from cleanup_manager import CleanupManager
+        from size_index import SizeIndex
+
+        with tempfile.TemporaryDirectory() as root:
+            cache = os.path.join(root, "Cache")
+            temp = os.path.join(root, "Temp")
+            os.makedirs(cache)
+            os.makedirs(temp)
+            cache_bytes, _ = _make_tree(cache)
+            temp_bytes, _ = _make_tree(temp, subdirs=2)
+
+            original = (CleanupManager.get_cache_folders, CleanupManager.get_temp_folders,
+                        CleanupManager.get_recyclable_size)
+            CleanupManager.get_cache_folders = lambda self: [cache]
+            CleanupManager.get_temp_folders = lambda self: [temp]
+            CleanupManager.get_recyclable_size = lambda self: 0
+            index = SizeIndex()
+            try:
+                cold = cleanup_manager.get_cleanup_info(estimate_only=True, size_index=index)
+                full = cleanup_manager.get_cleanup_info(size_index=index)
+                warm = cleanup_manager.get_cleanup_info(estimate_only=True, size_index=index)
+            finally:
+                (CleanupManager.get_cache_folders, CleanupManager.get_temp_folders,
+                 CleanupManager.get_recyclable_size) = original
+
+            print(f"Fria: {cold['cache_size']}/{cold['temp_size']} (sem índice: {cold['unindexed']})")
+            print(f"Completa: {full['cache_size']}/{full['temp_size']}, estimativa: {warm['cache_size']}/{warm['temp_size']}")
+
+            checks = {
+                "Estimativa fria marca pastas sem índice": cold['estimated'] and cold['unindexed'] == 2,
+                "Varredura completa correta": (full['cache_size'], full['temp_size']) == (cache_bytes, temp_bytes)
+                                              and not full['estimated'],
+                "Estimativa seguinte usa o índice": (warm['cache_size'], warm['temp_size']) == (cache_bytes, temp_bytes)
+                                                    and warm['unindexed'] == 0,
+            }
+            return report_checks(checks)
+
+    except Exception as e:
+        print(f"❌ Erro no teste: {e}")
+        import traceback
+        traceback.print_exc()
+        raise
+
+
+def main():
+    """Executa todos os testes"""
+    print("\n" + "="*75)
+    print("SUITE DE TESTES - ÍNDICE DE TAMANHOS")
+    print("="*75)
+
+    tests = [
+        ("Revarredura Incremental", test_incremental_refresh),
+        ("Estimativa e Persistência", test_estimate_and_persistence),
+        ("get_cleanup_info com Índice", test_cleanup_info_estimate),
+    ]
+
+    results = {}
+    for test_name, test_func in tests:
+        try:
+            results[test_name] = test_func()
+        except Exception as e:
+            print(f"\n❌ Teste '{test_name}' falhou com erro: {e}")
+            results[test_name] = False
+
+    # Resumo
+    print("\n" + "="*75)
+    print("RESUMO DOS TESTES")
+    print("="*75 + "\n")
+
+    passed = sum(1 for r in results.values() if r)
+    total = len(results)
+
+    for test_name, result in results.items():
+        status = "✓ PASSOU" if result else "❌ FALHOU"
+        print(f"{status}: {test_name}")
+
+    print(f"\n{passed}/{total} testes passaram")
+
+    if passed == total:
+        print("\n✓ ÍNDICE DE TAMANHOS FUNCIONANDO!")
+        return 0
+    else:
+        print(f"\n⚠️  {total - passed} teste(s) falharam")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,160 @@
+"""
+test_startup.py - Testa a inicialização rápida do modo console
+
+Este script testa:
+1. import auto_launcher sem tkinter, Pillow ou módulos da GUI
+2. ConsoleSplash executando tarefas reais, sem esperas fixas
+3. 'auto_launcher.py console' chegando ao menu dentro do orçamento
+"""
+import io
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+
+from script_checks import report_checks
+
+
+def test_lazy_gui_imports():
+    """Testa que o modo console não importa a GUI"""
+    print("\n" + "="*75)
+    print("TESTE: Imports Adiados da GUI")
+    print("="*75 + "\n")
+
+    try:
+        from bench_startup import measure_imports
+
+        result = measure_imports('auto_launcher')
+        print(f"import auto_launcher: {result['cumulative_ms']:.1f} ms, GUI: {result['gui_modules']}")
+
+        checks = {
+            "auto_launcher importado": result['ok'],
+            "tkinter, Pillow e GUI não importados": result['gui_modules'] == [],
+        }
+        return report_checks(checks)
+
+    except Exception as e:
+        print(f"❌ Erro no teste: {e}")
+        import traceback
+        traceback.print_exc()
+        raise
+
+
+def test_console_splash_tasks():
+    """Testa o progresso guiado por tarefas de pré-carregamento"""
+    print("\n" + "="*75)
+    print("TESTE: Splash Console com Pré-carregamento")
+    print("="*75 + "\n")
+
+    try:
+        from console_splash import ConsoleSplash
+
+        executed = []
+        progress = []
+
+        def failing_task():
+            executed.append("falha")
+            raise RuntimeError("cache corrompido")
+
+        tasks = [
+            ("Primeira tarefa", lambda: executed.append("primeira")),
+            ("Tarefa com falha", failing_task),
+            ("Última tarefa", lambda: executed.append("última")),
+        ]
+
+        splash = ConsoleSplash()
+        splash.clear_screen = lambda: None
+        output = io.StringIO()
+        start = time.perf_counter()
+        with redirect_stdout(output):
+            splash.show(callback=progress.append, tasks=tasks)
+        elapsed = time.perf_counter() - start
+
+        print(f"Tarefas: {executed}, progresso: {progress}, tempo: {elapsed:.3f}s")
+
+        checks = {
+            "Tarefas executadas em ordem": executed == ["primeira", "falha", "última"],
+            "Falha exibida sem interromper": "[!!] Tarefa com falha" in output.getvalue(),
+            "Progresso crescente até 100%": progress == sorted(progress) and progress[-1] == 100,
+            "Sem esperas fixas (< 0,3s)": elapsed < 0.3,
+        }
+        return report_checks(checks)
+
+    except Exception as e:
+        print(f"❌ Erro no teste: {e}")
+        import traceback
+        traceback.print_exc()
+        raise
+
+
+def test_console_startup_budget():
+    """Testa o modo console completo até o menu"""
+    print("\n" + "="*75)
+    print("TESTE: Inicialização do Console no Orçamento")
+    print("="*75 + "\n")
+
+    try:
+        from bench_startup import CONSOLE_STARTUP_BUDGET_MS, measure_console_startup
+
+        with tempfile.TemporaryDirectory() as data_dir:
+            result = measure_console_startup(data_dir)
+
+        print(f"Console até o menu: {result['ms']:.0f} ms (orçamento {CONSOLE_STARTUP_BUDGET_MS} ms)")
+
+        checks = {
+            "Menu exibido": result['menu_shown'],
+            "Dentro do orçamento": result['ms'] <= CONSOLE_STARTUP_BUDGET_MS,
+        }
+        return report_checks(checks)
+
+    except Exception as e:
+        print(f"❌ Erro no teste: {e}")
+        import traceback
+        traceback.print_exc()
+        raise
+
+
+def main():
+    """Executa todos os testes"""
+    print("\n" + "="*75)
+    print("SUITE DE TESTES - INICIALIZAÇÃO")
+    print("="*75)
+
+    tests = [
+        ("Imports Adiados da GUI", test_lazy_gui_imports),
+        ("Splash Console com Pré-carregamento", test_console_splash_tasks),
+        ("Inicialização do Console no Orçamento", test_console_startup_budget),
+    ]
+
+    results = {}
+    for test_name, test_func in tests:
+        try:
+            results[test_name] = test_func()
+        except Exception as e:
+            print(f"\n❌ Teste '{test_name}' falhou com erro: {e}")
+            results[test_name] = False
+
+    # Resumo
+    print("\n" + "="*75)
+    print("RESUMO DOS TESTES")
+    print("="*75 + "\n")
+
+    passed = sum(1 for r in results.values() if r)
+    total = len(results)
+
+    for test_name, result in results.items():
+        status = "✓ PASSOU" if result else "❌ FALHOU"
+        print(f"{status}: {test_name}")
+
+    print(f"\n{passed}/{total} testes passaram")
+
+    if passed == total:
+        print("\n✓ INICIALIZAÇÃO RÁPIDA FUNCIONANDO!")
+        return 0
+    else:
+        print(f"\n⚠️  {total - passed} teste(s) falharam")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,251 @@
+"""
+test_startup_tasks.py - Testa a splash guiada pelo grafo de inicialização
+
+Este script testa:
+1. Dependências, tarefas com falha e progresso pelo peso das tarefas críticas
+2. A splash (widgets falsos de stub_tk.py) fecha quando as tarefas críticas
+   terminam, com a barra refletindo o trabalho real
+3. O aquecimento do modo gráfico com o PowerShell falso (sessão, pré-requisitos,
+   catálogo de atualizações pronto para a janela principal)
+"""
+import os
+import sys
+import tempfile
+import threading
+import time
+
+from script_checks import report_checks
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+STUB_ARGV = [sys.executable, os.path.join(BASE_DIR, 'stub_powershell.py')]
+
+
+def test_graph_dependencies():
+    """Testa ordem, falhas e progresso do grafo"""
+    print("\n" + "="*75)
+    print("TESTE: Grafo de Tarefas de Inicialização")
+    print("="*75 + "\n")
+
+    try:
+        from startup_tasks import StartupTaskGraph, TASK_DONE, TASK_FAILED
+
+        events = []
+        lock = threading.Lock()
+        release_background = threading.Event()
+
+        def step(name, seconds, fail=False):
+            def run():
+                with lock:
+                    events.append(('início', name))
+                time.sleep(seconds)
+                with lock:
+                    events.append(('fim', name))
+                if fail:
+                    raise RuntimeError(f"{name} falhou")
+                return name
+            return run
+
+        graph = StartupTaskGraph()
+        graph.add('sessao', "Sessão...", step('sessao', 0.15, fail=True), weight=3)
+        graph.add('indice', "Índice...", step('indice', 0.05), weight=1)
+        graph.add('prereqs', "Pré-requisitos...", step('prereqs', 0.1),
+                  depends=('sessao',), weight=2)
+        graph.add('lista', "Listando...", lambda: release_background.wait(5),
+                  depends=('prereqs',), critical=False)
+
+        rejected = False
+        try:
+            graph.add('orfa', "Órfã...", lambda: None, depends=('inexistente',))
+        except ValueError:
+            rejected = True
+
+        progress_before = graph.progress()
+        graph.start()
+        critical_ok = graph.wait(timeout=5)
+        background_running = not graph.get('lista').finished
+        progress_after = graph.progress()
+        release_background.set()
+        all_ok = graph.wait(timeout=5, critical_only=False)
+
+        order = [name for kind, name in events if kind == 'início']
+        summary = {item['name']: item['state'] for item in graph.summary()}
+        print(f"Início das tarefas: {order}")
+        print(f"Estados: {summary}")
+        print(f"Progresso: {progress_before}% -> {progress_after}%")
+
+        checks = {
+            "Dependência desconhecida rejeitada": rejected,
+            "Independentes começam juntas": set(order[:2]) == {'sessao', 'indice'},
+            "Dependente começa após a dependência": events.index(('fim', 'sessao')) < events.index(('início', 'prereqs')),
+            "Falha não bloqueia dependentes": summary['sessao'] == TASK_FAILED and summary['prereqs'] == TASK_DONE,
+            "Críticas terminam sem esperar as de fundo": critical_ok and background_running,
+            "Progresso pelo peso das críticas (0 -> 100)": progress_before == 0 and progress_after == 100,
+            "Todas concluídas ao final": all_ok and graph.all_done,
+        }
+        return report_checks(checks)
+
+    except Exception as e:
+        print(f"❌ Erro no teste: {e}")
+        import traceback
+        traceback.print_exc()
+        raise
+
+
+def test_splash_follows_graph():
+    """Testa a splash acompanhando o progresso real"""
+    print("\n" + "="*75)
+    print("TESTE: Splash Guiada pelo Grafo")
+    print("="*75 + "\n")
+
+    try:
+        from startup_tasks import StartupTaskGraph
+        from stub_tk import StubLoop, make_splash_screen
+
+        release_background = threading.Event()
+        graph = StartupTaskGraph()
+        graph.add('sessao', "Iniciando sessão PowerShell...", lambda: time.sleep(0.2), weight=3)
+        graph.add('prereqs', "Verificando pré-requisitos...", lambda: time.sleep(0.2),
+                  depends=('sessao',), weight=2)
+        graph.add('lista', "Listando...", lambda: release_background.wait(5),
+                  depends=('prereqs',), critical=False)
+
+        loop = StubLoop(redraw_cost=0)
+        start = time.perf_counter()
+        graph.start()
+        splash = make_splash_screen(loop, graph)
+
+        progress = []
+        labels = set()
+        shown = {}
+        splash.set_progress_callback(lambda p: (progress.append(p), labels.add(splash.status_label['text'])))
+        splash.set_complete_callback(lambda: shown.setdefault('seconds', time.perf_counter() - start))
+
+        closed = loop.run_until(lambda: not splash.root.exists, timeout=10)
+        background_running = not graph.get('lista').finished
+        release_background.set()
+        graph.wait(timeout=5, critical_only=False)
+
+        print(f"Janela principal após {shown.get('seconds', -1):.2f}s (antes: 3,5s fixos)")
+        print(f"Progresso observado: {sorted(set(progress))}")
+
+        checks = {
+            "Splash fechada e janela principal liberada": closed and 'seconds' in shown,
+            "Libera assim que as críticas terminam (< 1s)": shown.get('seconds', 99) < 1.0,
+            "Barra reflete etapas reais (0, 60, 100)": {0, 60, 100} <= set(progress),
+            "Progresso nunca regride": progress == sorted(progress),
+            "Texto da tarefa em execução exibido": "Verificando pré-requisitos..." in labels,
+            "Tarefa de fundo segue após a splash": background_running,
+            "Widgets só acessados pela thread do laço": loop.foreign_calls == 0,
+        }
+        return report_checks(checks)
+
+    except Exception as e:
+        print(f"❌ Erro no teste: {e}")
+        import traceback
+        traceback.print_exc()
+        raise
+
+
+def test_gui_startup_with_stub_powershell():
+    """Testa o aquecimento do modo gráfico com o PowerShell falso"""
+    print("\n" + "="*75)
+    print("TESTE: Aquecimento do Modo Gráfico (PowerShell Falso)")
+    print("="*75 + "\n")
+
+    try:
+        from powershell_manager import PowerShellManager
+        from prereq_cache import PrerequisiteCache
+        from size_index import SizeIndex
+        from startup_tasks import build_gui_startup_graph
+        from upgrade_catalog import UpgradeCatalog
+
+        os.environ['STUB_WINGET_PACKAGES'] = '5'
+        catalog = UpgradeCatalog()
+        manager = PowerShellManager(shell_argv=STUB_ARGV, use_session_pool=True, pool_size=2,
+                                    prereq_cache=PrerequisiteCache(), catalog=catalog)
+        try:
+            with tempfile.TemporaryDirectory() as data_dir:
+                index = SizeIndex(os.path.join(data_dir, 'size_index.json'))
+                graph = build_gui_startup_graph(manager, size_index_loader=lambda: index)
+                start = time.perf_counter()
+                graph.start()
+                critical_ok = graph.wait(timeout=30)
+                critical_seconds = time.perf_counter() - start
+                all_ok = graph.wait(timeout=30, critical_only=False)
+
+            summary = graph.summary()
+            for item in summary:
+                print(f"  {item['name']}: {item['state']} ({item['seconds']:.2f}s)")
+            print(f"Tarefas críticas em {critical_seconds:.2f}s")
+
+            # Primeiro uso pela janela principal: catálogo recente, sem nova consulta
+            queries = []
+            original_query = manager._query_upgradable_apps
+            manager._query_upgradable_apps = lambda: queries.append(1) or original_query()
+            apps = manager.get_upgradable_apps()
+            print(f"Catálogo: {len(apps)} apps, consultas extras ao winget: {len(queries)}")
+        finally:
+            manager.close()
+            os.environ.pop('STUB_WINGET_PACKAGES', None)
+
+        checks = {
+            "Tarefas críticas e de fundo concluídas": critical_ok and all_ok,
+            "Nenhuma tarefa falhou": all(item['error'] is None for item in summary),
+            "Sessão PowerShell aquecida": graph.get('session').state == 'concluída',
+            "Catálogo com os 5 apps": len(apps) == 5,
+            "Janela principal não repete a consulta": queries == [],
+            "Índice de tamanhos entregue": graph.get('size_index').result is index,
+        }
+        return report_checks(checks)
+
+    except Exception as e:
+        print(f"❌ Erro no teste: {e}")
+        import traceback
+        traceback.print_exc()
+        raise
+
+
+def main():
+    """Executa todos os testes"""
+    print("\n" + "="*75)
+    print("SUITE DE TESTES - INICIALIZAÇÃO GUIADA POR TAREFAS")
+    print("="*75)
+
+    tests = [
+        ("Grafo de Tarefas de Inicialização", test_graph_dependencies),
+        ("Splash Guiada pelo Grafo", test_splash_follows_graph),
+        ("Aquecimento do Modo Gráfico", test_gui_startup_with_stub_powershell),
+    ]
+
+    results = {}
+    for test_name, test_func in tests:
+        try:
+            results[test_name] = test_func()
+        except Exception as e:
+            print(f"\n❌ Teste '{test_name}' falhou com erro: {e}")
+            results[test_name] = False
+
+    # Resumo
+    print("\n" + "="*75)
+    print("RESUMO DOS TESTES")
+    print("="*75 + "\n")
+
+    passed = sum(1 for r in results.values() if r)
+    total = len(results)
+
+    for test_name, result in results.items():
+        status = "✓ PASSOU" if result else "❌ FALHOU"
+        print(f"{status}: {test_name}")
+
+    print(f"\n{passed}/{total} testes passaram")
+
+    if passed == total:
+        print("\n✓ INICIALIZAÇÃO GUIADA POR TAREFAS FUNCIONANDO!")
+        return 0
+    else:
+        print(f"\n⚠️  {total - passed} teste(s) falharam")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,194 @@
+"""
+test_update_pipeline.py - Testa a atualização completa em fases sobrepostas
+
+Este script testa (com o PowerShell e o winget falsos):
+1. Busca/download do Windows Update junto com os aplicativos e instalação só
+   depois deles; progresso combinado crescente até 100%
+2. Sem atualizações do Windows: a instalação é dispensada
+3. Falhas isoladas: módulo PSWindowsUpdate ausente e erro nos aplicativos
+"""
+import os
+import sys
+import tempfile
+
+from script_checks import report_checks
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+STUB_ARGV = [sys.executable, os.path.join(BASE_DIR, 'stub_powershell.py')]
+WINGET_STUB_ARGV = [sys.executable, os.path.join(BASE_DIR, 'stub_winget.py')]
+
+
+def _run_pipeline(apps_step=None, **env):
+    """Executa o pipeline com os stubs; devolve (resultado, eventos do barramento, progresso)"""
+    from bench_suite import stub_environment
+    from event_bus import EventBus
+    from powershell_manager import PowerShellManager
+    from prereq_cache import PrerequisiteCache
+    from update_pipeline import FullUpdatePipeline
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        values = {'STUB_WINGET_PACKAGES': '3', 'STUB_WINGET_DOWNLOAD_SECONDS': '0.3',
+                  'STUB_WINGET_INSTALL_SECONDS': '0.05', 'STUB_WINGET_LOCK': os.path.join(work_dir, 'install.lock'),
+                  'STUB_WU_UPDATES': '2', 'STUB_WU_SCAN_SECONDS': '0.1', 'STUB_WU_DOWNLOAD_SECONDS': '0.2',
+                  'STUB_WU_INSTALL_SECONDS': '0.05', 'STUB_WU_CACHE': os.path.join(work_dir, 'downloads.txt'),
+                  'STUB_PS_MODULES': 'PSWindowsUpdate'}
+        values.update(env)
+        with stub_environment(**values):
+            bus = EventBus()
+            events = []
+            bus.subscribe(events.append)
+            manager = PowerShellManager(shell_argv=STUB_ARGV, winget_argv=WINGET_STUB_ARGV,
+                                        prereq_cache=PrerequisiteCache(), event_bus=bus)
+            if apps_step is None:
+                def apps_step(report):
+                    return manager.update_apps_individually(
+                        lambda current, total, name, success: report(100 * current / total, name), max_workers=3)
+            progress = []
+            result = FullUpdatePipeline(manager, apps_step,
+                                        lambda percent, message: progress.append((percent, message))).run()
+    return result, events, progress
+
+
+def _phase_times(events, name):
+    """ts de início e fim de uma etapa no barramento"""
+    started = next((e['ts'] for e in events if e['type'] == 'phase_started' and e['phase'] == name), None)
+    finished = next((e['ts'] for e in events if e['type'] == 'phase_finished' and e['phase'] == name), None)
+    return started, finished
+
+
+def test_overlapped_phases():
+    """Testa a sobreposição e a ordem das fases"""
+    print("\n" + "="*75)
+    print("TESTE: Fases Sobrepostas")
+    print("="*75 + "\n")
+
+    try:
+        result, events, progress = _run_pipeline()
+        apps = _phase_times(events, 'upgrade_apps')
+        download = _phase_times(events, 'windows_download')
+        install = _phase_times(events, 'windows_update')
+        percents = [percent for percent, _ in progress]
+
+        print(f"Fases: {result['seconds']}, sobreposição {result['overlap_seconds']}s")
+        print(f"Última mensagem: {progress[-1][1]}")
+
+        checks = {
+            "Aplicativos atualizados": result['apps'][:2] == (3, 0) and result['apps_error'] is None,
+            "Windows Update instalado": result['windows_success'] and not result['windows_skipped'],
+            "Download do WU começa antes do fim dos aplicativos": download[0] < apps[1],
+            "Instalação do WU só depois dos aplicativos": install[0] >= apps[1],
+            "Sobreposição medida": result['overlap_seconds'] > 0.2,
+            "Progresso combinado crescente até 100%": percents == sorted(percents) and percents[-1] == 100,
+            "Mensagem com as duas trilhas": "Aplicativos:" in progress[-1][1] and "Windows Update:" in progress[-1][1],
+        }
+        return report_checks(checks)
+
+    except Exception as e:
+        print(f"❌ Erro no teste: {e}")
+        import traceback
+        traceback.print_exc()
+        raise
+
+
+def test_no_windows_updates():
+    """Testa a dispensa da instalação quando a busca não encontra nada"""
+    print("\n" + "="*75)
+    print("TESTE: Sem Atualizações do Windows")
+    print("="*75 + "\n")
+
+    try:
+        result, events, progress = _run_pipeline(STUB_WU_UPDATES='0')
+        phases = [e['phase'] for e in events if e['type'] == 'phase_finished']
+        print(f"Etapas: {phases}")
+
+        checks = {
+            "Instalação dispensada": result['windows_skipped'] and result['windows_success'],
+            "Sem segunda busca": 'windows_update' not in phases and 'windows_download' in phases,
+            "Progresso chega a 100%": progress[-1][0] == 100,
+        }
+        return report_checks(checks)
+
+    except Exception as e:
+        print(f"❌ Erro no teste: {e}")
+        import traceback
+        traceback.print_exc()
+        raise
+
+
+def test_isolated_failures():
+    """Testa falhas de uma trilha sem interromper a outra"""
+    print("\n" + "="*75)
+    print("TESTE: Falhas Isoladas")
+    print("="*75 + "\n")
+
+    try:
+        no_module, no_module_events, _ = _run_pipeline(STUB_PS_MODULES='Outro')
+
+        def broken_apps(report):
+            raise RuntimeError("winget ausente")
+
+        apps_failed, _, _ = _run_pipeline(apps_step=broken_apps)
+        print(f"Sem módulo: {no_module['windows_error']}")
+        print(f"Erro nos aplicativos: {apps_failed['apps_error']}")
+
+        checks = {
+            "Módulo ausente vira windows_error": bool(no_module['windows_error']) and not no_module['windows_success'],
+            "Aplicativos seguem sem o módulo": no_module['apps'][:2] == (3, 0),
+            "Sem módulo, nada do Windows Update é executado": not any(
+                e.get('phase') in ('windows_download', 'windows_update') for e in no_module_events),
+            "Erro dos aplicativos registrado": apps_failed['apps_error'] == "winget ausente",
+            "Windows Update segue após erro dos aplicativos": apps_failed['windows_success'],
+        }
+        return report_checks(checks)
+
+    except Exception as e:
+        print(f"❌ Erro no teste: {e}")
+        import traceback
+        traceback.print_exc()
+        raise
+
+
+def main():
+    """Executa todos os testes"""
+    print("\n" + "="*75)
+    print("SUITE DE TESTES - ATUALIZAÇÃO COMPLETA EM FASES")
+    print("="*75)
+
+    tests = [
+        ("Fases Sobrepostas", test_overlapped_phases),
+        ("Sem Atualizações do Windows", test_no_windows_updates),
+        ("Falhas Isoladas", test_isolated_failures),
+    ]
+
+    results = {}
+    for test_name, test_func in tests:
+        try:
+            results[test_name] = test_func()
+        except Exception as e:
+            print(f"\n❌ Teste '{test_name}' falhou com erro: {e}")
+            results[test_name] = False
+
+    # Resumo
+    print("\n" + "="*75)
+    print("RESUMO DOS TESTES")
+    print("="*75 + "\n")
+
+    passed = sum(1 for r in results.values() if r)
+    total = len(results)
+
+    for test_name, result in results.items():
+        status = "✓ PASSOU" if result else "❌ FALHOU"
+        print(f"{status}: {test_name}")
+
+    print(f"\n{passed}/{total} testes passaram")
+
+    if passed == total:
+        print("\n✓ ATUALIZAÇÃO EM FASES FUNCIONANDO!")
+        return 0
+    else:
+        print(f"\n⚠️  {total - passed} teste(s) falharam")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,236 @@
+"""
+test_upgrade_catalog.py - Testa o catálogo local de aplicativos atualizáveis
+
+Este script testa:
+1. Persistência, limiares de idade e reconciliação (relógio simulado)
+2. Consultas simultâneas ao winget deduplicadas
+3. PowerShellManager com o catálogo e o PowerShell falso: lista instantânea,
+   atualização em segundo plano e aplicativos atualizados retirados
+"""
+import os
+import sys
+import tempfile
+import threading
+import time
+
+from script_checks import report_checks
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+STUB_ARGV = [sys.executable, os.path.join(BASE_DIR, 'stub_powershell.py')]
+
+
+def _app(app_id, available="2.0"):
+    return {'id': app_id, 'name': app_id.split('.')[-1], 'version': "1.0", 'available': available}
+
+
+def test_persistence_and_thresholds():
+    """Testa idade, persistência e reconciliação"""
+    print("\n" + "="*75)
+    print("TESTE: Persistência e Limiares do Catálogo")
+    print("="*75 + "\n")
+
+    try:
+        from upgrade_catalog import UpgradeCatalog
+
+        now = [1000.0]
+        clock = lambda: now[0]
+
+        with tempfile.TemporaryDirectory() as data_dir:
+            path = os.path.join(data_dir, 'upgrade_catalog.json')
+            catalog = UpgradeCatalog(path, fresh_age=60, max_age=600, clock=clock)
+            empty = catalog.snapshot() is None and not catalog.is_fresh()
+
+            catalog.update([_app('Git.Git'), _app('Mozilla.Firefox')])
+            now[0] += 30
+            reloaded = UpgradeCatalog(path, fresh_age=60, max_age=600, clock=clock)
+            apps, age = reloaded.snapshot()
+
+            fresh_at_30 = reloaded.is_fresh()
+            now[0] += 60
+            stale_but_shown = not reloaded.is_fresh() and reloaded.snapshot() is not None
+
+            diff = reloaded.update([_app('Git.Git', "2.1"), _app('VideoLAN.VLC')])
+            first_seen = {app['id']: app['first_seen'] for app in reloaded.snapshot()[0]}
+
+            failed = reloaded.refresh(lambda: None)
+            kept = len(reloaded.snapshot()[0]) == 2
+
+            reloaded.mark_upgraded('Git.Git')
+            after_upgrade = [app['id'] for app in UpgradeCatalog(path, clock=clock).snapshot()[0]]
+
+            now[0] += 601
+            too_old = reloaded.snapshot() is None
+
+        print(f"Recarregado: {[app['id'] for app in apps]} (idade {age:.0f}s)")
+        print(f"Reconciliação: +{[a['id'] for a in diff['added']]} "
+              f"-{[a['id'] for a in diff['removed']]} ~{[a['id'] for a in diff['changed']]}")
+
+        checks = {
+            "Catálogo vazio não é exibido": empty,
+            "Recarregado do disco com a idade correta": len(apps) == 2 and age == 30,
+            "Recente até fresh_age": fresh_at_30,
+            "Velho exibido até max_age": stale_but_shown,
+            "Diferenças da reconciliação": ([a['id'] for a in diff['added']] == ['VideoLAN.VLC']
+                                            and [a['id'] for a in diff['removed']] == ['Mozilla.Firefox']
+                                            and [a['id'] for a in diff['changed']] == ['Git.Git']),
+            "Primeira aparição preservada": first_seen == {'Git.Git': 1000.0, 'VideoLAN.VLC': 1090.0},
+            "Consulta com falha mantém o catálogo": not failed and kept,
+            "Aplicativo atualizado sai do catálogo": after_upgrade == ['VideoLAN.VLC'],
+            "Acima de max_age não é exibido": too_old,
+        }
+        return report_checks(checks)
+
+    except Exception as e:
+        print(f"❌ Erro no teste: {e}")
+        import traceback
+        traceback.print_exc()
+        raise
+
+
+def test_concurrent_refresh_single_query():
+    """Testa que consultas simultâneas chamam o winget uma vez"""
+    print("\n" + "="*75)
+    print("TESTE: Consultas Simultâneas Deduplicadas")
+    print("="*75 + "\n")
+
+    try:
+        from upgrade_catalog import UpgradeCatalog
+
+        catalog = UpgradeCatalog()
+        calls = []
+
+        def slow_lister():
+            calls.append(1)
+            time.sleep(0.3)
+            return [_app('Git.Git')]
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(catalog.refresh(slow_lister)))
+                   for _ in range(5)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+
+        print(f"5 chamadas simultâneas: {len(calls)} consulta(s) em {elapsed:.2f}s")
+
+        checks = {
+            "Uma única consulta": len(calls) == 1,
+            "Todas as chamadas veem o catálogo atualizado": results == [True] * 5,
+            "Sem esperar consultas em série (< 1s)": elapsed < 1.0,
+        }
+        return report_checks(checks)
+
+    except Exception as e:
+        print(f"❌ Erro no teste: {e}")
+        import traceback
+        traceback.print_exc()
+        raise
+
+
+def test_manager_with_catalog():
+    """Testa o PowerShellManager usando o catálogo com o PowerShell falso"""
+    print("\n" + "="*75)
+    print("TESTE: PowerShellManager com Catálogo Local")
+    print("="*75 + "\n")
+
+    try:
+        from powershell_manager import PowerShellManager
+        from prereq_cache import PrerequisiteCache
+        from upgrade_catalog import UpgradeCatalog
+
+        os.environ['STUB_WINGET_PACKAGES'] = '4'
+        os.environ['STUB_WINGET_LIST_SECONDS'] = '0.3'
+        try:
+            catalog = UpgradeCatalog(fresh_age=60, refresh_interval=0.5)
+            manager = PowerShellManager(shell_argv=STUB_ARGV, prereq_cache=PrerequisiteCache(),
+                                        catalog=catalog)
+            manager.detect_winget_client()
+
+            start = time.perf_counter()
+            cold = manager.get_upgradable_apps()
+            cold_seconds = time.perf_counter() - start
+
+            start = time.perf_counter()
+            cached = manager.get_upgradable_apps()
+            cached_seconds = time.perf_counter() - start
+
+            upgraded = manager.update_app_silent(cached[0]['id'])
+            remaining = [app['id'] for app in catalog.snapshot()[0]]
+
+            # Atualização em segundo plano reconcilia (o pacote volta na consulta seguinte)
+            refreshed = threading.Event()
+            catalog.add_listener(lambda apps, diff: refreshed.set())
+            catalog.fresh_age = 0
+            manager.start_catalog_refresh()
+            background = refreshed.wait(timeout=10)
+            catalog.stop_background_refresh()
+            restored = len(catalog.snapshot()[0])
+        finally:
+            os.environ.pop('STUB_WINGET_PACKAGES', None)
+            os.environ.pop('STUB_WINGET_LIST_SECONDS', None)
+
+        print(f"Consulta ao winget: {cold_seconds:.3f}s, catálogo recente: {cached_seconds*1000:.2f}ms")
+        print(f"Após atualizar {cached[0]['id']}: {remaining}")
+
+        checks = {
+            "Consulta inicial lista os 4 apps": len(cold) == 4,
+            "Catálogo recente dispensa a consulta (< 50ms)": len(cached) == 4 and cached_seconds < 0.05,
+            "Aplicativo atualizado retirado do catálogo": upgraded and cached[0]['id'] not in remaining and len(remaining) == 3,
+            "Atualização em segundo plano concluída": background and restored == 4,
+        }
+        return report_checks(checks)
+
+    except Exception as e:
+        print(f"❌ Erro no teste: {e}")
+        import traceback
+        traceback.print_exc()
+        raise
+
+
+def main():
+    """Executa todos os testes"""
+    print("\n" + "="*75)
+    print("SUITE DE TESTES - CATÁLOGO DE ATUALIZAÇÕES")
+    print("="*75)
+
+    tests = [
+        ("Persistência e Limiares do Catálogo", test_persistence_and_thresholds),
+        ("Consultas Simultâneas Deduplicadas", test_concurrent_refresh_single_query),
+        ("PowerShellManager com Catálogo Local", test_manager_with_catalog),
+    ]
+
+    results = {}
+    for test_name, test_func in tests:
+        try:
+            results[test_name] = test_func()
+        except Exception as e:
+            print(f"\n❌ Teste '{test_name}' falhou com erro: {e}")
+            results[test_name] = False
+
+    # Resumo
+    print("\n" + "="*75)
+    print("RESUMO DOS TESTES")
+    print("="*75 + "\n")
+
+    passed = sum(1 for r in results.values() if r)
+    total = len(results)
+
+    for test_name, result in results.items():
+        status = "✓ PASSOU" if result else "❌ FALHOU"
+        print(f"{status}: {test_name}")
+
+    print(f"\n{passed}/{total} testes passaram")
+
+    if passed == total:
+        print("\n✓ CATÁLOGO DE ATUALIZAÇÕES FUNCIONANDO!")
+        return 0
+    else:
+        print(f"\n⚠️  {total - passed} teste(s) falharam")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,291 @@
+"""
+test_upgrade_eta.py - Testa a estimativa de tempo restante das atualizações
+
+Este script testa:
+1. UpgradeEta com relógio falso: duração por pacote pelo histórico, modelo
+   sem histórico, simulação com downloads paralelos e instalação serializada
+2. Correção ao vivo: pacote além do esperado e aprendizado sem histórico
+3. Erro em históricos reproduzidos (bench_eta.py) menor que o da contagem
+4. Tempo restante na ProgressWindow (laço Tk falso) e em update_apps_individually
+"""
+import logging
+import os
+import sys
+
+from script_checks import report_checks
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+STUB_ARGV = [sys.executable, os.path.join(BASE_DIR, 'stub_powershell.py')]
+WINGET_STUB_ARGV = [sys.executable, os.path.join(BASE_DIR, 'stub_winget.py')]
+
+
+def _history_with(*packages):
+    """Histórico em memória com (id, download, instalação) atualizados duas vezes"""
+    from upgrade_history import UpgradeHistory
+
+    history = UpgradeHistory()
+    for _ in range(2):
+        for package_id, download, install in packages:
+            history.record(package_id, True, 'upgraded', download + install + 1, installer_type='msi',
+                           download_seconds=download, install_seconds=install)
+    return history
+
+
+def test_estimates():
+    """Testa as estimativas iniciais com e sem histórico"""
+    print("\n" + "="*75)
+    print("TESTE: Estimativas Iniciais")
+    print("="*75 + "\n")
+
+    try:
+        from upgrade_eta import BASIS_FALLBACK, BASIS_HISTORY, BASIS_MIXED, UpgradeEta, format_remaining
+
+        apps = [{'id': 'A', 'name': 'App A'}, {'id': 'B', 'name': 'App B'}, {'id': 'C', 'name': 'App C'}]
+        history = _history_with(('A', 10, 5), ('B', 10, 5), ('C', 2, 2))
+        now = [0.0]
+
+        sequential = UpgradeEta(history, workers=1, clock=lambda: now[0])
+        sequential.plan(apps)
+        concurrent = UpgradeEta(history, workers=2, clock=lambda: now[0])
+        concurrent.plan(apps)
+        # A e B baixam juntos (0-10); A instala 10-15, B espera e instala 15-20;
+        # C começa em 15 no worker de A, baixa até 17 e instala 20-22
+        mixed = UpgradeEta(history, workers=1, clock=lambda: now[0])
+        mixed.plan(apps + [{'id': 'New', 'name': 'Novo'}])
+        no_history = UpgradeEta(None, workers=1, default_seconds=30, clock=lambda: now[0])
+        no_history.plan(apps)
+
+        snapshots = {name: eta.snapshot() for name, eta in
+                     (('sequencial', sequential), ('concorrente', concurrent), ('misto', mixed),
+                      ('sem histórico', no_history))}
+        for name, snapshot in snapshots.items():
+            print(f"{name}: {snapshot}")
+
+        checks = {
+            "Sequencial soma download e instalação": snapshots['sequencial']['remaining_seconds'] == 34,
+            "Concorrente simula o mutex de instalação": snapshots['concorrente']['remaining_seconds'] == 22,
+            "Pacote novo usa a mediana de todos": snapshots['misto']['remaining_seconds'] == 34 + 16,
+            "Sem histórico usa o padrão": snapshots['sem histórico']['remaining_seconds'] == 90,
+            "Origem da estimativa": (snapshots['sequencial']['basis'], snapshots['misto']['basis'],
+                                     snapshots['sem histórico']['basis'])
+                                    == (BASIS_HISTORY, BASIS_MIXED, BASIS_FALLBACK),
+            "Estimativa inicial sinalizada": no_history.describe().endswith("(estimativa inicial)"),
+            "Texto do tempo restante": (format_remaining(30), format_remaining(125), format_remaining(3900))
+                                       == ("menos de 1 min restante", "cerca de 2 min restantes",
+                                           "cerca de 1 h 05 min restantes"),
+        }
+        return report_checks(checks)
+
+    except Exception as e:
+        print(f"❌ Erro no teste: {e}")
+        import traceback
+        traceback.print_exc()
+        raise
+
+
+def test_live_corrections():
+    """Testa o tempo decorrido ao vivo e as correções durante a execução"""
+    print("\n" + "="*75)
+    print("TESTE: Correção ao Vivo")
+    print("="*75 + "\n")
+
+    try:
+        from upgrade_eta import UpgradeEta
+
+        now = [0.0]
+        history = _history_with(('A', 10, 10), ('B', 10, 10))
+        eta = UpgradeEta(history, workers=1, clock=lambda: now[0])
+        eta.plan([{'id': 'A', 'name': 'Dup'}, {'id': 'B', 'name': 'Dup'}])
+        on_progress = eta.track()
+        on_progress(1, 2, 'Dup', None)
+        now[0] = 5
+        early = eta.snapshot()
+        now[0] = 30
+        overrun = eta.snapshot()
+        now[0] = 40
+        on_progress(1, 2, 'Dup', True)
+        on_progress(2, 2, 'Dup', None)
+        corrected = eta.snapshot()
+        now[0] = 60
+        on_progress(2, 2, 'Dup', True)
+        done = eta.snapshot()
+
+        learning = UpgradeEta(None, workers=1, default_seconds=100, clock=lambda: now[0])
+        now[0] = 0
+        learning.plan([{'id': f'N{i}', 'name': f'N{i}'} for i in range(4)])
+        learning.started('N0')
+        now[0] = 10
+        learning.finished('N0')
+        learned = learning.snapshot()
+
+        print(f"Aos 5s: {early}")
+        print(f"Aos 30s (além do esperado): {overrun}")
+        print(f"Após A levar 40s: {corrected}")
+        print(f"Sem histórico, após N0 levar 10s: {learned}")
+
+        checks = {
+            "Tempo decorrido desconta o pacote em andamento": early['remaining_seconds'] == 35,
+            "Pacote além do esperado ainda conta um pouco": overrun['remaining_seconds'] == 22,
+            "Nomes repetidos acompanhados em ordem": corrected['done'] == 1 and done['done'] == 2,
+            "Pacote lento corrige os demais": corrected['remaining_seconds'] > 20,
+            "Fração nunca regride e termina em 1": early['fraction'] <= overrun['fraction'] <= corrected['fraction']
+                                                   and done['fraction'] == 1.0 and done['remaining_seconds'] == 0,
+            "Sem histórico aprende com os concluídos": learned['remaining_seconds'] == 3 * (100 + 10) / 2,
+        }
+        return report_checks(checks)
+
+    except Exception as e:
+        print(f"❌ Erro no teste: {e}")
+        import traceback
+        traceback.print_exc()
+        raise
+
+
+def test_replayed_error():
+    """Testa o erro medido em históricos reproduzidos"""
+    print("\n" + "="*75)
+    print("TESTE: Erro em Históricos Reproduzidos")
+    print("="*75 + "\n")
+
+    try:
+        from bench_eta import run_benchmark, sessions_from_history, synthetic_sessions
+        from upgrade_history import UpgradeHistory
+
+        logging_before = logging.root.manager.disable
+        sequential = run_benchmark(sessions=6, packages=12, workers=1)
+        concurrent = run_benchmark(sessions=6, packages=12, workers=3)
+
+        history = UpgradeHistory()
+        for attempts in synthetic_sessions(sessions=3, packages=5):
+            for attempt in attempts:
+                history.record(attempt['package_id'], attempt['success'], attempt['outcome'],
+                               attempt['seconds'], started_at=attempt['started_at'])
+
+        for label, result in (("1 worker", sequential), ("3 workers", concurrent)):
+            print(f"{label}: UpgradeEta {result['eta_with_history']['mean_error_pct']}%, "
+                  f"contagem {result['count_with_history']['mean_error_pct']}%")
+
+        checks = {
+            "Com histórico, erro menor que o da contagem (1 worker)":
+                sequential['eta_with_history']['mean_error_pct'] < sequential['count_with_history']['mean_error_pct'],
+            "Com histórico, erro menor que o da contagem (3 workers)":
+                concurrent['eta_with_history']['mean_error_pct'] < concurrent['count_with_history']['mean_error_pct'],
+            "Estimativa inicial com histórico medida": concurrent['initial_with_history']['points'] == 5,
+            "Histórico gravado agrupado em execuções": len(sessions_from_history(history)) == 3,
+            "Logging restaurado": logging.root.manager.disable == logging_before,
+        }
+        return report_checks(checks)
+
+    except Exception as e:
+        print(f"❌ Erro no teste: {e}")
+        import traceback
+        traceback.print_exc()
+        raise
+
+
+def test_progress_displays():
+    """Testa o tempo restante na janela de progresso e no progresso por app"""
+    print("\n" + "="*75)
+    print("TESTE: Tempo Restante nas Telas de Progresso")
+    print("="*75 + "\n")
+
+    try:
+        import time
+        from event_bus import EventBus
+        from powershell_manager import PowerShellManager
+        from prereq_cache import PrerequisiteCache
+        from stub_tk import StubLoop, make_progress_window
+        from upgrade_eta import UpgradeEta
+
+        loop = StubLoop(redraw_cost=0)
+        window = make_progress_window(loop)
+        calls = []
+        window.set_eta_source(lambda: calls.append(1) or "cerca de 3 min restantes")
+        deadline = time.perf_counter() + 1.3
+        loop.run_until(lambda: time.perf_counter() > deadline, timeout=5)
+        shown = window.eta_var.get()
+        window.set_eta_source(None)
+        deadline = time.perf_counter() + 0.2
+        loop.run_until(lambda: time.perf_counter() > deadline, timeout=5)
+        cleared = window.eta_var.get()
+        window.close()
+
+        os.environ.update(STUB_WINGET_PACKAGES='3', STUB_WINGET_DOWNLOAD_SECONDS='0.05',
+                          STUB_WINGET_INSTALL_SECONDS='0.01')
+        try:
+            manager = PowerShellManager(shell_argv=STUB_ARGV, winget_argv=WINGET_STUB_ARGV,
+                                        prereq_cache=PrerequisiteCache(), event_bus=EventBus())
+            eta = UpgradeEta(None, workers=2)
+            seen = []
+            result = manager.update_apps_individually(
+                lambda current, total, name, success: seen.append((success, eta.describe())), max_workers=2, eta=eta)
+        finally:
+            for name in ('STUB_WINGET_PACKAGES', 'STUB_WINGET_DOWNLOAD_SECONDS', 'STUB_WINGET_INSTALL_SECONDS'):
+                os.environ.pop(name, None)
+
+        print(f"Janela: {shown!r}, consultas: {len(calls)}, depois de None: {cleared!r}")
+        print(f"Progresso: {seen}")
+
+        checks = {
+            "Janela consulta a estimativa só a cada segundo": shown == "cerca de 3 min restantes"
+                                                              and 1 <= len(calls) <= 2,
+            "None apaga o tempo restante": cleared == "",
+            "Apps atualizados com o estimador": result[:2] == (3, 0),
+            "Callback vê a estimativa": seen[0][1].startswith("cerca de")
+                                        and seen[0][1].endswith("(estimativa inicial)"),
+            "Sem estimativa depois do último app": seen[-1] == (True, "") and eta.snapshot()['fraction'] == 1.0,
+        }
+        return report_checks(checks)
+
+    except Exception as e:
+        print(f"❌ Erro no teste: {e}")
+        import traceback
+        traceback.print_exc()
+        raise
+
+
+def main():
+    """Executa todos os testes"""
+    print("\n" + "="*75)
+    print("SUITE DE TESTES - TEMPO RESTANTE DAS ATUALIZAÇÕES")
+    print("="*75)
+
+    tests = [
+        ("Estimativas Iniciais", test_estimates),
+        ("Correção ao Vivo", test_live_corrections),
+        ("Erro em Históricos Reproduzidos", test_replayed_error),
+        ("Tempo Restante nas Telas de Progresso", test_progress_displays),
+    ]
+
+    results = {}
+    for test_name, test_func in tests:
+        try:
+            results[test_name] = test_func()
+        except Exception as e:
+            print(f"\n❌ Teste '{test_name}' falhou com erro: {e}")
+            results[test_name] = False
+
+    # Resumo
+    print("\n" + "="*75)
+    print("RESUMO DOS TESTES")
+    print("="*75 + "\n")
+
+    passed = sum(1 for r in results.values() if r)
+    total = len(results)
+
+    for test_name, result in results.items():
+        status = "✓ PASSOU" if result else "❌ FALHOU"
+        print(f"{status}: {test_name}")
+
+    print(f"\n{passed}/{total} testes passaram")
+
+    if passed == total:
+        print("\n✓ TEMPO RESTANTE FUNCIONANDO!")
+        return 0
+    else:
+        print(f"\n⚠️  {total - passed} teste(s) falharam")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
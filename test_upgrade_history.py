@@ -0,0 +1,267 @@
+"""
+test_upgrade_history.py - Testa o histórico local de atualizações de pacotes
+
+Este script testa:
+1. UpgradeHistory: registro, pacotes mais lentos e que mais falham, resumo
+   por pacote, limite de tentativas e persistência em arquivo
+2. UpgradeTranscript: versão, tipo do instalador e duração do download e da
+   instalação a partir da saída do winget (en-US e pt-BR)
+3. update_app_silent registrando cada tentativa (winget falso, direto e
+   pelo PowerShell)
+"""
+import os
+import sys
+import tempfile
+
+from script_checks import report_checks
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+STUB_ARGV = [sys.executable, os.path.join(BASE_DIR, 'stub_powershell.py')]
+WINGET_STUB_ARGV = [sys.executable, os.path.join(BASE_DIR, 'stub_winget.py')]
+
+
+def test_history_queries():
+    """Testa o registro e as consultas do histórico"""
+    print("\n" + "="*75)
+    print("TESTE: Consultas do Histórico")
+    print("="*75 + "\n")
+
+    try:
+        from upgrade_history import UpgradeHistory
+
+        now = [1000.0]
+        history = UpgradeHistory(max_attempts_per_package=3, clock=lambda: now[0])
+        for seconds in (10, 20, 30, 40):
+            now[0] += 100
+            history.record('Slow.App', True, 'upgraded', seconds, from_version='1.0', to_version='2.0',
+                           installer_type='msi', download_seconds=seconds / 2, install_seconds=seconds / 2)
+        history.record('Fast.App', True, 'upgraded', 2, installer_type='msix')
+        history.record('Broken.App', False, 'installer_failed', 5, exit_code=1603, output_tail="1603")
+        history.record('Broken.App', False, 'failed', 5, exit_code=1)
+        history.record('Broken.App', True, 'up_to_date', 1)
+        history.record('Flaky.App', False, 'failed', 5)
+        history.record('Flaky.App', True, 'upgraded', 5)
+
+        slowest = history.slowest_packages(limit=2)
+        failing = history.failing_packages()
+        stats = history.package_stats('Slow.App')
+        print(f"Mais lentos: {[(e['package_id'], e['avg_seconds']) for e in slowest]}")
+        print(f"Mais falham: {[(e['package_id'], e['failures'], e['last_exit_code']) for e in failing]}")
+        print(f"Slow.App: {stats}")
+
+        checks = {
+            "Mais lentos em ordem": [e['package_id'] for e in slowest] == ['Slow.App', 'Flaky.App'],
+            "Limite por pacote descarta as mais antigas": stats['attempts'] == 3
+                                                          and sorted(history.durations('Slow.App')) == [20, 30, 40],
+            "Resumo do pacote": stats['median_seconds'] == 30 and stats['median_install_seconds'] == 15
+                                and stats['installer_type'] == 'msi' and stats['last_version'] == '2.0',
+            "Mais falham em ordem": [e['package_id'] for e in failing] == ['Broken.App', 'Flaky.App'],
+            "Última falha com código de saída": failing[0]['last_exit_code'] == 1 and failing[0]['failures'] == 2,
+            "up_to_date não conta como falha": history.package_stats('Broken.App')['failures'] == 2,
+            "Pacote sem histórico": history.package_stats('Unknown.App') is None
+                                    and history.durations('Unknown.App') == [],
+        }
+        return report_checks(checks)
+
+    except Exception as e:
+        print(f"❌ Erro no teste: {e}")
+        import traceback
+        traceback.print_exc()
+        raise
+
+
+def test_history_persistence():
+    """Testa a persistência em arquivo e o arquivo corrompido"""
+    print("\n" + "="*75)
+    print("TESTE: Persistência do Histórico")
+    print("="*75 + "\n")
+
+    try:
+        from upgrade_history import UpgradeHistory
+
+        with tempfile.TemporaryDirectory() as data_dir:
+            path = os.path.join(data_dir, 'history.sqlite3')
+            first = UpgradeHistory(path=path)
+            first.record('Git.Git', True, 'upgraded', 12.5, from_version='2.42', to_version='2.43')
+            first.close()
+
+            reopened = UpgradeHistory(path=path)
+            attempts = reopened.attempts('Git.Git')
+            reopened.close()
+
+            corrupt_path = os.path.join(data_dir, 'corrupt.sqlite3')
+            with open(corrupt_path, 'wb') as f:
+                f.write(b'isto nao e um banco sqlite' * 100)
+            corrupt = UpgradeHistory(path=corrupt_path)
+            recorded = corrupt.record('Git.Git', True, 'upgraded', 1)
+            corrupt.close()
+
+        print(f"Tentativas relidas: {attempts}")
+
+        checks = {
+            "Tentativa relida do arquivo": len(attempts) == 1 and attempts[0]['to_version'] == '2.43'
+                                           and attempts[0]['success'] is True,
+            "Arquivo corrompido vira histórico em memória": recorded is not None,
+        }
+        return report_checks(checks)
+
+    except Exception as e:
+        print(f"❌ Erro no teste: {e}")
+        import traceback
+        traceback.print_exc()
+        raise
+
+
+def test_upgrade_transcript():
+    """Testa a leitura da saída de 'winget upgrade --id'"""
+    print("\n" + "="*75)
+    print("TESTE: Saída do winget upgrade")
+    print("="*75 + "\n")
+
+    try:
+        from upgrade_transcript import UpgradeTranscript
+
+        now = [0.0]
+        transcript = UpgradeTranscript(tail_lines=3, clock=lambda: now[0])
+        for at, line in ((0, "Found Git [Git.Git] Version 2.43.0"),
+                         (1, "Downloading https://github.com/git/Git-2.43.0-64-bit.exe"),
+                         (2, "  ████  10 MB / 58 MB\r  █████  58 MB / 58 MB"),
+                         (9, "Successfully verified installer hash"),
+                         (10, "Starting package install..."),
+                         (25, "Successfully installed")):
+            now[0] = at
+            transcript.feed(line)
+        now[0] = 26
+        transcript.finish()
+
+        localized = UpgradeTranscript()
+        localized.feed_text("Encontrado 7-Zip [7zip.7zip] Versão 23.01\n"
+                            "Baixando https://www.7-zip.org/a/7z2301-x64.msi\n"
+                            "Hash do instalador verificado com êxito\n"
+                            "Iniciando a instalação do pacote...\n")
+
+        print(f"Versão {transcript.version}, {transcript.installer_type}, download {transcript.download_seconds}s, "
+              f"instalação {transcript.install_seconds}s")
+        print(f"Últimas linhas: {transcript.tail()!r}")
+
+        checks = {
+            "Versão alvo": transcript.version == '2.43.0',
+            "Tipo pela extensão da URL": transcript.installer_type == 'exe',
+            "Duração do download": transcript.download_seconds == 8,
+            "Duração da instalação": transcript.install_seconds == 16,
+            "Últimas linhas sem a barra de progresso": transcript.tail().splitlines()
+                                                       == ["Successfully verified installer hash",
+                                                           "Starting package install...", "Successfully installed"],
+            "Saída em pt-BR": localized.version == '23.01' and localized.installer_type == 'msi',
+            "Sem linhas ao vivo, sem durações": localized.download_seconds is None
+                                               and localized.install_seconds is None,
+        }
+        return report_checks(checks)
+
+    except Exception as e:
+        print(f"❌ Erro no teste: {e}")
+        import traceback
+        traceback.print_exc()
+        raise
+
+
+def test_manager_records_attempts():
+    """Testa o registro das tentativas por update_app_silent"""
+    print("\n" + "="*75)
+    print("TESTE: Tentativas Registradas")
+    print("="*75 + "\n")
+
+    try:
+        from bench_suite import stub_environment
+        from event_bus import EventBus
+        from powershell_manager import PowerShellManager
+        from prereq_cache import PrerequisiteCache
+        from upgrade_history import UpgradeHistory
+
+        with stub_environment(STUB_WINGET_PACKAGES='3', STUB_WINGET_DOWNLOAD_SECONDS='0.2',
+                              STUB_WINGET_INSTALL_SECONDS='0.1', STUB_WINGET_FAIL_IDS='Stub.Package2'):
+            history = UpgradeHistory()
+            manager = PowerShellManager(shell_argv=STUB_ARGV, winget_argv=WINGET_STUB_ARGV,
+                                        prereq_cache=PrerequisiteCache(), event_bus=EventBus(), history=history)
+            manager.list_upgradable_apps()
+            manager.update_app_silent('Stub.Package1')
+            manager.update_app_silent('Stub.Package2')
+
+            via_shell = UpgradeHistory()
+            PowerShellManager(shell_argv=STUB_ARGV, winget_argv=WINGET_STUB_ARGV, direct_winget=False,
+                              prereq_cache=PrerequisiteCache(), event_bus=EventBus(),
+                              history=via_shell).update_app_silent('Stub.Package0')
+
+        upgraded = history.attempts('Stub.Package1')[0]
+        failed = history.attempts('Stub.Package2')[0]
+        shell_attempt = via_shell.attempts('Stub.Package0')[0]
+        print(f"Atualizado: {upgraded}")
+        print(f"Falhou: {failed}")
+        print(f"Pelo PowerShell: {shell_attempt}")
+
+        checks = {
+            "Versões de origem e destino": (upgraded['from_version'], upgraded['to_version']) == ('1.1.0', '1.1.1'),
+            "Tipo do instalador": upgraded['installer_type'] in ('exe', 'msi', 'msix'),
+            "Download e instalação medidos": 0.15 <= upgraded['download_seconds'] < 1
+                                             and 0.05 <= upgraded['install_seconds'] < 1,
+            "Código de saída": upgraded['exit_code'] == 0 and failed['exit_code'] == 1,
+            "Falha com resultado e últimas linhas": failed['outcome'] == 'installer_failed'
+                                                    and "1603" in failed['output_tail'],
+            "Pelo PowerShell: versão e instalador, sem durações": shell_attempt['to_version'] == '1.0.1'
+                                                                  and shell_attempt['installer_type'] is not None
+                                                                  and shell_attempt['download_seconds'] is None,
+        }
+        return report_checks(checks)
+
+    except Exception as e:
+        print(f"❌ Erro no teste: {e}")
+        import traceback
+        traceback.print_exc()
+        raise
+
+
+def main():
+    """Executa todos os testes"""
+    print("\n" + "="*75)
+    print("SUITE DE TESTES - HISTÓRICO DE ATUALIZAÇÕES")
+    print("="*75)
+
+    tests = [
+        ("Consultas do Histórico", test_history_queries),
+        ("Persistência do Histórico", test_history_persistence),
+        ("Saída do winget upgrade", test_upgrade_transcript),
+        ("Tentativas Registradas", test_manager_records_attempts),
+    ]
+
+    results = {}
+    for test_name, test_func in tests:
+        try:
+            results[test_name] = test_func()
+        except Exception as e:
+            print(f"\n❌ Teste '{test_name}' falhou com erro: {e}")
+            results[test_name] = False
+
+    # Resumo
+    print("\n" + "="*75)
+    print("RESUMO DOS TESTES")
+    print("="*75 + "\n")
+
+    passed = sum(1 for r in results.values() if r)
+    total = len(results)
+
+    for test_name, result in results.items():
+        status = "✓ PASSOU" if result else "❌ FALHOU"
+        print(f"{status}: {test_name}")
+
+    print(f"\n{passed}/{total} testes passaram")
+
+    if passed == total:
+        print("\n✓ HISTÓRICO DE ATUALIZAÇÕES FUNCIONANDO!")
+        return 0
+    else:
+        print(f"\n⚠️  {total - passed} teste(s) falharam")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,235 @@
+"""
+test_upgrade_scheduler.py - Testa o agendador concorrente de atualizações
+
+Este script testa:
+1. Execução concorrente respeitando o número de workers
+2. Progresso monotônico no formato callback(current, total, app_name, success)
+3. Callback fora do lock: lento sem travar os workers, reentrante sem deadlock
+4. Pacotes exclusivos executados sem nada em paralelo
+"""
+import sys
+import threading
+import time
+
+from script_checks import fail, report_checks
+
+
+def _make_apps(count):
+    return [{'name': f"App {i}", 'id': f"Vendor.App{i}"} for i in range(count)]
+
+
+def test_concurrency_and_results():
+    """Testa paralelismo, contagens e lista de falhas"""
+    print("\n" + "="*75)
+    print("TESTE: Concorrência e Resultados")
+    print("="*75 + "\n")
+
+    try:
+        from upgrade_scheduler import UpgradeScheduler
+
+        lock = threading.Lock()
+        running = {'now': 0, 'peak': 0}
+
+        def fake_upgrade(app_id):
+            with lock:
+                running['now'] += 1
+                running['peak'] = max(running['peak'], running['now'])
+            time.sleep(0.05)
+            with lock:
+                running['now'] -= 1
+            return not app_id.endswith('3')
+
+        scheduler = UpgradeScheduler(fake_upgrade, max_workers=3)
+        successful, failed, failed_apps = scheduler.run(_make_apps(10))
+
+        print(f"Sucesso: {successful}, Falhas: {failed}, Pico de paralelismo: {running['peak']}")
+
+        checks = {
+            "Contagens corretas": successful == 9 and failed == 1,
+            "Lista de falhas correta": failed_apps == [{'name': 'App 3', 'id': 'Vendor.App3'}],
+            "Paralelismo limitado a 3": 1 < running['peak'] <= 3,
+        }
+        return report_checks(checks)
+
+    except Exception as e:
+        print(f"❌ Erro no teste: {e}")
+        import traceback
+        traceback.print_exc()
+        raise
+
+
+def test_progress_callback():
+    """Testa que o progresso é monotônico e cobre início e fim de cada app"""
+    print("\n" + "="*75)
+    print("TESTE: Callback de Progresso")
+    print("="*75 + "\n")
+
+    try:
+        from upgrade_scheduler import UpgradeScheduler
+
+        events = []
+
+        def callback(current, total, app_name, success):
+            events.append((current, total, app_name, success))
+
+        scheduler = UpgradeScheduler(lambda app_id: True, max_workers=4)
+        scheduler.run(_make_apps(8), callback)
+
+        starts = [e[0] for e in events if e[3] is None]
+        finishes = [e[0] for e in events if e[3] is not None]
+
+        checks = {
+            "Um início e um fim por app": len(starts) == 8 and len(finishes) == 8,
+            "Inícios monotônicos": starts == sorted(starts),
+            "Fins monotônicos até o total": finishes == list(range(1, 9)),
+            "Total informado": all(e[1] == 8 for e in events),
+        }
+        return report_checks(checks)
+
+    except Exception as e:
+        print(f"❌ Erro no teste: {e}")
+        import traceback
+        traceback.print_exc()
+        raise
+
+
+def test_callback_outside_lock():
+    """Testa que o callback de progresso não roda com o lock do agendador"""
+    print("\n" + "="*75)
+    print("TESTE: Callback Fora do Lock")
+    print("="*75 + "\n")
+
+    try:
+        from upgrade_scheduler import UpgradeScheduler
+
+        started_at = []
+
+        def upgrade(app_id):
+            started_at.append(time.perf_counter())
+            time.sleep(0.1)
+            return True
+
+        def slow_callback(current, total, app_name, success):
+            # Ex: console bloqueado ou espera pela interface
+            if success is None and current == 1:
+                time.sleep(0.5)
+
+        start = time.perf_counter()
+        UpgradeScheduler(upgrade, max_workers=3).run(_make_apps(3), slow_callback)
+        # O worker que entrega o evento espera o callback; os outros seguem
+        early = sum(1 for t in started_at if t - start < 0.3)
+
+        scheduler = UpgradeScheduler(lambda app_id: True, max_workers=3)
+        calls = []
+
+        def reentrant_callback(current, total, app_name, success):
+            # Callback que consulta o próprio agendador
+            with scheduler._lock:
+                calls.append(current)
+
+        runner = threading.Thread(target=scheduler.run, args=(_make_apps(6), reentrant_callback), daemon=True)
+        runner.start()
+        runner.join(timeout=5)
+
+        print(f"Atualizações iniciadas durante o callback lento: {early} de {len(started_at)}")
+        print(f"Callback reentrante: {len(calls)} chamadas, terminou: {not runner.is_alive()}")
+
+        checks = {
+            "Callback lento não atrasa os outros workers": len(started_at) == 3 and early >= 2,
+            "Callback reentrante sem deadlock": not runner.is_alive() and len(calls) == 12,
+        }
+        return report_checks(checks)
+
+    except Exception as e:
+        print(f"❌ Erro no teste: {e}")
+        import traceback
+        traceback.print_exc()
+        raise
+
+
+def test_exclusive_packages():
+    """Testa que a atualização do próprio winget roda sozinha e por último"""
+    print("\n" + "="*75)
+    print("TESTE: Pacotes Exclusivos")
+    print("="*75 + "\n")
+
+    try:
+        from upgrade_scheduler import UpgradeScheduler
+
+        lock = threading.Lock()
+        running = {'now': 0}
+        overlap = []
+        order = []
+
+        def fake_upgrade(app_id):
+            with lock:
+                running['now'] += 1
+                if app_id == 'Microsoft.AppInstaller' and running['now'] > 1:
+                    overlap.append(app_id)
+            time.sleep(0.02)
+            with lock:
+                running['now'] -= 1
+                order.append(app_id)
+            return True
+
+        apps = [{'name': 'App Installer', 'id': 'Microsoft.AppInstaller'}] + _make_apps(5)
+        UpgradeScheduler(fake_upgrade, max_workers=4).run(apps)
+
+        print(f"Ordem de conclusão: {order}")
+        if not overlap and order[-1] == 'Microsoft.AppInstaller':
+            print("✓ App Installer atualizado sozinho, após os demais")
+            return True
+        fail("App Installer rodou em paralelo com outras atualizações")
+
+    except Exception as e:
+        print(f"❌ Erro no teste: {e}")
+        import traceback
+        traceback.print_exc()
+        raise
+
+
+def main():
+    """Executa todos os testes"""
+    print("\n" + "="*75)
+    print("SUITE DE TESTES - AGENDADOR DE ATUALIZAÇÕES")
+    print("="*75)
+
+    tests = [
+        ("Concorrência e Resultados", test_concurrency_and_results),
+        ("Callback de Progresso", test_progress_callback),
+        ("Callback Fora do Lock", test_callback_outside_lock),
+        ("Pacotes Exclusivos", test_exclusive_packages),
+    ]
+
+    results = {}
+    for test_name, test_func in tests:
+        try:
+            results[test_name] = test_func()
+        except Exception as e:
+            print(f"\n❌ Teste '{test_name}' falhou com erro: {e}")
+            results[test_name] = False
+
+    # Resumo
+    print("\n" + "="*75)
+    print("RESUMO DOS TESTES")
+    print("="*75 + "\n")
+
+    passed = sum(1 for r in results.values() if r)
+    total = len(results)
+
+    for test_name, result in results.items():
+        status = "✓ PASSOU" if result else "❌ FALHOU"
+        print(f"{status}: {test_name}")
+
+    print(f"\n{passed}/{total} testes passaram")
+
+    if passed == total:
+        print("\n✓ AGENDADOR FUNCIONANDO!")
+        return 0
+    else:
+        print(f"\n⚠️  {total - passed} teste(s) falharam")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
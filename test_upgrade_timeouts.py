@@ -0,0 +1,400 @@
+"""
+test_upgrade_timeouts.py - Testa os tempos limite por pacote e a detecção de instalador travado
+
+Este script testa:
+1. UpgradeTimeouts: timeout pelo p95 do pacote, pelo tipo de instalador e
+   padrão, piso e teto, aumento após estouro, tempo de inatividade e em massa
+   (com teto e só com os pacotes da última listagem)
+2. HangWatch: saída e CPU contam como atividade; CPU real de um processo filho
+3. update_app_silent e update_all_apps_with_winget encerrando um instalador
+   travado antes do timeout, sem repetir sem --exact (winget falso)
+4. Pacote sem histórico: só o timeout encerra (instalação MSI fora da árvore)
+5. Instalador travado com o winget ainda redesenhando o spinner
+"""
+import os
+import subprocess
+import sys
+import time
+
+from script_checks import report_checks
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+STUB_ARGV = [sys.executable, os.path.join(BASE_DIR, 'stub_powershell.py')]
+WINGET_STUB_ARGV = [sys.executable, os.path.join(BASE_DIR, 'stub_winget.py')]
+
+
+def test_timeout_policy():
+    """Testa os limites derivados do histórico"""
+    print("\n" + "="*75)
+    print("TESTE: Limites pelo Histórico")
+    print("="*75 + "\n")
+
+    try:
+        from upgrade_history import UpgradeHistory
+        from upgrade_timeouts import (BASIS_DEFAULT, BASIS_INSTALLER_TYPE, BASIS_PACKAGE, BULK_UPGRADE_TIMEOUT,
+                                      UpgradeTimeouts)
+
+        history = UpgradeHistory()
+        for seconds in (100, 110, 120):
+            history.record('Big.IDE', True, 'upgraded', seconds, installer_type='exe', install_seconds=60)
+        history.record('Tiny.Tool', True, 'upgraded', 5, installer_type='msi', install_seconds=2)
+        history.record('Huge.Suite', True, 'upgraded', 5000, installer_type='msi')
+        history.record('New.Msi', False, 'not_found', 1, installer_type='msi')
+        history.record('Slow.App', False, 'timeout', 600)
+
+        timeouts = UpgradeTimeouts(history)
+        policies = {app_id: timeouts.for_package(app_id, 600)
+                    for app_id in ('Big.IDE', 'Tiny.Tool', 'Huge.Suite', 'New.Msi', 'Unknown.App', 'Slow.App')}
+        bulk = timeouts.for_bulk(['Big.IDE', 'Tiny.Tool'], 600)
+        many = UpgradeTimeouts().for_bulk([f'Pending.App{index}' for index in range(40)], 600)
+        for app_id, policy in policies.items():
+            print(f"{app_id}: {policy}")
+        print(f"Em massa: {bulk}")
+
+        checks = {
+            "p95 do pacote x multiplicador": policies['Big.IDE']['timeout'] == 360
+                                             and policies['Big.IDE']['basis'] == BASIS_PACKAGE,
+            "Piso para pacotes rápidos": policies['Tiny.Tool']['timeout'] == 120,
+            "Teto para pacotes enormes": policies['Huge.Suite']['timeout'] == 3600,
+            "Pacote novo pelo tipo de instalador": policies['New.Msi']['timeout'] == 120
+                                                   and policies['New.Msi']['basis'] == BASIS_INSTALLER_TYPE,
+            "Sem histórico usa o padrão, sem limite de inatividade": policies['Unknown.App'] == {
+                'timeout': 600, 'idle_timeout': None, 'basis': BASIS_DEFAULT},
+            "Sem duração de instalação, sem limite de inatividade": policies['New.Msi']['idle_timeout'] is None,
+            "Estouro anterior dobra o limite": policies['Slow.App']['timeout'] == 1200,
+            "Inatividade pela instalação do pacote": policies['Big.IDE']['idle_timeout'] == 180
+                                                     and policies['Tiny.Tool']['idle_timeout'] == 90,
+            "Em massa soma os pacotes": bulk['timeout'] == 480 and bulk['idle_timeout'] == 180,
+            "Em massa com teto (40 pacotes sem histórico)": many['timeout'] == 3600 and many['packages'] == 40,
+            "Em massa sem pacotes conhecidos": timeouts.for_bulk(None, 600) == {
+                'timeout': BULK_UPGRADE_TIMEOUT, 'idle_timeout': None, 'packages': 0},
+            "Em massa com pacote sem histórico, sem limite de inatividade":
+                timeouts.for_bulk(['Big.IDE', 'Unknown.App'], 600)['idle_timeout'] is None,
+        }
+        return report_checks(checks)
+
+    except Exception as e:
+        print(f"❌ Erro no teste: {e}")
+        import traceback
+        traceback.print_exc()
+        raise
+
+
+def test_bulk_uses_current_listing():
+    """Testa que a atualização em massa considera só a última listagem"""
+    print("\n" + "="*75)
+    print("TESTE: Em Massa pela Última Listagem")
+    print("="*75 + "\n")
+
+    try:
+        from bench_suite import stub_environment
+        from event_bus import EventBus
+        from powershell_manager import PowerShellManager
+        from prereq_cache import PrerequisiteCache
+        from upgrade_timeouts import UpgradeTimeouts
+
+        class RecordingTimeouts(UpgradeTimeouts):
+            def for_bulk(self, app_ids, default_seconds):
+                bulk_ids.append(sorted(app_ids or ()))
+                return super().for_bulk(app_ids, default_seconds)
+
+        bulk_ids = []
+        with stub_environment(STUB_WINGET_PACKAGES='3', STUB_WINGET_DOWNLOAD_SECONDS='0.01',
+                              STUB_WINGET_INSTALL_SECONDS='0.01'):
+            manager = PowerShellManager(shell_argv=STUB_ARGV, winget_argv=WINGET_STUB_ARGV,
+                                        prereq_cache=PrerequisiteCache(), event_bus=EventBus(),
+                                        upgrade_timeouts=RecordingTimeouts())
+            manager.list_upgradable_apps()
+            # Dois pacotes atualizados por fora: a listagem seguinte só traz um
+            os.environ['STUB_WINGET_PACKAGES'] = '1'
+            manager.list_upgradable_apps()
+            success, _ = manager.update_all_apps_with_winget()
+
+        print(f"Pacotes considerados: {bulk_ids}")
+
+        checks = {
+            "Atualização em massa concluída": success is True,
+            "Só os pacotes da última listagem": bulk_ids == [['Stub.Package0']],
+        }
+        return report_checks(checks)
+
+    except Exception as e:
+        print(f"❌ Erro no teste: {e}")
+        import traceback
+        traceback.print_exc()
+        raise
+
+
+def test_hang_watch():
+    """Testa a detecção de inatividade por saída e por CPU"""
+    print("\n" + "="*75)
+    print("TESTE: Detecção de Inatividade")
+    print("="*75 + "\n")
+
+    try:
+        from process_activity import HangWatch, process_tree_cpu_seconds
+
+        now = [0.0]
+        cpu = [1.0]
+        watch = HangWatch(1234, 10, clock=lambda: now[0], cpu_seconds=lambda pid: cpu[0])
+        now[0] = 8
+        quiet = watch.hung()
+        now[0] = 9
+        watch.activity()
+        now[0] = 18
+        after_output = watch.hung()
+        cpu[0] = 2.0
+        now[0] = 20
+        after_cpu = watch.hung()
+        now[0] = 29
+        still_busy = watch.hung()
+        now[0] = 31
+        hung = watch.hung()
+
+        blind = HangWatch(1234, 10, clock=lambda: now[0], cpu_seconds=lambda pid: None)
+        now[0] += 11
+        blind_hung = blind.hung()
+
+        # Processo filho real consumindo CPU (Linux/Windows; em outras plataformas é None)
+        child = subprocess.Popen([sys.executable, '-c',
+                                  "import subprocess, sys; subprocess.run([sys.executable, '-c', "
+                                  "'import time\\nt = time.perf_counter()\\nwhile time.perf_counter() - t < 0.6: pass'])"])
+        time.sleep(0.1)
+        first = process_tree_cpu_seconds(child.pid)
+        time.sleep(0.4)
+        second = process_tree_cpu_seconds(child.pid)
+        child.wait()
+        print(f"CPU da árvore do processo filho: {first} -> {second}")
+
+        checks = {
+            "Sem saída e sem CPU, ainda dentro do limite": quiet is False,
+            "Saída reinicia a contagem": after_output is False,
+            "CPU conta como atividade": after_cpu is False and still_busy is False,
+            "Travado após o limite sem atividade": hung is True,
+            "Sem leitura de CPU, só a saída conta": blind_hung is True,
+            "CPU do neto somada à árvore": first is None or (second is not None and second - first >= 0.2),
+        }
+        return report_checks(checks)
+
+    except Exception as e:
+        print(f"❌ Erro no teste: {e}")
+        import traceback
+        traceback.print_exc()
+        raise
+
+
+def test_hung_installer_killed():
+    """Testa o encerramento de um instalador travado (winget falso)"""
+    print("\n" + "="*75)
+    print("TESTE: Instalador Travado Encerrado")
+    print("="*75 + "\n")
+
+    try:
+        from event_bus import EVENT_COMMAND_STARTED, EventBus
+        from powershell_manager import PowerShellManager
+        from prereq_cache import PrerequisiteCache
+        from upgrade_history import UpgradeHistory
+        from upgrade_timeouts import UpgradeTimeouts
+
+        names = ('STUB_WINGET_PACKAGES', 'STUB_WINGET_DOWNLOAD_SECONDS', 'STUB_WINGET_INSTALL_SECONDS',
+                 'STUB_WINGET_HANG_IDS', 'STUB_WINGET_BUSY_INSTALL')
+        os.environ.update(STUB_WINGET_PACKAGES='3', STUB_WINGET_DOWNLOAD_SECONDS='0.1',
+                          STUB_WINGET_INSTALL_SECONDS='1.2', STUB_WINGET_HANG_IDS='Stub.Package1',
+                          STUB_WINGET_BUSY_INSTALL='1')
+        try:
+            # Só pacotes com duração de instalação no histórico são encerrados por inatividade
+            history = UpgradeHistory()
+            for index in range(3):
+                history.record(f'Stub.Package{index}', True, 'upgraded', 1, install_seconds=0.1)
+            manager = PowerShellManager(shell_argv=STUB_ARGV, winget_argv=WINGET_STUB_ARGV,
+                                        prereq_cache=PrerequisiteCache(), event_bus=EventBus(), history=history,
+                                        upgrade_timeouts=UpgradeTimeouts(history, min_idle_seconds=0.6))
+            commands = []
+            manager.event_bus.subscribe(
+                lambda event: commands.append(event) if event['type'] == EVENT_COMMAND_STARTED else None)
+
+            start = time.perf_counter()
+            busy = manager.update_app_silent('Stub.Package0')
+            busy_seconds = time.perf_counter() - start
+
+            start = time.perf_counter()
+            hung = manager.update_app_silent('Stub.Package1')
+            hung_seconds = time.perf_counter() - start
+            hung_commands = len(commands) - 1
+
+            manager.list_upgradable_apps()
+            lines = []
+            start = time.perf_counter()
+            bulk_success, bulk_output = manager.update_all_apps_with_winget(output_callback=lines.append)
+            bulk_seconds = time.perf_counter() - start
+        finally:
+            for name in names:
+                os.environ.pop(name, None)
+
+        attempt = history.attempts('Stub.Package1')[0]
+        print(f"Instalação silenciosa com CPU: {busy} em {busy_seconds:.2f}s")
+        print(f"Travado: {hung} em {hung_seconds:.2f}s, {hung_commands} comando(s): {attempt['outcome']}")
+        print(f"Em massa: {bulk_success} em {bulk_seconds:.2f}s, últimas linhas: {lines[-1:]}")
+
+        checks = {
+            "Instalação silenciosa, mas ativa, não é encerrada": busy is True and busy_seconds >= 1.2,
+            "Instalador travado encerrado pela inatividade": hung is False and hung_seconds < 5,
+            "Sem nova tentativa sem --exact": hung_commands == 1,
+            "Registrado como travado": attempt['outcome'] == 'hung'
+                                      and "Starting package install" in attempt['output_tail'],
+            "Em massa encerrada no pacote travado": bulk_success is False and bulk_seconds < 15
+                                                    and lines[-1] == "Starting package install...",
+        }
+        return report_checks(checks)
+
+    except Exception as e:
+        print(f"❌ Erro no teste: {e}")
+        import traceback
+        traceback.print_exc()
+        raise
+
+
+def test_no_history_only_timeout():
+    """Testa que um pacote sem histórico não é encerrado por inatividade"""
+    print("\n" + "="*75)
+    print("TESTE: Sem Histórico Só o Timeout Encerra")
+    print("="*75 + "\n")
+
+    try:
+        from bench_suite import stub_environment
+        from event_bus import EVENT_APP_UPGRADE, EventBus
+        from powershell_manager import PowerShellManager
+        from prereq_cache import PrerequisiteCache
+        from upgrade_timeouts import UpgradeTimeouts
+
+        # Como uma instalação MSI longa: sem saída e sem CPU na árvore do winget
+        with stub_environment(STUB_WINGET_PACKAGES='2', STUB_WINGET_DOWNLOAD_SECONDS='0.1',
+                              STUB_WINGET_HANG_IDS='Stub.Package1'):
+            bus = EventBus()
+            outcomes = []
+            bus.subscribe(lambda event: outcomes.append(event['outcome'])
+                          if event['type'] == EVENT_APP_UPGRADE else None)
+            manager = PowerShellManager(shell_argv=STUB_ARGV, winget_argv=WINGET_STUB_ARGV,
+                                        prereq_cache=PrerequisiteCache(), event_bus=bus,
+                                        upgrade_timeouts=UpgradeTimeouts(min_idle_seconds=0.3))
+            manager.app_upgrade_timeout = 2
+            start = time.perf_counter()
+            success = manager.update_app_silent('Stub.Package1')
+            seconds = time.perf_counter() - start
+
+        print(f"Sem histórico: {success} em {seconds:.2f}s, {outcomes}")
+
+        checks = {
+            "Não encerrado por inatividade": outcomes == ['timeout'],
+            "Encerrado só pelo timeout": success is False and 2 <= seconds < 6,
+        }
+        return report_checks(checks)
+
+    except Exception as e:
+        print(f"❌ Erro no teste: {e}")
+        import traceback
+        traceback.print_exc()
+        raise
+
+
+def test_spinner_is_not_activity():
+    """Testa o instalador travado com o winget ainda redesenhando o spinner"""
+    print("\n" + "="*75)
+    print("TESTE: Spinner Não Conta Como Atividade")
+    print("="*75 + "\n")
+
+    try:
+        from bench_suite import stub_environment
+        from event_bus import EventBus
+        from powershell_manager import PowerShellManager
+        from prereq_cache import PrerequisiteCache
+        from winget_parser import has_content
+
+        with open(os.path.join(BASE_DIR, 'fixtures', 'winget_upgrade_en.txt'), 'r', encoding='utf-8',
+                  newline='') as f:
+            fixture_spinner = f.read().split('Name', 1)[0]
+
+        with stub_environment(STUB_WINGET_PACKAGES='2', STUB_WINGET_DOWNLOAD_SECONDS='0.1',
+                              STUB_WINGET_HANG_IDS='Stub.Package1', STUB_WINGET_HANG_SPINNER='1'):
+            manager = PowerShellManager(shell_argv=STUB_ARGV, winget_argv=WINGET_STUB_ARGV,
+                                        prereq_cache=PrerequisiteCache(), event_bus=EventBus())
+            details = {}
+            start = time.perf_counter()
+            success, _, _ = manager.execute_winget(['upgrade', '--id', 'Stub.Package1'], timeout=8,
+                                                   details=details, idle_timeout=0.6)
+            direct_seconds = time.perf_counter() - start
+
+            start = time.perf_counter()
+            streamed, _, stderr = manager.execute_winget_streaming(['upgrade', '--all'], lambda line: None,
+                                                                   timeout=8, idle_timeout=0.6)
+            streamed_seconds = time.perf_counter() - start
+
+        print(f"Spinner da fixture: {fixture_spinner!r}")
+        print(f"Direto: {details.get('stopped')} em {direct_seconds:.2f}s")
+        print(f"Em streaming: {stderr!r} em {streamed_seconds:.2f}s")
+
+        checks = {
+            "Quadros do spinner sem conteúdo": fixture_spinner.strip() and not has_content(fixture_spinner),
+            "Linhas e barras de progresso têm conteúdo": has_content("Starting package install...\n")
+                                                         and has_content("\r   - \r  ████  10 MB / 58 MB"),
+            "Direto: travado apesar do spinner": success is False and details.get('stopped') == 'hung'
+                                                 and direct_seconds < 4,
+            "Em streaming: travado apesar do spinner": streamed is False and "hung" in stderr
+                                                       and streamed_seconds < 4,
+        }
+        return report_checks(checks)
+
+    except Exception as e:
+        print(f"❌ Erro no teste: {e}")
+        import traceback
+        traceback.print_exc()
+        raise
+
+
+def main():
+    """Executa todos os testes"""
+    print("\n" + "="*75)
+    print("SUITE DE TESTES - TEMPOS LIMITE POR PACOTE")
+    print("="*75)
+
+    tests = [
+        ("Limites pelo Histórico", test_timeout_policy),
+        ("Em Massa pela Última Listagem", test_bulk_uses_current_listing),
+        ("Detecção de Inatividade", test_hang_watch),
+        ("Instalador Travado Encerrado", test_hung_installer_killed),
+        ("Sem Histórico Só o Timeout Encerra", test_no_history_only_timeout),
+        ("Spinner Não Conta Como Atividade", test_spinner_is_not_activity),
+    ]
+
+    results = {}
+    for test_name, test_func in tests:
+        try:
+            results[test_name] = test_func()
+        except Exception as e:
+            print(f"\n❌ Teste '{test_name}' falhou com erro: {e}")
+            results[test_name] = False
+
+    # Resumo
+    print("\n" + "="*75)
+    print("RESUMO DOS TESTES")
+    print("="*75 + "\n")
+
+    passed = sum(1 for r in results.values() if r)
+    total = len(results)
+
+    for test_name, result in results.items():
+        status = "✓ PASSOU" if result else "❌ FALHOU"
+        print(f"{status}: {test_name}")
+
+    print(f"\n{passed}/{total} testes passaram")
+
+    if passed == total:
+        print("\n✓ TEMPOS LIMITE POR PACOTE FUNCIONANDO!")
+        return 0
+    else:
+        print(f"\n⚠️  {total - passed} teste(s) falharam")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,190 @@
+"""
+test_windows_update_progress.py - Testa o progresso real do Windows Update
+
+Este script testa:
+1. Parser das transições Accepted/Downloaded/Installed de uma transcrição gravada
+2. Saída sem atualizações disponíveis
+3. run_windows_update_with_progress reproduzindo a transcrição pelo PowerShell falso
+"""
+import os
+import sys
+import time
+
+from script_checks import fail, report_checks
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+FIXTURES_DIR = os.path.join(BASE_DIR, 'fixtures')
+STUB_ARGV = [sys.executable, os.path.join(BASE_DIR, 'stub_powershell.py')]
+
+
+def _read_fixture(name):
+    with open(os.path.join(FIXTURES_DIR, name), 'r', encoding='utf-8') as f:
+        return f.read().splitlines()
+
+
+def test_parser_transcript():
+    """Testa eventos, tamanhos, durações e porcentagens de uma transcrição"""
+    print("\n" + "="*75)
+    print("TESTE: Parser da Transcrição do PSWindowsUpdate")
+    print("="*75 + "\n")
+
+    try:
+        from windows_update_progress import WindowsUpdateProgressParser
+
+        # Relógio falso: cada leitura avança 10 segundos
+        ticks = iter(range(0, 10000, 10))
+        parser = WindowsUpdateProgressParser(clock=lambda: next(ticks))
+
+        events = []
+        for line in _read_fixture('pswindowsupdate_install.txt'):
+            events.extend(parser.feed(line))
+
+        for event in events:
+            print(f"  {event['percent']:5.1f}% [{event['phase']}] {event['message']}")
+
+        phases = [e['phase'] for e in events]
+        percents = [e['percent'] for e in events]
+        cumulative = next(e for e in events if e['phase'] == 'downloaded' and e['kb'] == 'KB5031356')
+        last_download = [e for e in events if e['phase'] == 'downloaded'][-1]
+        summary = parser.summary()
+
+        checks = {
+            "Busca concluída": phases[0] == 'scan' and parser.found == 4,
+            "Quatro aceitas e quatro baixadas": phases.count('accepted') == 4 and phases.count('downloaded') == 4,
+            "Três instaladas e uma falha": phases.count('installed') == 3 and phases.count('failed') == 1,
+            "Porcentagens monotônicas": percents == sorted(percents),
+            "Download termina em 50%": last_download['percent'] == 50.0,
+            "Instalação termina em 100%": percents[-1] == 100.0,
+            "Tamanho em bytes": cumulative['size_bytes'] == 812 * 1024 ** 2,
+            "Duração da etapa informada": cumulative['duration'] and cumulative['duration'] > 0,
+            "Atualização sem KB identificada pelo título": summary['total'] == 4,
+            "Resumo com a falha": summary['failed'] == ['KB2267602'] and summary['installed'] == 3,
+        }
+        return report_checks(checks)
+
+    except Exception as e:
+        print(f"❌ Erro no teste: {e}")
+        import traceback
+        traceback.print_exc()
+        raise
+
+
+def test_parser_no_updates():
+    """Testa a saída quando não há atualizações"""
+    print("\n" + "="*75)
+    print("TESTE: Nenhuma Atualização Disponível")
+    print("="*75 + "\n")
+
+    try:
+        from windows_update_progress import WindowsUpdateProgressParser
+
+        parser = WindowsUpdateProgressParser()
+        events = []
+        for line in _read_fixture('pswindowsupdate_none.txt'):
+            events.extend(parser.feed(line))
+
+        print(f"Eventos: {[e['message'] for e in events]}")
+
+        if len(events) == 1 and events[0]['message'] == "Nenhuma atualização disponível":
+            print("✓ Apenas o evento de busca foi gerado")
+            return True
+        fail("Eventos inesperados")
+
+    except Exception as e:
+        print(f"❌ Erro no teste: {e}")
+        import traceback
+        traceback.print_exc()
+        raise
+
+
+def test_replay_through_stub():
+    """Testa o progresso ao vivo reproduzindo a transcrição pelo PowerShell falso"""
+    print("\n" + "="*75)
+    print("TESTE: Reprodução pelo PowerShell Falso")
+    print("="*75 + "\n")
+
+    try:
+        from powershell_manager import PowerShellManager
+        from prereq_cache import PrerequisiteCache
+
+        os.environ['STUB_WU_TRANSCRIPT'] = os.path.join(FIXTURES_DIR, 'pswindowsupdate_install.txt')
+        os.environ['STUB_WU_LINE_SECONDS'] = '0.05'
+
+        ps_manager = PowerShellManager(shell_argv=STUB_ARGV, prereq_cache=PrerequisiteCache())
+        start = time.perf_counter()
+        progress = []
+        events = []
+
+        success, output = ps_manager.run_windows_update_with_progress(
+            lambda percent, message: progress.append((percent, time.perf_counter() - start)),
+            event_callback=events.append,
+        )
+        elapsed = time.perf_counter() - start
+
+        percents = [p for p, _ in progress]
+        first_download = next(t for p, t in progress if 5 < p < 50)
+        print(f"Atualizações de progresso: {len(progress)}, primeiro download em {first_download:.2f}s de {elapsed:.2f}s")
+
+        checks = {
+            "Sucesso": success,
+            "Progresso intermediário real": len({p for p in percents if 0 < p < 100}) >= 8,
+            "Porcentagens monotônicas": percents == sorted(percents),
+            "Progresso chegou antes do fim do comando": first_download < elapsed - 0.3,
+            "Eventos completos repassados": sum(1 for e in events if e['phase'] == 'installed') == 3,
+        }
+        return report_checks(checks)
+
+    except Exception as e:
+        print(f"❌ Erro no teste: {e}")
+        import traceback
+        traceback.print_exc()
+        raise
+    finally:
+        os.environ.pop('STUB_WU_TRANSCRIPT', None)
+        os.environ.pop('STUB_WU_LINE_SECONDS', None)
+
+
+def main():
+    """Executa todos os testes"""
+    print("\n" + "="*75)
+    print("SUITE DE TESTES - PROGRESSO DO WINDOWS UPDATE")
+    print("="*75)
+
+    tests = [
+        ("Parser da Transcrição do PSWindowsUpdate", test_parser_transcript),
+        ("Nenhuma Atualização Disponível", test_parser_no_updates),
+        ("Reprodução pelo PowerShell Falso", test_replay_through_stub),
+    ]
+
+    results = {}
+    for test_name, test_func in tests:
+        try:
+            results[test_name] = test_func()
+        except Exception as e:
+            print(f"\n❌ Teste '{test_name}' falhou com erro: {e}")
+            results[test_name] = False
+
+    # Resumo
+    print("\n" + "="*75)
+    print("RESUMO DOS TESTES")
+    print("="*75 + "\n")
+
+    passed = sum(1 for r in results.values() if r)
+    total = len(results)
+
+    for test_name, result in results.items():
+        status = "✓ PASSOU" if result else "❌ FALHOU"
+        print(f"{status}: {test_name}")
+
+    print(f"\n{passed}/{total} testes passaram")
+
+    if passed == total:
+        print("\n✓ PROGRESSO DO WINDOWS UPDATE FUNCIONANDO!")
+        return 0
+    else:
+        print(f"\n⚠️  {total - passed} teste(s) falharam")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,285 @@
+"""
+test_winget_direct.py - Testa a execução direta do winget (sem PowerShell)
+
+Este script testa (com o winget falso executado como processo):
+1. Listagem e atualização sem host PowerShell: argv literal, eventos 'winget'
+2. Atualização em massa em streaming e o código de saída do winget
+3. Volta ao PowerShell: direct_winget=False e shell próprio sem winget_argv
+4. Tabela do winget quando Get-WinGetPackage falha ou devolve JSON inválido
+5. headless_cli.py com --winget
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from script_checks import report_checks
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+STUB_ARGV = [sys.executable, os.path.join(BASE_DIR, 'stub_powershell.py')]
+WINGET_STUB_ARGV = [sys.executable, os.path.join(BASE_DIR, 'stub_winget.py')]
+# "PowerShell" que sempre falha: prova que o comando não passou por ele
+BROKEN_SHELL_ARGV = [sys.executable, '-c', 'import sys; sys.exit(9)']
+
+
+def test_direct_commands():
+    """Testa listagem e atualização sem passar pelo PowerShell"""
+    print("\n" + "="*75)
+    print("TESTE: winget Direto")
+    print("="*75 + "\n")
+
+    try:
+        from bench_suite import stub_environment
+        from event_bus import EventBus
+        from powershell_manager import PowerShellManager
+        from prereq_cache import PrerequisiteCache
+
+        with stub_environment(STUB_WINGET_PACKAGES='3', STUB_WINGET_DOWNLOAD_SECONDS='0.01',
+                              STUB_WINGET_INSTALL_SECONDS='0.01'):
+            # Sem verificação prévia do Microsoft.WinGet.Client: a listagem não a faz
+            cache = PrerequisiteCache()
+            bus = EventBus()
+            events = []
+            bus.subscribe(events.append)
+            manager = PowerShellManager(shell_argv=BROKEN_SHELL_ARGV, prereq_cache=cache, event_bus=bus,
+                                        winget_argv=WINGET_STUB_ARGV, instrument_commands=True)
+            installed, _ = manager.install_winget_if_needed()
+            apps = manager.list_upgradable_apps()
+            upgraded = manager.update_app_silent('Stub.Package1')
+            # Sem shell no meio, o id chega literal ao winget (não é interpretado)
+            injected = manager.update_app_silent('Stub.Package1; exit 0')
+
+        finished = [e for e in events if e['type'] == 'command_finished']
+        outcomes = [e['outcome'] for e in events if e['type'] == 'app_upgrade']
+        print(f"Apps: {[app['id'] for app in apps]}")
+        print(f"Comandos: {[(e['kind'], e['command'][:40]) for e in finished]}")
+
+        checks = {
+            "winget disponível sem consultar o PowerShell": installed,
+            "Listagem interpretada": [app['id'] for app in apps] == ['Stub.Package0', 'Stub.Package1', 'Stub.Package2'],
+            "Atualização concluída": upgraded and outcomes[0] == 'upgraded',
+            "Argumento não interpretado por shell": not injected and outcomes[1] == 'not_found',
+            "Listagem sem verificar o módulo no PowerShell": cache.get('winget_client') is None,
+            "Todos os comandos marcados 'winget'": bool(finished) and all(e['kind'] == 'winget' for e in finished),
+            "Instrumentação no caminho direto": all(e['exit_code'] is not None and e['spawn_seconds'] is not None
+                                                    for e in finished),
+            "Chamador identificado": {e['caller'] for e in finished} == {'list_upgradable_apps', 'update_app_silent'},
+        }
+        return report_checks(checks)
+
+    except Exception as e:
+        print(f"❌ Erro no teste: {e}")
+        import traceback
+        traceback.print_exc()
+        raise
+
+
+def test_direct_streaming():
+    """Testa a atualização em massa em streaming pelo winget direto"""
+    print("\n" + "="*75)
+    print("TESTE: Atualização em Massa Direta")
+    print("="*75 + "\n")
+
+    try:
+        import time
+        from bench_suite import stub_environment
+        from event_bus import EventBus
+        from powershell_manager import PowerShellManager
+        from prereq_cache import PrerequisiteCache
+
+        with stub_environment(STUB_WINGET_PACKAGES='3', STUB_WINGET_DOWNLOAD_SECONDS='0.2',
+                              STUB_WINGET_INSTALL_SECONDS='0.01'):
+            bus = EventBus()
+            events = []
+            bus.subscribe(events.append)
+            manager = PowerShellManager(shell_argv=BROKEN_SHELL_ARGV, prereq_cache=PrerequisiteCache(),
+                                        event_bus=bus, winget_argv=WINGET_STUB_ARGV)
+            arrivals = []
+            start = time.perf_counter()
+            success, output = manager.update_all_apps_with_winget(
+                output_callback=lambda line: arrivals.append((time.perf_counter() - start, line)))
+            total = time.perf_counter() - start
+
+            os.environ['STUB_WINGET_FAIL_IDS'] = 'Stub.Package2'
+            failed_success, failed_output = manager.update_all_apps_with_winget(output_callback=lambda line: None)
+
+        kinds = [e['kind'] for e in events if e['type'] == 'command_finished']
+        print(f"{len(arrivals)} linhas; primeira em {arrivals[0][0]:.2f}s de {total:.2f}s")
+
+        checks = {
+            "Atualização em massa concluída": success and "Successfully installed" in output,
+            "Linhas entregues antes do fim": arrivals[0][0] < total - 0.3,
+            "Comando marcado 'winget_stream'": kinds == ['winget_stream', 'winget_stream'],
+            "Código de saída do winget respeitado": not failed_success and "1603" in failed_output,
+        }
+        return report_checks(checks)
+
+    except Exception as e:
+        print(f"❌ Erro no teste: {e}")
+        import traceback
+        traceback.print_exc()
+        raise
+
+
+def test_powershell_fallback():
+    """Testa os casos em que o winget continua indo pelo PowerShell"""
+    print("\n" + "="*75)
+    print("TESTE: winget pelo PowerShell")
+    print("="*75 + "\n")
+
+    try:
+        from bench_suite import stub_environment
+        from event_bus import EventBus
+        from powershell_manager import PowerShellManager
+        from prereq_cache import PrerequisiteCache
+
+        with stub_environment(STUB_WINGET_PACKAGES='2', STUB_WINGET_DOWNLOAD_SECONDS='0.01',
+                              STUB_WINGET_INSTALL_SECONDS='0.01'):
+            bus = EventBus()
+            events = []
+            bus.subscribe(events.append)
+            disabled = PowerShellManager(shell_argv=STUB_ARGV, prereq_cache=PrerequisiteCache(), event_bus=bus,
+                                         winget_argv=WINGET_STUB_ARGV, direct_winget=False)
+            upgraded = disabled.update_app_silent('Stub.Package0')
+            custom_shell = PowerShellManager(shell_argv=STUB_ARGV, prereq_cache=PrerequisiteCache())
+
+        kinds = [e['kind'] for e in events if e['type'] == 'command_finished']
+        print(f"Comandos: {kinds}")
+
+        checks = {
+            "direct_winget=False usa o PowerShell": upgraded and kinds == ['process'],
+            "Sem execução direta, resolve_winget é None": disabled.resolve_winget() is None,
+            "Shell próprio sem winget_argv não procura o winget do sistema": custom_shell.resolve_winget() is None,
+        }
+        return report_checks(checks)
+
+    except Exception as e:
+        print(f"❌ Erro no teste: {e}")
+        import traceback
+        traceback.print_exc()
+        raise
+
+
+def test_structured_query_fallback():
+    """Testa a volta à tabela do winget quando Get-WinGetPackage falha"""
+    print("\n" + "="*75)
+    print("TESTE: Get-WinGetPackage com Falha")
+    print("="*75 + "\n")
+
+    try:
+        from bench_suite import stub_environment
+        from powershell_manager import PowerShellManager
+        from prereq_cache import PrerequisiteCache
+
+        # O PowerShell falso não conhece Get-WinGetPackage (módulo quebrado);
+        # o segundo "PowerShell" responde com algo que não é JSON
+        not_json_argv = [sys.executable, '-c', 'print("Get-WinGetPackage: not JSON")']
+        with stub_environment(STUB_WINGET_PACKAGES='3'):
+            results = {}
+            for label, shell_argv in (('módulo quebrado', STUB_ARGV), ('JSON inválido', not_json_argv)):
+                cache = PrerequisiteCache()
+                cache.set('winget_client', True, persist=False)
+                manager = PowerShellManager(shell_argv=shell_argv, prereq_cache=cache,
+                                            winget_argv=WINGET_STUB_ARGV)
+                results[label] = [app['id'] for app in manager.list_upgradable_apps()]
+
+        print(f"Apps: {results}")
+        expected = ['Stub.Package0', 'Stub.Package1', 'Stub.Package2']
+
+        checks = {
+            "Módulo quebrado: apps vindos da tabela do winget": results['módulo quebrado'] == expected,
+            "JSON inválido: apps vindos da tabela do winget": results['JSON inválido'] == expected,
+        }
+        return report_checks(checks)
+
+    except Exception as e:
+        print(f"❌ Erro no teste: {e}")
+        import traceback
+        traceback.print_exc()
+        raise
+
+
+def test_headless_winget_option():
+    """Testa headless_cli.py com --winget"""
+    print("\n" + "="*75)
+    print("TESTE: --winget na Linha de Comando")
+    print("="*75 + "\n")
+
+    try:
+        with tempfile.TemporaryDirectory() as data_dir:
+            env = dict(os.environ, MENINODETI_DATA_DIR=data_dir, PYTHONIOENCODING='utf-8',
+                       STUB_WINGET_PACKAGES='2', STUB_WINGET_DOWNLOAD_SECONDS='0.01',
+                       STUB_WINGET_INSTALL_SECONDS='0.01')
+            shell = f'"{sys.executable}" "{STUB_ARGV[1]}"'
+            winget = f'"{sys.executable}" "{WINGET_STUB_ARGV[1]}"'
+            result = subprocess.run(
+                [sys.executable, os.path.join(BASE_DIR, 'headless_cli.py'), 'apps', '--shell', shell,
+                 '--winget', winget],
+                cwd=BASE_DIR, env=env, capture_output=True, text=True, encoding='utf-8', timeout=120)
+
+        events = [json.loads(line) for line in result.stdout.splitlines() if line.strip()]
+        metrics = next((e for e in events if e['event'] == 'metrics'), {})
+        by_kind = metrics.get('commands', {}).get('by_kind', {})
+        print(f"Código: {result.returncode}, comandos por tipo: { {k: v['count'] for k, v in by_kind.items()} }")
+
+        checks = {
+            "Código de saída 0": result.returncode == 0,
+            "Apps atualizados": metrics.get('apps', {}).get('successful') == 2,
+            "Comandos winget diretos": by_kind.get('winget', {}).get('count', 0) >= 3,
+        }
+        return report_checks(checks)
+
+    except Exception as e:
+        print(f"❌ Erro no teste: {e}")
+        import traceback
+        traceback.print_exc()
+        raise
+
+
+def main():
+    """Executa todos os testes"""
+    print("\n" + "="*75)
+    print("SUITE DE TESTES - WINGET DIRETO")
+    print("="*75)
+
+    tests = [
+        ("winget Direto", test_direct_commands),
+        ("Atualização em Massa Direta", test_direct_streaming),
+        ("winget pelo PowerShell", test_powershell_fallback),
+        ("Get-WinGetPackage com Falha", test_structured_query_fallback),
+        ("--winget na Linha de Comando", test_headless_winget_option),
+    ]
+
+    results = {}
+    for test_name, test_func in tests:
+        try:
+            results[test_name] = test_func()
+        except Exception as e:
+            print(f"\n❌ Teste '{test_name}' falhou com erro: {e}")
+            results[test_name] = False
+
+    # Resumo
+    print("\n" + "="*75)
+    print("RESUMO DOS TESTES")
+    print("="*75 + "\n")
+
+    passed = sum(1 for r in results.values() if r)
+    total = len(results)
+
+    for test_name, result in results.items():
+        status = "✓ PASSOU" if result else "❌ FALHOU"
+        print(f"{status}: {test_name}")
+
+    print(f"\n{passed}/{total} testes passaram")
+
+    if passed == total:
+        print("\n✓ WINGET DIRETO FUNCIONANDO!")
+        return 0
+    else:
+        print(f"\n⚠️  {total - passed} teste(s) falharam")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
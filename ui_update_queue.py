@@ -0,0 +1,81 @@
+"""
+ui_update_queue.py - Fila thread-safe de atualizações de interface com coalescência
+
+As threads de trabalho publicam linhas de log e valores de estado (progresso,
+status, textos do passo) sem tocar nos widgets. Uma única bomba periódica na
+thread do Tk drena a fila: as linhas saem em lote e, para cada valor de
+estado, só o mais recente de cada intervalo é aplicado. A fila de linhas é
+limitada; quando a produção supera o que a janela consegue mostrar, as linhas
+mais antigas são descartadas (e contadas), já que sairiam do log de qualquer
+forma.
+"""
+import threading
+from collections import deque
+from typing import Any, Dict, List, Tuple
+
+
+class UIUpdateQueue:
+    """Fila de linhas (em ordem) e valores de estado (só o mais recente)"""
+
+    def __init__(self, max_lines: int = 2000):
+        """
+        Args:
+            max_lines: Linhas pendentes guardadas no máximo (as mais antigas saem)
+        """
+        self._lines = deque(maxlen=max_lines)
+        self._latest = {}
+        self._dropped = 0
+        self._lock = threading.Lock()
+
+    def put_line(self, line: Any):
+        """
+        Publica uma linha de log (qualquer thread).
+
+        Args:
+            line: Texto já formatado, ou o item que a bomba sabe aplicar
+                (ex: (texto, tag) no diálogo de limpeza)
+        """
+        with self._lock:
+            if len(self._lines) == self._lines.maxlen:
+                self._dropped += 1
+            self._lines.append(line)
+
+    def set_latest(self, key: str, value):
+        """
+        Publica um valor de estado; um valor ainda não aplicado é substituído.
+
+        Args:
+            key: Nome do estado (ex: 'progress', 'status')
+            value: Novo valor
+        """
+        with self._lock:
+            self._latest[key] = value
+
+    def drain(self, max_lines: int = None) -> Tuple[List[Any], Dict, int]:
+        """
+        Retira o que está pendente (thread do Tk).
+
+        Args:
+            max_lines: Máximo de linhas retiradas (None = todas); o restante
+                fica para o próximo intervalo
+
+        Returns:
+            Tupla (linhas, valores_de_estado, linhas_descartadas)
+        """
+        with self._lock:
+            if max_lines is None or max_lines >= len(self._lines):
+                lines = list(self._lines)
+                self._lines.clear()
+            else:
+                lines = [self._lines.popleft() for _ in range(max_lines)]
+            latest = self._latest
+            self._latest = {}
+            dropped = self._dropped
+            self._dropped = 0
+        return lines, latest, dropped
+
+    @property
+    def pending(self) -> int:
+        """Quantidade de linhas aguardando a bomba"""
+        with self._lock:
+            return len(self._lines)
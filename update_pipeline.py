@@ -0,0 +1,151 @@
+"""
+update_pipeline.py - Atualização completa com fases sobrepostas
+
+Antes, a atualização completa rodava os aplicativos até o fim e só então o
+Windows Update (busca, download e instalação). A busca e o download do
+Windows Update só usam a rede, então começam junto com as atualizações do
+winget; só a instalação espera os instaladores terminarem, porque instaladores
+MSI e o Windows Update disputam o mesmo mutex do Windows Installer:
+
+    aplicativos (winget)          ████████████████
+    Windows Update busca+download ██████████
+    Windows Update instalação                     ████████
+
+O progresso combinado pondera os aplicativos e o Windows Update (apps_weight)
+e nunca regride.
+
+Uso:
+    pipeline = FullUpdatePipeline(ps_manager, apps_step, progress_callback=on_progress)
+    result = pipeline.run()
+"""
+import logging
+import threading
+import time
+from typing import Any, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+# Parte da barra combinada que corresponde aos aplicativos (o resto é o Windows Update)
+APPS_WEIGHT = 0.5
+
+
+class FullUpdatePipeline:
+    """Aplicativos em paralelo com a busca/download do Windows Update; instalação do WU no fim"""
+
+    def __init__(self, ps_manager, apps_step: Callable[[Callable[[float, str], None]], Any],
+                 progress_callback: Optional[Callable[[float, str], None]] = None,
+                 windows_output_callback: Optional[Callable[[str], None]] = None,
+                 apps_weight: float = APPS_WEIGHT):
+        """
+        Args:
+            ps_manager: PowerShellManager
+            apps_step: Função apps_step(report) que atualiza os aplicativos; report(percent, message)
+                informa o progresso dela (0-100). O retorno vai em result['apps'].
+            progress_callback: Função callback(percent, message) com o progresso combinado (0-100)
+            windows_output_callback: Função callback(line) para cada linha do Windows Update
+            apps_weight: Fração da barra combinada dedicada aos aplicativos
+        """
+        self.ps_manager = ps_manager
+        self.apps_step = apps_step
+        self.progress_callback = progress_callback
+        self.windows_output_callback = windows_output_callback
+        self.apps_weight = apps_weight
+        self._lock = threading.Lock()
+        self._percent = {'apps': 0.0, 'windows': 0.0}
+        self._messages = {'apps': "", 'windows': ""}
+        self._combined = 0.0
+
+    def _report(self, track: str, percent: float, message: str):
+        """Atualiza uma das trilhas e publica o progresso combinado"""
+        with self._lock:
+            self._percent[track] = max(self._percent[track], min(100.0, percent))
+            if message:
+                self._messages[track] = message
+            combined = (self.apps_weight * self._percent['apps']
+                        + (1 - self.apps_weight) * self._percent['windows'])
+            self._combined = max(self._combined, combined)
+            percent = self._combined
+            parts = [f"{label}: {self._messages[key]}" for key, label in
+                     (('apps', "Aplicativos"), ('windows', "Windows Update")) if self._messages[key]]
+        if self.progress_callback:
+            self.progress_callback(round(percent, 1), " | ".join(parts))
+
+    def _prefetch_windows(self, state: dict):
+        """Trilha paralela: módulo PSWindowsUpdate, busca e download (sem instalar)"""
+        state['download_started'] = time.perf_counter()
+        try:
+            module_success, module_msg = self.ps_manager.install_pswindowsupdate_module()
+            if not module_success:
+                state['module_error'] = module_msg
+                return
+            state['download'] = self.ps_manager.download_windows_updates(
+                lambda percent, message: self._report('windows', percent, message),
+                self.windows_output_callback)
+        except Exception as e:
+            # Sem a antecipação, a instalação ainda busca e baixa sozinha
+            logger.warning(f"Windows Update download failed, install step will retry: {e}")
+        finally:
+            state['download_finished'] = time.perf_counter()
+
+    def run(self) -> dict:
+        """
+        Executa a atualização completa.
+
+        Returns:
+            Dicionário com:
+                apps: Retorno de apps_step (None se falhou)
+                apps_error: Mensagem do erro de apps_step, ou None
+                windows_success, windows_output: Resultado do Windows Update
+                windows_error: Falha ao preparar o módulo PSWindowsUpdate, ou None
+                windows_skipped: A busca não encontrou atualizações (instalação dispensada)
+                seconds: Duração de 'apps', 'windows_download', 'windows_install' e 'total'
+                overlap_seconds: Tempo em que aplicativos e download rodaram juntos
+        """
+        result = {'apps': None, 'apps_error': None, 'windows_success': False, 'windows_output': "",
+                  'windows_error': None, 'windows_skipped': False}
+        state = {}
+        start = time.perf_counter()
+
+        with self.ps_manager.event_bus.phase('full_update'):
+            prefetch = threading.Thread(target=self._prefetch_windows, args=(state,),
+                                        name="windows-update-prefetch", daemon=True)
+            prefetch.start()
+
+            apps_started = time.perf_counter()
+            try:
+                result['apps'] = self.apps_step(lambda percent, message: self._report('apps', percent, message))
+            except Exception as e:
+                logger.error(f"Application step failed: {e}")
+                result['apps_error'] = str(e)
+            apps_finished = time.perf_counter()
+            self._report('apps', 100, "concluído" if result['apps_error'] is None else "falhou")
+
+            # Instalação do Windows Update só depois dos instaladores dos aplicativos
+            prefetch.join()
+            install_started = time.perf_counter()
+            download = state.get('download')
+            if 'module_error' in state:
+                result.update(windows_error=state['module_error'], windows_output=state['module_error'])
+            elif download is not None and download[0] and download[2].get('found') == 0:
+                result.update(windows_success=True, windows_skipped=True, windows_output=download[1])
+                self._report('windows', 100, "Nenhuma atualização disponível")
+            else:
+                success, output = self.ps_manager.run_windows_update_with_progress(
+                    lambda percent, message: self._report('windows', percent, message),
+                    self.windows_output_callback)
+                result.update(windows_success=success, windows_output=output)
+            install_finished = time.perf_counter()
+
+        download_started = state.get('download_started', apps_started)
+        download_finished = state.get('download_finished', download_started)
+        result['seconds'] = {
+            'apps': round(apps_finished - apps_started, 3),
+            'windows_download': round(download_finished - download_started, 3),
+            'windows_install': round(install_finished - install_started, 3),
+            'total': round(install_finished - start, 3),
+        }
+        result['overlap_seconds'] = round(max(0.0, min(apps_finished, download_finished)
+                                              - max(apps_started, download_started)), 3)
+        logger.info(f"Full update finished in {result['seconds']['total']:.1f}s "
+                    f"({result['overlap_seconds']:.1f}s of Windows Update download overlapped with apps)")
+        return result
@@ -0,0 +1,296 @@
+"""
+upgrade_catalog.py - Catálogo local de aplicativos atualizáveis (winget) em disco
+
+Consultar o winget leva de 10 a 30 segundos (com a atualização das fontes),
+então a última listagem bem-sucedida fica guardada no diretório de dados com
+o horário da consulta e o horário em que cada pacote foi visto pela primeira
+vez. A interface mostra o catálogo na hora e o reconcilia quando uma consulta
+nova termina; uma thread em segundo plano refaz a consulta periodicamente.
+
+Limiares de idade (configuráveis por instância):
+    fresh_age   Até esta idade o catálogo substitui uma consulta nova
+    max_age     Acima desta idade o catálogo nem é exibido
+    refresh_interval   Período da atualização em segundo plano
+
+Uma consulta que falhou (lister retorna None) não apaga o catálogo.
+"""
+import json
+import logging
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Arquivo de persistência dentro do diretório de dados (app_paths)
+UPGRADE_CATALOG_FILE = 'upgrade_catalog.json'
+UPGRADE_CATALOG_VERSION = 1
+
+# Limiares padrão (segundos)
+DEFAULT_CATALOG_FRESH_AGE = 15 * 60
+DEFAULT_CATALOG_MAX_AGE = 24 * 3600
+DEFAULT_CATALOG_REFRESH_INTERVAL = 30 * 60
+
+_shared_catalog = None
+_shared_lock = threading.Lock()
+
+
+def diff_apps(old: List[dict], new: List[dict]) -> Dict[str, list]:
+    """
+    Compara duas listagens pelo Id do pacote.
+
+    Returns:
+        Dicionário com 'added' e 'removed' (apps) e 'changed' (apps cuja
+        versão disponível mudou)
+    """
+    old_by_id = {app['id']: app for app in old}
+    new_by_id = {app['id']: app for app in new}
+    return {
+        'added': [app for app in new if app['id'] not in old_by_id],
+        'removed': [app for app in old if app['id'] not in new_by_id],
+        'changed': [app for app in new if app['id'] in old_by_id
+                    and old_by_id[app['id']].get('available') != app.get('available')],
+    }
+
+
+class UpgradeCatalog:
+    """Última listagem de atualizações com idade, reconciliação e atualização periódica"""
+
+    def __init__(self, path: Optional[str] = None,
+                 fresh_age: float = DEFAULT_CATALOG_FRESH_AGE,
+                 max_age: float = DEFAULT_CATALOG_MAX_AGE,
+                 refresh_interval: float = DEFAULT_CATALOG_REFRESH_INTERVAL,
+                 clock: Callable[[], float] = time.time):
+        """
+        Args:
+            path: Arquivo JSON de persistência (None = apenas em memória)
+            fresh_age: Idade até a qual o catálogo dispensa uma consulta nova
+            max_age: Idade acima da qual o catálogo é descartado
+            refresh_interval: Período da atualização em segundo plano
+            clock: Fonte de tempo (substituível em testes)
+        """
+        self.path = path
+        self.fresh_age = fresh_age
+        self.max_age = max_age
+        self.refresh_interval = refresh_interval
+        self.clock = clock
+        self._apps: List[dict] = []
+        self._refreshed_at: Optional[float] = None
+        self._lock = threading.RLock()
+        self._refresh_lock = threading.Lock()
+        self._generation = 0
+        self._listeners = []
+        self._stop = threading.Event()
+        self._thread = None
+
+        if path:
+            self.load()
+
+    def age(self) -> Optional[float]:
+        """Segundos desde a última consulta bem-sucedida (None = nunca)"""
+        with self._lock:
+            if self._refreshed_at is None:
+                return None
+            return max(0.0, self.clock() - self._refreshed_at)
+
+    def is_fresh(self) -> bool:
+        """Se o catálogo pode substituir uma consulta nova"""
+        age = self.age()
+        return age is not None and age <= self.fresh_age
+
+    def snapshot(self) -> Optional[Tuple[List[dict], float]]:
+        """
+        Retorna o catálogo para exibição imediata.
+
+        Returns:
+            Tupla (apps, idade_em_segundos) ou None se ausente ou velho demais
+        """
+        with self._lock:
+            age = self.age()
+            if age is None or age > self.max_age:
+                return None
+            return [dict(app) for app in self._apps], age
+
+    def update(self, apps: List[dict]) -> Dict[str, list]:
+        """
+        Substitui o catálogo pelo resultado de uma consulta bem-sucedida.
+
+        Args:
+            apps: Listagem nova ({'id', 'name', 'version', 'available'})
+
+        Returns:
+            Diferenças em relação ao catálogo anterior (ver diff_apps)
+        """
+        now = self.clock()
+        with self._lock:
+            first_seen = {app['id']: app.get('first_seen', now) for app in self._apps}
+            diff = diff_apps(self._apps, apps)
+            self._apps = [dict(app, first_seen=first_seen.get(app['id'], now)) for app in apps]
+            self._refreshed_at = now
+            self._generation += 1
+            snapshot = [dict(app) for app in self._apps]
+            listeners = list(self._listeners)
+        self.save()
+        for listener in listeners:
+            try:
+                listener(snapshot, diff)
+            except Exception as e:
+                logger.warning(f"Listener do catálogo falhou: {e}")
+        return diff
+
+    def mark_upgraded(self, app_id: str):
+        """Remove um pacote atualizado com sucesso (sem mudar a idade do catálogo)"""
+        with self._lock:
+            remaining = [app for app in self._apps if app['id'] != app_id]
+            if len(remaining) == len(self._apps):
+                return
+            self._apps = remaining
+        self.save()
+
+    def invalidate(self):
+        """Descarta o catálogo (ex: após 'winget upgrade --all')"""
+        with self._lock:
+            self._apps = []
+            self._refreshed_at = None
+        self.save()
+
+    def add_listener(self, callback: Callable[[List[dict], Dict[str, list]], None]):
+        """
+        Registra callback(apps, diff) chamado a cada consulta bem-sucedida.
+
+        O callback roda na thread que fez a consulta.
+        """
+        with self._lock:
+            self._listeners.append(callback)
+
+    def remove_listener(self, callback):
+        with self._lock:
+            if callback in self._listeners:
+                self._listeners.remove(callback)
+
+    def refresh(self, lister: Callable[[], Optional[List[dict]]]) -> bool:
+        """
+        Refaz a consulta e atualiza o catálogo.
+
+        Chamadas simultâneas consultam o winget uma única vez: quem chega
+        durante uma consulta espera por ela e usa o mesmo resultado.
+
+        Args:
+            lister: Consulta ao winget; retorna None em caso de falha
+
+        Returns:
+            True se o catálogo foi atualizado (por esta chamada ou pela simultânea)
+        """
+        with self._lock:
+            generation = self._generation
+        with self._refresh_lock:
+            with self._lock:
+                if self._generation != generation:
+                    return True
+            apps = lister()
+            if apps is None:
+                logger.warning("Consulta de atualizações falhou; catálogo mantido")
+                return False
+            self.update(apps)
+            return True
+
+    def start_background_refresh(self, lister: Callable[[], Optional[List[dict]]],
+                                 interval: Optional[float] = None):
+        """
+        Inicia a atualização periódica em uma thread daemon.
+
+        A primeira consulta acontece logo se o catálogo já passou do intervalo.
+
+        Args:
+            lister: Consulta ao winget (ver refresh)
+            interval: Período em segundos (padrão: refresh_interval)
+        """
+        if interval is not None:
+            self.refresh_interval = interval
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._refresh_loop, args=(lister,),
+                                        daemon=True, name="upgrade-catalog-refresh")
+        self._thread.start()
+
+    def stop_background_refresh(self, timeout: float = 5.0):
+        """Interrompe a atualização periódica (uma consulta em andamento termina antes)"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _refresh_loop(self, lister):
+        while not self._stop.is_set():
+            age = self.age()
+            due = 0.0 if age is None else self.refresh_interval - age
+            if due <= 0:
+                try:
+                    self.refresh(lister)
+                except Exception as e:
+                    logger.warning(f"Atualização do catálogo em segundo plano falhou: {e}")
+                due = self.refresh_interval
+            self._stop.wait(max(1.0, due))
+
+    def load(self):
+        """Carrega o catálogo persistido (ignora arquivo corrompido ou de outra versão)"""
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') != UPGRADE_CATALOG_VERSION:
+                return
+            apps = [app for app in data['apps'] if app.get('id')]
+            refreshed_at = float(data['refreshed_at']) if data['refreshed_at'] is not None else None
+            with self._lock:
+                self._apps = apps
+                self._refreshed_at = refreshed_at
+        except (OSError, ValueError, KeyError, TypeError, AttributeError) as e:
+            logger.warning(f"Catálogo de atualizações ignorado: {e}")
+
+    def save(self):
+        """Grava o catálogo (escrita atômica)"""
+        if not self.path:
+            return
+        with self._lock:
+            data = {'version': UPGRADE_CATALOG_VERSION, 'refreshed_at': self._refreshed_at,
+                    'apps': self._apps}
+            try:
+                temp_path = self.path + '.tmp'
+                with open(temp_path, 'w', encoding='utf-8') as f:
+                    json.dump(data, f)
+                os.replace(temp_path, self.path)
+            except OSError as e:
+                logger.warning(f"Não foi possível salvar o catálogo de atualizações: {e}")
+
+
+def get_shared_catalog() -> UpgradeCatalog:
+    """
+    Retorna o catálogo compartilhado do processo, persistido no diretório de dados.
+
+    Returns:
+        UpgradeCatalog único por processo
+    """
+    global _shared_catalog
+    with _shared_lock:
+        if _shared_catalog is None:
+            from app_paths import get_data_path
+            try:
+                path = get_data_path(UPGRADE_CATALOG_FILE)
+            except OSError as e:
+                logger.warning(f"Catálogo de atualizações apenas em memória: {e}")
+                path = None
+            _shared_catalog = UpgradeCatalog(path=path)
+        return _shared_catalog
+
+
+def format_catalog_age(seconds: float) -> str:
+    """Descreve a idade do catálogo para a interface (ex: 'verificado há 5 min')"""
+    if seconds < 60:
+        return "verificado agora"
+    if seconds < 3600:
+        return f"verificado há {int(seconds // 60)} min"
+    return f"verificado há {int(seconds // 3600)} h"
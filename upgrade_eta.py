@@ -0,0 +1,301 @@
+"""
+upgrade_eta.py - Estimativa do tempo restante das atualizações de aplicativos
+
+A barra de progresso andava um passo igual por aplicativo, seja uma ferramenta
+de 5 MB ou uma IDE de 2 GB. UpgradeEta estima a duração de cada pacote pelo
+histórico local (upgrade_history.py) e combina com o tempo decorrido ao vivo:
+
+    duração esperada de um pacote, em ordem de preferência:
+        1. mediana das atualizações anteriores do próprio pacote
+        2. mediana do tipo de instalador do pacote (se já conhecido)
+        3. mediana de todos os pacotes do histórico
+        4. DEFAULT_APP_SECONDS
+    pacotes sem histórico próprio (2-4) passam a usar a média dos que já
+    terminaram nesta execução sem histórico, e todas as durações esperadas
+    são corrigidas pela razão real/esperado dos pacotes já concluídos.
+
+O tempo restante vem de uma simulação do UpgradeScheduler a partir de agora:
+os pacotes pendentes ocupam os workers na ordem da lista, a parte de download
+de cada um corre em paralelo e a instalação espera o mutex de instalação
+(uma por vez). Um pacote em andamento há mais tempo que o esperado conta
+ainda com OVERRUN_SHARE da duração esperada. A fração concluída é decorrido /
+(decorrido + restante) e nunca regride.
+
+Uso:
+    eta = UpgradeEta(history, workers=3)
+    ps_manager.update_apps_individually(progress_callback, eta=eta)
+    # no callback: format_remaining(eta.snapshot()['remaining_seconds'])
+"""
+import heapq
+import logging
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, List, Optional
+
+from upgrade_scheduler import DEFAULT_UPGRADE_WORKERS
+
+logger = logging.getLogger(__name__)
+
+# Duração suposta de um pacote quando não há histórico nenhum (segundos)
+DEFAULT_APP_SECONDS = 90.0
+
+# Parte da duração que é instalação (serializada) quando o histórico não separa
+DEFAULT_INSTALL_SHARE = 0.5
+
+# Restante suposto de um pacote que já passou da duração esperada
+OVERRUN_SHARE = 0.1
+
+# Peso (em pacotes) da estimativa a priori frente às durações observadas ao vivo
+PRIOR_WEIGHT = 1.0
+
+# Origem das estimativas em snapshot()['basis']
+BASIS_HISTORY = 'history'
+BASIS_FALLBACK = 'fallback'
+BASIS_MIXED = 'mixed'
+
+
+class UpgradeEta:
+    """Tempo restante das atualizações pelo histórico por pacote e pelo andamento ao vivo"""
+
+    def __init__(self, history=None, workers: int = DEFAULT_UPGRADE_WORKERS,
+                 default_seconds: float = DEFAULT_APP_SECONDS,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            history: UpgradeHistory com as durações anteriores (None = só o modelo sem histórico)
+            workers: Atualizações simultâneas (como no UpgradeScheduler)
+            default_seconds: Duração suposta de um pacote sem histórico nenhum
+            clock: Fonte de tempo (substituível em testes e na reprodução de históricos)
+        """
+        self.history = history
+        self.workers = max(1, workers)
+        self.default_seconds = default_seconds
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._expected: Dict[str, dict] = {}
+        self._pending: List[str] = []
+        self._running: Dict[str, float] = {}
+        self._finished: Dict[str, float] = {}
+        self._by_name: Dict[str, deque] = {}
+        self._running_by_name: Dict[str, deque] = {}
+        self._started_at: Optional[float] = None
+        self._fraction = 0.0
+
+    def plan(self, apps: List[dict]):
+        """
+        Define os aplicativos da execução e estima a duração de cada um.
+
+        Args:
+            apps: Lista de dicionários com 'id' e 'name' (como no UpgradeScheduler)
+        """
+        expected = {app['id']: self._estimate(app['id']) for app in apps}
+        with self._lock:
+            self._expected = expected
+            self._pending = [app['id'] for app in apps]
+            self._running = {}
+            self._finished = {}
+            self._by_name = {}
+            self._running_by_name = {}
+            for app in apps:
+                self._by_name.setdefault(app.get('name', app['id']), deque()).append(app['id'])
+            self._started_at = self.clock()
+            self._fraction = 0.0
+
+    def _estimate(self, app_id: str) -> dict:
+        """Duração esperada de um pacote (total e instalação) e se veio do histórico dele"""
+        stats = self.history.package_stats(app_id) if self.history is not None else None
+        if stats and stats['median_seconds'] is not None:
+            seconds = stats['median_seconds']
+            install = stats['median_install_seconds']
+            if install is None:
+                install = seconds * DEFAULT_INSTALL_SHARE
+            # O total registrado inclui a espera pelo mutex, que a simulação já reproduz
+            download = stats['median_download_seconds']
+            if download is None:
+                download = max(0.0, seconds - install)
+            return {'seconds': download + install, 'install': install, 'from_history': True}
+
+        seconds = None
+        if self.history is not None:
+            if stats and stats['installer_type']:
+                seconds = self.history.typical_seconds(stats['installer_type'])
+            if seconds is None:
+                seconds = self.history.typical_seconds()
+        if seconds is None:
+            seconds = self.default_seconds
+        return {'seconds': seconds, 'install': seconds * DEFAULT_INSTALL_SHARE, 'from_history': False}
+
+    def started(self, app_id: str):
+        """Registra o início da atualização de um pacote"""
+        with self._lock:
+            if app_id in self._pending:
+                self._pending.remove(app_id)
+            self._running[app_id] = self.clock()
+
+    def finished(self, app_id: str):
+        """Registra o fim (com sucesso ou não) da atualização de um pacote"""
+        with self._lock:
+            now = self.clock()
+            started_at = self._running.pop(app_id, now)
+            if app_id in self._pending:
+                self._pending.remove(app_id)
+            self._finished[app_id] = now - started_at
+
+    def track(self, progress_callback: Optional[Callable] = None) -> Callable:
+        """
+        Envolve um callback(current, total, app_name, success) do UpgradeScheduler.
+
+        O estimador é atualizado antes do callback, que já pode consultar snapshot().
+        """
+        def on_progress(current, total, app_name, success):
+            with self._lock:
+                if success is None:
+                    pending = self._by_name.get(app_name)
+                    app_id = pending.popleft() if pending else None
+                    if app_id is not None:
+                        self._running_by_name.setdefault(app_name, deque()).append(app_id)
+                else:
+                    running = self._running_by_name.get(app_name)
+                    app_id = running.popleft() if running else None
+            if app_id is not None:
+                if success is None:
+                    self.started(app_id)
+                else:
+                    self.finished(app_id)
+            if progress_callback:
+                progress_callback(current, total, app_name, success)
+        return on_progress
+
+    def _corrections(self) -> tuple:
+        """Fator real/esperado dos pacotes com histórico e duração observada dos sem histórico (com o lock)"""
+        known = [app_id for app_id in self._finished
+                 if app_id in self._expected and self._expected[app_id]['from_history']]
+        actual = sum(self._finished[app_id] for app_id in known)
+        expected = sum(self._expected[app_id]['seconds'] for app_id in known)
+        factor = 1.0
+        if known and expected > 0:
+            prior = PRIOR_WEIGHT * expected / len(known)
+            factor = (actual + prior) / (expected + prior)
+
+        unknown = [seconds for app_id, seconds in self._finished.items()
+                   if app_id in self._expected and not self._expected[app_id]['from_history']]
+        fallback = None
+        if unknown:
+            fallback_prior = next((e['seconds'] for e in self._expected.values() if not e['from_history']),
+                                  self.default_seconds)
+            fallback = (fallback_prior * PRIOR_WEIGHT + sum(unknown)) / (PRIOR_WEIGHT + len(unknown))
+        return factor, fallback
+
+    def _expected_seconds(self, app_id: str, factor: float, fallback: Optional[float]) -> tuple:
+        """Duração total e de instalação esperadas de um pacote com as correções ao vivo"""
+        estimate = self._expected.get(app_id) or {'seconds': self.default_seconds,
+                                                  'install': self.default_seconds * DEFAULT_INSTALL_SHARE,
+                                                  'from_history': False}
+        if not estimate['from_history'] and fallback is not None:
+            return fallback, fallback * DEFAULT_INSTALL_SHARE
+        return estimate['seconds'] * factor, estimate['install'] * factor
+
+    def snapshot(self) -> dict:
+        """
+        Estado atual da estimativa.
+
+        Returns:
+            Dicionário com remaining_seconds, elapsed_seconds, fraction (0-1, nunca
+            regride), done, total e basis ('history', 'fallback' ou 'mixed')
+        """
+        with self._lock:
+            now = self.clock()
+            started_at = self._started_at if self._started_at is not None else now
+            factor, fallback = self._corrections()
+
+            running = []
+            for app_id, app_started in sorted(self._running.items(), key=lambda item: item[1]):
+                seconds, install = self._expected_seconds(app_id, factor, fallback)
+                left = max(seconds - (now - app_started), OVERRUN_SHARE * seconds)
+                # Já passou da parte de download: o que falta é instalação
+                running.append((max(0.0, left - install), min(install, left)))
+            pending = [self._expected_seconds(app_id, factor, fallback) for app_id in self._pending]
+            remaining = self._simulate(running, [(seconds - install, install) for seconds, install in pending])
+
+            left_count = len(self._running) + len(self._pending)
+
+            elapsed = now - started_at
+            if not left_count:
+                self._fraction = 1.0
+            elif elapsed + remaining > 0:
+                self._fraction = max(self._fraction, elapsed / (elapsed + remaining))
+
+            from_history = [e['from_history'] for e in self._expected.values()]
+            if from_history and all(from_history):
+                basis = BASIS_HISTORY
+            elif any(from_history):
+                basis = BASIS_MIXED
+            else:
+                basis = BASIS_FALLBACK
+
+            return {
+                'remaining_seconds': round(remaining, 1),
+                'elapsed_seconds': round(elapsed, 1),
+                'fraction': round(self._fraction, 4),
+                'done': len(self._finished),
+                'total': len(self._expected),
+                'basis': basis,
+            }
+
+    def _simulate(self, running: List[tuple], pending: List[tuple]) -> float:
+        """
+        Simula o restante da execução a partir de agora (t = 0).
+
+        Args:
+            running: (download_restante, instalação_restante) dos pacotes em andamento
+            pending: (download, instalação) dos pacotes pendentes, na ordem da fila
+
+        Returns:
+            Segundos até o último pacote terminar
+        """
+        queue = list(pending)
+        ready = []  # (instante em que o download termina, ordem, instalação)
+        for order, (download, install) in enumerate(running):
+            heapq.heappush(ready, (download, order, install))
+        order = len(running)
+        while queue and len(ready) < self.workers:
+            download, install = queue.pop(0)
+            heapq.heappush(ready, (download, order, install))
+            order += 1
+
+        installer_free = 0.0
+        finished = 0.0
+        while ready:
+            download_done, _, install = heapq.heappop(ready)
+            installer_free = max(download_done, installer_free) + install
+            finished = max(finished, installer_free)
+            if queue:
+                # O worker liberado pega o próximo pacote da fila
+                download, install = queue.pop(0)
+                heapq.heappush(ready, (installer_free + download, order, install))
+                order += 1
+        return finished
+
+    def describe(self) -> str:
+        """Texto curto para a interface (ex: 'cerca de 4 min restantes')"""
+        snapshot = self.snapshot()
+        if snapshot['total'] and snapshot['done'] >= snapshot['total']:
+            return ""
+        text = format_remaining(snapshot['remaining_seconds'])
+        if snapshot['basis'] == BASIS_FALLBACK and not snapshot['done']:
+            text += " (estimativa inicial)"
+        return text
+
+
+def format_remaining(seconds: float) -> str:
+    """Descreve o tempo restante (ex: 'cerca de 4 min restantes')"""
+    if seconds < 60:
+        return "menos de 1 min restante"
+    minutes = int(round(seconds / 60))
+    if minutes == 1:
+        return "cerca de 1 min restante"
+    if minutes < 60:
+        return f"cerca de {minutes} min restantes"
+    hours, minutes = divmod(minutes, 60)
+    return f"cerca de {hours} h {minutes:02d} min restantes"
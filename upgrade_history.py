@@ -0,0 +1,337 @@
+"""
+upgrade_history.py - Histórico local (SQLite) das tentativas de atualização de pacotes
+
+Cada chamada de PowerShellManager.update_app_silent vira uma linha com o id do
+pacote, versão de origem e destino, tipo do instalador, duração do download e
+da instalação, código de saída do winget, resultado e as últimas linhas da
+saída. Assim a duração e as falhas de cada pacote sobrevivem entre execuções
+e podem alimentar estimativas de tempo, a ordem das atualizações e timeouts.
+
+Consultas:
+    slowest_packages()   Pacotes com maior duração média
+    failing_packages()   Pacotes que mais falham
+    package_stats()      Resumo de um pacote (mediana, p95, taxa de falha)
+    durations()          Durações recentes de um pacote
+    typical_seconds()    Mediana de todos os pacotes (ou de um tipo de instalador)
+
+O banco fica no diretório de dados (app_paths); cada pacote guarda no máximo
+max_attempts_per_package tentativas (as mais antigas são descartadas).
+Falhas do SQLite nunca interrompem uma atualização: são registradas no log.
+
+Uso:
+    python upgrade_history.py [--limit N] [--json]
+"""
+import argparse
+import json
+import logging
+import sqlite3
+import sys
+import threading
+import time
+from typing import Callable, List, Optional
+
+from event_bus import percentile
+
+logger = logging.getLogger(__name__)
+
+# Banco dentro do diretório de dados (app_paths)
+UPGRADE_HISTORY_FILE = 'upgrade_history.sqlite3'
+UPGRADE_HISTORY_VERSION = 1
+
+# Tentativas guardadas por pacote
+DEFAULT_MAX_ATTEMPTS_PER_PACKAGE = 50
+
+# Único resultado cujas durações descrevem uma atualização ('up_to_date' não instala nada)
+UPGRADED_OUTCOME = 'upgraded'
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS upgrade_attempts (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    package_id TEXT NOT NULL,
+    started_at REAL NOT NULL,
+    seconds REAL NOT NULL,
+    success INTEGER NOT NULL,
+    outcome TEXT NOT NULL,
+    from_version TEXT,
+    to_version TEXT,
+    installer_type TEXT,
+    download_seconds REAL,
+    install_seconds REAL,
+    exit_code INTEGER,
+    output_tail TEXT
+);
+CREATE INDEX IF NOT EXISTS upgrade_attempts_package ON upgrade_attempts (package_id, started_at);
+"""
+
+_COLUMNS = ('id', 'package_id', 'started_at', 'seconds', 'success', 'outcome', 'from_version', 'to_version',
+            'installer_type', 'download_seconds', 'install_seconds', 'exit_code', 'output_tail')
+
+_shared_history = None
+_shared_lock = threading.Lock()
+
+
+def _row_to_attempt(row: tuple) -> dict:
+    attempt = dict(zip(_COLUMNS, row))
+    attempt['success'] = bool(attempt['success'])
+    return attempt
+
+
+class UpgradeHistory:
+    """Tentativas de atualização por pacote em SQLite, com consultas agregadas"""
+
+    def __init__(self, path: Optional[str] = None,
+                 max_attempts_per_package: int = DEFAULT_MAX_ATTEMPTS_PER_PACKAGE,
+                 clock: Callable[[], float] = time.time):
+        """
+        Args:
+            path: Arquivo SQLite (None = apenas em memória)
+            max_attempts_per_package: Tentativas guardadas por pacote
+            clock: Fonte de tempo (substituível em testes)
+        """
+        self.path = path
+        self.max_attempts_per_package = max_attempts_per_package
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._conn = self._open(path)
+
+    def _open(self, path: Optional[str]) -> sqlite3.Connection:
+        """Abre (e cria) o banco; um arquivo ilegível dá lugar a um banco em memória"""
+        if path:
+            conn = None
+            try:
+                conn = sqlite3.connect(path, timeout=5, check_same_thread=False)
+                self._migrate(conn)
+                return conn
+            except sqlite3.Error as e:
+                if conn is not None:
+                    conn.close()
+                logger.warning(f"Histórico de atualizações apenas em memória: {e}")
+        conn = sqlite3.connect(':memory:', check_same_thread=False)
+        self._migrate(conn)
+        return conn
+
+    @staticmethod
+    def _migrate(conn: sqlite3.Connection):
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        if version > UPGRADE_HISTORY_VERSION:
+            raise sqlite3.DatabaseError(f"versão {version} do histórico não suportada")
+        conn.executescript(_SCHEMA)
+        conn.execute(f"PRAGMA user_version = {UPGRADE_HISTORY_VERSION}")
+        conn.commit()
+
+    def close(self):
+        """Fecha o banco"""
+        with self._lock:
+            self._conn.close()
+
+    def record(self, package_id: str, success: bool, outcome: str, seconds: float,
+               from_version: Optional[str] = None, to_version: Optional[str] = None,
+               installer_type: Optional[str] = None, download_seconds: Optional[float] = None,
+               install_seconds: Optional[float] = None, exit_code: Optional[int] = None,
+               output_tail: str = "", started_at: Optional[float] = None) -> Optional[int]:
+        """
+        Registra uma tentativa de atualização.
+
+        Args:
+            package_id: Id do pacote no winget
+            success: Se a tentativa conta como sucesso
+            outcome: Resultado de update_app_silent ('upgraded', 'up_to_date', 'failed', ...)
+            seconds: Duração total da tentativa
+            from_version: Versão instalada antes da tentativa
+            to_version: Versão alvo
+            installer_type: Tipo do instalador ('msi', 'msix', 'exe', ...)
+            download_seconds: Duração do download (None = desconhecida)
+            install_seconds: Duração da instalação (None = desconhecida)
+            exit_code: Código de saída do winget
+            output_tail: Últimas linhas da saída
+            started_at: Início da tentativa (padrão: agora menos seconds)
+
+        Returns:
+            Id da tentativa, ou None se não foi possível gravar
+        """
+        if started_at is None:
+            started_at = self.clock() - seconds
+        values = (package_id, started_at, seconds, int(bool(success)), outcome, from_version, to_version,
+                  installer_type, download_seconds, install_seconds, exit_code, output_tail)
+        with self._lock:
+            try:
+                with self._conn:
+                    cursor = self._conn.execute(
+                        f"INSERT INTO upgrade_attempts ({', '.join(_COLUMNS[1:])}) "
+                        f"VALUES ({', '.join('?' * len(values))})", values)
+                    self._conn.execute(
+                        "DELETE FROM upgrade_attempts WHERE package_id = ? AND id NOT IN "
+                        "(SELECT id FROM upgrade_attempts WHERE package_id = ? "
+                        "ORDER BY started_at DESC, id DESC LIMIT ?)",
+                        (package_id, package_id, self.max_attempts_per_package))
+                return cursor.lastrowid
+            except sqlite3.Error as e:
+                logger.warning(f"Não foi possível registrar a atualização de {package_id}: {e}")
+                return None
+
+    def _query(self, sql: str, params: tuple = ()) -> List[tuple]:
+        with self._lock:
+            try:
+                return self._conn.execute(sql, params).fetchall()
+            except sqlite3.Error as e:
+                logger.warning(f"Consulta ao histórico de atualizações falhou: {e}")
+                return []
+
+    def attempts(self, package_id: Optional[str] = None, limit: int = 100) -> List[dict]:
+        """Tentativas mais recentes primeiro (de um pacote ou de todos)"""
+        where, params = ("WHERE package_id = ?", (package_id,)) if package_id else ("", ())
+        rows = self._query(f"SELECT {', '.join(_COLUMNS)} FROM upgrade_attempts {where} "
+                           f"ORDER BY started_at DESC, id DESC LIMIT ?", params + (limit,))
+        return [_row_to_attempt(row) for row in rows]
+
+    def durations(self, package_id: str, upgraded_only: bool = True, limit: int = 20) -> List[float]:
+        """Durações totais das tentativas mais recentes de um pacote (padrão: só as que atualizaram)"""
+        where = f"AND outcome = '{UPGRADED_OUTCOME}'" if upgraded_only else ""
+        rows = self._query(f"SELECT seconds FROM upgrade_attempts WHERE package_id = ? {where} "
+                           f"ORDER BY started_at DESC, id DESC LIMIT ?", (package_id, limit))
+        return [row[0] for row in rows]
+
+    def typical_seconds(self, installer_type: Optional[str] = None, limit: int = 500) -> Optional[float]:
+        """
+        Mediana das durações das atualizações recentes de todos os pacotes.
+
+        Args:
+            installer_type: Considerar só este tipo de instalador (None = todos)
+            limit: Tentativas mais recentes consideradas
+
+        Returns:
+            Mediana em segundos, ou None sem atualizações registradas
+        """
+        where, params = ("AND installer_type = ?", (installer_type,)) if installer_type else ("", ())
+        rows = self._query(f"SELECT seconds FROM upgrade_attempts WHERE outcome = '{UPGRADED_OUTCOME}' {where} "
+                           f"ORDER BY started_at DESC, id DESC LIMIT ?", params + (limit,))
+        return percentile([row[0] for row in rows], 50) if rows else None
+
+    def package_stats(self, package_id: str) -> Optional[dict]:
+        """
+        Resumo das tentativas guardadas de um pacote.
+
+        Returns:
+            Dicionário com attempts, failures, failure_rate, median_seconds e
+            p95_seconds (tentativas que atualizaram), median_download_seconds,
+            median_install_seconds, installer_type, last_outcome e last_version;
+            None se o pacote não tem histórico
+        """
+        attempts = self.attempts(package_id, limit=self.max_attempts_per_package)
+        if not attempts:
+            return None
+        upgraded = [a for a in attempts if a['outcome'] == UPGRADED_OUTCOME]
+        seconds = [a['seconds'] for a in upgraded]
+        downloads = [a['download_seconds'] for a in upgraded if a['download_seconds'] is not None]
+        installs = [a['install_seconds'] for a in upgraded if a['install_seconds'] is not None]
+        failures = sum(1 for a in attempts if not a['success'])
+        return {
+            'package_id': package_id,
+            'attempts': len(attempts),
+            'failures': failures,
+            'failure_rate': round(failures / len(attempts), 3),
+            'median_seconds': percentile(seconds, 50) if seconds else None,
+            'p95_seconds': percentile(seconds, 95) if seconds else None,
+            'median_download_seconds': percentile(downloads, 50) if downloads else None,
+            'median_install_seconds': percentile(installs, 50) if installs else None,
+            'installer_type': next((a['installer_type'] for a in attempts if a['installer_type']), None),
+            'last_outcome': attempts[0]['outcome'],
+            'last_version': next((a['to_version'] for a in upgraded if a['to_version']), None),
+        }
+
+    def slowest_packages(self, limit: int = 10, min_attempts: int = 1) -> List[dict]:
+        """
+        Pacotes com maior duração média entre as tentativas que atualizaram.
+
+        Returns:
+            Lista de {'package_id', 'attempts', 'avg_seconds', 'max_seconds', 'installer_type'}
+        """
+        rows = self._query(
+            "SELECT package_id, COUNT(*), AVG(seconds), MAX(seconds), MAX(installer_type) "
+            "FROM upgrade_attempts WHERE outcome = ? GROUP BY package_id HAVING COUNT(*) >= ? "
+            "ORDER BY AVG(seconds) DESC LIMIT ?", (UPGRADED_OUTCOME, min_attempts, limit))
+        return [{'package_id': package_id, 'attempts': attempts, 'avg_seconds': round(avg, 3),
+                 'max_seconds': round(maximum, 3), 'installer_type': installer_type}
+                for package_id, attempts, avg, maximum, installer_type in rows]
+
+    def failing_packages(self, limit: int = 10, min_failures: int = 1) -> List[dict]:
+        """
+        Pacotes com mais falhas ('up_to_date' não conta como falha).
+
+        Returns:
+            Lista de {'package_id', 'attempts', 'failures', 'failure_rate', 'last_outcome',
+            'last_exit_code'}, do que mais falha para o que menos falha
+        """
+        rows = self._query(
+            "SELECT package_id, COUNT(*), SUM(1 - success), "
+            "(SELECT outcome FROM upgrade_attempts AS last WHERE last.package_id = a.package_id "
+            " ORDER BY started_at DESC, id DESC LIMIT 1), "
+            "(SELECT exit_code FROM upgrade_attempts AS last WHERE last.package_id = a.package_id "
+            " AND success = 0 ORDER BY started_at DESC, id DESC LIMIT 1) "
+            "FROM upgrade_attempts AS a GROUP BY package_id HAVING SUM(1 - success) >= ? "
+            "ORDER BY SUM(1 - success) DESC, SUM(1 - success) * 1.0 / COUNT(*) DESC LIMIT ?",
+            (min_failures, limit))
+        return [{'package_id': package_id, 'attempts': attempts, 'failures': failures,
+                 'failure_rate': round(failures / attempts, 3), 'last_outcome': last_outcome,
+                 'last_exit_code': last_exit_code}
+                for package_id, attempts, failures, last_outcome, last_exit_code in rows]
+
+
+def get_shared_history() -> UpgradeHistory:
+    """
+    Retorna o histórico compartilhado do processo, persistido no diretório de dados.
+
+    Returns:
+        UpgradeHistory único por processo
+    """
+    global _shared_history
+    with _shared_lock:
+        if _shared_history is None:
+            from app_paths import get_data_path
+            try:
+                path = get_data_path(UPGRADE_HISTORY_FILE)
+            except OSError as e:
+                logger.warning(f"Histórico de atualizações apenas em memória: {e}")
+                path = None
+            _shared_history = UpgradeHistory(path=path)
+        return _shared_history
+
+
+def format_history_report(slowest: List[dict], failing: List[dict]) -> str:
+    """Relatório de texto com os pacotes mais lentos e os que mais falham"""
+    lines = ["Pacotes mais lentos (média das atualizações concluídas):"]
+    if not slowest:
+        lines.append("  (sem histórico)")
+    for entry in slowest:
+        lines.append(f"  {entry['package_id']:<40} {entry['avg_seconds']:>8.1f}s  "
+                     f"máx {entry['max_seconds']:.1f}s  {entry['attempts']}x  {entry['installer_type'] or '-'}")
+    lines.append("")
+    lines.append("Pacotes que mais falham:")
+    if not failing:
+        lines.append("  (nenhuma falha registrada)")
+    for entry in failing:
+        exit_code = entry['last_exit_code'] if entry['last_exit_code'] is not None else '-'
+        lines.append(f"  {entry['package_id']:<40} {entry['failures']}/{entry['attempts']} falhas  "
+                     f"último: {entry['last_outcome']} (código {exit_code})")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog='upgrade_history.py',
+                                     description="Pacotes mais lentos e que mais falham no histórico local")
+    parser.add_argument('--limit', type=int, default=10, help="Pacotes listados em cada relatório")
+    parser.add_argument('--json', action='store_true', help="Imprimir o relatório em JSON")
+    args = parser.parse_args(argv)
+
+    history = get_shared_history()
+    slowest = history.slowest_packages(args.limit)
+    failing = history.failing_packages(args.limit)
+    if args.json:
+        print(json.dumps({'slowest': slowest, 'failing': failing}, ensure_ascii=False, indent=2))
+    else:
+        print(format_history_report(slowest, failing))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,147 @@
+"""
+upgrade_scheduler.py - Agendador concorrente de atualizações por aplicativo
+
+Executa várias atualizações 'winget upgrade --id' em paralelo. O download de
+cada pacote acontece de forma concorrente, enquanto a fase de instalação
+continua serializada: o próprio winget aguarda outras instalações em andamento
+("Waiting for another install/uninstall to complete...") e o Windows Installer
+mantém um mutex global para pacotes MSI. Pacotes que atualizam o próprio
+winget rodam sozinhos, depois de todos os outros.
+
+O callback de progresso nunca roda com o lock do agendador: os eventos entram
+numa fila sob o lock, na ordem dos contadores, e uma thread por vez os entrega
+fora dele. Um callback lento não trava os outros workers, e um callback que
+chama o agendador não entra em deadlock.
+"""
+import logging
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Número padrão de atualizações simultâneas
+DEFAULT_UPGRADE_WORKERS = 3
+
+# Pacotes que não podem rodar em paralelo com outras instâncias do winget
+EXCLUSIVE_PACKAGE_IDS = (
+    'Microsoft.AppInstaller',
+    'Microsoft.DesktopAppInstaller',
+)
+
+
+class UpgradeScheduler:
+    """Distribui atualizações de aplicativos entre workers concorrentes"""
+
+    def __init__(self, upgrade_func: Callable[[str], bool],
+                 max_workers: int = DEFAULT_UPGRADE_WORKERS,
+                 exclusive_ids: tuple = EXCLUSIVE_PACKAGE_IDS):
+        """
+        Inicializa o agendador.
+
+        Args:
+            upgrade_func: Função que atualiza um app pelo ID e retorna True/False
+            max_workers: Número de atualizações simultâneas
+            exclusive_ids: IDs que devem rodar sem nenhuma outra atualização em paralelo
+        """
+        self.upgrade_func = upgrade_func
+        self.max_workers = max(1, max_workers)
+        self.exclusive_ids = {app_id.lower() for app_id in exclusive_ids}
+
+        self._lock = threading.Lock()
+        self._started = 0
+        self._completed = 0
+        self._total = 0
+        self._outcomes = {}
+        self._progress_callback = None
+        self._pending = deque()
+        self._delivering = False
+
+    def _notify(self, current: int, total: int, app_name: str, success: Optional[bool]):
+        """Chama o callback de progresso protegendo contra exceções"""
+        if self._progress_callback:
+            try:
+                self._progress_callback(current, total, app_name, success)
+            except Exception as e:
+                logger.warning(f"Progress callback error: {e}")
+
+    def _deliver(self):
+        """Entrega os eventos pendentes em ordem, fora do lock (uma thread entrega por vez)"""
+        with self._lock:
+            if self._delivering:
+                return
+            self._delivering = True
+        while True:
+            with self._lock:
+                if not self._pending:
+                    self._delivering = False
+                    return
+                event = self._pending.popleft()
+                total = self._total
+            current, app_name, success = event
+            self._notify(current, total, app_name, success)
+
+    def _run_one(self, indexed_app: Tuple[int, dict]):
+        """Atualiza um aplicativo e reporta início e fim"""
+        index, app = indexed_app
+        app_name = app['name']
+
+        with self._lock:
+            self._started += 1
+            self._pending.append((self._started, app_name, None))
+        self._deliver()
+
+        try:
+            success = bool(self.upgrade_func(app['id']))
+        except Exception as e:
+            logger.error(f"Error updating {app['id']}: {e}")
+            success = False
+
+        with self._lock:
+            self._completed += 1
+            self._outcomes[index] = success
+            # 'current' no fim é o número de concluídos, para manter o progresso monotônico
+            self._pending.append((self._completed, app_name, success))
+        self._deliver()
+
+    def run(self, apps: list, progress_callback=None) -> Tuple[int, int, list]:
+        """
+        Atualiza a lista de aplicativos.
+
+        Args:
+            apps: Lista de dicionários com 'id' e 'name'
+            progress_callback: Função callback(current, total, app_name, success);
+                success é None no início de cada app
+
+        Returns:
+            Tuple of (successful_count, failed_count, failed_apps_list)
+        """
+        self._progress_callback = progress_callback
+        self._started = 0
+        self._completed = 0
+        self._total = len(apps)
+        self._outcomes = {}
+        self._pending.clear()
+
+        indexed = list(enumerate(apps))
+        shared = [item for item in indexed if item[1]['id'].lower() not in self.exclusive_ids]
+        exclusive = [item for item in indexed if item[1]['id'].lower() in self.exclusive_ids]
+
+        logger.info(f"Scheduling {len(shared)} concurrent updates "
+                    f"({self.max_workers} workers) and {len(exclusive)} exclusive updates")
+
+        if shared:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                list(pool.map(self._run_one, shared))
+
+        for item in exclusive:
+            self._run_one(item)
+
+        successful = sum(1 for ok in self._outcomes.values() if ok)
+        failed_apps = [
+            {'name': apps[index]['name'], 'id': apps[index]['id']}
+            for index in sorted(self._outcomes)
+            if not self._outcomes[index]
+        ]
+        return successful, len(failed_apps), failed_apps
@@ -0,0 +1,148 @@
+"""
+upgrade_timeouts.py - Tempo limite de cada atualização pelo histórico do pacote
+
+Um tempo fixo (600 s por pacote, 1800 s na atualização em massa) é longo
+demais para uma ferramenta de 20 s travada e curto demais para uma IDE de
+15 min. UpgradeTimeouts deriva dois limites do histórico local
+(upgrade_history.py), com um multiplicador e um piso:
+
+    timeout       tempo máximo da tentativa
+        1. p95 das atualizações anteriores do próprio pacote x multiplicador
+        2. mediana do tipo de instalador do pacote x multiplicador
+        3. sem histórico: o padrão (APP_UPGRADE_TIMEOUT do PowerShellManager)
+        sempre entre min_seconds e max_seconds; se a última tentativa estourou
+        o tempo, o limite seguinte é TIMEOUT_BACKOFF vezes maior
+    idle_timeout  tempo sem saída e sem CPU até o instalador ser considerado
+        travado e encerrado (ver process_activity.HangWatch)
+        mediana da instalação do pacote x multiplicador (a instalação é o
+        trecho silencioso do winget), entre min_idle_seconds e o timeout
+        sem duração de instalação registrada: None (só o timeout vale); uma
+        instalação MSI roda no serviço msiexec, fora da árvore do winget, e
+        sem histórico não há como distinguir uma instalação longa de uma travada
+
+Na atualização em massa (winget upgrade --all) os pacotes rodam um após o
+outro: o timeout é a soma dos timeouts dos pacotes, limitada a
+max(BULK_UPGRADE_TIMEOUT, max_seconds), e o idle_timeout é o maior deles
+(None se algum pacote não tem o seu).
+
+Uso:
+    timeouts = UpgradeTimeouts(history)
+    policy = timeouts.for_package('Git.Git', default_seconds=600)
+    # policy['timeout'], policy['idle_timeout'], policy['basis']
+"""
+import logging
+from typing import Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+# Folga sobre a duração observada
+TIMEOUT_MULTIPLIER = 3.0
+
+# Limites do timeout de um pacote (segundos)
+MIN_UPGRADE_TIMEOUT = 120
+MAX_UPGRADE_TIMEOUT = 3600
+
+# Piso do tempo sem saída e sem CPU tolerado (segundos)
+MIN_IDLE_TIMEOUT = 90
+
+# Timeout da atualização em massa quando os pacotes não são conhecidos (e piso do teto da soma)
+BULK_UPGRADE_TIMEOUT = 1800
+
+# Aumento do limite depois de uma tentativa que estourou o tempo
+TIMEOUT_BACKOFF = 2.0
+
+# Resultados de update_app_silent encerrados pelo tempo (ver UpgradeHistory)
+TIMEOUT_OUTCOME = 'timeout'
+HUNG_OUTCOME = 'hung'
+
+# Origem dos limites em policy['basis']
+BASIS_PACKAGE = 'package'
+BASIS_INSTALLER_TYPE = 'installer_type'
+BASIS_DEFAULT = 'default'
+
+
+class UpgradeTimeouts:
+    """Tempo limite e tempo de inatividade de cada atualização pelo histórico"""
+
+    def __init__(self, history=None, multiplier: float = TIMEOUT_MULTIPLIER,
+                 min_seconds: float = MIN_UPGRADE_TIMEOUT, max_seconds: float = MAX_UPGRADE_TIMEOUT,
+                 min_idle_seconds: float = MIN_IDLE_TIMEOUT):
+        """
+        Args:
+            history: UpgradeHistory com as durações anteriores (None = sempre o padrão)
+            multiplier: Folga sobre a duração observada
+            min_seconds: Piso do timeout derivado do histórico
+            max_seconds: Teto do timeout derivado do histórico
+            min_idle_seconds: Piso do tempo sem saída e sem CPU
+        """
+        self.history = history
+        self.multiplier = multiplier
+        self.min_seconds = min_seconds
+        self.max_seconds = max_seconds
+        self.min_idle_seconds = min_idle_seconds
+
+    def _clamp(self, seconds: float) -> float:
+        return round(min(self.max_seconds, max(self.min_seconds, seconds)), 1)
+
+    def for_package(self, app_id: str, default_seconds: float) -> dict:
+        """
+        Limites da atualização de um pacote.
+
+        Args:
+            app_id: ID do pacote
+            default_seconds: Timeout de um pacote sem histórico
+
+        Returns:
+            Dicionário com timeout, idle_timeout (segundos; None sem duração de
+            instalação do pacote no histórico) e basis ('package',
+            'installer_type' ou 'default')
+        """
+        stats = self.history.package_stats(app_id) if self.history is not None else None
+        install = None
+        if stats and stats['p95_seconds'] is not None:
+            timeout = self._clamp(stats['p95_seconds'] * self.multiplier)
+            install = stats['median_install_seconds']
+            basis = BASIS_PACKAGE
+        else:
+            typical = None
+            if stats and stats['installer_type']:
+                typical = self.history.typical_seconds(stats['installer_type'])
+            if typical is not None:
+                timeout = self._clamp(typical * self.multiplier)
+                basis = BASIS_INSTALLER_TYPE
+            else:
+                timeout = default_seconds
+                basis = BASIS_DEFAULT
+
+        if stats and stats['last_outcome'] == TIMEOUT_OUTCOME:
+            # Talvez só lento: não repetir o mesmo limite que já não bastou
+            timeout = round(min(max(self.max_seconds, default_seconds), timeout * TIMEOUT_BACKOFF), 1)
+
+        idle = None
+        if install is not None:
+            idle = round(min(max(self.min_idle_seconds, install * self.multiplier), timeout), 1)
+        return {'timeout': timeout, 'idle_timeout': idle, 'basis': basis}
+
+    def for_bulk(self, app_ids: Optional[Iterable[str]], default_seconds: float) -> dict:
+        """
+        Limites de 'winget upgrade --all' (pacotes atualizados um após o outro).
+
+        Args:
+            app_ids: Pacotes que serão atualizados (None ou vazio = desconhecidos)
+            default_seconds: Timeout de um pacote sem histórico
+
+        Returns:
+            Dicionário com timeout e idle_timeout (segundos; None se algum pacote
+            não tem duração de instalação no histórico) e packages
+        """
+        policies = [self.for_package(app_id, default_seconds) for app_id in (app_ids or ())]
+        if not policies:
+            return {'timeout': BULK_UPGRADE_TIMEOUT, 'idle_timeout': None, 'packages': 0}
+        idle = [p['idle_timeout'] for p in policies]
+        # Sem teto, 40 pacotes sem histórico somariam 40 x 600 s e uma execução travada nunca pararia
+        cap = max(BULK_UPGRADE_TIMEOUT, self.max_seconds)
+        return {
+            'timeout': round(min(sum(p['timeout'] for p in policies), cap), 1),
+            'idle_timeout': None if None in idle else max(idle),
+            'packages': len(policies),
+        }
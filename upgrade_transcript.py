@@ -0,0 +1,130 @@
+"""
+upgrade_transcript.py - Saída de 'winget upgrade --id' de um pacote
+
+UpgradeTranscript acompanha a saída de uma atualização (versão instalada, URL
+e tipo do instalador, duração do download e da instalação) e guarda as
+últimas linhas para relatório; PowerShellManager.update_app_silent entrega o
+resultado ao histórico (upgrade_history.py).
+"""
+import re
+import time
+from collections import deque
+from typing import Callable, Optional
+
+from winget_parser import clean_line
+
+# Marcos da saída de 'winget upgrade --id' (en-US e pt-BR)
+_FOUND_RE = re.compile(r'^(?:Found|Encontrado)\s.*\[(?P<id>[^\]]+)\]\s+(?:Version|Vers\S+)\s+(?P<version>\S+)',
+                       re.IGNORECASE)
+_DOWNLOADING_RE = re.compile(r'^(?:Downloading|Baixando)\s+(?P<url>https?://\S+)', re.IGNORECASE)
+_HASH_VERIFIED_RE = re.compile(r'^(?:Successfully verified installer hash|Hash do instalador verificado)',
+                               re.IGNORECASE)
+_INSTALL_STARTED_RE = re.compile(r'^(?:Starting package install|Iniciando a instala)', re.IGNORECASE)
+
+# Tipo do instalador pela extensão do arquivo baixado
+INSTALLER_EXTENSIONS = {
+    '.msi': 'msi',
+    '.msix': 'msix',
+    '.msixbundle': 'msix',
+    '.appx': 'msix',
+    '.appxbundle': 'msix',
+    '.exe': 'exe',
+    '.zip': 'zip',
+}
+
+# Linhas finais guardadas por UpgradeTranscript
+DEFAULT_TRANSCRIPT_TAIL = 20
+
+
+def installer_type_from_url(url: str) -> Optional[str]:
+    """Tipo do instalador ('msi', 'msix', 'exe', 'zip') pela extensão da URL, ou None"""
+    path = url.split('?', 1)[0].split('#', 1)[0].lower()
+    for extension, installer_type in INSTALLER_EXTENSIONS.items():
+        if path.endswith(extension):
+            return installer_type
+    return None
+
+
+class UpgradeTranscript:
+    """
+    Acompanha a saída de 'winget upgrade --id' de um pacote, linha a linha.
+
+    Com as linhas entregues ao vivo (feed), o horário de cada marco separa o
+    download ("Downloading ..." até o hash verificado) da instalação ("Starting
+    package install..." até finish()). Com a saída completa de uma vez
+    (feed_text), só versão, instalador e últimas linhas são aproveitados.
+    """
+
+    def __init__(self, tail_lines: int = DEFAULT_TRANSCRIPT_TAIL,
+                 clock: Callable[[], float] = time.perf_counter):
+        """
+        Args:
+            tail_lines: Quantidade de linhas finais guardadas
+            clock: Fonte de tempo (substituível em testes)
+        """
+        self.clock = clock
+        self.version: Optional[str] = None
+        self.installer_url: Optional[str] = None
+        self.installer_type: Optional[str] = None
+        self.live = False
+        self._tail = deque(maxlen=tail_lines)
+        self._marks = {}
+
+    def feed(self, line: str):
+        """Registra uma linha entregue assim que o winget a produziu"""
+        self.live = True
+        self._process(line, self.clock())
+
+    def feed_text(self, text: str):
+        """Registra a saída completa (sem horários: durações ficam None)"""
+        for line in text.splitlines():
+            self._process(line, None)
+
+    def finish(self):
+        """Marca o fim do comando (fecha a duração da instalação)"""
+        if self.live:
+            self._marks.setdefault('finished', self.clock())
+
+    def _process(self, line: str, at: Optional[float]):
+        line = clean_line(line).strip()
+        if not line:
+            return
+        self._tail.append(line)
+
+        found = _FOUND_RE.match(line)
+        if found:
+            self.version = found.group('version')
+            return
+        downloading = _DOWNLOADING_RE.match(line)
+        if downloading:
+            self.installer_url = downloading.group('url')
+            self.installer_type = installer_type_from_url(self.installer_url)
+            self._mark('download_started', at)
+        elif _HASH_VERIFIED_RE.match(line):
+            self._mark('download_finished', at)
+        elif _INSTALL_STARTED_RE.match(line):
+            self._mark('download_finished', at)
+            self._mark('install_started', at)
+
+    def _mark(self, name: str, at: Optional[float]):
+        if at is not None:
+            self._marks.setdefault(name, at)
+
+    def _span(self, start: str, end: str) -> Optional[float]:
+        if start not in self._marks or end not in self._marks:
+            return None
+        return round(max(0.0, self._marks[end] - self._marks[start]), 3)
+
+    @property
+    def download_seconds(self) -> Optional[float]:
+        """Duração do download (None sem linhas ao vivo ou sem o marco)"""
+        return self._span('download_started', 'download_finished')
+
+    @property
+    def install_seconds(self) -> Optional[float]:
+        """Duração da instalação (None sem linhas ao vivo ou sem o marco)"""
+        return self._span('install_started', 'finished')
+
+    def tail(self) -> str:
+        """Últimas linhas da saída"""
+        return "\n".join(self._tail)
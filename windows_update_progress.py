@@ -0,0 +1,214 @@
+"""
+windows_update_progress.py - Progresso real do Windows Update (PSWindowsUpdate)
+
+Interpreta, linha a linha, a saída de 'Get-WindowsUpdate -AcceptAll -Install -Verbose'.
+Cada atualização passa pelas fases Accepted (1) -> Downloaded (2) ->
+Installed/Failed (3); as transições viram eventos de progresso ponderados pelo
+tamanho de cada atualização, com a duração de cada etapa.
+
+Faixas de porcentagem:
+    0-5     busca de atualizações
+    5-50    download (ponderado pelo tamanho)
+    50-100  instalação (ponderada pelo tamanho)
+"""
+import re
+import time
+from typing import Callable, List, Optional
+
+# Limites de cada fase na barra de progresso
+SCAN_END_PERCENT = 5
+DOWNLOAD_END_PERCENT = 50
+INSTALL_END_PERCENT = 100
+
+# Linha da tabela: X ComputerName Result [KB] Size Title
+_ROW_RE = re.compile(
+    r'^\s*(?P<step>[123])\s+(?P<computer>\S+)\s+(?P<result>[A-Za-z]+)\s+'
+    r'(?:(?P<kb>KB\d+)\s+)?(?P<size>\d+(?:[.,]\d+)?\s?[KMGT]?B)\s+(?P<title>.*)$'
+)
+_FOUND_RE = re.compile(r'Found \[(\d+)\] Updates in post search criteria', re.IGNORECASE)
+_SIZE_RE = re.compile(r'^(\d+(?:[.,]\d+)?)\s?([KMGT]?B)$', re.IGNORECASE)
+
+_SIZE_UNITS = {'B': 1, 'KB': 1024, 'MB': 1024 ** 2, 'GB': 1024 ** 3, 'TB': 1024 ** 4}
+
+# Resultado da tabela -> fase do evento
+_RESULT_PHASES = {
+    'accepted': 'accepted',
+    'downloaded': 'downloaded',
+    'installed': 'installed',
+    'failed': 'failed',
+    'rejected': 'failed',
+    'notaccepted': 'failed',
+}
+
+
+def parse_size(text: str) -> int:
+    """
+    Converte um tamanho do PSWindowsUpdate ("59MB", "1,2GB") para bytes.
+
+    Returns:
+        Tamanho em bytes (0 se não reconhecido)
+    """
+    match = _SIZE_RE.match(text.strip())
+    if not match:
+        return 0
+    value = float(match.group(1).replace(',', '.'))
+    return int(value * _SIZE_UNITS[match.group(2).upper()])
+
+
+def _format_size(bytes_size: int) -> str:
+    """Formata tamanho em bytes para formato legível"""
+    for unit in ['B', 'KB', 'MB', 'GB']:
+        if bytes_size < 1024.0:
+            return f"{bytes_size:.0f} {unit}"
+        bytes_size /= 1024.0
+    return f"{bytes_size:.1f} TB"
+
+
+class WindowsUpdateProgressParser:
+    """Transforma a saída do PSWindowsUpdate em eventos de progresso"""
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            clock: Fonte de tempo (substituível em testes)
+        """
+        self.clock = clock
+        self.start_time = clock()
+        self.updates = {}
+        self.found = None
+        self.percent = 0.0
+        self._phase_marks = {}
+
+    def _weight(self, update: dict) -> float:
+        """Peso de uma atualização: seu tamanho, ou a média quando o tamanho é desconhecido"""
+        if update['size_bytes']:
+            return update['size_bytes']
+        known = [u['size_bytes'] for u in self.updates.values() if u['size_bytes']]
+        return sum(known) / len(known) if known else 1.0
+
+    def _fraction(self, done_key: str) -> float:
+        """Fração (por peso) das atualizações que já passaram por uma fase"""
+        total = sum(self._weight(u) for u in self.updates.values())
+        if not total:
+            return 0.0
+        done = sum(self._weight(u) for u in self.updates.values() if u[done_key] is not None)
+        return done / total
+
+    def _event(self, phase: str, message: str, update: Optional[dict] = None,
+               duration: Optional[float] = None) -> dict:
+        """Monta um evento de progresso"""
+        event = {
+            'phase': phase,
+            'percent': round(self.percent, 1),
+            'message': message,
+            'elapsed': self.clock() - self.start_time,
+            'duration': duration,
+            'total': len(self.updates),
+        }
+        if update is not None:
+            event.update({
+                'kb': update['kb'],
+                'title': update['title'],
+                'size_bytes': update['size_bytes'],
+            })
+        return event
+
+    def feed(self, line: str) -> List[dict]:
+        """
+        Processa uma linha de saída.
+
+        Args:
+            line: Linha de stdout do PowerShell
+
+        Returns:
+            Lista de eventos gerados pela linha (geralmente zero ou um)
+        """
+        found = _FOUND_RE.search(line)
+        if found:
+            self.found = int(found.group(1))
+            self.percent = max(self.percent, SCAN_END_PERCENT)
+            if self.found:
+                message = f"{self.found} atualização(ões) encontrada(s)"
+            else:
+                message = "Nenhuma atualização disponível"
+            return [self._event('scan', message)]
+
+        match = _ROW_RE.match(line)
+        if not match:
+            return []
+
+        phase = _RESULT_PHASES.get(match.group('result').lower())
+        if phase is None:
+            return []
+
+        kb = match.group('kb') or ''
+        title = match.group('title').strip()
+        key = kb or title
+        now = self.clock()
+
+        update = self.updates.get(key)
+        if update is None:
+            update = {
+                'kb': kb,
+                'title': title,
+                'size_bytes': parse_size(match.group('size')),
+                'accepted_at': None,
+                'downloaded_at': None,
+                'finished_at': None,
+                'result': None,
+            }
+            self.updates[key] = update
+
+        label = kb or title
+        size_text = _format_size(update['size_bytes'])
+
+        if phase == 'accepted':
+            update['accepted_at'] = now
+            self._phase_marks.setdefault('download', now)
+            return [self._event('accepted', f"Atualização aceita: {label} ({size_text})", update)]
+
+        if phase == 'downloaded':
+            # Downloads são sequenciais: a duração vai do evento anterior até este
+            duration = now - self._phase_marks.get('download', now)
+            self._phase_marks['download'] = now
+            self._phase_marks.setdefault('install', now)
+            update['downloaded_at'] = now
+            update['download_seconds'] = duration
+            self.percent = max(self.percent, SCAN_END_PERCENT
+                               + (DOWNLOAD_END_PERCENT - SCAN_END_PERCENT) * self._fraction('downloaded_at'))
+            index = sum(1 for u in self.updates.values() if u['downloaded_at'] is not None)
+            message = f"Baixado {index}/{len(self.updates)}: {label} ({size_text}, {duration:.0f}s)"
+            return [self._event('downloaded', message, update, duration)]
+
+        # Fase 3: instalação concluída ou com falha
+        duration = now - self._phase_marks.get('install', now)
+        self._phase_marks['install'] = now
+        update['finished_at'] = now
+        update['install_seconds'] = duration
+        update['result'] = 'installed' if phase == 'installed' else 'failed'
+        self.percent = max(self.percent, DOWNLOAD_END_PERCENT
+                           + (INSTALL_END_PERCENT - DOWNLOAD_END_PERCENT) * self._fraction('finished_at'))
+        index = sum(1 for u in self.updates.values() if u['finished_at'] is not None)
+        if update['result'] == 'installed':
+            message = f"Instalado {index}/{len(self.updates)}: {label} ({size_text}, {duration:.0f}s)"
+        else:
+            message = f"Falha ao instalar {index}/{len(self.updates)}: {label}"
+        return [self._event(update['result'], message, update, duration)]
+
+    def summary(self) -> dict:
+        """
+        Resumo das atualizações processadas.
+
+        Returns:
+            Dicionário com contagens, bytes e lista de KBs com falha
+        """
+        updates = list(self.updates.values())
+        return {
+            'found': self.found,
+            'total': len(updates),
+            'downloaded': sum(1 for u in updates if u['downloaded_at'] is not None),
+            'installed': sum(1 for u in updates if u['result'] == 'installed'),
+            'failed': [u['kb'] or u['title'] for u in updates if u['result'] == 'failed'],
+            'total_bytes': sum(u['size_bytes'] for u in updates),
+            'elapsed': self.clock() - self.start_time,
+        }
@@ -0,0 +1,185 @@
+"""
+winget_parser.py - Parser da tabela de texto do winget por offsets de coluna
+
+Lê a linha de cabeçalho e o separador de traços uma única vez para obter o
+offset de cada coluna e depois fatia cada linha por esses offsets. Nomes com
+espaços, IDs sem ponto (ex: IDs da Microsoft Store), células truncadas com "…"
+e cabeçalhos localizados (en-US e pt-BR) são tratados.
+"""
+import re
+from typing import Iterable, Iterator, List, Optional, Union
+
+# Cabeçalhos conhecidos mapeados para as chaves dos dicionários de apps
+HEADER_ALIASES = {
+    'name': 'name',
+    'nome': 'name',
+    'id': 'id',
+    'version': 'version',
+    'versão': 'version',
+    'versao': 'version',
+    'available': 'available',
+    'disponível': 'available',
+    'disponivel': 'available',
+    'source': 'source',
+    'origem': 'source',
+    'fonte': 'source',
+}
+
+# Marca usada pelo winget em células truncadas
+TRUNCATION_MARK = '…'
+
+_SEPARATOR_RE = re.compile(r'^-{10,}\s*$')
+_TOKEN_RE = re.compile(r'\S+')
+_FOOTER_RE = re.compile(r'^\d+\s+(upgrades?|atualiza\S*)\s+(available|dispon\S*)', re.IGNORECASE)
+
+# Quadros do spinner que o winget redesenha enquanto espera ("\r   - \r   \\ ...")
+_SPINNER_CHARS = ' \t-\\|/'
+
+
+def clean_line(line: str) -> str:
+    """Remove o spinner/barra de progresso (texto antes do último \\r) e o fim de linha"""
+    line = line.rstrip()
+    if '\r' in line:
+        line = line.rsplit('\r', 1)[-1].rstrip()
+    return line
+
+
+def has_content(text: str) -> bool:
+    """
+    Se um trecho da saída do winget traz algo além do spinner.
+
+    Cada redesenho (separado por \r ou \n) passa por clean_line; trechos só
+    com \r, espaços e -\\|/ não têm conteúdo.
+    """
+    return any(clean_line(part).strip(_SPINNER_CHARS) for part in re.split(r'[\r\n]', text))
+
+
+def parse_header(line: str) -> Optional[List[tuple]]:
+    """
+    Extrai as colunas de uma linha de cabeçalho.
+
+    Args:
+        line: Linha de cabeçalho (ex: "Name   Id   Version   Available   Source")
+
+    Returns:
+        Lista de (chave, offset) ou None se a linha não for um cabeçalho do winget
+    """
+    columns = []
+    for match in _TOKEN_RE.finditer(line):
+        key = HEADER_ALIASES.get(match.group(0).lower())
+        if key:
+            columns.append((key, match.start()))
+
+    keys = {key for key, _ in columns}
+    if 'name' in keys and 'id' in keys:
+        return columns
+    return None
+
+
+def _snap_boundary(line: str, boundary: int, floor: int) -> int:
+    """
+    Ajusta um offset que caiu no meio de uma palavra para o início dela.
+
+    Caracteres largos (ex: CJK) ocupam duas colunas no console, então a
+    linha pode estar deslocada em relação ao cabeçalho.
+    """
+    if boundary >= len(line) or boundary <= floor:
+        return boundary
+    if line[boundary - 1] == ' ' or line[boundary] == ' ':
+        return boundary
+    start = line.rfind(' ', floor, boundary)
+    return start + 1 if start >= 0 else boundary
+
+
+def split_row(line: str, columns: List[tuple]) -> dict:
+    """
+    Fatia uma linha de dados pelos offsets das colunas.
+
+    Args:
+        line: Linha de dados já limpa
+        columns: Colunas retornadas por parse_header
+
+    Returns:
+        Dicionário {chave: valor} com 'truncated' indicando células cortadas com "…"
+    """
+    starts = [start for _, start in columns]
+    starts[0] = 0
+    length = len(line)
+
+    # Só corrige offsets que caíram no meio de uma palavra (linha desalinhada)
+    for index in range(1, len(starts)):
+        start = starts[index]
+        if start < length and line[start - 1] != ' ' and line[start] != ' ':
+            starts[index] = _snap_boundary(line, start, starts[index - 1] + 1)
+    starts.append(length)
+
+    row = {'truncated': False}
+    for index, (key, _) in enumerate(columns):
+        value = line[starts[index]:starts[index + 1]].strip()
+        if value and value[-1] == TRUNCATION_MARK:
+            value = value.rstrip(TRUNCATION_MARK).rstrip()
+            row['truncated'] = True
+        row[key] = value
+    return row
+
+
+def iter_rows(source: Union[str, Iterable[str]]) -> Iterator[dict]:
+    """
+    Itera sobre as linhas de dados de uma saída do winget, de forma incremental.
+
+    Aceita o texto completo ou qualquer iterável de linhas (ex: stdout lido
+    em streaming). Várias tabelas na mesma saída (como a lista de pacotes
+    que exigem seleção explícita) são suportadas.
+
+    Args:
+        source: Texto ou iterável de linhas
+
+    Yields:
+        Dicionários {'name', 'id', 'version', 'available', 'source', 'truncated'}
+    """
+    lines = source.splitlines() if isinstance(source, str) else source
+
+    columns = None
+    pending_header = None
+
+    for raw in lines:
+        line = clean_line(raw)
+
+        if line[:1] == '-' and _SEPARATOR_RE.match(line):
+            if pending_header is not None:
+                columns = pending_header
+                pending_header = None
+            continue
+
+        if columns is None:
+            pending_header = parse_header(line)
+            continue
+
+        # Linha em branco ou rodapé encerram a tabela atual
+        if not line or (line[0].isdigit() and _FOOTER_RE.match(line)):
+            columns = None
+            continue
+
+        row = split_row(line, columns)
+        app_id = row.get('id')
+        if not app_id:
+            continue
+
+        row['name'] = row.get('name') or app_id
+        row['version'] = row.get('version') or 'unknown'
+        row['available'] = row.get('available') or 'unknown'
+        row.setdefault('source', '')
+        yield row
+
+
+def parse_upgrade_table(text: str) -> list:
+    """
+    Interpreta a saída completa de 'winget upgrade'.
+
+    Args:
+        text: Saída de texto do winget
+
+    Returns:
+        Lista de dicionários de apps
+    """
+    return list(iter_rows(text))